@@ -1,25 +1,37 @@
 from abc import ABC, abstractmethod
-import boto3
 import botocore
+import io
 import os
 import shutil
+from functools import partial
 
 from aitoolbox.utils import file_system
+from aitoolbox.cloud.clients import get_s3_client, get_s3_resource
+from aitoolbox.cloud.transfer import get_transfer_config, parallel_file_transfer, MB
+from aitoolbox.cloud.download import RangedFileDownloader, RangedReadStream, TeeStreamReader, DownloadCache, \
+    FileLock, link_or_copy_file, replace_with_cached_file, verify_file_md5, cleanup_failed_extraction
+
+DATASET_CACHE_DIR_PATH = '~/.cache/aitoolbox/datasets'
 
 
 class BaseDataSaver:
-    def __init__(self, bucket_name='model-result'):
+    def __init__(self, bucket_name='model-result', transfer_config=None):
         """Base class implementing S3 file saving logic
 
         Args:
             bucket_name (str): S3 bucket into which the files will be saved
+            transfer_config (aitoolbox.cloud.transfer.CloudTransferConfig or None): parallel and multipart transfer
+                settings. If left to ``None`` the default process-wide transfer config is used.
         """
         self.bucket_name = bucket_name
-        self.s3_client = boto3.client('s3')
+        self.s3_client = get_s3_client()
+        self.transfer_config = transfer_config
 
     def save_file(self, local_file_path, cloud_file_path):
         """Save / upload file on local drive to the AWS S3
 
+        Large files are uploaded as multipart uploads with the parts being uploaded in parallel.
+
         Args:
             local_file_path (str): path to the file on the local drive
             cloud_file_path (str): destination where the file will be saved on S3 inside the specified bucket
@@ -28,7 +40,124 @@ class BaseDataSaver:
             None
         """
         self.s3_client.upload_file(os.path.expanduser(local_file_path),
-                                   self.bucket_name, cloud_file_path)
+                                   self.bucket_name, cloud_file_path,
+                                   Config=get_transfer_config(self.transfer_config).get_s3_transfer_config())
+
+    def save_files(self, file_paths):
+        """Save / upload multiple files on local drive to the AWS S3 in parallel
+
+        Args:
+            file_paths (list): list of [local_file_path, cloud_file_path] pairs
+
+        Returns:
+            None
+        """
+        parallel_file_transfer(self.save_file, file_paths, get_transfer_config(self.transfer_config).max_workers)
+
+    def save_bytes(self, data, cloud_file_path):
+        """Save / upload the in-memory bytes as the file on the AWS S3
+
+        Args:
+            data (bytes): content of the saved file
+            cloud_file_path (str): destination where the file will be saved on S3 inside the specified bucket
+
+        Returns:
+            None
+        """
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=cloud_file_path, Body=data)
+
+    def file_exists(self, cloud_file_path):
+        """Check if the file exists on the AWS S3
+
+        Args:
+            cloud_file_path (str): location of the file on S3 inside the specified bucket
+
+        Returns:
+            bool: if the file exists
+        """
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=cloud_file_path)
+            return True
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] == "404":
+                return False
+            raise
+
+    def list_files(self, cloud_folder_path):
+        """List all the files inside the folder on the AWS S3, including the files in its subfolders
+
+        Args:
+            cloud_folder_path (str): path of the folder on S3 inside the specified bucket
+
+        Returns:
+            list: list of (cloud_file_path, file_size, last_modified_timestamp) tuples
+        """
+        files = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=cloud_folder_path.rstrip('/') + '/'):
+            for s3_object in page.get('Contents', []):
+                files.append((s3_object['Key'], s3_object['Size'], s3_object['LastModified'].timestamp()))
+        return files
+
+    def read_file_range(self, cloud_file_path, start, end):
+        """Read the byte range of the file on the AWS S3
+
+        Args:
+            cloud_file_path (str): location of the file on S3 inside the specified bucket
+            start (int): inclusive start byte position
+            end (int): inclusive end byte position
+
+        Returns:
+            bytes: file bytes in the range
+        """
+        return self.s3_client.get_object(Bucket=self.bucket_name, Key=cloud_file_path,
+                                         Range=f'bytes={start}-{end}')['Body'].read()
+
+    def open_upload_stream(self, cloud_file_path):
+        """Open the writable stream which uploads the written bytes directly into the file on the AWS S3
+
+        Nothing is written to the local drive. Use the returned stream as a context manager: the upload is completed
+        when the stream is closed and aborted if an exception is raised while writing. A stream which is garbage
+        collected without being explicitly closed is aborted as well.
+
+        Args:
+            cloud_file_path (str): destination where the file will be saved on S3 inside the specified bucket
+
+        Returns:
+            S3MultipartUploadStream: writable upload stream
+        """
+        return S3MultipartUploadStream(self.s3_client, self.bucket_name, cloud_file_path,
+                                       part_size=get_transfer_config(self.transfer_config).multipart_chunksize)
+
+    def delete_files(self, cloud_file_paths):
+        """Delete multiple files from the AWS S3
+
+        Deletions are batched into the minimal number of S3 requests. The batched request succeeds even when
+        some of its files can't be deleted, so the failed files are collected from all the requests and reported
+        together at the end.
+
+        Args:
+            cloud_file_paths (list): list of paths of the files on S3 inside the specified bucket
+
+        Raises:
+            RuntimeError: if any of the files couldn't be deleted
+
+        Returns:
+            None
+        """
+        delete_errors = []
+        for i in range(0, len(cloud_file_paths), 1000):
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': cloud_file_path} for cloud_file_path in cloud_file_paths[i:i + 1000]],
+                        'Quiet': True}
+            )
+            delete_errors += response.get('Errors', [])
+
+        if len(delete_errors) > 0:
+            failed_files = {error['Key']: f'{error.get("Code")}: {error.get("Message")}' for error in delete_errors}
+            raise RuntimeError(f'Failed to delete {len(failed_files)} files from the bucket {self.bucket_name}: '
+                               f'{failed_files}')
 
     def save_folder(self, local_folder_path, cloud_folder_path):
         """Save / upload the contents of the local folder on the local drive to AWS S3
@@ -52,25 +181,155 @@ class BaseDataSaver:
         Returns:
             None
         """
+        file_paths = []
         for root, dirs, files in os.walk(local_folder_path):
             for filename in files:
                 local_file_path = os.path.join(root, filename)
                 file_path_inside_folder = os.path.relpath(local_file_path, local_folder_path)
                 s3_file_path = os.path.join(cloud_folder_path, file_path_inside_folder)
+                file_paths.append([local_file_path, s3_file_path])
+
+        self.save_files(file_paths)
+
 
-                self.s3_client.upload_file(local_file_path, self.bucket_name, s3_file_path)
+class S3MultipartUploadStream(io.RawIOBase):
+    # S3 requires all the multipart upload parts except for the last one to be at least 5 MB large
+    MIN_PART_SIZE = 5 * MB
+
+    def __init__(self, s3_client, bucket_name, cloud_file_path, part_size=16 * MB):
+        """Write-only file object uploading the written bytes to the AWS S3 as a multipart upload
+
+        At most a single part is buffered in memory at any time which bounds the memory use regardless of
+        the uploaded file size. Files smaller than a single part are uploaded with a single put request when
+        the stream is closed.
+
+        The file is only created on S3 when ``close()`` is explicitly called or when the stream used as the context
+        manager exits without an exception. If the stream is dropped, e.g. after an error outside of the ``with``
+        block, the upload is aborted when the stream is garbage collected, so that the truncated file is never
+        published at the destination.
+
+        Args:
+            s3_client: boto3 S3 client
+            bucket_name (str): S3 bucket into which the file will be saved
+            cloud_file_path (str): destination where the file will be saved on S3 inside the specified bucket
+            part_size (int): size in bytes of each uploaded part
+        """
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.cloud_file_path = cloud_file_path
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.uploaded_parts = []
+        self.num_bytes_written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        position = 0
+        while position < len(data):
+            num_bytes = min(self.part_size - len(self.buffer), len(data) - position)
+            self.buffer += data[position:position + num_bytes]
+            position += num_bytes
+
+            if len(self.buffer) == self.part_size:
+                self._upload_buffered_part()
+
+        self.num_bytes_written += len(data)
+        return len(data)
+
+    def _upload_buffered_part(self):
+        if self.upload_id is None:
+            self.upload_id = self.s3_client.create_multipart_upload(Bucket=self.bucket_name,
+                                                                    Key=self.cloud_file_path)['UploadId']
+
+        part_number = len(self.uploaded_parts) + 1
+        response = self.s3_client.upload_part(Bucket=self.bucket_name, Key=self.cloud_file_path,
+                                              UploadId=self.upload_id, PartNumber=part_number,
+                                              Body=bytes(self.buffer))
+        self.uploaded_parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self.buffer.clear()
+
+    def close(self):
+        """Upload the remaining buffered bytes and complete the upload
+
+        Returns:
+            None
+        """
+        if self.closed:
+            return
+
+        try:
+            if self.upload_id is None:
+                self.s3_client.put_object(Bucket=self.bucket_name, Key=self.cloud_file_path, Body=bytes(self.buffer))
+            else:
+                if len(self.buffer) > 0:
+                    self._upload_buffered_part()
+                self.s3_client.complete_multipart_upload(Bucket=self.bucket_name, Key=self.cloud_file_path,
+                                                         UploadId=self.upload_id,
+                                                         MultipartUpload={'Parts': self.uploaded_parts})
+        except Exception:
+            self.abort()
+            raise
+        super().close()
+
+    def abort(self):
+        """Abort the upload without creating the file on S3
+
+        Returns:
+            None
+        """
+        if self.closed:
+            return
+
+        if self.upload_id is not None:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=self.cloud_file_path,
+                                                  UploadId=self.upload_id)
+        self.buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def __del__(self):
+        # IOBase.__del__ would call close() and thus complete the upload of the potentially truncated file
+        try:
+            self.abort()
+        except Exception:
+            pass
 
 
 class BaseDataLoader:
-    def __init__(self, bucket_name='dataset-store', local_base_data_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_base_data_folder_path='~/project/data',
+                 cache_dir_path=None, max_cache_size=None, transfer_config=None):
         """Base class implementing S3 file downloading logic
 
+        Files are downloaded in parallel byte ranges and interrupted downloads are resumed on the next attempt.
+
         Args:
             bucket_name (str): S3 bucket from which the files will be downloaded
             local_base_data_folder_path (str): local main experiment saving folder
+            cache_dir_path (str or None): path to the local download cache directory shared between the processes.
+                Files are downloaded from S3 only once into the cache and then linked to the requested local paths.
+                If left to ``None`` the files are downloaded directly to the requested local paths.
+            max_cache_size (int or None): max total size in bytes of the download cache. When exceeded, the least
+                recently used cached files are evicted. If left to ``None`` the cache size is not limited.
+            transfer_config (aitoolbox.cloud.transfer.CloudTransferConfig or None): parallel and multipart transfer
+                settings. If left to ``None`` the default process-wide transfer config is used.
         """
         self.bucket_name = bucket_name
-        self.s3 = boto3.resource('s3')
+        self.s3 = get_s3_resource()
+        self.s3_client = get_s3_client()
+        self.transfer_config = transfer_config
+        self.file_downloader = RangedFileDownloader(transfer_config)
+        self.download_cache = DownloadCache(cache_dir_path, max_cache_size) if cache_dir_path is not None else None
 
         self.local_base_data_folder_path = os.path.expanduser(local_base_data_folder_path)
         self.available_prepocessed_datasets = []
@@ -92,13 +351,308 @@ class BaseDataLoader:
         else:
             print('Local file does not exist on the local disk. Downloading from S3')
             try:
-                self.s3.Bucket(self.bucket_name).download_file(cloud_file_path, local_file_path)
+                file_size, file_etag, file_md5 = self.get_file_info(cloud_file_path)
             except botocore.exceptions.ClientError as e:
                 if e.response['Error']['Code'] == "404":
                     print("The object does not exist on S3.")
+                    return
                 else:
                     raise
 
+            if self.download_cache is not None:
+                cache_file_path = self.download_cache.fetch(
+                    lambda download_path: self.download_file(cloud_file_path, download_path, file_size, file_etag, file_md5),
+                    file_etag, file_size
+                )
+                link_or_copy_file(cache_file_path, local_file_path)
+            else:
+                self.download_file(cloud_file_path, local_file_path, file_size, file_etag, file_md5)
+
+    def load_cached_file(self, cloud_file_path, local_file_path):
+        """Get the up-to-date file from AWS S3 through the download cache
+
+        Unlike ``load_file()``, the already existing local file is not trusted blindly. The file version on S3 is
+        checked on every call and the file is served from the local cache as long as it hasn't changed on S3.
+        Only the changed or not yet cached files are downloaded. The cache is keyed by the bucket, key and ETag.
+
+        Args:
+            cloud_file_path (str): location where the file is saved on S3 inside the specified bucket
+            local_file_path (str): destination path where the file will be made available on the local drive
+
+        Returns:
+            None
+        """
+        if self.download_cache is None:
+            raise ValueError('Download cache is not enabled. Provide cache_dir_path when creating the data loader.')
+
+        local_file_path = os.path.expanduser(local_file_path)
+        try:
+            file_size, file_etag, file_md5 = self.get_file_info(cloud_file_path)
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] == "404":
+                print("The object does not exist on S3.")
+                return
+            else:
+                raise
+
+        cache_file_path = self.download_cache.fetch(
+            lambda download_path: self.download_file(cloud_file_path, download_path, file_size, file_etag, file_md5),
+            f'{self.bucket_name}/{cloud_file_path}@{file_etag}', file_size
+        )
+        replace_with_cached_file(cache_file_path, local_file_path)
+
+    def load_files(self, file_paths):
+        """Download multiple files from AWS S3 to the local drive in parallel
+
+        Args:
+            file_paths (list): list of [cloud_file_path, local_file_path] pairs
+
+        Returns:
+            None
+        """
+        parallel_file_transfer(self.load_file, file_paths, get_transfer_config(self.transfer_config).max_workers)
+
+    def read_file(self, cloud_file_path):
+        """Read the whole file from AWS S3 into memory with a single request
+
+        Args:
+            cloud_file_path (str): location where the file is saved on S3 inside the specified bucket
+
+        Returns:
+            bytearray: file bytes
+        """
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=cloud_file_path)
+        file_data = bytearray(response['Body'].read())
+        if len(file_data) != response['ContentLength']:
+            raise ValueError(f'Read {len(file_data)} bytes of the file {cloud_file_path} with '
+                             f'{response["ContentLength"]} bytes')
+        return file_data
+
+    def read_files(self, cloud_file_paths):
+        """Read multiple whole files from AWS S3 into memory in parallel
+
+        Args:
+            cloud_file_paths (list): list of locations where the files are saved on S3 inside the specified bucket
+
+        Returns:
+            list: bytes of each file in the same order as the provided paths
+        """
+        files_data = [None] * len(cloud_file_paths)
+
+        def read_file_at(cloud_file_path, file_idx):
+            files_data[file_idx] = self.read_file(cloud_file_path)
+
+        parallel_file_transfer(read_file_at,
+                               [[cloud_file_path, i] for i, cloud_file_path in enumerate(cloud_file_paths)],
+                               get_transfer_config(self.transfer_config).max_workers)
+        return files_data
+
+    def load_file_segments(self, cloud_segments_prefix, local_file_path):
+        """Download the file uploaded in segments and concatenate the segments into the local file
+
+        Segment files are all the files on S3 starting with the ``cloud_segments_prefix``. They are concatenated in
+        the order of their sorted names, which is why the segment files should be named with the zero-padded
+        sequence numbers.
+
+        Args:
+            cloud_segments_prefix (str): common path prefix of the segment files on S3 inside the specified bucket
+            local_file_path (str): destination path of the concatenated file on the local drive
+
+        Returns:
+            list: sorted paths of the concatenated segment files on S3
+        """
+        local_file_path = os.path.expanduser(local_file_path)
+        segment_paths = sorted(
+            el['Key']
+            for page in self.s3_client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket_name,
+                                                                                 Prefix=cloud_segments_prefix)
+            for el in page.get('Contents', [])
+        )
+
+        with file_system.atomic_write_path(local_file_path) as tmp_file_path:
+            with open(tmp_file_path, 'wb') as f:
+                for segment_path in segment_paths:
+                    segment_body = self.s3_client.get_object(Bucket=self.bucket_name, Key=segment_path)['Body']
+                    shutil.copyfileobj(segment_body, f)
+        return segment_paths
+
+    def get_file_info(self, cloud_file_path):
+        """Get the size, the ETag and the content MD5 hash of the file on S3
+
+        Args:
+            cloud_file_path (str): location where the file is saved on S3 inside the specified bucket
+
+        Returns:
+            (int, str, str or None): file size in bytes, file ETag and the hex digest of the file content MD5 hash.
+                The MD5 hash is ``None`` when the ETag isn't the content MD5 hash.
+        """
+        file_head = self.s3_client.head_object(Bucket=self.bucket_name, Key=cloud_file_path)
+        file_etag = file_head['ETag'].strip('"')
+
+        # ETags of the multipart uploads and of the objects encrypted with the KMS or the customer provided keys
+        # are not the content MD5 hashes
+        is_etag_md5 = '-' not in file_etag and \
+            not file_head.get('ServerSideEncryption', '').startswith('aws:kms') and \
+            'SSECustomerAlgorithm' not in file_head
+
+        return file_head['ContentLength'], file_etag, file_etag if is_etag_md5 else None
+
+    def download_file(self, cloud_file_path, local_file_path, file_size, file_etag, file_md5=None):
+        """Download the file in parallel byte ranges and verify its integrity
+
+        Every range request is conditioned on the ETag so that the file modified on S3 during the download
+        is not silently stitched together from different versions.
+
+        Args:
+            cloud_file_path (str): location where the file is saved on S3 inside the specified bucket
+            local_file_path (str): destination path where the file will be downloaded to the local drive
+            file_size (int): size of the file in bytes
+            file_etag (str): S3 ETag of the file
+            file_md5 (str or None): expected hex digest of the file content MD5 hash. If not provided, the file
+                content is not verified.
+
+        Returns:
+            None
+        """
+        self.file_downloader.download(
+            self.get_download_range_fn(cloud_file_path, file_etag), file_size, file_etag, local_file_path,
+            verify_fn=partial(verify_file_md5, expected_md5=file_md5) if file_md5 is not None else None
+        )
+
+    def get_file_range_reader(self, cloud_file_path):
+        """Get the function reading the byte ranges of the file on S3 without downloading the whole file
+
+        Args:
+            cloud_file_path (str): location where the file is saved on S3 inside the specified bucket
+
+        Returns:
+            (callable, int): function accepting the inclusive start and end byte positions and returning the bytes
+                of the file in that range, and the file size in bytes
+        """
+        file_size, file_etag, _ = self.get_file_info(cloud_file_path)
+        return self.get_download_range_fn(cloud_file_path, file_etag), file_size
+
+    def get_download_range_fn(self, cloud_file_path, file_etag):
+        def download_range(start, end):
+            return self.s3_client.get_object(Bucket=self.bucket_name, Key=cloud_file_path,
+                                             Range=f'bytes={start}-{end}', IfMatch=file_etag)['Body'].read()
+        return download_range
+
+    def load_archive(self, cloud_file_path, local_folder_path, members=None):
+        """Download and extract the zip or tar archive from AWS S3 without first saving the whole archive to disk
+
+        Tar archives are decompressed and extracted while the bytes are arriving from S3. When the download cache
+        is used, the archive is at the same time also written into the cache so that the other jobs can reuse it.
+        Zip archives keep their index at the end of the file and thus can't be extracted while streaming. Instead,
+        without the download cache, only the byte ranges of the selected members are read directly from S3.
+
+        Args:
+            cloud_file_path (str): location where the archive is saved on S3 inside the specified bucket
+            local_folder_path (str): destination folder where the archive content is extracted
+            members (list or None): optional list of glob patterns. Only the archive members matching at least one
+                of the patterns are extracted. If left to ``None`` the whole archive is extracted.
+
+        Returns:
+            None
+        """
+        local_folder_path = os.path.expanduser(local_folder_path)
+        is_zip_archive = cloud_file_path.endswith('.zip')
+
+        try:
+            file_size, file_etag, file_md5 = self.get_file_info(cloud_file_path)
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] == "404":
+                print("The object does not exist on S3.")
+                return
+            else:
+                raise
+
+        if self.download_cache is not None:
+            cache_file_path = self.download_cache.get_cache_file_path(file_etag, file_size)
+
+            if not is_zip_archive and not os.path.isfile(cache_file_path):
+                with FileLock(f'{cache_file_path}.lock'):
+                    if not os.path.isfile(cache_file_path):
+                        self.stream_extract_tar(cloud_file_path, local_folder_path, file_size, file_etag, members,
+                                                cache_file_path=cache_file_path, file_md5=file_md5)
+                        return
+
+            cache_file_path = self.download_cache.fetch(
+                lambda download_path: self.download_file(cloud_file_path, download_path, file_size, file_etag, file_md5),
+                file_etag, file_size
+            )
+            with cleanup_failed_extraction(local_folder_path) as extracted_paths, open(cache_file_path, 'rb') as f:
+                if is_zip_archive:
+                    file_system.extract_zip(f, local_folder_path, members, extracted_paths)
+                else:
+                    file_system.extract_tar_stream(f, local_folder_path, members, extracted_paths)
+
+        elif is_zip_archive:
+            ranged_stream = RangedReadStream(self.get_download_range_fn(cloud_file_path, file_etag), file_size)
+            buffer_size = get_transfer_config(self.transfer_config).multipart_chunksize
+            with cleanup_failed_extraction(local_folder_path) as extracted_paths:
+                file_system.extract_zip(io.BufferedReader(ranged_stream, buffer_size=buffer_size),
+                                        local_folder_path, members, extracted_paths)
+        else:
+            self.stream_extract_tar(cloud_file_path, local_folder_path, file_size, file_etag, members)
+
+    def load_archives(self, archive_paths, members=None):
+        """Download and extract multiple archives from AWS S3 in parallel
+
+        Args:
+            archive_paths (list): list of [cloud_file_path, local_folder_path] pairs
+            members (list or None): optional list of glob patterns selecting the extracted archive members
+
+        Returns:
+            None
+        """
+        parallel_file_transfer(lambda cloud_file_path, local_folder_path:
+                               self.load_archive(cloud_file_path, local_folder_path, members),
+                               archive_paths, get_transfer_config(self.transfer_config).max_workers)
+
+    def stream_extract_tar(self, cloud_file_path, local_folder_path, file_size, file_etag, members=None,
+                           cache_file_path=None, file_md5=None):
+        """Extract the tar archive directly from the S3 download stream
+
+        Args:
+            cloud_file_path (str): location where the archive is saved on S3 inside the specified bucket
+            local_folder_path (str): destination folder where the archive content is extracted
+            file_size (int): size of the archive in bytes
+            file_etag (str): S3 ETag of the archive
+            members (list or None): optional list of glob patterns selecting the extracted archive members
+            cache_file_path (str or None): if provided, the streamed archive is also saved to this path
+            file_md5 (str or None): expected hex digest of the archive content MD5 hash used to verify the archive
+                saved to the ``cache_file_path``
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: if the archive streamed into the ``cache_file_path`` is corrupted. In case of any error
+                the partially extracted content and the partially downloaded archive are removed.
+        """
+        archive_stream = self.s3_client.get_object(Bucket=self.bucket_name, Key=cloud_file_path,
+                                                   IfMatch=file_etag)['Body']
+
+        if cache_file_path is None:
+            with cleanup_failed_extraction(local_folder_path) as extracted_paths:
+                file_system.extract_tar_stream(archive_stream, local_folder_path, members, extracted_paths)
+        else:
+            part_file_path = f'{cache_file_path}.part'
+            with cleanup_failed_extraction(local_folder_path, part_file_path) as extracted_paths:
+                tee_stream = TeeStreamReader(archive_stream, part_file_path)
+                try:
+                    file_system.extract_tar_stream(tee_stream, local_folder_path, members, extracted_paths)
+                    # Tar end-of-archive padding might not have been read by the extraction
+                    tee_stream.drain()
+                finally:
+                    tee_stream.close()
+
+                if tee_stream.num_bytes_read != file_size or \
+                        (file_md5 is not None and tee_stream.file_hash.hexdigest() != file_md5):
+                    raise ValueError(f'Downloaded archive {cloud_file_path} is corrupted')
+                os.replace(part_file_path, cache_file_path)
+
     def exists_local_data_folder(self, data_folder_name, protect_local_folder=True):
         """Check if a specific folder exists in the base data folder
 
@@ -142,14 +696,16 @@ class AbstractDatasetFetcher(ABC):
 
 
 class SQuAD2DatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
-    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data',
+                 cache_dir_path=DATASET_CACHE_DIR_PATH):
         """
 
         Args:
             bucket_name (str):
             local_dataset_folder_path (str):
+            cache_dir_path (str or None): local download cache directory shared between the processes
         """
-        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path)
+        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path, cache_dir_path)
 
     def fetch_dataset(self, dataset_name=None, protect_local_folder=True):
         """
@@ -162,65 +718,61 @@ class SQuAD2DatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
             None
         """
         if not self.exists_local_data_folder('SQuAD2', protect_local_folder):
-            self.load_file(cloud_file_path='SQuAD2/train-v2.0.json',
-                           local_file_path=os.path.join(self.local_base_data_folder_path, 'SQuAD2', 'train-v2.0.json'))
-            self.load_file(cloud_file_path='SQuAD2/dev-v2.0.json',
-                           local_file_path=os.path.join(self.local_base_data_folder_path, 'SQuAD2', 'dev-v2.0.json'))
+            self.load_files([
+                ['SQuAD2/train-v2.0.json', os.path.join(self.local_base_data_folder_path, 'SQuAD2', 'train-v2.0.json')],
+                ['SQuAD2/dev-v2.0.json', os.path.join(self.local_base_data_folder_path, 'SQuAD2', 'dev-v2.0.json')]
+            ])
 
 
 class QAngarooDatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
-    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data',
+                 cache_dir_path=DATASET_CACHE_DIR_PATH):
         """
 
         Args:
             bucket_name (str):
             local_dataset_folder_path (str):
+            cache_dir_path (str or None): local download cache directory shared between the processes
         """
-        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path)
+        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path, cache_dir_path)
 
-    def fetch_dataset(self, dataset_name=None, protect_local_folder=True):
+    def fetch_dataset(self, dataset_name=None, protect_local_folder=True, members=None):
         """
 
         Args:
             dataset_name (str or None): possible options: medhop, wikihop or None
             protect_local_folder (bool):
+            members (list or None): optional list of glob patterns. Only the archive members matching at least one
+                of the patterns are extracted. If left to ``None`` the whole archive is extracted.
 
         Returns:
             None
         """
         if not self.exists_local_data_folder('qangaroo_v1', protect_local_folder):
             if dataset_name == 'medhop':
-                self._fetch_medhop()
+                self._fetch_subsets(['medhop'], members)
             elif dataset_name == 'wikihop':
-                self._fetch_wikihop()
+                self._fetch_subsets(['wikihop'], members)
             else:
-                self._fetch_medhop()
-                self._fetch_wikihop()
+                self._fetch_subsets(['medhop', 'wikihop'], members)
 
-    def _fetch_medhop(self):
-        medhop_local_folder_path = os.path.join(self.local_base_data_folder_path, 'qangaroo_v1')
-        medhop_local_file_path = os.path.join(medhop_local_folder_path, 'medhop.zip')
-        self.load_file(cloud_file_path='qangaroo_v1/medhop.zip',
-                       local_file_path=medhop_local_file_path)
-        file_system.unzip_file(medhop_local_file_path, medhop_local_folder_path)
-
-    def _fetch_wikihop(self):
-        wikihop_local_folder_path = os.path.join(self.local_base_data_folder_path, 'qangaroo_v1')
-        wikihop_local_file_path = os.path.join(wikihop_local_folder_path, 'wikihop.zip')
-        self.load_file(cloud_file_path='qangaroo_v1/wikihop.zip',
-                       local_file_path=wikihop_local_file_path)
-        file_system.unzip_file(wikihop_local_file_path, wikihop_local_folder_path)
+    def _fetch_subsets(self, subset_names, members=None):
+        local_folder_path = os.path.join(self.local_base_data_folder_path, 'qangaroo_v1')
+        self.load_archives([[f'qangaroo_v1/{subset_name}.zip', local_folder_path] for subset_name in subset_names],
+                           members)
 
 
 class CNNDailyMailDatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
-    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data',
+                 cache_dir_path=DATASET_CACHE_DIR_PATH):
         """
 
         Args:
             bucket_name (str):
             local_dataset_folder_path (str):
+            cache_dir_path (str or None): local download cache directory shared between the processes
         """
-        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path)
+        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path, cache_dir_path)
         self.available_prepocessed_datasets = ['abisee', 'danqi']
 
     def fetch_dataset(self, dataset_name=None, protect_local_folder=True):
@@ -237,12 +789,14 @@ class CNNDailyMailDatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
                                   'Rather use one of the preprocessed datasets.')
         pass
 
-    def fetch_preprocessed_dataset(self, preprocess_name, protect_local_folder=True):
+    def fetch_preprocessed_dataset(self, preprocess_name, protect_local_folder=True, members=None):
         """
 
         Args:
             preprocess_name (str):
             protect_local_folder (bool):
+            members (list or None): optional list of glob patterns. Only the archive members matching at least one
+                of the patterns are extracted. If left to ``None`` the whole archive is extracted.
 
         Returns:
             None
@@ -252,35 +806,24 @@ class CNNDailyMailDatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
 
         if preprocess_name == 'abisee':
             if not self.exists_local_data_folder('cnn-dailymail-abisee', protect_local_folder):
-                cnn_local_folder_path = os.path.join(self.local_base_data_folder_path, 'cnn-dailymail-abisee')
-                dm_local_folder_path = os.path.join(self.local_base_data_folder_path, 'cnn-dailymail-abisee')
-                cnn_local_file_path = os.path.join(cnn_local_folder_path, 'cnn_stories_tokenized.zip')
-                dm_local_file_path = os.path.join(dm_local_folder_path, 'dm_stories_tokenized.zip')
-
-                self.load_file(cloud_file_path='cnn-dailymail/preproc/abisee/cnn_stories_tokenized.zip',
-                               local_file_path=cnn_local_file_path)
-                self.load_file(cloud_file_path='cnn-dailymail/preproc/abisee/dm_stories_tokenized.zip',
-                               local_file_path=dm_local_file_path)
-                file_system.unzip_file(cnn_local_file_path, cnn_local_folder_path)
-                file_system.unzip_file(dm_local_file_path, dm_local_folder_path)
+                local_folder_path = os.path.join(self.local_base_data_folder_path, 'cnn-dailymail-abisee')
+                self.load_archives([
+                    ['cnn-dailymail/preproc/abisee/cnn_stories_tokenized.zip', local_folder_path],
+                    ['cnn-dailymail/preproc/abisee/dm_stories_tokenized.zip', local_folder_path]
+                ], members)
 
         elif preprocess_name == 'danqi':
             if not self.exists_local_data_folder('cnn-dailymail-danqi', protect_local_folder):
-                cnn_local_folder_path = os.path.join(self.local_base_data_folder_path, 'cnn-dailymail-danqi')
-                dm_local_folder_path = os.path.join(self.local_base_data_folder_path, 'cnn-dailymail-danqi')
-                cnn_local_file_path = os.path.join(cnn_local_folder_path, 'cnn.tar.gz')
-                dm_local_file_path = os.path.join(dm_local_folder_path, 'dailymail.tar.gz')
-
-                self.load_file(cloud_file_path='cnn-dailymail/preproc/danqi/cnn.tar.gz',
-                               local_file_path=cnn_local_file_path)
-                self.load_file(cloud_file_path='cnn-dailymail/preproc/danqi/dailymail.tar.gz',
-                               local_file_path=dm_local_file_path)
-                file_system.unzip_file(cnn_local_file_path, cnn_local_folder_path)
-                file_system.unzip_file(dm_local_file_path, dm_local_folder_path)
+                local_folder_path = os.path.join(self.local_base_data_folder_path, 'cnn-dailymail-danqi')
+                self.load_archives([
+                    ['cnn-dailymail/preproc/danqi/cnn.tar.gz', local_folder_path],
+                    ['cnn-dailymail/preproc/danqi/dailymail.tar.gz', local_folder_path]
+                ], members)
 
 
 class HotpotQADatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
-    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data',
+                 cache_dir_path=DATASET_CACHE_DIR_PATH):
         """
 
         https://hotpotqa.github.io/
@@ -292,66 +835,61 @@ class HotpotQADatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
         Args:
             bucket_name (str):
             local_dataset_folder_path (str):
+            cache_dir_path (str or None): local download cache directory shared between the processes
         """
-        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path)
+        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path, cache_dir_path)
 
-    def fetch_dataset(self, dataset_name=None, protect_local_folder=True):
+    def fetch_dataset(self, dataset_name=None, protect_local_folder=True, members=None):
         """
 
         Args:
             dataset_name (None): no effect here
             protect_local_folder (bool):
+            members (list or None): optional list of glob patterns. Only the archive members matching at least one
+                of the patterns are extracted. If left to ``None`` the whole archive is extracted.
 
         Returns:
             None
         """
         if not self.exists_local_data_folder('HotpotQA', protect_local_folder):
             hotpotqa_local_folder_path = os.path.join(self.local_base_data_folder_path, 'HotpotQA')
-            hotpotqa_local_file_path = os.path.join(hotpotqa_local_folder_path, 'HotpotQA.zip')
-            self.load_file(cloud_file_path='HotpotQA/HotpotQA.zip',
-                           local_file_path=hotpotqa_local_file_path)
-            file_system.unzip_file(hotpotqa_local_file_path, hotpotqa_local_folder_path)
+            self.load_archive('HotpotQA/HotpotQA.zip', hotpotqa_local_folder_path, members)
 
 
 class TriviaQADatasetFetcher(AbstractDatasetFetcher, BaseDataLoader):
-    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data',
+                 cache_dir_path=DATASET_CACHE_DIR_PATH):
         """
 
         Args:
             bucket_name (str):
             local_dataset_folder_path (str):
+            cache_dir_path (str or None): local download cache directory shared between the processes
         """
-        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path)
+        BaseDataLoader.__init__(self, bucket_name, local_dataset_folder_path, cache_dir_path)
 
-    def fetch_dataset(self, dataset_name=None, protect_local_folder=True):
+    def fetch_dataset(self, dataset_name=None, protect_local_folder=True, members=None):
         """
 
         Args:
             dataset_name (str or None): possible options: rc, unfiltered or None
             protect_local_folder (bool):
+            members (list or None): optional list of glob patterns. Only the archive members matching at least one
+                of the patterns are extracted. If left to ``None`` the whole archive is extracted.
 
         Returns:
             None
         """
         if not self.exists_local_data_folder('TriviaQA', protect_local_folder):
             if dataset_name == 'rc':
-                self._fetch_rc()
+                self._fetch_subsets(['rc'], members)
             elif dataset_name == 'unfiltered':
-                self._fetch_unfiltered()
+                self._fetch_subsets(['unfiltered'], members)
             else:
-                self._fetch_rc()
-                self._fetch_unfiltered()
-
-    def _fetch_rc(self):
-        rc_local_folder_path = os.path.join(self.local_base_data_folder_path, 'TriviaQA')
-        rc_local_file_path = os.path.join(rc_local_folder_path, 'triviaqa-rc.tar.gz')
-        self.load_file(cloud_file_path='TriviaQA/triviaqa-rc.tar.gz',
-                       local_file_path=rc_local_file_path)
-        file_system.unzip_file(rc_local_file_path, rc_local_folder_path)
-
-    def _fetch_unfiltered(self):
-        unfiltered_local_folder_path = os.path.join(self.local_base_data_folder_path, 'TriviaQA')
-        unfiltered_local_file_path = os.path.join(unfiltered_local_folder_path, 'triviaqa-unfiltered.tar.gz')
-        self.load_file(cloud_file_path='TriviaQA/triviaqa-unfiltered.tar.gz',
-                       local_file_path=unfiltered_local_file_path)
-        file_system.unzip_file(unfiltered_local_file_path, unfiltered_local_folder_path)
+                self._fetch_subsets(['rc', 'unfiltered'], members)
+
+    def _fetch_subsets(self, subset_names, members=None):
+        local_folder_path = os.path.join(self.local_base_data_folder_path, 'TriviaQA')
+        self.load_archives([[f'TriviaQA/triviaqa-{subset_name}.tar.gz', local_folder_path]
+                            for subset_name in subset_names],
+                           members)
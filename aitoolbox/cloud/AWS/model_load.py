@@ -3,11 +3,17 @@ import os
 from aitoolbox.cloud.AWS.data_access import BaseDataLoader
 from aitoolbox.experiment.local_load.local_model_load import AbstractLocalModelLoader, PyTorchLocalModelLoader
 from aitoolbox.experiment.local_save.folder_create import ExperimentFolder
+from aitoolbox.experiment.local_save.local_model_save import PyTorchLocalModelSaver
+from aitoolbox.experiment.local_save.sectioned_checkpoint import get_checkpoint_file_paths, \
+    get_tensor_store_blob_paths, RangedSectionedCheckpointReader, LazyCheckpoint, SECTIONED_CHECKPOINT_MAGIC
+
+CHECKPOINT_CACHE_DIR_PATH = '~/.cache/aitoolbox/checkpoints'
 
 
 class BaseModelLoader(BaseDataLoader):
     def __init__(self, local_model_loader, local_model_result_folder_path='~/project/model_result',
-                 bucket_name='model-result', cloud_dir_prefix=''):
+                 bucket_name='model-result', cloud_dir_prefix='',
+                 cache_dir_path=CHECKPOINT_CACHE_DIR_PATH, max_cache_size=20 * 1024 ** 3):
         """Base saved model loading from S3 storage
 
         Args:
@@ -16,8 +22,13 @@ class BaseModelLoader(BaseDataLoader):
             local_model_result_folder_path (str): root local path where project folder will be created
             bucket_name (str): name of the bucket in the cloud storage from which the model will be downloaded
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            cache_dir_path (str or None): path to the local checkpoint cache directory. The checkpoint is downloaded
+                only when it is not yet cached or when it has changed in the cloud storage. If set to ``None``
+                the checkpoint is downloaded only if it doesn't yet exist at the local experiment path.
+            max_cache_size (int or None): max total size in bytes of the cached checkpoints. When exceeded,
+                the least recently used checkpoints are evicted from the cache.
         """
-        BaseDataLoader.__init__(self, bucket_name, local_model_result_folder_path)
+        BaseDataLoader.__init__(self, bucket_name, local_model_result_folder_path, cache_dir_path, max_cache_size)
         self.local_model_result_folder_path = self.local_base_data_folder_path
 
         self.cloud_dir_prefix = cloud_dir_prefix
@@ -27,7 +38,7 @@ class BaseModelLoader(BaseDataLoader):
             raise TypeError('Provided local_model_loader is not inherited from AbstractLocalModelLoader as required.')
 
     def load_model(self, project_name, experiment_name, experiment_timestamp,
-                   model_save_dir='checkpoint_model', epoch_num=None,
+                   model_save_dir='checkpoint_model', epoch_num=None, iteration_idx=None,
                    **kwargs):
         """Download and read/load the model
 
@@ -37,51 +48,152 @@ class BaseModelLoader(BaseDataLoader):
             experiment_timestamp (str): time stamp at the start of training
             model_save_dir (str): name of the folder inside experiment folder where the model is saved
             epoch_num (int or None): epoch number of the model checkpoint or none if loading final model
+            iteration_idx (int or None): training iteration index of the model checkpoint saved in the middle of
+                the epoch, e.g. by the ``ModelIterationCheckpoint``
             **kwargs: additional local_model_loader parameters
 
         Returns:
             dict: model representation. (currently only returning dicts as only PyTorch model loading is supported)
         """
-        cloud_model_folder_path = os.path.join(self.cloud_dir_prefix,
-                                               project_name,
-                                               experiment_name + '_' + experiment_timestamp,
-                                               model_save_dir)
+        cloud_model_folder_path = self.get_cloud_model_folder_path(project_name, experiment_name, experiment_timestamp,
+                                                                   model_save_dir)
         experiment_dir_path = ExperimentFolder.create_base_folder(project_name, experiment_name, experiment_timestamp,
                                                                   self.local_model_result_folder_path)
         local_model_folder_path = os.path.join(experiment_dir_path, model_save_dir)
         if not os.path.exists(local_model_folder_path):
             os.mkdir(local_model_folder_path)
 
-        if epoch_num is None:
-            model_name = f'model_{experiment_name}_{experiment_timestamp}.pth'
-        else:
-            model_name = f'model_{experiment_name}_{experiment_timestamp}_E{epoch_num}.pth'
+        model_name = PyTorchLocalModelSaver.get_model_name(experiment_name, experiment_timestamp,
+                                                           epoch_num, iteration_idx)
 
         # Loads the model save file from S3 to the local folder
         cloud_model_file_path = os.path.join(cloud_model_folder_path, model_name)
         local_model_file_path = os.path.join(local_model_folder_path, model_name)
 
-        # Will only download from S3 if file not present on local drive
-        self.load_file(cloud_model_file_path, local_model_file_path)
-
+        self.load_model_file(cloud_model_file_path, local_model_file_path)
+
+        # Also download the checkpoint parts saved in the separate files, e.g. the optimizer state
+        for local_file_path in get_checkpoint_file_paths(local_model_file_path)[1:]:
+            self.load_model_file(os.path.join(cloud_model_folder_path, os.path.basename(local_file_path)),
+                                 local_file_path)
+        # And the tensor store blobs referenced by the deduplicated checkpoint. Blobs are named by their content,
+        # so only the ones missing locally are downloaded
+        blob_file_paths = [
+            [os.path.join(cloud_model_folder_path, os.path.relpath(local_blob_path, local_model_folder_path)),
+             local_blob_path]
+            for local_blob_path in get_tensor_store_blob_paths(local_model_file_path)
+        ]
+        if len(blob_file_paths) > 0:
+            os.makedirs(os.path.dirname(blob_file_paths[0][1]), exist_ok=True)
+            self.load_files(blob_file_paths)
+
+        if iteration_idx is not None:
+            kwargs['iteration_idx'] = iteration_idx
         return self.local_model_loader.load_model(project_name, experiment_name, experiment_timestamp,
                                                   model_save_dir, epoch_num, **kwargs)
 
+    def load_model_remote(self, project_name, experiment_name, experiment_timestamp,
+                          model_save_dir='checkpoint_model', epoch_num=None, iteration_idx=None, map_location=None):
+        """Read the model directly from the cloud storage transferring only the accessed checkpoint sections
+
+        For the checkpoints saved in the sectioned checkpoint format, nothing is downloaded to the local drive.
+        The returned model representation reads each section, e.g. ``model_state_dict``, with the byte-range
+        request when the section is first accessed. Inference or evaluation which only initializes the model
+        therefore never transfers the optimizer state. Checkpoints saved in the standard ``torch.save()`` format
+        can't be read partially and are downloaded in full via ``load_model()``.
+
+        Args:
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+            model_save_dir (str): name of the folder inside experiment folder where the model is saved
+            epoch_num (int or None): epoch number of the model checkpoint or none if loading final model
+            iteration_idx (int or None): training iteration index of the model checkpoint saved in the middle of
+                the epoch, e.g. by the ``ModelIterationCheckpoint``
+            map_location (str or torch.device or None): device to which the loaded tensors are moved
+
+        Returns:
+            dict or LazyCheckpoint: model representation
+        """
+        cloud_model_folder_path = self.get_cloud_model_folder_path(project_name, experiment_name, experiment_timestamp,
+                                                                   model_save_dir)
+        model_name = PyTorchLocalModelSaver.get_model_name(experiment_name, experiment_timestamp,
+                                                           epoch_num, iteration_idx)
+        read_range_fn, file_size = self.get_file_range_reader(os.path.join(cloud_model_folder_path, model_name))
+
+        if file_size < len(SECTIONED_CHECKPOINT_MAGIC) or \
+                read_range_fn(0, len(SECTIONED_CHECKPOINT_MAGIC) - 1) != SECTIONED_CHECKPOINT_MAGIC:
+            return self.load_model(project_name, experiment_name, experiment_timestamp, model_save_dir,
+                                   epoch_num, iteration_idx, map_location=map_location)
+
+        checkpoint_reader = RangedSectionedCheckpointReader(
+            read_range_fn, file_size, map_location,
+            open_file_fn=lambda file_path: self.get_file_range_reader(os.path.join(cloud_model_folder_path, file_path)),
+            read_files_fn=lambda file_paths: self.read_files([os.path.join(cloud_model_folder_path, file_path)
+                                                              for file_path in file_paths])
+        )
+        model_representation = LazyCheckpoint(checkpoint_reader)
+        # Fix for back-compatibility
+        if 'schedulers_state_dict' not in model_representation:
+            model_representation['schedulers_state_dict'] = []
+
+        # Enables the model, optimizer and scheduler initialization from the remotely read checkpoint
+        self.local_model_loader.model_representation = model_representation
+        return model_representation
+
+    def get_cloud_model_folder_path(self, project_name, experiment_name, experiment_timestamp, model_save_dir):
+        """Get the path of the folder inside the bucket where the models of the experiment are saved
+
+        Args:
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+            model_save_dir (str): name of the folder inside experiment folder where the model is saved
+
+        Returns:
+            str: cloud model folder path
+        """
+        return os.path.join(self.cloud_dir_prefix,
+                            project_name,
+                            experiment_name + '_' + experiment_timestamp,
+                            model_save_dir)
+
+    def load_model_file(self, cloud_file_path, local_file_path):
+        """Download the model file either via the checkpoint cache or directly to the local experiment folder
+
+        Args:
+            cloud_file_path (str): path to the model file inside the bucket
+            local_file_path (str): destination path of the model file on the local drive
+
+        Returns:
+            None
+        """
+        if self.download_cache is not None:
+            # Will only download from the cloud if the checkpoint is not cached or has changed in the cloud storage
+            self.load_cached_file(cloud_file_path, local_file_path)
+        else:
+            # Will only download from the cloud if file not present on local drive
+            self.load_file(cloud_file_path, local_file_path)
+
 
 class PyTorchS3ModelLoader(BaseModelLoader):
     def __init__(self, local_model_result_folder_path='~/project/model_result',
-                 bucket_name='model-result', cloud_dir_prefix=''):
+                 bucket_name='model-result', cloud_dir_prefix='',
+                 cache_dir_path=CHECKPOINT_CACHE_DIR_PATH, max_cache_size=20 * 1024 ** 3):
         """PyTorch S3 model downloader & loader
 
         Args:
             local_model_result_folder_path (str): root local path where project folder will be created
             bucket_name (str): name of the bucket in the cloud storage from which the model will be downloaded
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            cache_dir_path (str or None): path to the local checkpoint cache directory. If set to ``None``
+                the checkpoint cache is disabled.
+            max_cache_size (int or None): max total size in bytes of the cached checkpoints
         """
         local_model_loader = PyTorchLocalModelLoader(local_model_result_folder_path)
 
         BaseModelLoader.__init__(self, local_model_loader, local_model_result_folder_path,
-                                 bucket_name, cloud_dir_prefix)
+                                 bucket_name, cloud_dir_prefix, cache_dir_path, max_cache_size)
 
     def init_model(self, model, used_data_parallel=False):
         """Initialize provided PyTorch model with the loaded model weights
@@ -41,6 +41,23 @@ class BaseModelSaver(BaseDataSaver):
         BaseDataSaver.__init__(self, bucket_name)
         self.cloud_dir_prefix = cloud_dir_prefix
         self.checkpoint_model = checkpoint_model
+        # Optional aitoolbox.cloud.background_upload.BackgroundUploader to which the model uploads are handed off
+        self.background_uploader = None
+
+    def upload_model_file(self, local_file_path, cloud_file_path):
+        """Upload the saved model file either directly or via the background uploader if one is set
+
+        Args:
+            local_file_path (str): path to the model file on the local drive
+            cloud_file_path (str): destination where the model file will be saved inside the bucket
+
+        Returns:
+            None
+        """
+        if self.background_uploader is not None:
+            self.background_uploader.save_file(local_file_path=local_file_path, cloud_file_path=cloud_file_path)
+        else:
+            self.save_file(local_file_path=local_file_path, cloud_file_path=cloud_file_path)
 
     def create_experiment_cloud_storage_folder_structure(self, project_name, experiment_name, experiment_timestamp):
         """
@@ -62,7 +79,8 @@ class BaseModelSaver(BaseDataSaver):
 
 class PyTorchS3ModelSaver(AbstractModelSaver, BaseModelSaver):
     def __init__(self, bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result', checkpoint_model=False):
+                 local_model_result_folder_path='~/project/model_result', checkpoint_model=False,
+                 sectioned_checkpoint=False, local_model_copy=True):
         """PyTorch AWS S3 model saving
 
         Args:
@@ -70,9 +88,23 @@ class PyTorchS3ModelSaver(AbstractModelSaver, BaseModelSaver):
             cloud_dir_prefix (str): destination folder path inside selected bucket
             local_model_result_folder_path (str): root local path where project folder will be created
             checkpoint_model (bool): if the model being saved is checkpoint model or final end of training model
+            sectioned_checkpoint (bool or dict): if the model should be saved in the sectioned checkpoint format which
+                enables the lazy and memory-mapped loading of only the needed checkpoint sections. Provide a dict
+                to specify the ``save_sectioned_checkpoint()`` parameters such as the compression.
+            local_model_copy (bool): if set to ``False`` the model isn't saved to the local drive but is instead
+                serialized directly into the multipart upload stream with only a single upload part buffered
+                in memory. The upload then always happens in the calling thread and the sectioned checkpoint
+                format isn't supported.
         """
         BaseModelSaver.__init__(self, bucket_name, cloud_dir_prefix, checkpoint_model)
-        self.pytorch_local_saver = PyTorchLocalModelSaver(local_model_result_folder_path, checkpoint_model)
+        self.pytorch_local_saver = PyTorchLocalModelSaver(local_model_result_folder_path, checkpoint_model,
+                                                          sectioned_checkpoint)
+        self.uploaded_tensor_blob_names = set()
+        self.local_model_copy = local_model_copy
+
+        if not self.local_model_copy and self.pytorch_local_saver.sectioned_checkpoint:
+            raise ValueError('Sectioned checkpoint format requires the local model copy. '
+                             'Set local_model_copy to True or disable sectioned_checkpoint.')
 
     def save_model(self, model, project_name, experiment_name, experiment_timestamp=None,
                    epoch=None, iteration_idx=None,
@@ -89,7 +121,8 @@ class PyTorchS3ModelSaver(AbstractModelSaver, BaseModelSaver):
             protect_existing_folder (bool): can override potentially already existing folder or not
 
         Returns:
-            (str, str, str): model_s3_path, experiment_timestamp, model_local_path
+            (str, str, str): model_s3_path, experiment_timestamp, model_local_path. When the local model copy
+                is disabled, model_local_path is ``None``.
 
         Examples:
             .. code-block:: python
@@ -106,6 +139,9 @@ class PyTorchS3ModelSaver(AbstractModelSaver, BaseModelSaver):
         if experiment_timestamp is None:
             experiment_timestamp = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d_%H-%M-%S')
 
+        if not self.local_model_copy:
+            return self.stream_model(model, project_name, experiment_name, experiment_timestamp, epoch, iteration_idx)
+
         model_name, model_local_path = self.pytorch_local_saver.save_model(model, project_name, experiment_name,
                                                                            experiment_timestamp, epoch, iteration_idx,
                                                                            protect_existing_folder)
@@ -114,12 +150,58 @@ class PyTorchS3ModelSaver(AbstractModelSaver, BaseModelSaver):
                                                                                    experiment_timestamp)
         model_s3_path = os.path.join(experiment_s3_path, model_name)
 
-        self.save_file(local_file_path=model_local_path, cloud_file_path=model_s3_path)
+        from aitoolbox.experiment.local_save.sectioned_checkpoint import get_checkpoint_file_paths, \
+            get_tensor_store_blob_paths, TENSOR_STORE_DIR_NAME
+        # Only the deduplicated tensor store blobs which haven't been uploaded with the previous checkpoints.
+        # Blobs are named by their content hash, so the blobs already in the bucket, e.g. uploaded before
+        # the training was resumed, don't have to be uploaded again.
+        for local_blob_path in get_tensor_store_blob_paths(model_local_path):
+            blob_name = os.path.basename(local_blob_path)
+            if blob_name not in self.uploaded_tensor_blob_names:
+                blob_s3_path = os.path.join(experiment_s3_path, TENSOR_STORE_DIR_NAME, blob_name)
+                if not self.file_exists(blob_s3_path):
+                    self.upload_model_file(local_file_path=local_blob_path, cloud_file_path=blob_s3_path)
+                self.uploaded_tensor_blob_names.add(blob_name)
+
+        # Separately saved checkpoint parts (e.g. the optimizer state) are uploaded before the main model file
+        for local_file_path in reversed(get_checkpoint_file_paths(model_local_path)[1:]):
+            self.upload_model_file(local_file_path=local_file_path,
+                                   cloud_file_path=os.path.join(experiment_s3_path, os.path.basename(local_file_path)))
+        self.upload_model_file(local_file_path=model_local_path, cloud_file_path=model_s3_path)
 
         full_model_s3_path = os.path.join(self.bucket_name, model_s3_path)
 
         return full_model_s3_path, experiment_timestamp, model_local_path
 
+    def stream_model(self, model, project_name, experiment_name, experiment_timestamp,
+                     epoch=None, iteration_idx=None):
+        """Serialize the PyTorch model representation directly into the cloud storage without the local file
+
+        Args:
+            model (dict): PyTorch model representation dict
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+            epoch (int or None): epoch number
+            iteration_idx (int or None): at which training iteration the model is being saved
+
+        Returns:
+            (str, str, None): model_s3_path, experiment_timestamp, model_local_path
+        """
+        import torch
+
+        model_name = PyTorchLocalModelSaver.get_model_name(experiment_name, experiment_timestamp, epoch, iteration_idx)
+        experiment_s3_path = self.create_experiment_cloud_storage_folder_structure(project_name, experiment_name,
+                                                                                   experiment_timestamp)
+        model_s3_path = os.path.join(experiment_s3_path, model_name)
+
+        with self.open_upload_stream(model_s3_path) as upload_stream:
+            torch.save(model, upload_stream)
+
+        full_model_s3_path = os.path.join(self.bucket_name, model_s3_path)
+
+        return full_model_s3_path, experiment_timestamp, None
+
 
 class KerasS3ModelSaver(AbstractModelSaver, BaseModelSaver):
     def __init__(self, bucket_name='model-result', cloud_dir_prefix='',
@@ -173,7 +255,7 @@ class KerasS3ModelSaver(AbstractModelSaver, BaseModelSaver):
                                                                                    experiment_timestamp)
         model_s3_path = os.path.join(experiment_s3_path, model_name)
 
-        self.save_file(local_file_path=model_local_path, cloud_file_path=model_s3_path)
+        self.upload_model_file(local_file_path=model_local_path, cloud_file_path=model_s3_path)
 
         full_model_s3_path = os.path.join(self.bucket_name, model_s3_path)
 
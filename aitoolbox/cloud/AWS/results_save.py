@@ -4,6 +4,7 @@ import time
 import datetime
 
 from aitoolbox.cloud.AWS.data_access import BaseDataSaver
+from aitoolbox.cloud.bundle import ArtifactBundler
 from aitoolbox.experiment.local_save.local_results_save import LocalResultsSaver
 
 
@@ -61,7 +62,8 @@ class BaseResultsSaver(BaseDataSaver):
 
 class S3ResultsSaver(AbstractResultsSaver, BaseResultsSaver):
     def __init__(self, bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', labels_array_format=None,
+                 bundle_artifacts=False):
         """AWS S3 results saver
 
         It first saves the results files to local drive and then uploads them to S3
@@ -70,9 +72,17 @@ class S3ResultsSaver(AbstractResultsSaver, BaseResultsSaver):
             bucket_name (str): name of the bucket in the S3 to which the results files will be saved
             cloud_dir_prefix (str): destination folder path inside selected bucket
             local_model_result_folder_path (str): root local path where project folder will be created
+            labels_array_format (str or None): storage format of the ground truth and predicted labels arrays:
+                ``None`` (embedded into the results file), ``'npz'`` or ``'npy'``. The label array files are
+                uploaded as separate objects so that the results can be downloaded without the labels.
+            bundle_artifacts (bool or dict): pack the small results files into a single zip bundle uploaded with
+                one request instead of uploading every file separately. Provide a dict to specify
+                the ``ArtifactBundler`` parameters such as the ``max_bundled_file_size``.
         """
         BaseResultsSaver.__init__(self, bucket_name, cloud_dir_prefix)
-        self.local_results_saver = LocalResultsSaver(local_model_result_folder_path)
+        self.local_results_saver = LocalResultsSaver(local_model_result_folder_path,
+                                                     labels_array_format=labels_array_format)
+        self.bundler = self.get_artifact_bundler(bundle_artifacts)
 
     def save_experiment_results(self, result_package, training_history,
                                 project_name, experiment_name, experiment_timestamp=None,
@@ -92,7 +102,8 @@ class S3ResultsSaver(AbstractResultsSaver, BaseResultsSaver):
             protect_existing_folder (bool): can override potentially already existing folder or not
 
         Returns:
-            (str, str): results file path on S3, experiment timestamp
+            (str, str): results file path on S3, experiment timestamp. When the results are bundled, the path
+                of the bundle containing the main results file is returned.
         """
         if experiment_timestamp is None:
             experiment_timestamp = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d_%H-%M-%S')
@@ -117,13 +128,36 @@ class S3ResultsSaver(AbstractResultsSaver, BaseResultsSaver):
 
         experiment_s3_path = self.create_experiment_cloud_storage_folder_structure(project_name, experiment_name, experiment_timestamp)
 
-        for results_file_path_in_s3_results_dir, results_file_local_path in saved_local_results_details:
-            results_file_s3_path = os.path.join(experiment_s3_path, results_file_path_in_s3_results_dir)
-            self.save_file(local_file_path=results_file_local_path, cloud_file_path=results_file_s3_path)
+        results_file_paths = \
+            [[results_file_local_path, os.path.join(experiment_s3_path, results_file_path_in_s3_results_dir)]
+             for results_file_path_in_s3_results_dir, results_file_local_path in saved_local_results_details]
 
         # saved_local_results_details[0][0] used to extract the main results file path which should be the first element
         # of the list with the support files' paths following
         main_results_s3_file_path = os.path.join(self.bucket_name, experiment_s3_path,
                                                  saved_local_results_details[0][0])
 
+        if self.bundler is not None:
+            bundle_s3_path = os.path.join(experiment_s3_path,
+                                          f'results_bundle_{experiment_name}_{experiment_timestamp}.zip')
+            uploaded_s3_paths = self.bundler.save_files(results_file_paths, bundle_s3_path)
+
+            if results_file_paths[0][1] not in uploaded_s3_paths:
+                main_results_s3_file_path = os.path.join(self.bucket_name, bundle_s3_path)
+        else:
+            self.save_files(results_file_paths)
+
         return main_results_s3_file_path, experiment_timestamp
+
+    def get_artifact_bundler(self, bundle_artifacts):
+        """Build the artifact bundler uploading the files with this saver
+
+        Args:
+            bundle_artifacts (bool or dict): if the bundling is enabled or the ``ArtifactBundler`` parameters
+
+        Returns:
+            aitoolbox.cloud.bundle.ArtifactBundler or None: artifact bundler or None if the bundling is disabled
+        """
+        if bundle_artifacts is False:
+            return None
+        return ArtifactBundler(self, **(bundle_artifacts if isinstance(bundle_artifacts, dict) else {}))
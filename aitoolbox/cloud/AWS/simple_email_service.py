@@ -1,10 +1,11 @@
 import os
-import boto3
 from botocore.exceptions import ClientError
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 
+from aitoolbox.cloud.clients import get_ses_client
+
 
 class SESSender:
     def __init__(self, sender_name, sender_email, recipient_email,
@@ -28,8 +29,8 @@ class SESSender:
         self.aws_region = aws_region
         self.CHARSET = "UTF-8"
 
-        # Create a new SES resource and specify a region.
-        self.client = boto3.client('ses', region_name=self.aws_region)
+        # Shared SES client for the specified region
+        self.client = get_ses_client(self.aws_region)
 
     def send_email(self, subject, body, attachment_file_paths=None):
         """Send email text with optional attachments
@@ -1,25 +1,44 @@
+import io
 import os
-from google.cloud import storage
+import uuid
+import base64
+from contextlib import contextmanager
+from functools import partial
+try:
+    from google.cloud.storage import transfer_manager
+except ImportError:
+    transfer_manager = None
 
 from aitoolbox.cloud.AWS.data_access import SQuAD2DatasetFetcher as SQuAD2S3DatasetFetcher, \
     QAngarooDatasetFetcher as QAngarooS3DatasetFetcher, CNNDailyMailDatasetFetcher as CNNDailyMailS3DatasetFetcher, \
     HotpotQADatasetFetcher as HotpotQAS3DatasetFetcher
+from aitoolbox.cloud.clients import get_gcs_client
+from aitoolbox.cloud.transfer import get_transfer_config, parallel_file_transfer
+from aitoolbox.cloud.download import RangedFileDownloader, RangedReadStream, DownloadCache, link_or_copy_file, \
+    replace_with_cached_file, verify_file_md5, cleanup_failed_extraction
+from aitoolbox.utils import file_system
 
 
 class BaseGoogleStorageDataSaver:
-    def __init__(self, bucket_name='model-result'):
+    def __init__(self, bucket_name='model-result', transfer_config=None):
         """
 
         Args:
             bucket_name (str):
+            transfer_config (aitoolbox.cloud.transfer.CloudTransferConfig or None): parallel and multipart transfer
+                settings. If left to ``None`` the default process-wide transfer config is used.
         """
         self.bucket_name = bucket_name
-        self.gcs_client = storage.Client()
+        self.gcs_client = get_gcs_client()
         self.gcs_bucket = self.gcs_client.get_bucket(bucket_name)
+        self.transfer_config = transfer_config
 
     def save_file(self, local_file_path, cloud_file_path):
         """
 
+        Large files are uploaded in multiple chunks in parallel when the installed google-cloud-storage version
+        supports it.
+
         Args:
             local_file_path (str):
             cloud_file_path (str):
@@ -27,21 +46,184 @@ class BaseGoogleStorageDataSaver:
         Returns:
             None
         """
+        local_file_path = os.path.expanduser(local_file_path)
+        transfer_config = get_transfer_config(self.transfer_config)
         blob = self.gcs_bucket.blob(cloud_file_path)
-        blob.upload_from_filename(local_file_path)
+
+        if transfer_manager is not None and hasattr(transfer_manager, 'upload_chunks_concurrently') and \
+                transfer_config.max_concurrency > 1 and transfer_config.is_multipart_upload(local_file_path):
+            transfer_manager.upload_chunks_concurrently(local_file_path, blob,
+                                                        chunk_size=transfer_config.multipart_chunksize,
+                                                        max_workers=transfer_config.max_concurrency,
+                                                        worker_type='thread')
+        else:
+            blob.upload_from_filename(local_file_path)
+
+    def save_files(self, file_paths):
+        """Save / upload multiple files on local drive to the Google Cloud Storage in parallel
+
+        Args:
+            file_paths (list): list of [local_file_path, cloud_file_path] pairs
+
+        Returns:
+            None
+        """
+        parallel_file_transfer(self.save_file, file_paths, get_transfer_config(self.transfer_config).max_workers)
+
+    def save_bytes(self, data, cloud_file_path):
+        """Save / upload the in-memory bytes as the file on the Google Cloud Storage
+
+        Args:
+            data (bytes): content of the saved file
+            cloud_file_path (str): destination where the file will be saved inside the specified bucket
+
+        Returns:
+            None
+        """
+        self.gcs_bucket.blob(cloud_file_path).upload_from_string(data)
+
+    @contextmanager
+    def open_upload_stream(self, cloud_file_path):
+        """Open the writable stream which uploads the written bytes directly into the file on the Google Cloud Storage
+
+        Nothing is written to the local drive. The bytes are uploaded in chunks via the resumable upload with
+        only a single chunk buffered in memory. The bytes are uploaded into the temporary object which is renamed
+        to the destination only when the context is exited without an error. Consequently, the partially written
+        file never appears at the destination path. If an exception is raised while writing, the temporary object
+        is deleted.
+
+        Args:
+            cloud_file_path (str): destination where the file will be saved inside the specified bucket
+
+        Yields:
+            google.cloud.storage.fileio.BlobWriter: writable upload stream
+        """
+        # Resumable upload chunk size has to be a multiple of 256 KB
+        chunk_size = max(get_transfer_config(self.transfer_config).multipart_chunksize // (256 * 1024), 1) * 256 * 1024
+        tmp_blob = self.gcs_bucket.blob(f'{cloud_file_path}.{uuid.uuid4().hex}.part')
+        blob_writer = tmp_blob.open('wb', chunk_size=chunk_size)
+        try:
+            yield blob_writer
+        except BaseException:
+            # Closing finalizes the upload, but only under the temporary name which is then removed
+            blob_writer.close()
+            tmp_blob.delete()
+            raise
+        blob_writer.close()
+        self.gcs_bucket.rename_blob(tmp_blob, cloud_file_path)
+
+    def compose_files(self, cloud_file_paths, cloud_file_path):
+        """Concatenate multiple files inside the bucket server-side into a single file
+
+        Single compose request accepts at most 32 source files. Longer lists are composed in multiple steps where
+        each step appends the next sources to the already composed destination file.
+
+        Args:
+            cloud_file_paths (list): ordered list of paths of the concatenated files inside the specified bucket
+            cloud_file_path (str): destination path of the composed file inside the specified bucket
+
+        Returns:
+            None
+        """
+        destination_blob = self.gcs_bucket.blob(cloud_file_path)
+        source_blobs = [self.gcs_bucket.blob(path) for path in cloud_file_paths]
+
+        destination_blob.compose(source_blobs[:32])
+        for i in range(32, len(source_blobs), 31):
+            destination_blob.compose([destination_blob] + source_blobs[i:i + 31])
+
+    def file_exists(self, cloud_file_path):
+        """Check if the file exists on the Google Cloud Storage
+
+        Args:
+            cloud_file_path (str): location of the file inside the specified bucket
+
+        Returns:
+            bool: if the file exists
+        """
+        return self.gcs_bucket.blob(cloud_file_path).exists()
+
+    def list_files(self, cloud_folder_path):
+        """List all the files inside the folder on the Google Cloud Storage, including the files in its subfolders
+
+        Args:
+            cloud_folder_path (str): path of the folder inside the specified bucket
+
+        Returns:
+            list: list of (cloud_file_path, file_size, last_modified_timestamp) tuples
+        """
+        return [(blob.name, blob.size, blob.updated.timestamp())
+                for blob in self.gcs_client.list_blobs(self.bucket_name, prefix=cloud_folder_path.rstrip('/') + '/')]
+
+    def read_file_range(self, cloud_file_path, start, end):
+        """Read the byte range of the file on the Google Cloud Storage
+
+        Args:
+            cloud_file_path (str): location of the file inside the specified bucket
+            start (int): inclusive start byte position
+            end (int): inclusive end byte position
+
+        Returns:
+            bytes: file bytes in the range
+        """
+        return self.gcs_bucket.blob(cloud_file_path).download_as_bytes(start=start, end=end)
+
+    def delete_files(self, cloud_file_paths):
+        """Delete multiple files from the Google Cloud Storage
+
+        Args:
+            cloud_file_paths (list): list of paths of the files inside the specified bucket
+
+        Returns:
+            None
+        """
+        self.gcs_bucket.delete_blobs([self.gcs_bucket.blob(cloud_file_path) for cloud_file_path in cloud_file_paths],
+                                     on_error=lambda blob: None)
+
+    def save_folder(self, local_folder_path, cloud_folder_path):
+        """Save / upload the contents of the local folder on the local drive to Google Cloud Storage
+
+        Args:
+            local_folder_path (str): local path to the folder which should be uploaded
+            cloud_folder_path (str): destination path on GCS where the folder and its content should be uploaded
+
+        Returns:
+            None
+        """
+        file_paths = []
+        for root, dirs, files in os.walk(local_folder_path):
+            for filename in files:
+                local_file_path = os.path.join(root, filename)
+                file_path_inside_folder = os.path.relpath(local_file_path, local_folder_path)
+                file_paths.append([local_file_path, os.path.join(cloud_folder_path, file_path_inside_folder)])
+
+        self.save_files(file_paths)
 
 
 class BaseGoogleStorageDataLoader:
-    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data'):
+    def __init__(self, bucket_name='dataset-store', local_dataset_folder_path='~/project/data',
+                 cache_dir_path=None, max_cache_size=None, transfer_config=None):
         """
 
+        Files are downloaded in parallel byte ranges and interrupted downloads are resumed on the next attempt.
+
         Args:
             bucket_name (str):
             local_dataset_folder_path (str):
+            cache_dir_path (str or None): path to the local download cache directory shared between the processes.
+                Files are downloaded only once into the cache and then linked to the requested local paths.
+                If left to ``None`` the files are downloaded directly to the requested local paths.
+            max_cache_size (int or None): max total size in bytes of the download cache. When exceeded, the least
+                recently used cached files are evicted. If left to ``None`` the cache size is not limited.
+            transfer_config (aitoolbox.cloud.transfer.CloudTransferConfig or None): parallel and multipart transfer
+                settings. If left to ``None`` the default process-wide transfer config is used.
         """
         self.bucket_name = bucket_name
-        self.gcs_client = storage.Client()
+        self.gcs_client = get_gcs_client()
         self.gcs_bucket = self.gcs_client.get_bucket(bucket_name)
+        self.transfer_config = transfer_config
+        self.file_downloader = RangedFileDownloader(transfer_config)
+        self.download_cache = DownloadCache(cache_dir_path, max_cache_size) if cache_dir_path is not None else None
 
         self.local_dataset_folder_path = os.path.expanduser(local_dataset_folder_path)
         self.available_prepocessed_datasets = []
@@ -62,8 +244,200 @@ class BaseGoogleStorageDataLoader:
             print('File already exists on local disk. Not downloading from Google Cloud Storage')
         else:
             print('Local file does not exist on the local disk. Downloading from Google Cloud Storage.')
-            blob = self.gcs_bucket.blob(cloud_file_path)
-            blob.download_to_filename(local_file_path)
+            blob = self.gcs_bucket.get_blob(cloud_file_path)
+            if blob is None:
+                print('The object does not exist on Google Cloud Storage.')
+                return
+
+            file_md5 = base64.b64decode(blob.md5_hash).hex() if blob.md5_hash is not None else None
+            file_version = file_md5 if file_md5 is not None else str(blob.generation)
+
+            if self.download_cache is not None:
+                cache_file_path = self.download_cache.fetch(
+                    lambda download_path: self.download_file(blob, download_path, file_md5),
+                    file_version, blob.size
+                )
+                link_or_copy_file(cache_file_path, local_file_path)
+            else:
+                self.download_file(blob, local_file_path, file_md5)
+
+    def load_cached_file(self, cloud_file_path, local_file_path):
+        """Get the up-to-date file from Google Cloud Storage through the download cache
+
+        The file version in the bucket is checked on every call and the file is served from the local cache as long
+        as it hasn't changed. The cache is keyed by the bucket, blob name and generation.
+
+        Args:
+            cloud_file_path (str): location where the file is saved inside the specified bucket
+            local_file_path (str): destination path where the file will be made available on the local drive
+
+        Returns:
+            None
+        """
+        if self.download_cache is None:
+            raise ValueError('Download cache is not enabled. Provide cache_dir_path when creating the data loader.')
+
+        local_file_path = os.path.expanduser(local_file_path)
+        blob = self.gcs_bucket.get_blob(cloud_file_path)
+        if blob is None:
+            print('The object does not exist on Google Cloud Storage.')
+            return
+
+        file_md5 = base64.b64decode(blob.md5_hash).hex() if blob.md5_hash is not None else None
+        cache_file_path = self.download_cache.fetch(
+            lambda download_path: self.download_file(blob, download_path, file_md5),
+            f'{self.bucket_name}/{cloud_file_path}@{blob.generation}', blob.size
+        )
+        replace_with_cached_file(cache_file_path, local_file_path)
+
+    def load_files(self, file_paths):
+        """Download multiple files from Google Cloud Storage to the local drive in parallel
+
+        Args:
+            file_paths (list): list of [cloud_file_path, local_file_path] pairs
+
+        Returns:
+            None
+        """
+        parallel_file_transfer(self.load_file, file_paths, get_transfer_config(self.transfer_config).max_workers)
+
+    def read_file(self, cloud_file_path):
+        """Read the whole file from Google Cloud Storage into memory with a single request
+
+        Args:
+            cloud_file_path (str): location where the file is saved inside the specified bucket
+
+        Returns:
+            bytearray: file bytes
+        """
+        return bytearray(self.gcs_bucket.blob(cloud_file_path).download_as_bytes())
+
+    def read_files(self, cloud_file_paths):
+        """Read multiple whole files from Google Cloud Storage into memory in parallel
+
+        Args:
+            cloud_file_paths (list): list of locations where the files are saved inside the specified bucket
+
+        Returns:
+            list: bytes of each file in the same order as the provided paths
+        """
+        files_data = [None] * len(cloud_file_paths)
+
+        def read_file_at(cloud_file_path, file_idx):
+            files_data[file_idx] = self.read_file(cloud_file_path)
+
+        parallel_file_transfer(read_file_at,
+                               [[cloud_file_path, i] for i, cloud_file_path in enumerate(cloud_file_paths)],
+                               get_transfer_config(self.transfer_config).max_workers)
+        return files_data
+
+    def load_file_segments(self, cloud_segments_prefix, local_file_path):
+        """Download the file uploaded in segments and concatenate the segments into the local file
+
+        Segment files are all the files in the bucket starting with the ``cloud_segments_prefix``. They are
+        concatenated in the order of their sorted names, which is why the segment files should be named with
+        the zero-padded sequence numbers.
+
+        Args:
+            cloud_segments_prefix (str): common path prefix of the segment files inside the specified bucket
+            local_file_path (str): destination path of the concatenated file on the local drive
+
+        Returns:
+            list: sorted paths of the concatenated segment files inside the bucket
+        """
+        local_file_path = os.path.expanduser(local_file_path)
+        segment_blobs = sorted(self.gcs_client.list_blobs(self.gcs_bucket, prefix=cloud_segments_prefix),
+                               key=lambda blob: blob.name)
+
+        with file_system.atomic_write_path(local_file_path) as tmp_file_path:
+            with open(tmp_file_path, 'wb') as f:
+                for blob in segment_blobs:
+                    blob.download_to_file(f)
+        return [blob.name for blob in segment_blobs]
+
+    def download_file(self, blob, local_file_path, file_md5=None):
+        """Download the blob in parallel byte ranges and verify its integrity
+
+        Args:
+            blob (google.cloud.storage.Blob): blob with the loaded metadata
+            local_file_path (str): destination path where the file will be downloaded to the local drive
+            file_md5 (str or None): expected hex digest of the file content MD5 hash
+
+        Returns:
+            None
+        """
+        # Composite objects don't have the MD5 hash
+        self.file_downloader.download(
+            self.get_download_range_fn(blob), blob.size, str(blob.generation), local_file_path,
+            verify_fn=partial(verify_file_md5, expected_md5=file_md5) if file_md5 is not None else None
+        )
+
+    def get_file_range_reader(self, cloud_file_path):
+        """Get the function reading the byte ranges of the file on Google Cloud Storage without downloading it
+
+        Args:
+            cloud_file_path (str): location where the file is saved inside the specified bucket
+
+        Returns:
+            (callable, int): function accepting the inclusive start and end byte positions and returning the bytes
+                of the file in that range, and the file size in bytes
+        """
+        blob = self.gcs_bucket.get_blob(cloud_file_path)
+        if blob is None:
+            raise FileNotFoundError(f'File {cloud_file_path} not found in the bucket {self.bucket_name}')
+        return self.get_download_range_fn(blob), blob.size
+
+    @staticmethod
+    def get_download_range_fn(blob):
+        def download_range(start, end):
+            return blob.download_as_bytes(start=start, end=end, if_generation_match=blob.generation)
+        return download_range
+
+    def load_archive(self, cloud_file_path, local_folder_path, members=None):
+        """Download and extract the zip or tar archive without first saving the whole archive to disk
+
+        Tar archives are extracted while the bytes are arriving from Google Cloud Storage. For zip archives only
+        the byte ranges of the selected members are read. When the download cache is used, the archive is first
+        downloaded into the cache and then extracted from there.
+
+        Args:
+            cloud_file_path (str): location where the archive is saved inside the specified bucket
+            local_folder_path (str): destination folder where the archive content is extracted
+            members (list or None): optional list of glob patterns. Only the archive members matching at least one
+                of the patterns are extracted. If left to ``None`` the whole archive is extracted.
+
+        Returns:
+            None
+        """
+        local_folder_path = os.path.expanduser(local_folder_path)
+        is_zip_archive = cloud_file_path.endswith('.zip')
+
+        blob = self.gcs_bucket.get_blob(cloud_file_path)
+        if blob is None:
+            print('The object does not exist on Google Cloud Storage.')
+            return
+
+        if self.download_cache is not None:
+            file_md5 = base64.b64decode(blob.md5_hash).hex() if blob.md5_hash is not None else None
+            cache_file_path = self.download_cache.fetch(
+                lambda download_path: self.download_file(blob, download_path, file_md5),
+                file_md5 if file_md5 is not None else str(blob.generation), blob.size
+            )
+            with cleanup_failed_extraction(local_folder_path) as extracted_paths, open(cache_file_path, 'rb') as f:
+                if is_zip_archive:
+                    file_system.extract_zip(f, local_folder_path, members, extracted_paths)
+                else:
+                    file_system.extract_tar_stream(f, local_folder_path, members, extracted_paths)
+
+        elif is_zip_archive:
+            ranged_stream = RangedReadStream(self.get_download_range_fn(blob), blob.size)
+            buffer_size = get_transfer_config(self.transfer_config).multipart_chunksize
+            with cleanup_failed_extraction(local_folder_path) as extracted_paths:
+                file_system.extract_zip(io.BufferedReader(ranged_stream, buffer_size=buffer_size),
+                                        local_folder_path, members, extracted_paths)
+        else:
+            with cleanup_failed_extraction(local_folder_path) as extracted_paths, blob.open('rb') as archive_stream:
+                file_system.extract_tar_stream(archive_stream, local_folder_path, members, extracted_paths)
             
             
 # class SQuAD2DatasetFetcher(BaseGoogleStorageDataLoader, SQuAD2S3DatasetFetcher):
@@ -1,11 +1,12 @@
 from aitoolbox.cloud.GoogleCloud.data_access import BaseGoogleStorageDataLoader
-from aitoolbox.cloud.AWS.model_load import PyTorchS3ModelLoader
+from aitoolbox.cloud.AWS.model_load import PyTorchS3ModelLoader, CHECKPOINT_CACHE_DIR_PATH
 from aitoolbox.experiment.local_load.local_model_load import AbstractLocalModelLoader, PyTorchLocalModelLoader
 
 
 class BaseModelGoogleStorageLoader(BaseGoogleStorageDataLoader):
     def __init__(self, local_model_loader, local_model_result_folder_path='~/project/model_result',
-                 bucket_name='model-result', cloud_dir_prefix=''):
+                 bucket_name='model-result', cloud_dir_prefix='',
+                 cache_dir_path=CHECKPOINT_CACHE_DIR_PATH, max_cache_size=20 * 1024 ** 3):
         """Base saved model loading from Google Cloud Storage
 
         Args:
@@ -14,8 +15,12 @@ class BaseModelGoogleStorageLoader(BaseGoogleStorageDataLoader):
             local_model_result_folder_path (str): root local path where project folder will be created
             bucket_name (str): name of the bucket in the cloud storage from which the model will be downloaded
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            cache_dir_path (str or None): path to the local checkpoint cache directory. If set to ``None``
+                the checkpoint cache is disabled.
+            max_cache_size (int or None): max total size in bytes of the cached checkpoints
         """
-        BaseGoogleStorageDataLoader.__init__(self, bucket_name, local_model_result_folder_path)
+        BaseGoogleStorageDataLoader.__init__(self, bucket_name, local_model_result_folder_path,
+                                             cache_dir_path, max_cache_size)
         self.local_model_result_folder_path = self.local_dataset_folder_path
 
         self.cloud_dir_prefix = cloud_dir_prefix
@@ -27,15 +32,20 @@ class BaseModelGoogleStorageLoader(BaseGoogleStorageDataLoader):
 
 class PyTorchGoogleStorageModelLoader(BaseModelGoogleStorageLoader, PyTorchS3ModelLoader):
     def __init__(self, local_model_result_folder_path='~/project/model_result',
-                 bucket_name='model-result', cloud_dir_prefix=''):
+                 bucket_name='model-result', cloud_dir_prefix='',
+                 cache_dir_path=CHECKPOINT_CACHE_DIR_PATH, max_cache_size=20 * 1024 ** 3):
         """PyTorch Google Cloud Storage model downloader & loader
 
         Args:
             local_model_result_folder_path (str): root local path where project folder will be created
             bucket_name (str): name of the bucket in the cloud storage from which the model will be downloaded
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            cache_dir_path (str or None): path to the local checkpoint cache directory. If set to ``None``
+                the checkpoint cache is disabled.
+            max_cache_size (int or None): max total size in bytes of the cached checkpoints
         """
         local_model_loader = PyTorchLocalModelLoader(local_model_result_folder_path)
 
         BaseModelGoogleStorageLoader.__init__(self, local_model_loader,
-                                              local_model_result_folder_path, bucket_name, cloud_dir_prefix)
+                                              local_model_result_folder_path, bucket_name, cloud_dir_prefix,
+                                              cache_dir_path, max_cache_size)
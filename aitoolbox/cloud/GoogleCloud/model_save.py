@@ -15,11 +15,14 @@ class BaseModelGoogleStorageSaver(BaseGoogleStorageDataSaver):
         BaseGoogleStorageDataSaver.__init__(self, bucket_name)
         self.cloud_dir_prefix = cloud_dir_prefix
         self.checkpoint_model = checkpoint_model
+        # Optional aitoolbox.cloud.background_upload.BackgroundUploader to which the model uploads are handed off
+        self.background_uploader = None
 
 
 class PyTorchGoogleStorageModelSaver(BaseModelGoogleStorageSaver, PyTorchS3ModelSaver):
     def __init__(self, bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result', checkpoint_model=False):
+                 local_model_result_folder_path='~/project/model_result', checkpoint_model=False,
+                 sectioned_checkpoint=False, local_model_copy=True):
         """PyTorch Google Cloud Storage model saving
 
         Args:
@@ -27,9 +30,23 @@ class PyTorchGoogleStorageModelSaver(BaseModelGoogleStorageSaver, PyTorchS3Model
             cloud_dir_prefix (str): destination folder path inside selected bucket
             local_model_result_folder_path (str): root local path where project folder will be created
             checkpoint_model (bool): if the model being saved is checkpoint model or final end of training model
+            sectioned_checkpoint (bool or dict): if the model should be saved in the sectioned checkpoint format which
+                enables the lazy and memory-mapped loading of only the needed checkpoint sections. Provide a dict
+                to specify the ``save_sectioned_checkpoint()`` parameters such as the compression.
+            local_model_copy (bool): if set to ``False`` the model isn't saved to the local drive but is instead
+                serialized directly into the resumable upload stream with only a single upload chunk buffered
+                in memory. The upload then always happens in the calling thread and the sectioned checkpoint
+                format isn't supported.
         """
         BaseModelGoogleStorageSaver.__init__(self, bucket_name, cloud_dir_prefix, checkpoint_model)
-        self.pytorch_local_saver = PyTorchLocalModelSaver(local_model_result_folder_path, checkpoint_model)
+        self.pytorch_local_saver = PyTorchLocalModelSaver(local_model_result_folder_path, checkpoint_model,
+                                                          sectioned_checkpoint)
+        self.uploaded_tensor_blob_names = set()
+        self.local_model_copy = local_model_copy
+
+        if not self.local_model_copy and self.pytorch_local_saver.sectioned_checkpoint:
+            raise ValueError('Sectioned checkpoint format requires the local model copy. '
+                             'Set local_model_copy to True or disable sectioned_checkpoint.')
 
 
 class KerasGoogleStorageModelSaver(BaseModelGoogleStorageSaver, KerasS3ModelSaver):
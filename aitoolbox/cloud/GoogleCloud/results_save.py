@@ -17,7 +17,8 @@ class BaseResultsGoogleStorageSaver(BaseGoogleStorageDataSaver):
 
 class GoogleStorageResultsSaver(BaseResultsGoogleStorageSaver, S3ResultsSaver):
     def __init__(self, bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', labels_array_format=None,
+                 bundle_artifacts=False):
         """Google Cloud Storage results saver
 
         It first saves the results files to local drive and then uploads them to GCS.
@@ -26,6 +27,14 @@ class GoogleStorageResultsSaver(BaseResultsGoogleStorageSaver, S3ResultsSaver):
             bucket_name (str): name of the bucket in the Google Cloud Storage to which the results files will be saved
             cloud_dir_prefix (str): destination folder path inside selected bucket
             local_model_result_folder_path (str): root local path where project folder will be created
+            labels_array_format (str or None): storage format of the ground truth and predicted labels arrays:
+                ``None`` (embedded into the results file), ``'npz'`` or ``'npy'``. The label array files are
+                uploaded as separate objects so that the results can be downloaded without the labels.
+            bundle_artifacts (bool or dict): pack the small results files into a single zip bundle uploaded with
+                one request instead of uploading every file separately. Provide a dict to specify
+                the ``ArtifactBundler`` parameters such as the ``max_bundled_file_size``.
         """
         BaseResultsGoogleStorageSaver.__init__(self, bucket_name, cloud_dir_prefix)
-        self.local_results_saver = LocalResultsSaver(local_model_result_folder_path)
+        self.local_results_saver = LocalResultsSaver(local_model_result_folder_path,
+                                                     labels_array_format=labels_array_format)
+        self.bundler = self.get_artifact_bundler(bundle_artifacts)
@@ -0,0 +1,165 @@
+import os
+import time
+import queue
+import threading
+
+
+class BackgroundUploader:
+    def __init__(self, cloud_saver, max_inflight_bytes=4 * 1024 ** 3, max_retries=3, backoff_base=1., max_backoff=60.,
+                 num_workers=1):
+        """Non-blocking background upload service
+
+        Files are enqueued for the upload and the caller returns immediately, while the worker threads upload
+        the files to the cloud storage in the background. Failed uploads are retried with the exponential backoff.
+
+        The enqueuing only blocks when the total size of the pending files would exceed ``max_inflight_bytes``.
+        This way the amount of local disk space taken by the not yet uploaded files stays bounded.
+
+        Args:
+            cloud_saver (aitoolbox.cloud.AWS.data_access.BaseDataSaver or
+                aitoolbox.cloud.GoogleCloud.data_access.BaseGoogleStorageDataSaver): cloud saver used for the upload
+            max_inflight_bytes (int): max total size in bytes of the enqueued files which haven't yet been uploaded
+            max_retries (int): max number of upload retries after the failed upload
+            backoff_base (float): wait time in seconds before the first retry. Doubled on every following retry.
+            max_backoff (float): max wait time in seconds between the retries
+            num_workers (int): number of upload worker threads
+        """
+        if num_workers < 1:
+            raise ValueError(f'num_workers should be at least 1. Provided: {num_workers}')
+
+        self.cloud_saver = cloud_saver
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+        self.upload_queue = queue.Queue()
+        self.inflight_bytes = 0
+        self.pending_files = {}
+        self.finished_uploads = []
+        self.status_lock = threading.Condition()
+
+        self.workers = [threading.Thread(target=self._upload_worker, daemon=True) for _ in range(num_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def save_file(self, local_file_path, cloud_file_path):
+        """Enqueue the file for the background upload
+
+        Has the same signature as the cloud savers' ``save_file()``, but returns immediately unless the in-flight
+        bytes budget is exceeded.
+
+        Args:
+            local_file_path (str): path to the file on the local drive
+            cloud_file_path (str): destination where the file will be saved inside the cloud storage bucket
+
+        Returns:
+            None
+        """
+        if not self.is_alive():
+            raise RuntimeError('BackgroundUploader has already been shut down')
+
+        local_file_path = os.path.expanduser(local_file_path)
+        file_size = os.path.getsize(local_file_path)
+
+        with self.status_lock:
+            # Always let at least one file through even if it is larger than the whole budget
+            while self.inflight_bytes > 0 and self.inflight_bytes + file_size > self.max_inflight_bytes:
+                self.status_lock.wait()
+
+            self.inflight_bytes += file_size
+            self.pending_files[local_file_path] = self.pending_files.get(local_file_path, 0) + 1
+
+        self.upload_queue.put((local_file_path, cloud_file_path, file_size))
+
+    def _upload_worker(self):
+        while True:
+            upload_task = self.upload_queue.get()
+            if upload_task is None:
+                self.upload_queue.task_done()
+                break
+
+            local_file_path, cloud_file_path, file_size = upload_task
+            upload_status = {'local_file_path': local_file_path, 'cloud_file_path': cloud_file_path,
+                             'size': file_size, 'success': False, 'attempts': 0, 'error': None}
+
+            for attempt in range(self.max_retries + 1):
+                upload_status['attempts'] = attempt + 1
+                try:
+                    self.cloud_saver.save_file(local_file_path=local_file_path, cloud_file_path=cloud_file_path)
+                    upload_status['success'] = True
+                    upload_status['error'] = None
+                    break
+                except Exception as e:
+                    upload_status['error'] = repr(e)
+                    if attempt < self.max_retries:
+                        time.sleep(min(self.backoff_base * 2 ** attempt, self.max_backoff))
+
+            with self.status_lock:
+                self.inflight_bytes -= file_size
+                self.pending_files[local_file_path] -= 1
+                if self.pending_files[local_file_path] == 0:
+                    del self.pending_files[local_file_path]
+                self.finished_uploads.append(upload_status)
+                self.status_lock.notify_all()
+
+            self.upload_queue.task_done()
+
+    def wait_for_files(self, local_file_paths):
+        """Block until the specified files are not pending for the upload anymore
+
+        Useful before deleting the local files which might still be waiting in the upload queue.
+
+        Args:
+            local_file_paths (list): list of local file paths
+
+        Returns:
+            None
+        """
+        local_file_paths = [os.path.expanduser(file_path) for file_path in local_file_paths]
+        with self.status_lock:
+            while any(file_path in self.pending_files for file_path in local_file_paths):
+                self.status_lock.wait()
+
+    def get_pending_files(self):
+        """Get the local paths of the files which are enqueued or being uploaded
+
+        Returns:
+            list: local file paths
+        """
+        with self.status_lock:
+            return list(self.pending_files.keys())
+
+    def wait_until_done(self):
+        """Block until all the enqueued files have been processed
+
+        Returns:
+            None
+        """
+        self.upload_queue.join()
+
+    def pop_finished_uploads(self):
+        """Get the statuses of all the uploads finished since the last call
+
+        Returns:
+            list: list of upload status dicts
+        """
+        with self.status_lock:
+            finished_uploads = self.finished_uploads
+            self.finished_uploads = []
+        return finished_uploads
+
+    def shutdown(self):
+        """Wait for all the pending uploads to finish and stop the worker threads
+
+        Returns:
+            None
+        """
+        if self.is_alive():
+            for _ in self.workers:
+                self.upload_queue.put(None)
+            for worker in self.workers:
+                worker.join()
+
+    def is_alive(self):
+        return any(worker.is_alive() for worker in self.workers)
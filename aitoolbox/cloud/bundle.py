@@ -0,0 +1,85 @@
+import os
+import tempfile
+import zipfile
+
+from aitoolbox.cloud.transfer import MB
+
+# Already compressed file formats are only stored in the bundle as their compression would just waste CPU time
+INCOMPRESSIBLE_FILE_EXTENSIONS = {'.zip', '.gz', '.bz2', '.xz', '.npz', '.png', '.jpg', '.jpeg', '.gif', '.pth', '.h5'}
+
+
+class ArtifactBundler:
+    def __init__(self, cloud_saver, max_bundled_file_size=4 * MB):
+        """Upload of many small experiment artifact files packed into a single compressed bundle archive
+
+        Uploading every small file, such as the hyperparameters text file, the plots or the history CSVs, as
+        a separate object is dominated by the per-request latency. Instead, all the small files uploaded together
+        at the same epoch or event are packed into one zip bundle and uploaded with a single request. Files larger
+        than ``max_bundled_file_size`` are still uploaded as the standalone objects.
+
+        Bundled files are stored in the archive under their cloud paths relative to the folder of the bundle.
+        The zip central directory serves as the bundle index: the cloud data loaders' ``load_archive()`` with
+        the ``members`` glob patterns reads only the byte ranges of the selected files from the bundle.
+
+        Args:
+            cloud_saver (aitoolbox.cloud.AWS.data_access.BaseDataSaver or
+                aitoolbox.cloud.GoogleCloud.data_access.BaseGoogleStorageDataSaver): cloud saver used for the upload
+            max_bundled_file_size (int): max size in bytes of the file which is still packed into the bundle
+        """
+        self.cloud_saver = cloud_saver
+        self.max_bundled_file_size = max_bundled_file_size
+
+    def save_files(self, file_paths, bundle_cloud_path):
+        """Upload the files packing all the small ones into the single bundle archive
+
+        Args:
+            file_paths (list): list of [local_file_path, cloud_file_path] pairs
+            bundle_cloud_path (str): destination of the bundle zip archive inside the bucket
+
+        Returns:
+            list: cloud paths of the uploaded objects. The bundle, if created, is listed first followed by
+            the standalone files.
+        """
+        bundle_folder_path = os.path.dirname(bundle_cloud_path)
+        bundled_file_paths = []
+        standalone_file_paths = []
+
+        for local_file_path, cloud_file_path in file_paths:
+            local_file_path = os.path.expanduser(local_file_path)
+            member_name = os.path.relpath(cloud_file_path, bundle_folder_path) if bundle_folder_path != '' \
+                else cloud_file_path
+
+            if os.path.getsize(local_file_path) <= self.max_bundled_file_size and not member_name.startswith('..'):
+                bundled_file_paths.append([local_file_path, member_name])
+            else:
+                standalone_file_paths.append([local_file_path, cloud_file_path])
+
+        uploaded_cloud_paths = []
+        if len(bundled_file_paths) > 0:
+            with tempfile.TemporaryDirectory() as tmp_dir_path:
+                local_bundle_path = os.path.join(tmp_dir_path, os.path.basename(bundle_cloud_path))
+                ArtifactBundler.pack_bundle(bundled_file_paths, local_bundle_path)
+                self.cloud_saver.save_file(local_file_path=local_bundle_path, cloud_file_path=bundle_cloud_path)
+            uploaded_cloud_paths.append(bundle_cloud_path)
+
+        self.cloud_saver.save_files(standalone_file_paths)
+
+        return uploaded_cloud_paths + [cloud_file_path for _, cloud_file_path in standalone_file_paths]
+
+    @staticmethod
+    def pack_bundle(bundled_file_paths, local_bundle_path):
+        """Pack the files into the zip bundle archive on the local drive
+
+        Args:
+            bundled_file_paths (list): list of [local_file_path, member_name] pairs
+            local_bundle_path (str): path where the bundle archive is saved
+
+        Returns:
+            str: path to the bundle archive
+        """
+        with zipfile.ZipFile(local_bundle_path, 'w', compression=zipfile.ZIP_DEFLATED) as zip_f:
+            for local_file_path, member_name in bundled_file_paths:
+                is_compressed = os.path.splitext(local_file_path)[1].lower() in INCOMPRESSIBLE_FILE_EXTENSIONS
+                zip_f.write(local_file_path, arcname=member_name,
+                            compress_type=zipfile.ZIP_STORED if is_compressed else zipfile.ZIP_DEFLATED)
+        return local_bundle_path
@@ -0,0 +1,165 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage
+from requests.adapters import HTTPAdapter
+
+
+class CloudClientConfig:
+    def __init__(self, max_pool_connections=50, max_retries=5, retry_mode='adaptive', tcp_keepalive=True,
+                 connect_timeout=60, read_timeout=60):
+        """Connection settings of the cloud storage clients shared by all the S3 and Google Cloud Storage components
+
+        Args:
+            max_pool_connections (int): max number of the connections kept open in the client's connection pool.
+                Should be at least as large as the number of the parallel transfer threads using the client.
+            max_retries (int): max number of retry attempts of the failed requests
+            retry_mode (str): botocore retry mode used by the AWS clients: ``'legacy'``, ``'standard'`` or
+                ``'adaptive'``
+            tcp_keepalive (bool): enable the TCP keep-alive on the AWS client connections
+            connect_timeout (float): number of seconds to wait for the connection to be established
+            read_timeout (float): number of seconds to wait for the data to be received on the open connection
+        """
+        if max_pool_connections < 1 or max_retries < 0:
+            raise ValueError(f'max_pool_connections should be at least 1 and max_retries non-negative. '
+                             f'Provided: max_pool_connections={max_pool_connections}, max_retries={max_retries}')
+
+        self.max_pool_connections = max_pool_connections
+        self.max_retries = max_retries
+        self.retry_mode = retry_mode
+        self.tcp_keepalive = tcp_keepalive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def get_botocore_config(self):
+        """Convert the settings into the botocore client config
+
+        Returns:
+            botocore.config.Config: botocore client config
+        """
+        return Config(max_pool_connections=self.max_pool_connections,
+                      retries={'max_attempts': self.max_retries, 'mode': self.retry_mode},
+                      tcp_keepalive=self.tcp_keepalive,
+                      connect_timeout=self.connect_timeout, read_timeout=self.read_timeout)
+
+    def get_http_adapter(self):
+        """Build the requests HTTP adapter with the connection pool used by the Google Cloud Storage client
+
+        Returns:
+            requests.adapters.HTTPAdapter: HTTP adapter
+        """
+        return HTTPAdapter(pool_connections=self.max_pool_connections, pool_maxsize=self.max_pool_connections,
+                           max_retries=self.max_retries)
+
+
+default_client_config = CloudClientConfig()
+
+_client_registry = {}
+_client_registry_lock = threading.Lock()
+
+
+def set_default_client_config(client_config):
+    """Replace the process-wide cloud client config
+
+    Already created shared clients are discarded so that the next requested clients are built with the new config.
+
+    Args:
+        client_config (CloudClientConfig): new default client config
+
+    Returns:
+        None
+    """
+    global default_client_config
+    default_client_config = client_config
+    clear_cloud_clients()
+
+
+def clear_cloud_clients():
+    """Discard all the shared cloud clients
+
+    The clients are built anew when they are next requested.
+
+    Returns:
+        None
+    """
+    with _client_registry_lock:
+        _client_registry.clear()
+
+
+def _get_shared_client(client_key, build_client_fn):
+    with _client_registry_lock:
+        if client_key not in _client_registry:
+            _client_registry[client_key] = build_client_fn()
+        return _client_registry[client_key]
+
+
+def get_s3_client():
+    """Get the AWS S3 client shared by all the components in the process
+
+    boto3 clients are thread-safe so the same client and its connection pool are used by all the savers, loaders
+    and background transfer threads.
+
+    Returns:
+        botocore.client.S3: S3 client
+    """
+    return _get_shared_client(('s3', None),
+                              lambda: boto3.client('s3', config=default_client_config.get_botocore_config()))
+
+
+def get_s3_resource():
+    """Get the new AWS S3 resource which sends its requests through the shared S3 client
+
+    boto3 resources aren't thread-safe, so each component gets its own resource. Its low-level client is replaced
+    with the shared client, so that the resource still uses the shared connection pool and client config.
+
+    Returns:
+        boto3.resources.base.ServiceResource: S3 resource
+    """
+    s3_resource = boto3.resource('s3', config=default_client_config.get_botocore_config())
+    s3_resource.meta.client = get_s3_client()
+    return s3_resource
+
+
+def get_ses_client(region_name):
+    """Get the AWS Simple Email Service client shared by all the components in the process
+
+    Args:
+        region_name (str): AWS SES region
+
+    Returns:
+        botocore.client.SES: SES client
+    """
+    return _get_shared_client(('ses', region_name),
+                              lambda: boto3.client('ses', region_name=region_name,
+                                                   config=default_client_config.get_botocore_config()))
+
+
+def get_gcs_client():
+    """Get the Google Cloud Storage client shared by all the components in the process
+
+    Returns:
+        google.cloud.storage.Client: Google Cloud Storage client
+    """
+    def build_gcs_client():
+        credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+        http_session = AuthorizedSession(credentials)
+        http_adapter = default_client_config.get_http_adapter()
+        http_session.mount('https://', http_adapter)
+        http_session.mount('http://', http_adapter)
+        return storage.Client(project=project, credentials=credentials, _http=http_session)
+
+    return _get_shared_client(('gcs', None), build_gcs_client)
+
+
+def _reset_clients_after_fork():
+    global _client_registry_lock
+    _client_registry_lock = threading.Lock()
+    _client_registry.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    # Connection pools mustn't be shared between the forked processes, e.g. the DataLoader or DDP workers
+    os.register_at_fork(after_in_child=_reset_clients_after_fork)
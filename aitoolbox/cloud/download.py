@@ -0,0 +1,475 @@
+import os
+import io
+import json
+import time
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from aitoolbox.cloud.transfer import get_transfer_config
+from aitoolbox.cloud.sync import IncrementalCloudSync
+
+
+class FileLock:
+    def __init__(self, lock_file_path, poll_interval=0.1):
+        """Inter-process exclusive lock based on the lock file
+
+        Uses ``fcntl.flock()`` where available, which is released automatically by the OS even if the process holding
+        the lock crashes. On other platforms it falls back to the exclusive creation of the lock file.
+
+        Args:
+            lock_file_path (str): path to the lock file
+            poll_interval (float): wait time in seconds between the lock acquisition attempts when using
+                the lock file creation fallback
+        """
+        self.lock_file_path = os.path.expanduser(lock_file_path)
+        self.poll_interval = poll_interval
+        self.lock_file_descriptor = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.lock_file_path), exist_ok=True)
+
+        if fcntl is not None:
+            self.lock_file_descriptor = os.open(self.lock_file_path, os.O_RDWR | os.O_CREAT)
+            fcntl.flock(self.lock_file_descriptor, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    self.lock_file_descriptor = os.open(self.lock_file_path, os.O_RDWR | os.O_CREAT | os.O_EXCL)
+                    break
+                except FileExistsError:
+                    time.sleep(self.poll_interval)
+
+    def release(self):
+        if self.lock_file_descriptor is not None:
+            if fcntl is not None:
+                fcntl.flock(self.lock_file_descriptor, fcntl.LOCK_UN)
+                os.close(self.lock_file_descriptor)
+            else:
+                os.close(self.lock_file_descriptor)
+                os.remove(self.lock_file_path)
+            self.lock_file_descriptor = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class RangedFileDownloader:
+    def __init__(self, transfer_config=None):
+        """Parallel byte-range file download with the resume of the interrupted downloads
+
+        The file is downloaded into the ``.part`` file next to the destination. Completed byte ranges are recorded
+        in the accompanying progress file so that the interrupted download continues where it stopped instead of
+        starting from scratch. The progress is discarded when the remote file version changes. Only when all
+        the ranges have been downloaded, the ``.part`` file is atomically moved to the final destination.
+
+        Args:
+            transfer_config (aitoolbox.cloud.transfer.CloudTransferConfig or None): parallel and multipart transfer
+                settings. Files larger than ``multipart_threshold`` are downloaded in ``multipart_chunksize`` ranges
+                with ``max_concurrency`` ranges downloaded in parallel. If left to ``None`` the default process-wide
+                transfer config is used.
+        """
+        self.transfer_config = transfer_config
+
+    def download(self, download_range_fn, file_size, file_version, local_file_path, verify_fn=None):
+        """Download the file
+
+        Args:
+            download_range_fn (callable): function which accepts the inclusive start and end byte positions and
+                returns the bytes of the file in that range
+            file_size (int): size of the remote file in bytes
+            file_version (str): identifier of the remote file version, e.g. ETag. Used to detect that the partially
+                downloaded data belongs to the same remote file version.
+            local_file_path (str): destination path where the file will be downloaded
+            verify_fn (callable or None): optional function called with the path of the completely downloaded
+                ``.part`` file before it is moved to the destination. It should raise an error if the downloaded
+                file is corrupted, in which case the download progress is discarded.
+
+        Returns:
+            None
+        """
+        transfer_config = get_transfer_config(self.transfer_config)
+        local_file_path = os.path.expanduser(local_file_path)
+        part_file_path = f'{local_file_path}.part'
+        progress_file_path = f'{part_file_path}.progress'
+
+        chunk_size = transfer_config.multipart_chunksize if file_size >= transfer_config.multipart_threshold \
+            else max(file_size, 1)
+        download_progress = {'version': file_version, 'size': file_size, 'chunk_size': chunk_size, 'completed': []}
+
+        previous_progress = self.load_progress(progress_file_path)
+        if previous_progress is not None and os.path.isfile(part_file_path) and \
+                all(previous_progress[k] == download_progress[k] for k in ['version', 'size', 'chunk_size']):
+            download_progress = previous_progress
+        else:
+            with open(part_file_path, 'wb') as f:
+                f.truncate(file_size)
+            self.save_progress(download_progress, progress_file_path)
+
+        completed_chunks = set(download_progress['completed'])
+        remaining_chunks = [(chunk_idx, start, min(start + chunk_size, file_size) - 1)
+                            for chunk_idx, start in enumerate(range(0, file_size, chunk_size))
+                            if chunk_idx not in completed_chunks]
+        progress_lock = threading.Lock()
+
+        def download_chunk(chunk_idx, start, end):
+            chunk_data = download_range_fn(start, end)
+            if len(chunk_data) != end - start + 1:
+                raise ValueError(f'Downloaded {len(chunk_data)} bytes for the range {start}-{end} of {local_file_path}')
+
+            with open(part_file_path, 'r+b') as f:
+                f.seek(start)
+                f.write(chunk_data)
+
+            with progress_lock:
+                download_progress['completed'].append(chunk_idx)
+                self.save_progress(download_progress, progress_file_path)
+
+        if len(remaining_chunks) > 0:
+            num_workers = min(transfer_config.max_concurrency, len(remaining_chunks))
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(download_chunk, *chunk) for chunk in remaining_chunks]
+                for future in futures:
+                    future.result()
+
+        # File is verified before it becomes visible at the destination, which might be shared with other readers
+        if verify_fn is not None:
+            try:
+                verify_fn(part_file_path)
+            except Exception:
+                for file_path in [part_file_path, progress_file_path]:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                raise
+
+        os.replace(part_file_path, local_file_path)
+        os.remove(progress_file_path)
+
+    @staticmethod
+    def load_progress(progress_file_path):
+        if os.path.isfile(progress_file_path):
+            try:
+                with open(progress_file_path) as f:
+                    return json.load(f)
+            except ValueError:
+                return None
+        return None
+
+    @staticmethod
+    def save_progress(download_progress, progress_file_path):
+        tmp_progress_file_path = f'{progress_file_path}.tmp'
+        with open(tmp_progress_file_path, 'w') as f:
+            json.dump(download_progress, f)
+        os.replace(tmp_progress_file_path, progress_file_path)
+
+
+class RangedReadStream(io.RawIOBase):
+    def __init__(self, download_range_fn, file_size):
+        """Seekable read-only file object backed by the byte-range requests to the remote file
+
+        Enables reading only the needed parts of the remote file, e.g. only the selected members of the zip archive,
+        without downloading the whole file. Wrap it into ``io.BufferedReader`` to avoid issuing many tiny requests.
+
+        Args:
+            download_range_fn (callable): function which accepts the inclusive start and end byte positions and
+                returns the bytes of the file in that range
+            file_size (int): size of the remote file in bytes
+        """
+        super().__init__()
+        self.download_range_fn = download_range_fn
+        self.file_size = file_size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.file_size + offset
+        else:
+            raise ValueError(f'Unsupported whence value: {whence}')
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position >= self.file_size or len(buffer) == 0:
+            return 0
+
+        end = min(self.position + len(buffer), self.file_size) - 1
+        data = self.download_range_fn(self.position, end)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class TeeStreamReader:
+    def __init__(self, file_obj, tee_file_path):
+        """Stream reader which at the same time writes all the read bytes into the file and hashes them
+
+        Args:
+            file_obj (file object): source stream
+            tee_file_path (str): path of the file into which the read bytes are written
+        """
+        self.file_obj = file_obj
+        self.tee_file = open(tee_file_path, 'wb')
+        self.file_hash = hashlib.md5()
+        self.num_bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.file_obj.read(size)
+        self.tee_file.write(data)
+        self.file_hash.update(data)
+        self.num_bytes_read += len(data)
+        return data
+
+    def drain(self, chunk_size=1024 * 1024):
+        """Read the rest of the source stream
+
+        Returns:
+            None
+        """
+        while len(self.read(chunk_size)) > 0:
+            pass
+
+    def close(self):
+        self.tee_file.close()
+
+
+class DownloadCache:
+    def __init__(self, cache_dir_path='~/.cache/aitoolbox/downloads', max_cache_size=None):
+        """Content-addressed local cache of the downloaded files shared between processes
+
+        Cached files are addressed by the remote file's content identifier (e.g. ETag or MD5 hash) and size,
+        so the same content is stored only once regardless of its remote location. Concurrent processes on the same
+        machine are coordinated via file locks: only one of them downloads the file while the others wait and then
+        reuse the cached copy.
+
+        Args:
+            cache_dir_path (str): path to the cache directory
+            max_cache_size (int or None): max total size in bytes of the cached files. When exceeded, the least
+                recently used files are evicted from the cache. If left to ``None`` the cache size is not limited.
+        """
+        self.cache_dir_path = os.path.expanduser(cache_dir_path)
+        self.max_cache_size = max_cache_size
+
+    def get_cache_file_path(self, file_version, file_size):
+        """Get the location of the file in the cache
+
+        Args:
+            file_version (str): remote file content identifier
+            file_size (int): size of the file in bytes
+
+        Returns:
+            str: path to the file in the cache
+        """
+        content_key = hashlib.sha256(f'{file_version}:{file_size}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir_path, 'objects', content_key[:2], content_key)
+
+    def fetch(self, download_fn, file_version, file_size):
+        """Get the file from the cache and download it into the cache if not yet present
+
+        Args:
+            download_fn (callable): function which accepts the destination path and downloads the file there
+            file_version (str): remote file content identifier
+            file_size (int): size of the file in bytes
+
+        Returns:
+            str: path to the file in the cache
+        """
+        cache_file_path = self.get_cache_file_path(file_version, file_size)
+
+        try:
+            # Modification time is used as the last access time for the LRU eviction
+            os.utime(cache_file_path)
+            return cache_file_path
+        except FileNotFoundError:
+            pass
+
+        with FileLock(f'{cache_file_path}.lock'):
+            # Another process might have downloaded the file while this one was waiting for the lock
+            if not os.path.isfile(cache_file_path):
+                download_fn(cache_file_path)
+            else:
+                os.utime(cache_file_path)
+
+        if self.max_cache_size is not None:
+            self.evict_least_recently_used(keep_file_paths=[cache_file_path])
+
+        return cache_file_path
+
+    def get_cached_files(self):
+        """List all the completely downloaded files in the cache
+
+        Returns:
+            list: list of (file path, file size, last access time) tuples
+        """
+        cached_files = []
+        for root, _, files in os.walk(os.path.join(self.cache_dir_path, 'objects')):
+            for file_name in files:
+                if file_name.endswith(('.lock', '.part', '.progress', '.tmp')):
+                    continue
+                file_path = os.path.join(root, file_name)
+                try:
+                    file_stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                cached_files.append((file_path, file_stat.st_size, file_stat.st_mtime))
+        return cached_files
+
+    def evict_least_recently_used(self, keep_file_paths=()):
+        """Remove the least recently used files until the cache fits into the max cache size
+
+        Args:
+            keep_file_paths (list or tuple): cache file paths which must not be evicted
+
+        Returns:
+            list: paths of the evicted files
+        """
+        evicted_file_paths = []
+
+        with FileLock(os.path.join(self.cache_dir_path, 'eviction.lock')):
+            cached_files = sorted(self.get_cached_files(), key=lambda cached_file: cached_file[2])
+            cache_size = sum(file_size for _, file_size, _ in cached_files)
+
+            for file_path, file_size, _ in cached_files:
+                if cache_size <= self.max_cache_size:
+                    break
+                if file_path in keep_file_paths:
+                    continue
+
+                # Already linked copies outside of the cache stay valid after the removal
+                os.remove(file_path)
+                cache_size -= file_size
+                evicted_file_paths.append(file_path)
+
+        return evicted_file_paths
+
+
+def link_or_copy_file(source_file_path, destination_file_path):
+    """Hard link the file to the destination or copy it if linking is not possible
+
+    Args:
+        source_file_path (str): path to the existing file
+        destination_file_path (str): path where the file should be made available
+
+    Returns:
+        None
+    """
+    try:
+        os.link(source_file_path, destination_file_path)
+    except OSError:
+        shutil.copyfile(source_file_path, destination_file_path)
+
+
+def replace_with_cached_file(cache_file_path, local_file_path):
+    """Atomically make the cached file available at the local path, replacing the potentially outdated local file
+
+    Args:
+        cache_file_path (str): path to the file in the cache
+        local_file_path (str): path where the file should be made available
+
+    Returns:
+        None
+    """
+    if os.path.isfile(local_file_path) and os.path.samefile(cache_file_path, local_file_path):
+        return
+
+    tmp_local_file_path = f'{local_file_path}.tmp'
+    if os.path.exists(tmp_local_file_path):
+        os.remove(tmp_local_file_path)
+    link_or_copy_file(cache_file_path, tmp_local_file_path)
+    os.replace(tmp_local_file_path, local_file_path)
+
+
+def verify_file_md5(file_path, expected_md5):
+    """Check the downloaded file integrity and remove the file if it is corrupted
+
+    Args:
+        file_path (str): path to the downloaded file
+        expected_md5 (str): expected hex digest of the file content MD5 hash
+
+    Returns:
+        None
+    """
+    file_md5 = IncrementalCloudSync.calculate_file_hash(file_path)
+    if file_md5 != expected_md5:
+        os.remove(file_path)
+        raise ValueError(f'Downloaded file {file_path} is corrupted. Expected MD5 hash {expected_md5}, got {file_md5}')
+
+
+@contextmanager
+def cleanup_failed_extraction(local_folder_path, part_file_path=None):
+    """Remove the content written by the failed archive extraction and the partially downloaded archive
+
+    Only the archive members recorded into the yielded list are removed, together with their parent folders which
+    become empty. Other archives extracted in parallel into the same destination folder are thus left untouched.
+
+    Args:
+        local_folder_path (str): destination folder where the archive content is extracted
+        part_file_path (str or None): optional path of the partially downloaded archive file
+
+    Yields:
+        list: list into which the extraction records the paths of the extracted members, e.g. the
+            ``extracted_paths`` argument of ``file_system.extract_zip()`` and ``file_system.extract_tar_stream()``
+    """
+    local_folder_path = os.path.normpath(local_folder_path)
+    folder_existed = os.path.isdir(local_folder_path)
+    extracted_paths = []
+    is_extracted = False
+    try:
+        yield extracted_paths
+        is_extracted = True
+    finally:
+        if not is_extracted:
+            if part_file_path is not None and os.path.exists(part_file_path):
+                os.remove(part_file_path)
+
+            # Deeper paths first so that the extracted folders are already emptied when they are reached
+            for extracted_path in sorted(set(extracted_paths), reverse=True):
+                if os.path.islink(extracted_path) or os.path.isfile(extracted_path):
+                    os.remove(extracted_path)
+                remove_empty_folders(extracted_path, local_folder_path, remove_stop_folder=not folder_existed)
+
+
+def remove_empty_folders(folder_path, stop_folder_path, remove_stop_folder=False):
+    """Remove the folder and its parent folders as long as they are empty
+
+    Args:
+        folder_path (str): path of the deepest folder to remove
+        stop_folder_path (str): folder at which the removal stops. Only the folders inside it are removed.
+        remove_stop_folder (bool): if the stop folder itself is also removed when it becomes empty
+
+    Returns:
+        None
+    """
+    while os.path.commonpath([folder_path, stop_folder_path]) == stop_folder_path:
+        if folder_path == stop_folder_path and not remove_stop_folder:
+            break
+        if os.path.isdir(folder_path) and not os.path.islink(folder_path):
+            try:
+                os.rmdir(folder_path)
+            except OSError:
+                # Folder isn't empty, e.g. it also contains the files of the other extractions
+                break
+        if folder_path == stop_folder_path:
+            break
+        folder_path = os.path.dirname(folder_path)
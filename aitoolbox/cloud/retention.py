@@ -0,0 +1,151 @@
+import os
+import time
+from functools import partial
+
+from aitoolbox.experiment.local_save.local_model_save import LocalSubOptimalModelRemover
+from aitoolbox.experiment.local_save.sectioned_checkpoint import read_sectioned_checkpoint_header, \
+    get_referenced_blob_names, TENSOR_STORE_DIR_NAME
+
+
+class CloudSubOptimalModelRemover(LocalSubOptimalModelRemover):
+    def __init__(self, cloud_saver, metric_name, num_best_kept=2, dry_run=False, delete_batch_size=1,
+                 before_remove_fn=None, keep_latest=False, after_remove_fn=None, metric_known_at_save=False,
+                 tensor_store_grace_period=600.):
+        """Removes the cloud storage copies of the tracked models which become suboptimal in the subsequent epochs
+
+        Applies the same top-K-by-metric retention as the ``LocalSubOptimalModelRemover``, but to the model files
+        uploaded into the cloud storage bucket. The tracked model paths are the file paths inside the bucket.
+
+        The files of the removed models are accumulated and deleted together with the batched delete requests
+        of the cloud saver once at least ``delete_batch_size`` files are pending. The remaining pending files
+        are deleted by calling ``flush_deletes()``, e.g. at the end of training.
+
+        Tensor store blobs of the deduplicated sectioned checkpoints can be shared with the kept checkpoints and
+        are therefore not removed together with the model files. Instead, ``collect_tensor_store_garbage()``
+        removes the blobs no longer referenced by any of the checkpoints remaining in the bucket.
+
+        Args:
+            cloud_saver (aitoolbox.cloud.AWS.data_access.BaseDataSaver or
+                aitoolbox.cloud.GoogleCloud.data_access.BaseGoogleStorageDataSaver): cloud saver used to delete
+                the files from the bucket
+            metric_name (str): one of the metric names that will be calculated and will appear in the train_history
+                dict in the TrainLoop
+            num_best_kept (int): number of best performing models which are kept in the bucket
+            dry_run (bool): only report the files which would be deleted without actually deleting them. The paths
+                are collected in the ``dry_run_deleted_paths`` list.
+            delete_batch_size (int): number of the pending files at which they get deleted together
+            before_remove_fn (callable or None): optional function called with the list of cloud model paths right
+                before they get scheduled for the deletion. For example, used to wait for the pending background
+                uploads of these files.
+            keep_latest (bool): never remove the most recently saved model, even when it is suboptimal. Its removal
+                is deferred until the next model is saved.
+            after_remove_fn (callable or None): optional function called with the list of cloud model paths right
+                after they have been scheduled for the deletion
+            metric_known_at_save (bool): the metric of the newly saved model is already in the training history at
+                the time of saving
+            tensor_store_grace_period (float): number of seconds since the upload during which the tensor store blob
+                is never removed from the bucket
+        """
+        LocalSubOptimalModelRemover.__init__(self, metric_name, num_best_kept,
+                                             before_remove_fn=before_remove_fn, keep_latest=keep_latest,
+                                             after_remove_fn=after_remove_fn,
+                                             metric_known_at_save=metric_known_at_save)
+        if delete_batch_size < 1:
+            raise ValueError(f'delete_batch_size should be at least 1. Provided: {delete_batch_size}')
+
+        self.cloud_saver = cloud_saver
+        self.dry_run = dry_run
+        self.delete_batch_size = delete_batch_size
+        self.tensor_store_grace_period = tensor_store_grace_period
+
+        self.pending_delete_paths = []
+        self.dry_run_deleted_paths = []
+
+    def rm_suboptimal_model(self, rm_model_paths):
+        """Schedule the suboptimal model files for the batched deletion from the bucket
+
+        Args:
+            rm_model_paths (list): list of file paths inside the bucket
+
+        Returns:
+            None
+        """
+        self.pending_delete_paths += rm_model_paths
+        if len(self.pending_delete_paths) >= self.delete_batch_size:
+            self.flush_deletes()
+
+    def flush_deletes(self):
+        """Delete all the pending files from the bucket
+
+        In the dry run mode the files are only reported and recorded in ``dry_run_deleted_paths``.
+
+        Returns:
+            list: paths of the deleted files inside the bucket
+        """
+        delete_paths, self.pending_delete_paths = self.pending_delete_paths, []
+        if len(delete_paths) == 0:
+            return []
+
+        if self.dry_run:
+            print(f'Dry run. Suboptimal model files which would be deleted from the bucket: {delete_paths}')
+            self.dry_run_deleted_paths += delete_paths
+        else:
+            print(f'Deleting suboptimal model files from the bucket: {delete_paths}')
+            self.cloud_saver.delete_files(delete_paths)
+        return delete_paths
+
+    def collect_tensor_store_garbage(self, cloud_checkpoint_dir_path, protected_blob_names=()):
+        """Remove the tensor store blobs which are no longer referenced by any of the checkpoints in the bucket
+
+        Mark-and-sweep garbage collection of the ``tensor_store`` folder inside the bucket: the blobs referenced
+        by the index headers of the sectioned checkpoints remaining in the folder are kept and the rest are deleted
+        via ``flush_deletes()``. The checkpoints already scheduled for the deletion don't protect their blobs.
+        The blobs uploaded within the grace period are always kept as they could belong to the checkpoint which
+        is still being uploaded.
+
+        Args:
+            cloud_checkpoint_dir_path (str): path of the folder inside the bucket containing the checkpoints and
+                their tensor store folder
+            protected_blob_names (set or list or tuple): names of the blobs which are never removed, e.g. the blobs
+                referenced by the checkpoints still waiting for their upload
+
+        Returns:
+            list: paths of the deleted blobs inside the bucket
+        """
+        tensor_store_path = os.path.join(cloud_checkpoint_dir_path, TENSOR_STORE_DIR_NAME)
+        removed_paths = set(self.pending_delete_paths + self.dry_run_deleted_paths)
+
+        blob_files = []
+        referenced_blob_names = set(protected_blob_names)
+        for cloud_file_path, file_size, last_modified in self.cloud_saver.list_files(cloud_checkpoint_dir_path):
+            if os.path.dirname(cloud_file_path) == tensor_store_path:
+                blob_files.append((cloud_file_path, last_modified))
+            elif os.path.dirname(cloud_file_path) == cloud_checkpoint_dir_path and cloud_file_path not in removed_paths:
+                try:
+                    header = read_sectioned_checkpoint_header(
+                        partial(self.cloud_saver.read_file_range, cloud_file_path), file_size
+                    )
+                except ValueError:
+                    # Not a sectioned checkpoint
+                    continue
+                if header.get('tensor_store') == TENSOR_STORE_DIR_NAME:
+                    referenced_blob_names.update(get_referenced_blob_names(header))
+
+        current_time = time.time()
+        unreferenced_blob_paths = [
+            blob_path for blob_path, last_modified in blob_files
+            if os.path.basename(blob_path) not in referenced_blob_names and
+            current_time - last_modified > self.tensor_store_grace_period
+        ]
+        if len(unreferenced_blob_paths) == 0:
+            return []
+
+        print(f'Deleting {len(unreferenced_blob_paths)} unreferenced tensor store blobs from the bucket')
+        self.pending_delete_paths += unreferenced_blob_paths
+        self.flush_deletes()
+
+        # Deleted blobs have to be uploaded again if any of the future checkpoints references them
+        if not self.dry_run and hasattr(self.cloud_saver, 'uploaded_tensor_blob_names'):
+            for blob_path in unreferenced_blob_paths:
+                self.cloud_saver.uploaded_tensor_blob_names.discard(os.path.basename(blob_path))
+        return unreferenced_blob_paths
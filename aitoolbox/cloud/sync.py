@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+
+
+class IncrementalCloudSync:
+    def __init__(self, cloud_saver, manifest_file_path=None, hash_content=True, bundler=None):
+        """Manifest-based incremental upload of local files to the cloud storage
+
+        The sync keeps the manifest with the size, modification time and content hash of every uploaded file. On every
+        sync only the new or changed files are uploaded. A file is considered unchanged when its size and modification
+        time match the manifest. When these differ, but the content hash stays the same, the file is not re-uploaded
+        either and only the manifest entry gets refreshed.
+
+        Args:
+            cloud_saver (aitoolbox.cloud.AWS.data_access.BaseDataSaver or
+                aitoolbox.cloud.GoogleCloud.data_access.BaseGoogleStorageDataSaver): cloud saver used for
+                the upload and the deletion of files
+            manifest_file_path (str or None): optional local path where the manifest is persisted as a JSON file.
+                Persisting the manifest enables incremental syncing also across the separate training runs.
+                If left to ``None`` the manifest is kept only in memory.
+            hash_content (bool): if ``True`` the content hash is used to skip the uploads of files which were
+                rewritten with the same content. If ``False`` any change in size or modification time triggers upload.
+            bundler (aitoolbox.cloud.bundle.ArtifactBundler or None): optional bundler packing the small changed
+                files of the sync into the single bundle archive when the sync is given the ``bundle_cloud_path``
+        """
+        self.cloud_saver = cloud_saver
+        self.manifest_file_path = os.path.expanduser(manifest_file_path) if manifest_file_path is not None else None
+        self.hash_content = hash_content
+        self.bundler = bundler
+
+        self.manifest = self.load_manifest()
+
+    def sync_files(self, file_paths, bundle_cloud_path=None):
+        """Upload only the new or changed files from the provided list
+
+        Args:
+            file_paths (list): list of [local_file_path, cloud_file_path] pairs
+            bundle_cloud_path (str or None): destination inside the bucket of the bundle archive into which
+                the small changed files are packed. Only used when the sync has the bundler.
+
+        Returns:
+            list: cloud paths of the uploaded files
+        """
+        upload_file_paths = []
+        new_manifest_entries = {}
+
+        for local_file_path, cloud_file_path in file_paths:
+            local_file_path = os.path.expanduser(local_file_path)
+            is_changed, manifest_entry = self.check_file_changed(local_file_path, cloud_file_path)
+            if is_changed:
+                upload_file_paths.append([local_file_path, cloud_file_path])
+            new_manifest_entries[cloud_file_path] = manifest_entry
+
+        if self.bundler is not None and bundle_cloud_path is not None:
+            self.bundler.save_files(upload_file_paths, bundle_cloud_path)
+        else:
+            self.cloud_saver.save_files(upload_file_paths)
+
+        self.manifest.update(new_manifest_entries)
+        self.save_manifest()
+
+        return [cloud_file_path for _, cloud_file_path in upload_file_paths]
+
+    def sync_folder(self, local_folder_path, cloud_folder_path, delete_removed=False, bundle_cloud_path=None):
+        """Incrementally sync the contents of the local folder to the cloud storage
+
+        Args:
+            local_folder_path (str): local path to the folder which should be synced
+            cloud_folder_path (str): destination path in the cloud storage where the folder content should be uploaded
+            delete_removed (bool): should the previously synced files, which have since been removed from the local
+                folder, also be deleted from the cloud storage
+            bundle_cloud_path (str or None): destination inside the bucket of the bundle archive into which
+                the small changed files are packed. Only used when the sync has the bundler.
+
+        Returns:
+            (list, list): cloud paths of the uploaded files and cloud paths of the deleted files
+        """
+        local_folder_path = os.path.expanduser(local_folder_path)
+        file_paths = []
+        for root, _, files in os.walk(local_folder_path):
+            for file_name in files:
+                local_file_path = os.path.join(root, file_name)
+                if local_file_path == self.manifest_file_path:
+                    continue
+                file_path_inside_folder = os.path.relpath(local_file_path, local_folder_path)
+                file_paths.append([local_file_path, os.path.join(cloud_folder_path, file_path_inside_folder)])
+
+        uploaded_cloud_paths = self.sync_files(file_paths, bundle_cloud_path)
+
+        deleted_cloud_paths = []
+        if delete_removed:
+            current_cloud_paths = {cloud_file_path for _, cloud_file_path in file_paths}
+            cloud_folder_prefix = os.path.join(cloud_folder_path, '')
+            deleted_cloud_paths = [
+                cloud_file_path for cloud_file_path, manifest_entry in self.manifest.items()
+                if cloud_file_path.startswith(cloud_folder_prefix) and cloud_file_path not in current_cloud_paths
+            ]
+            if len(deleted_cloud_paths) > 0:
+                self.cloud_saver.delete_files(deleted_cloud_paths)
+                for cloud_file_path in deleted_cloud_paths:
+                    del self.manifest[cloud_file_path]
+                self.save_manifest()
+
+        return uploaded_cloud_paths, deleted_cloud_paths
+
+    def check_file_changed(self, local_file_path, cloud_file_path):
+        """Check if the local file changed since it was last uploaded to the specified cloud path
+
+        Args:
+            local_file_path (str): path to the file on the local drive
+            cloud_file_path (str): destination path of the file in the cloud storage
+
+        Returns:
+            (bool, dict): flag if the file changed and the file's new manifest entry
+        """
+        file_stat = os.stat(local_file_path)
+        manifest_entry = {'local_path': local_file_path, 'size': file_stat.st_size, 'mtime': file_stat.st_mtime_ns,
+                          'hash': None}
+        previous_entry = self.manifest.get(cloud_file_path)
+
+        if previous_entry is not None and previous_entry['local_path'] == local_file_path and \
+                previous_entry['size'] == manifest_entry['size'] and previous_entry['mtime'] == manifest_entry['mtime']:
+            return False, previous_entry
+
+        if self.hash_content:
+            manifest_entry['hash'] = self.calculate_file_hash(local_file_path)
+
+            if previous_entry is not None and previous_entry['local_path'] == local_file_path and \
+                    previous_entry['hash'] is not None and previous_entry['hash'] == manifest_entry['hash']:
+                return False, manifest_entry
+
+        return True, manifest_entry
+
+    @staticmethod
+    def calculate_file_hash(file_path, chunk_size=1024 * 1024):
+        """Calculate the MD5 hash of the file content
+
+        Args:
+            file_path (str): path to the file
+            chunk_size (int): size in bytes of the chunks in which the file is read
+
+        Returns:
+            str: hex digest of the file content hash
+        """
+        file_hash = hashlib.md5()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def load_manifest(self):
+        if self.manifest_file_path is not None and os.path.isfile(self.manifest_file_path):
+            with open(self.manifest_file_path) as f:
+                return json.load(f)
+        return {}
+
+    def save_manifest(self):
+        if self.manifest_file_path is not None:
+            tmp_manifest_file_path = f'{self.manifest_file_path}.tmp'
+            with open(tmp_manifest_file_path, 'w') as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp_manifest_file_path, self.manifest_file_path)
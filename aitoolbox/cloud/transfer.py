@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+
+MB = 1024 ** 2
+
+
+class CloudTransferConfig:
+    def __init__(self, max_workers=8, multipart_threshold=64 * MB, multipart_chunksize=16 * MB, max_concurrency=10):
+        """Cloud storage transfer settings shared by all the S3 and Google Cloud Storage savers
+
+        Args:
+            max_workers (int): number of files which are transferred in parallel when uploading multiple files
+                or whole folders. Setting it to 1 results in the serial file-by-file transfer.
+            multipart_threshold (int): file size in bytes from which the file upload is split into multiple parts
+            multipart_chunksize (int): size in bytes of each uploaded part of the large file
+            max_concurrency (int): number of parts of the single large file which are uploaded in parallel
+        """
+        if max_workers < 1 or max_concurrency < 1:
+            raise ValueError(f'max_workers and max_concurrency should be at least 1. '
+                             f'Provided: max_workers={max_workers}, max_concurrency={max_concurrency}')
+
+        self.max_workers = max_workers
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        self.max_concurrency = max_concurrency
+
+    def get_s3_transfer_config(self):
+        """Convert the settings into the boto3 S3 transfer config
+
+        Returns:
+            boto3.s3.transfer.TransferConfig: boto3 S3 transfer config
+        """
+        return TransferConfig(multipart_threshold=self.multipart_threshold,
+                              multipart_chunksize=self.multipart_chunksize,
+                              max_concurrency=self.max_concurrency,
+                              use_threads=self.max_concurrency > 1)
+
+    def is_multipart_upload(self, local_file_path):
+        """Check if the file is large enough to be uploaded in multiple parts
+
+        Args:
+            local_file_path (str): path to the file on the local drive
+
+        Returns:
+            bool: if the file should be uploaded as a multipart upload
+        """
+        return os.path.getsize(local_file_path) >= self.multipart_threshold
+
+
+default_transfer_config = CloudTransferConfig()
+
+
+def get_transfer_config(transfer_config=None):
+    """Get the provided transfer config or fallback to the default process-wide one
+
+    Args:
+        transfer_config (CloudTransferConfig or None): transfer config
+
+    Returns:
+        CloudTransferConfig: transfer config
+    """
+    return transfer_config if transfer_config is not None else default_transfer_config
+
+
+def set_default_transfer_config(transfer_config):
+    """Replace the default process-wide transfer config used by the savers which didn't get their own config
+
+    Args:
+        transfer_config (CloudTransferConfig): new default transfer config
+
+    Returns:
+        None
+    """
+    global default_transfer_config
+    default_transfer_config = transfer_config
+
+
+def parallel_file_transfer(transfer_fn, file_paths, max_workers):
+    """Transfer multiple files in parallel
+
+    Args:
+        transfer_fn (callable): single file transfer function accepting the source and destination paths
+        file_paths (list): list of [source_path, destination_path] pairs
+        max_workers (int): number of files transferred in parallel
+
+    Returns:
+        None
+    """
+    if max_workers <= 1 or len(file_paths) <= 1:
+        for source_path, destination_path in file_paths:
+            transfer_fn(source_path, destination_path)
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+            futures = [executor.submit(transfer_fn, source_path, destination_path)
+                       for source_path, destination_path in file_paths]
+            # Re-raise potential transfer exceptions in the calling thread
+            for future in futures:
+                future.result()
@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import sqlite3
+import numbers
+from contextlib import closing
+
+EXPERIMENT_INDEX_FILE_NAME = 'experiment_index.sqlite'
+
+
+class ExperimentIndex:
+    def __init__(self, db_path=os.path.join('~/project/model_result', EXPERIMENT_INDEX_FILE_NAME), timeout=30.):
+        """Local SQLite index of the saved experiments for fast querying across many experiment runs
+
+        Every recorded experiment run is stored together with its hyperparameters, final metrics and saved artifact
+        paths. Instead of walking and unpickling all the experiment folders, the runs can then be compared with
+        the indexed queries, e.g. finding the run with the best validation metric in the whole hyperparameter sweep.
+
+        Numeric metrics are stored in the separate indexed table so that the filtering and ordering by metric value
+        is done inside the database. Nested results of the ``MultipleResultPackageWrapper`` are flattened into
+        the ``<package_name>/<metric_name>`` metric names.
+
+        Args:
+            db_path (str): path to the SQLite database file. Multiple processes can safely record into the same file.
+            timeout (float): number of seconds to wait for the database lock held by another process
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.timeout = timeout
+
+        db_dir_path = os.path.dirname(self.db_path)
+        if db_dir_path != '':
+            os.makedirs(db_dir_path, exist_ok=True)
+        self._create_tables()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA foreign_keys = ON')
+        return connection
+
+    def _create_tables(self):
+        with closing(self._connect()) as connection, connection:
+            # Write-ahead log lets the readers query the index while the training processes are recording into it
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.executescript('''
+                CREATE TABLE IF NOT EXISTS experiments (
+                    experiment_id INTEGER PRIMARY KEY,
+                    project_name TEXT NOT NULL,
+                    experiment_name TEXT NOT NULL,
+                    experiment_timestamp TEXT NOT NULL,
+                    recorded_at REAL NOT NULL,
+                    hyperparams TEXT,
+                    results TEXT,
+                    artifact_paths TEXT,
+                    UNIQUE (project_name, experiment_name, experiment_timestamp)
+                );
+                CREATE TABLE IF NOT EXISTS metrics (
+                    experiment_id INTEGER NOT NULL REFERENCES experiments (experiment_id) ON DELETE CASCADE,
+                    metric_name TEXT NOT NULL,
+                    metric_value REAL,
+                    PRIMARY KEY (experiment_id, metric_name)
+                );
+                CREATE INDEX IF NOT EXISTS metrics_name_value_idx ON metrics (metric_name, metric_value);
+            ''')
+
+    def record_experiment(self, project_name, experiment_name, experiment_timestamp,
+                          hyperparams=None, results=None, artifact_paths=None):
+        """Record the experiment run into the index
+
+        Recording the already indexed run (same project, experiment name and timestamp) replaces its entry.
+
+        Args:
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+            hyperparams (dict or None): used hyper-parameters
+            results (dict or None): final experiment results. Numeric values are indexed as the metrics.
+            artifact_paths (list or None): local or cloud paths of the saved experiment files
+
+        Returns:
+            int: index id of the recorded experiment
+        """
+        hyperparams = hyperparams if hyperparams is not None else {}
+        results = results if results is not None else {}
+        metrics = self.flatten_metrics(results)
+
+        experiment_key = (project_name, experiment_name, experiment_timestamp)
+        experiment_values = (time.time(), self.to_json(hyperparams), self.to_json(results),
+                             self.to_json(artifact_paths or []))
+
+        with closing(self._connect()) as connection, connection:
+            # Insert followed by the update of the already indexed run instead of the UPSERT, which isn't supported
+            # by the older SQLite versions bundled with the older Python versions
+            inserted_row_count = connection.execute(
+                'INSERT OR IGNORE INTO experiments (project_name, experiment_name, experiment_timestamp, recorded_at, '
+                'hyperparams, results, artifact_paths) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                experiment_key + experiment_values
+            ).rowcount
+            if inserted_row_count == 0:
+                connection.execute(
+                    'UPDATE experiments SET recorded_at = ?, hyperparams = ?, results = ?, artifact_paths = ? '
+                    'WHERE project_name = ? AND experiment_name = ? AND experiment_timestamp = ?',
+                    experiment_values + experiment_key
+                )
+            experiment_id = connection.execute(
+                'SELECT experiment_id FROM experiments '
+                'WHERE project_name = ? AND experiment_name = ? AND experiment_timestamp = ?',
+                experiment_key
+            ).fetchone()[0]
+
+            connection.execute('DELETE FROM metrics WHERE experiment_id = ?', (experiment_id,))
+            connection.executemany('INSERT INTO metrics (experiment_id, metric_name, metric_value) VALUES (?, ?, ?)',
+                                   [(experiment_id, name, value) for name, value in metrics.items()])
+        return experiment_id
+
+    def query(self, project_name=None, experiment_name=None, hyperparams=None, metric_filters=None,
+              order_by_metric=None, maximize=True, limit=None):
+        """Query the recorded experiment runs
+
+        Args:
+            project_name (str or None): only return the runs of this project
+            experiment_name (str or None): only return the runs of this experiment
+            hyperparams (dict or None): only return the runs where the hyper-parameters have the specified values
+            metric_filters (list or None): list of ``(metric_name, operator, value)`` conditions the metrics of
+                the returned runs have to satisfy. Supported operators are ``'<'``, ``'<='``, ``'>'``, ``'>='``,
+                ``'='`` and ``'!='``.
+            order_by_metric (str or None): order the runs by the value of this metric. Runs missing the metric are
+                not returned. If left to ``None`` the most recently recorded runs are returned first.
+            maximize (bool): when ordering by the metric, return the highest metric values first
+            limit (int or None): max number of the returned runs
+
+        Returns:
+            list: experiment runs as dicts with the decoded hyperparams, results, artifact_paths and the flat
+                metrics dict
+        """
+        where_conditions, where_params = [], []
+        if project_name is not None:
+            where_conditions.append('e.project_name = ?')
+            where_params.append(project_name)
+        if experiment_name is not None:
+            where_conditions.append('e.experiment_name = ?')
+            where_params.append(experiment_name)
+        for param_name, param_value in (hyperparams or {}).items():
+            where_conditions.append('json_extract(e.hyperparams, ?) = json_extract(?, \'$\')')
+            where_params += [f'$."{param_name}"', json.dumps(param_value)]
+        for metric_name, operator, value in (metric_filters or []):
+            if operator not in ('<', '<=', '>', '>=', '=', '!='):
+                raise ValueError(f'Metric filter operator {operator} not supported')
+            where_conditions.append(f'EXISTS (SELECT 1 FROM metrics m WHERE m.experiment_id = e.experiment_id '
+                                    f'AND m.metric_name = ? AND m.metric_value {operator} ?)')
+            where_params += [metric_name, value]
+
+        sql_query = 'SELECT e.* FROM experiments e'
+        sql_params = []
+        if order_by_metric is not None:
+            sql_query += ' JOIN metrics o ON o.experiment_id = e.experiment_id AND o.metric_name = ?'
+            sql_params.append(order_by_metric)
+        if len(where_conditions) > 0:
+            sql_query += ' WHERE ' + ' AND '.join(where_conditions)
+        sql_params += where_params
+
+        if order_by_metric is not None:
+            sql_query += f' ORDER BY o.metric_value {"DESC" if maximize else "ASC"}, e.recorded_at DESC'
+        else:
+            sql_query += ' ORDER BY e.recorded_at DESC, e.experiment_id DESC'
+        if limit is not None:
+            sql_query += ' LIMIT ?'
+            sql_params.append(limit)
+
+        with closing(self._connect()) as connection:
+            experiment_rows = connection.execute(sql_query, sql_params).fetchall()
+            return [self._build_experiment_record(connection, row) for row in experiment_rows]
+
+    def get_best_experiment(self, metric_name, maximize=True, project_name=None, experiment_name=None):
+        """Get the experiment run with the best metric value
+
+        Args:
+            metric_name (str): name of the compared metric
+            maximize (bool): if the higher metric value is better
+            project_name (str or None): only consider the runs of this project
+            experiment_name (str or None): only consider the runs of this experiment
+
+        Returns:
+            dict or None: best experiment run or ``None`` if no run has the metric recorded
+        """
+        best_experiments = self.query(project_name, experiment_name,
+                                      order_by_metric=metric_name, maximize=maximize, limit=1)
+        return best_experiments[0] if len(best_experiments) > 0 else None
+
+    def get_experiment(self, project_name, experiment_name, experiment_timestamp):
+        """Get the single recorded experiment run
+
+        Args:
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+
+        Returns:
+            dict or None: experiment run or ``None`` if the run isn't indexed
+        """
+        with closing(self._connect()) as connection:
+            experiment_row = connection.execute(
+                'SELECT * FROM experiments WHERE project_name = ? AND experiment_name = ? AND experiment_timestamp = ?',
+                (project_name, experiment_name, experiment_timestamp)
+            ).fetchone()
+            return self._build_experiment_record(connection, experiment_row) if experiment_row is not None else None
+
+    def delete_experiment(self, project_name, experiment_name, experiment_timestamp):
+        """Remove the experiment run from the index
+
+        The experiment files themselves are not deleted.
+
+        Args:
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+
+        Returns:
+            bool: if the run was found in the index and removed
+        """
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(
+                'DELETE FROM experiments WHERE project_name = ? AND experiment_name = ? AND experiment_timestamp = ?',
+                (project_name, experiment_name, experiment_timestamp)
+            ).rowcount > 0
+
+    @staticmethod
+    def _build_experiment_record(connection, experiment_row):
+        experiment_record = dict(experiment_row)
+        for json_column in ['hyperparams', 'results', 'artifact_paths']:
+            experiment_record[json_column] = json.loads(experiment_record[json_column])
+
+        experiment_record['metrics'] = {
+            row['metric_name']: row['metric_value']
+            for row in connection.execute('SELECT metric_name, metric_value FROM metrics WHERE experiment_id = ?',
+                                          (experiment_record['experiment_id'],))
+        }
+        return experiment_record
+
+    @staticmethod
+    def flatten_metrics(results, name_prefix=''):
+        """Extract the numeric metrics from the possibly nested results dict
+
+        Args:
+            results (dict): experiment results
+            name_prefix (str): prefix prepended to the metric names
+
+        Returns:
+            dict: flat metric name to float value mapping
+        """
+        metrics = {}
+        for metric_name, metric_value in results.items():
+            if isinstance(metric_value, dict):
+                metrics.update(ExperimentIndex.flatten_metrics(metric_value, f'{name_prefix}{metric_name}/'))
+            elif isinstance(metric_value, numbers.Number) and not isinstance(metric_value, (bool, complex)):
+                metrics[f'{name_prefix}{metric_name}'] = float(metric_value)
+            elif hasattr(metric_value, 'item') and getattr(metric_value, 'ndim', None) == 0:
+                # Zero-dimensional numpy arrays and torch tensors
+                metrics[f'{name_prefix}{metric_name}'] = float(metric_value.item())
+        return metrics
+
+    @staticmethod
+    def to_json(value):
+        # Values which aren't JSON serializable, e.g. numpy arrays or functions, are stored as their string form
+        return json.dumps(value, default=lambda el: el.tolist() if hasattr(el, 'tolist') else str(el))
@@ -32,7 +32,7 @@ class AbstractExperimentSaver(ABC):
 
 
 class BaseFullExperimentSaver(AbstractExperimentSaver):
-    def __init__(self, model_saver, results_saver, project_name, experiment_name):
+    def __init__(self, model_saver, results_saver, project_name, experiment_name, experiment_index=None):
         """Base full experiment saver functionality used by the underlying experiment saver derivations
 
         Args:
@@ -40,12 +40,15 @@ class BaseFullExperimentSaver(AbstractExperimentSaver):
             results_saver (aitoolbox.cloud.AWS.results_save.AbstractResultsSaver): selected saver used for results save
             project_name (str): root name of the project
             experiment_name (str): name of the particular experiment
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
         """
         self.model_saver = model_saver
         self.results_saver = results_saver
 
         self.project_name = project_name
         self.experiment_name = experiment_name
+        self.experiment_index = experiment_index
 
     def save_experiment(self, model, result_package, training_history, experiment_timestamp=None,
                         save_true_pred_labels=False, separate_files=False,
@@ -84,13 +87,21 @@ class BaseFullExperimentSaver(AbstractExperimentSaver):
                                                                            save_true_pred_labels=save_true_pred_labels,
                                                                            separate_files=separate_files,
                                                                            protect_existing_folder=protect_existing_folder)
+
+        if self.experiment_index is not None:
+            self.experiment_index.record_experiment(self.project_name, self.experiment_name, experiment_timestamp,
+                                                    hyperparams=result_package.get_hyperparameters(),
+                                                    results=result_package.get_results(),
+                                                    artifact_paths=[cloud_model_path, cloud_results_path])
+
         return cloud_model_path, cloud_results_path
 
 
 class BaseFullExperimentS3Saver(BaseFullExperimentSaver):
     def __init__(self, model_saver, project_name, experiment_name,
                  bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', experiment_index=None,
+                 bundle_artifacts=False):
         """Base experiment saver implementing the S3 saving functionality
 
         This is used by the underlying experiment S3 saver derivations
@@ -103,17 +114,24 @@ class BaseFullExperimentS3Saver(BaseFullExperimentSaver):
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
             local_model_result_folder_path (str): root local path where project folder will be created
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
+            bundle_artifacts (bool or dict): pack the small results files into a single zip bundle uploaded with
+                one request. Provide a dict to specify the ``ArtifactBundler`` parameters.
         """
         results_saver = S3ResultsSaver(bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                       local_model_result_folder_path=local_model_result_folder_path)
+                                       local_model_result_folder_path=local_model_result_folder_path,
+                                       bundle_artifacts=bundle_artifacts)
 
-        BaseFullExperimentSaver.__init__(self, model_saver, results_saver, project_name, experiment_name)
+        BaseFullExperimentSaver.__init__(self, model_saver, results_saver, project_name, experiment_name,
+                                         experiment_index=experiment_index)
 
 
 class FullPyTorchExperimentS3Saver(BaseFullExperimentS3Saver):
     def __init__(self, project_name, experiment_name,
                  bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', sectioned_checkpoint=False,
+                 experiment_index=None, local_model_copy=True, bundle_artifacts=False):
         """S3 saver for PyTorch experiments
 
         Args:
@@ -122,19 +140,30 @@ class FullPyTorchExperimentS3Saver(BaseFullExperimentS3Saver):
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
             local_model_result_folder_path (str): root local path where project folder will be created
+            sectioned_checkpoint (bool or dict): if the model should be saved in the sectioned checkpoint format.
+                Provide a dict to specify the ``save_sectioned_checkpoint()`` parameters.
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
+            local_model_copy (bool): if set to ``False`` the model is uploaded directly into the cloud storage
+                without first being saved to the local drive
+            bundle_artifacts (bool or dict): pack the small results files into a single zip bundle uploaded with
+                one request. Provide a dict to specify the ``ArtifactBundler`` parameters.
         """
         pytorch_model_saver = PyTorchS3ModelSaver(bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                                  local_model_result_folder_path=local_model_result_folder_path)
+                                                  local_model_result_folder_path=local_model_result_folder_path,
+                                                  sectioned_checkpoint=sectioned_checkpoint,
+                                                  local_model_copy=local_model_copy)
 
         BaseFullExperimentS3Saver.__init__(self, pytorch_model_saver, project_name, experiment_name,
                                            bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                           local_model_result_folder_path=local_model_result_folder_path)
+                                           local_model_result_folder_path=local_model_result_folder_path,
+                                           experiment_index=experiment_index, bundle_artifacts=bundle_artifacts)
 
 
 class FullKerasExperimentS3Saver(BaseFullExperimentS3Saver):
     def __init__(self, project_name, experiment_name,
                  bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', experiment_index=None):
         """S3 saver for Keras experiments
 
         Args:
@@ -143,13 +172,16 @@ class FullKerasExperimentS3Saver(BaseFullExperimentS3Saver):
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
             local_model_result_folder_path (str): root local path where project folder will be created
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
         """
         keras_model_saver = KerasS3ModelSaver(bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
                                               local_model_result_folder_path=local_model_result_folder_path)
 
         BaseFullExperimentS3Saver.__init__(self, keras_model_saver, project_name, experiment_name,
                                            bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                           local_model_result_folder_path=local_model_result_folder_path)
+                                           local_model_result_folder_path=local_model_result_folder_path,
+                                           experiment_index=experiment_index)
 
         
 # class FullTensorFlowExperimentS3Saver(BaseFullExperimentS3Saver):
@@ -178,7 +210,8 @@ class FullKerasExperimentS3Saver(BaseFullExperimentS3Saver):
 class BaseFullExperimentGoogleStorageSaver(BaseFullExperimentSaver):
     def __init__(self, model_saver, project_name, experiment_name,
                  bucket_name='model-result', cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', experiment_index=None,
+                 bundle_artifacts=False):
         """Base experiment saver implementing the Google Storage saving functionality
 
         This is used by the underlying experiment Google Storage saver derivations
@@ -191,17 +224,24 @@ class BaseFullExperimentGoogleStorageSaver(BaseFullExperimentSaver):
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
             local_model_result_folder_path (str): root local path where project folder will be created
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
+            bundle_artifacts (bool or dict): pack the small results files into a single zip bundle uploaded with
+                one request. Provide a dict to specify the ``ArtifactBundler`` parameters.
         """
         results_saver = GoogleStorageResultsSaver(bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                                  local_model_result_folder_path=local_model_result_folder_path)
+                                                  local_model_result_folder_path=local_model_result_folder_path,
+                                                  bundle_artifacts=bundle_artifacts)
 
-        BaseFullExperimentSaver.__init__(self, model_saver, results_saver, project_name, experiment_name)
+        BaseFullExperimentSaver.__init__(self, model_saver, results_saver, project_name, experiment_name,
+                                         experiment_index=experiment_index)
 
 
 class FullPyTorchExperimentGoogleStorageSaver(BaseFullExperimentGoogleStorageSaver):
     def __init__(self, project_name, experiment_name,
                  bucket_name='model-result',  cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', sectioned_checkpoint=False,
+                 experiment_index=None, local_model_copy=True, bundle_artifacts=False):
         """Google Storage saver for PyTorch experiments
 
         Args:
@@ -210,19 +250,31 @@ class FullPyTorchExperimentGoogleStorageSaver(BaseFullExperimentGoogleStorageSav
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
             local_model_result_folder_path (str): root local path where project folder will be created
+            sectioned_checkpoint (bool or dict): if the model should be saved in the sectioned checkpoint format.
+                Provide a dict to specify the ``save_sectioned_checkpoint()`` parameters.
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
+            local_model_copy (bool): if set to ``False`` the model is uploaded directly into the cloud storage
+                without first being saved to the local drive
+            bundle_artifacts (bool or dict): pack the small results files into a single zip bundle uploaded with
+                one request. Provide a dict to specify the ``ArtifactBundler`` parameters.
         """
         pytorch_model_saver = PyTorchGoogleStorageModelSaver(bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                                             local_model_result_folder_path=local_model_result_folder_path)
+                                                             local_model_result_folder_path=local_model_result_folder_path,
+                                                             sectioned_checkpoint=sectioned_checkpoint,
+                                                             local_model_copy=local_model_copy)
 
         BaseFullExperimentGoogleStorageSaver.__init__(self, pytorch_model_saver, project_name, experiment_name,
                                                       bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                                      local_model_result_folder_path=local_model_result_folder_path)
+                                                      local_model_result_folder_path=local_model_result_folder_path,
+                                                      experiment_index=experiment_index,
+                                                      bundle_artifacts=bundle_artifacts)
 
 
 class FullKerasExperimentGoogleStorageSaver(BaseFullExperimentGoogleStorageSaver):
     def __init__(self, project_name, experiment_name,
                  bucket_name='model-result',  cloud_dir_prefix='',
-                 local_model_result_folder_path='~/project/model_result'):
+                 local_model_result_folder_path='~/project/model_result', experiment_index=None):
         """Google Storage saver for Keras experiments
 
         Args:
@@ -231,13 +283,16 @@ class FullKerasExperimentGoogleStorageSaver(BaseFullExperimentGoogleStorageSaver
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
             local_model_result_folder_path (str): root local path where project folder will be created
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
         """
         keras_model_saver = KerasGoogleStorageModelSaver(bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
                                                          local_model_result_folder_path=local_model_result_folder_path)
 
         BaseFullExperimentGoogleStorageSaver.__init__(self, keras_model_saver, project_name, experiment_name,
                                                       bucket_name=bucket_name, cloud_dir_prefix=cloud_dir_prefix,
-                                                      local_model_result_folder_path=local_model_result_folder_path)
+                                                      local_model_result_folder_path=local_model_result_folder_path,
+                                                      experiment_index=experiment_index)
 
 
 # class FullTensorFlowExperimentGoogleStorageSaver(BaseFullExperimentGoogleStorageSaver):
@@ -7,7 +7,8 @@ from aitoolbox.experiment.local_save.local_results_save import LocalResultsSaver
 
 
 class BaseFullExperimentLocalSaver(AbstractExperimentSaver):
-    def __init__(self, model_saver, project_name, experiment_name, local_model_result_folder_path='~/project/model_result'):
+    def __init__(self, model_saver, project_name, experiment_name, local_model_result_folder_path='~/project/model_result',
+                 experiment_index=None):
         """Base functionality class common to all the full experiment local saver derivations
 
         Args:
@@ -16,6 +17,8 @@ class BaseFullExperimentLocalSaver(AbstractExperimentSaver):
             project_name (str): root name of the project
             experiment_name (str): name of the particular experiment
             local_model_result_folder_path (str): root local path where project folder will be created
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
         """
         if not isinstance(model_saver, AbstractLocalModelSaver):
             raise TypeError(f'model_saver must be inherited from AbstractLocalModelSaver. '
@@ -26,6 +29,7 @@ class BaseFullExperimentLocalSaver(AbstractExperimentSaver):
 
         self.model_saver = model_saver
         self.results_saver = LocalResultsSaver(local_model_result_folder_path)
+        self.experiment_index = experiment_index
 
     def save_experiment(self, model, result_package, training_history, experiment_timestamp=None,
                         save_true_pred_labels=False, separate_files=False,
@@ -80,32 +84,49 @@ class BaseFullExperimentLocalSaver(AbstractExperimentSaver):
 
         saved_paths += [path for _, path in saved_local_results_details]
 
+        if self.experiment_index is not None:
+            self.experiment_index.record_experiment(self.project_name, self.experiment_name, experiment_timestamp,
+                                                    hyperparams=result_package.get_hyperparameters(),
+                                                    results=result_package.get_results(),
+                                                    artifact_paths=saved_paths)
+
         return saved_paths
 
 
 class FullPyTorchExperimentLocalSaver(BaseFullExperimentLocalSaver):
-    def __init__(self, project_name, experiment_name, local_model_result_folder_path='~/project/model_result'):
+    def __init__(self, project_name, experiment_name, local_model_result_folder_path='~/project/model_result',
+                 sectioned_checkpoint=False, experiment_index=None):
         """PyTorch local experiment saver
 
         Args:
             project_name (str): root name of the project
             experiment_name (str): name of the particular experiment
             local_model_result_folder_path (str): root local path where project folder will be created
+            sectioned_checkpoint (bool or dict): if the model should be saved in the sectioned checkpoint format.
+                Provide a dict to specify the ``save_sectioned_checkpoint()`` parameters.
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
         """
-        BaseFullExperimentLocalSaver.__init__(self, PyTorchLocalModelSaver(local_model_result_folder_path),
+        model_saver = PyTorchLocalModelSaver(local_model_result_folder_path, sectioned_checkpoint=sectioned_checkpoint)
+        BaseFullExperimentLocalSaver.__init__(self, model_saver,
                                               project_name, experiment_name,
-                                              local_model_result_folder_path=local_model_result_folder_path)
+                                              local_model_result_folder_path=local_model_result_folder_path,
+                                              experiment_index=experiment_index)
 
 
 class FullKerasExperimentLocalSaver(BaseFullExperimentLocalSaver):
-    def __init__(self, project_name, experiment_name, local_model_result_folder_path='~/project/model_result'):
+    def __init__(self, project_name, experiment_name, local_model_result_folder_path='~/project/model_result',
+                 experiment_index=None):
         """Keras local experiment saver
 
         Args:
             project_name (str): root name of the project
             experiment_name (str): name of the particular experiment
             local_model_result_folder_path (str): root local path where project folder will be created
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the saved experiment is also recorded into this experiment index
         """
         BaseFullExperimentLocalSaver.__init__(self, KerasLocalModelSaver(local_model_result_folder_path),
                                               project_name, experiment_name,
-                                              local_model_result_folder_path=local_model_result_folder_path)
+                                              local_model_result_folder_path=local_model_result_folder_path,
+                                              experiment_index=experiment_index)
@@ -1,11 +1,19 @@
 from abc import ABC, abstractmethod
 import os
+import json
+import inspect
 from collections import OrderedDict
 import torch
 
 from aitoolbox.experiment.local_save.folder_create import ExperimentFolder
+from aitoolbox.experiment.local_save.local_model_save import LATEST_CHECKPOINT_MARKER_FILE_NAME
+from aitoolbox.experiment.local_save.sectioned_checkpoint import SectionedCheckpointReader, LazyCheckpoint, \
+    is_sectioned_checkpoint
 from aitoolbox.torchtrain.schedulers.basic import AbstractScheduler
 
+# torch.load() memory-mapping of the zipfile checkpoints is available from PyTorch 2.1 on
+TORCH_LOAD_MMAP_AVAILABLE = 'mmap' in inspect.signature(torch.load).parameters
+
 
 class AbstractLocalModelLoader(ABC):
     @abstractmethod
@@ -27,17 +35,25 @@ class AbstractLocalModelLoader(ABC):
 
 
 class PyTorchLocalModelLoader(AbstractLocalModelLoader):
-    def __init__(self, local_model_result_folder_path):
+    def __init__(self, local_model_result_folder_path, mmap=False):
         """PyTorch saved model loader and initializer
 
+        Checkpoints saved in the sectioned checkpoint format are loaded lazily: the returned model representation
+        deserializes each section (e.g. ``model_state_dict`` or ``optimizer_state_dict``) only when it is first
+        accessed. Consequently, the inference-only model initialization never reads the optimizer state.
+
         Args:
             local_model_result_folder_path (str): root local path where project folder will be created
+            mmap (bool): if ``True`` the checkpoint tensors are memory-mapped from the file instead of being read
+                into memory in full. For the standard ``torch.save()`` checkpoints this requires PyTorch 2.1 or newer
+                and the zipfile serialization format, otherwise the checkpoint is loaded normally.
         """
         self.local_model_result_folder_path = os.path.expanduser(local_model_result_folder_path)
+        self.mmap = mmap
         self.model_representation = None
 
     def load_model(self, project_name, experiment_name, experiment_timestamp, model_save_dir='checkpoint_model',
-                   epoch_num=None, map_location=None):
+                   epoch_num=None, map_location=None, iteration_idx=None):
         """Model loading interface compatible with the experiment folder structure maintained by the AIToolbox TrainLoop
 
         Args:
@@ -46,7 +62,10 @@ class PyTorchLocalModelLoader(AbstractLocalModelLoader):
             experiment_timestamp (str): time stamp at the start of training
             model_save_dir (str): name of the folder inside experiment folder where the model is saved
             epoch_num (int or None): epoch number of the model checkpoint or none if loading final model
-            map_location (str or None):
+            map_location (str or None): a function, :class:`torch.device`, string or a dict specifying how to remap
+                storage locations
+            iteration_idx (int or None): training iteration index of the model checkpoint saved in the middle of
+                the epoch, e.g. by the ``ModelIterationCheckpoint``
 
         Returns:
             model
@@ -54,14 +73,15 @@ class PyTorchLocalModelLoader(AbstractLocalModelLoader):
         _, experiment_dir_path = ExperimentFolder.get_base_folder_paths(project_name, experiment_name,
                                                                         experiment_timestamp,
                                                                         self.local_model_result_folder_path)
+        iteration_suffix = f'_ITER{iteration_idx}' if iteration_idx is not None else ''
         if epoch_num is None:
             model_name = f'model_{experiment_name}_{experiment_timestamp}.pth'
         else:
-            model_name = f'model_{experiment_name}_{experiment_timestamp}_E{epoch_num}.pth'
+            model_name = f'model_{experiment_name}_{experiment_timestamp}_E{epoch_num}{iteration_suffix}.pth'
 
         model_path = os.path.join(experiment_dir_path, model_save_dir, model_name)
 
-        self.model_representation = torch.load(model_path, map_location=map_location)
+        self.model_representation = self.load_checkpoint(model_path, map_location)
 
         # Fix for back-compatibility
         if 'schedulers_state_dict' not in self.model_representation:
@@ -69,6 +89,42 @@ class PyTorchLocalModelLoader(AbstractLocalModelLoader):
 
         return self.model_representation
 
+    def load_latest_checkpoint(self, project_name, experiment_name, experiment_timestamp, map_location=None):
+        """Load the latest completely saved model checkpoint of the experiment
+
+        The latest checkpoint is found via the ``latest_checkpoint.json`` marker which ``ModelCheckpoint`` updates
+        only after the checkpoint has been fully written. This makes it safe to resume the training even if it
+        was interrupted in the middle of the checkpoint saving.
+
+        Args:
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+            map_location (str or None): a function, :class:`torch.device`, string or a dict specifying how to remap
+                storage locations
+
+        Returns:
+            model
+        """
+        _, experiment_dir_path = ExperimentFolder.get_base_folder_paths(project_name, experiment_name,
+                                                                        experiment_timestamp,
+                                                                        self.local_model_result_folder_path)
+        marker_file_path = os.path.join(experiment_dir_path, LATEST_CHECKPOINT_MARKER_FILE_NAME)
+        if not os.path.isfile(marker_file_path):
+            raise FileNotFoundError(f'No completed checkpoint marker found at: {marker_file_path}')
+
+        with open(marker_file_path) as f:
+            latest_checkpoint = json.load(f)
+
+        model_path = os.path.join(experiment_dir_path, latest_checkpoint['model_save_dir'],
+                                  latest_checkpoint['model_name'])
+        self.model_representation = self.load_checkpoint(model_path, map_location)
+
+        if 'schedulers_state_dict' not in self.model_representation:
+            self.model_representation['schedulers_state_dict'] = []
+
+        return self.model_representation
+
     def load_model_from_path(self, model_path, map_location=None):
         """General model loading when the AIToolbox TrainLoop experiment folder structure is not used
 
@@ -80,13 +136,50 @@ class PyTorchLocalModelLoader(AbstractLocalModelLoader):
         Returns:
             model
         """
-        self.model_representation = torch.load(model_path, map_location=map_location)
+        self.model_representation = self.load_checkpoint(model_path, map_location)
         return self.model_representation
 
+    def load_checkpoint(self, model_path, map_location=None):
+        """Load the checkpoint saved either in the sectioned checkpoint or the standard torch.save() format
+
+        Args:
+            model_path (str): full path to the model
+            map_location (str or None): a function, :class:`torch.device`, string or a dict specifying how to remap
+                storage locations
+
+        Returns:
+            dict or LazyCheckpoint: model representation
+        """
+        if is_sectioned_checkpoint(model_path):
+            return LazyCheckpoint(SectionedCheckpointReader(model_path, map_location, mmap_tensors=self.mmap))
+
+        if self.mmap and TORCH_LOAD_MMAP_AVAILABLE:
+            try:
+                return torch.load(model_path, map_location=map_location, mmap=True)
+            except RuntimeError:
+                # Checkpoints saved in the legacy (non-zipfile) serialization format can't be memory-mapped
+                pass
+        return torch.load(model_path, map_location=map_location)
+
     def check_if_model_loaded(self):
         if self.model_representation is None:
             raise ValueError('Model has not yet been loaded. Please call load_model() first.')
 
+    def check_if_training_resumable(self):
+        """Prevent the training resumption from the model saved with the reduced precision weights
+
+        Raises:
+            ValueError
+
+        Returns:
+            None
+        """
+        reduced_precision_sections = getattr(self.model_representation, 'reduced_precision_sections', [])
+        if 'model_state_dict' in reduced_precision_sections:
+            raise ValueError('The model weights were saved in the reduced precision (weights_dtype option) which is only '
+                             'meant for the final model inference. Training can not be resumed from this model. Use '
+                             'the full precision training checkpoint instead.')
+
     def init_model(self, model, used_data_parallel=False):
         """Initialize provided PyTorch model with the loaded model weights
 
@@ -123,6 +216,7 @@ class PyTorchLocalModelLoader(AbstractLocalModelLoader):
             PyTorch optimizer
         """
         self.check_if_model_loaded()
+        self.check_if_training_resumable()
 
         optimizer.load_state_dict(self.model_representation['optimizer_state_dict'])
 
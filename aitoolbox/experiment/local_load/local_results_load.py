@@ -0,0 +1,65 @@
+import os
+import json
+import numpy as np
+
+
+class TruePredLabelsLoader:
+    def __init__(self, mmap_mode='r', allow_pickle=False):
+        """Loader of the ground truth and predicted labels arrays saved next to the experiment results
+
+        Loads the labels saved by the results savers with the ``labels_array_format`` set to ``'npz'`` or ``'npy'``.
+        The arrays stored in the separate ``.npy`` files are memory-mapped so only the actually accessed parts of
+        the labels are read from the disk. Arrays from the compressed ``.npz`` file are decompressed into memory
+        only when they are loaded.
+
+        Args:
+            mmap_mode (str or None): memory-map mode of the ``.npy`` array files as used by the ``numpy.load()``.
+                If set to ``None`` the arrays are fully read into memory.
+            allow_pickle (bool): allow loading of the object arrays which store the ragged nested labels.
+                Loading object arrays executes pickle and should thus be enabled only for the trusted files.
+        """
+        self.mmap_mode = mmap_mode
+        self.allow_pickle = allow_pickle
+
+    def load(self, metadata_file_path, label_names=('y_true', 'y_predicted')):
+        """Load the labels arrays described in the JSON metadata file
+
+        Args:
+            metadata_file_path (str): path to the labels JSON metadata file
+            label_names (list or tuple): names of the loaded labels
+
+        Returns:
+            dict: label name to the labels array. For the labels of the ``MultipleResultPackageWrapper`` the value
+                is the dict with the result package names as the keys and the labels arrays as the values.
+        """
+        metadata_file_path = os.path.expanduser(metadata_file_path)
+        results_dir_path = os.path.dirname(metadata_file_path)
+        with open(metadata_file_path) as f:
+            labels_metadata = json.load(f)
+
+        labels = {}
+        opened_npz_files = {}
+        try:
+            for array_metadata in labels_metadata['arrays']:
+                if array_metadata['label_name'] not in label_names:
+                    continue
+
+                array_file_path = os.path.join(results_dir_path, array_metadata['file_name'])
+                if array_metadata['array_key'] is not None:
+                    if array_file_path not in opened_npz_files:
+                        opened_npz_files[array_file_path] = np.load(array_file_path, allow_pickle=self.allow_pickle)
+                    array = opened_npz_files[array_file_path][array_metadata['array_key']]
+                else:
+                    # Object arrays can't be memory-mapped
+                    mmap_mode = self.mmap_mode if array_metadata['dtype'] != 'object' else None
+                    array = np.load(array_file_path, mmap_mode=mmap_mode, allow_pickle=self.allow_pickle)
+
+                if array_metadata['package_name'] is not None:
+                    labels.setdefault(array_metadata['label_name'], {})[array_metadata['package_name']] = array
+                else:
+                    labels[array_metadata['label_name']] = array
+        finally:
+            for npz_file in opened_npz_files.values():
+                npz_file.close()
+
+        return labels
@@ -0,0 +1,239 @@
+import copy
+import time
+import queue
+import threading
+import torch
+
+
+class AsyncCheckpointWriter:
+    def __init__(self, max_pending_saves=1):
+        """Snapshot-then-write checkpoint saving in the background thread
+
+        The caller takes the fast in-memory snapshot of the training state (see ``snapshot_state()``) and hands off
+        the slow serialization and writing of the snapshot to the background worker. The training can continue
+        while the checkpoint is being written.
+
+        A single worker thread executes the saves strictly in the order in which they were submitted. Consequently,
+        any bookkeeping done after the save inside the submitted function (e.g. suboptimal checkpoint removal or
+        the latest checkpoint marker update) only ever sees the fully written checkpoints.
+
+        Args:
+            max_pending_saves (int): max number of submitted saves waiting for the worker. When reached, the submit
+                blocks until the worker catches up. This bounds the memory taken by the pending snapshots.
+        """
+        if max_pending_saves < 1:
+            raise ValueError(f'max_pending_saves should be at least 1. Provided: {max_pending_saves}')
+
+        self.save_queue = queue.Queue(maxsize=max_pending_saves)
+        self.finished_saves = []
+        self.save_error = None
+        self.status_lock = threading.Lock()
+
+        self.worker = threading.Thread(target=self._save_worker, daemon=True)
+        self.worker.start()
+
+    def submit(self, save_fn, description=''):
+        """Submit the save to be executed in the background
+
+        Args:
+            save_fn (callable): function without arguments which serializes and writes the already snapshotted state
+            description (str): description of the save reported in the save status
+
+        Raises:
+            RuntimeError: if any of the previously submitted saves failed
+
+        Returns:
+            None
+        """
+        if not self.is_alive():
+            raise RuntimeError('AsyncCheckpointWriter has already been shut down')
+        self.raise_if_failed()
+
+        self.save_queue.put((save_fn, description))
+
+    def _save_worker(self):
+        while True:
+            save_task = self.save_queue.get()
+            if save_task is None:
+                self.save_queue.task_done()
+                break
+
+            save_fn, description = save_task
+            save_status = {'description': description, 'success': False, 'result': None, 'error': None}
+            start_time = time.time()
+            try:
+                save_status['result'] = save_fn()
+                save_status['success'] = True
+            except Exception as e:
+                save_status['error'] = repr(e)
+                with self.status_lock:
+                    if self.save_error is None:
+                        self.save_error = e
+            save_status['duration'] = time.time() - start_time
+
+            with self.status_lock:
+                self.finished_saves.append(save_status)
+            self.save_queue.task_done()
+
+    def raise_if_failed(self):
+        """Re-raise the error of the failed background save in the calling thread
+
+        Raises:
+            RuntimeError: if any of the submitted saves failed
+
+        Returns:
+            None
+        """
+        with self.status_lock:
+            save_error, self.save_error = self.save_error, None
+        if save_error is not None:
+            raise RuntimeError(f'Background checkpoint save failed: {save_error!r}') from save_error
+
+    def wait_until_done(self):
+        """Block until all the submitted saves have been executed
+
+        Raises:
+            RuntimeError: if any of the submitted saves failed
+
+        Returns:
+            None
+        """
+        self.save_queue.join()
+        self.raise_if_failed()
+
+    def pop_finished_saves(self):
+        """Get the statuses of all the saves finished since the last call
+
+        Returns:
+            list: list of save status dicts
+        """
+        with self.status_lock:
+            finished_saves = self.finished_saves
+            self.finished_saves = []
+        return finished_saves
+
+    def shutdown(self):
+        """Wait for all the pending saves to finish and stop the worker thread
+
+        Raises:
+            RuntimeError: if any of the submitted saves failed
+
+        Returns:
+            None
+        """
+        if self.is_alive():
+            self.save_queue.put(None)
+            self.worker.join()
+        self.raise_if_failed()
+
+    def is_alive(self):
+        return self.worker.is_alive()
+
+
+class PinnedBufferPool:
+    def __init__(self):
+        """Pool of the pinned CPU memory buffers reused by the consecutive training state snapshots
+
+        Allocating the pinned memory is slow, so instead of allocating new buffers for every snapshot, the buffers
+        of the already saved snapshots are released back into the pool and reused by the next snapshot of the
+        tensors with the same shape and dtype. The pool only ever holds as many buffers as were needed by
+        the snapshots existing at the same time.
+        """
+        self.free_buffers = {}
+        self.used_buffers = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, shape, dtype):
+        """Get the free pinned buffer for the tensor of the given shape and dtype
+
+        Args:
+            shape (torch.Size): tensor shape
+            dtype (torch.dtype): tensor dtype
+
+        Returns:
+            torch.Tensor: pinned CPU memory buffer
+        """
+        with self.lock:
+            free_buffers = self.free_buffers.get((tuple(shape), dtype))
+            buffer = free_buffers.pop() if free_buffers else None
+        if buffer is None:
+            buffer = torch.empty(shape, dtype=dtype, pin_memory=True)
+        with self.lock:
+            self.used_buffers[id(buffer)] = buffer
+        return buffer
+
+    def release(self, state_snapshot):
+        """Return the pinned buffers of the no longer needed snapshot back into the pool
+
+        Args:
+            state_snapshot: snapshot returned by ``snapshot_state()`` which has already been saved
+
+        Returns:
+            None
+        """
+        with self.lock:
+            for tensor in _iter_tensors(state_snapshot):
+                buffer = self.used_buffers.pop(id(tensor), None)
+                if buffer is not None:
+                    self.free_buffers.setdefault((tuple(buffer.shape), buffer.dtype), []).append(buffer)
+
+
+def snapshot_state(state, buffer_pool=None):
+    """Take the in-memory snapshot of the nested training state which can be safely saved in the background
+
+    Tensors are copied to the CPU memory. The CUDA tensors are copied asynchronously into the pinned memory and
+    every source device is synchronized once at the end, so that the snapshot costs about the time of a single
+    device-to-host memory copy. The rest of the state is deep copied so that the training can't modify
+    the snapshot while it is being saved.
+
+    Args:
+        state: nested structure of dicts, lists and tuples containing tensors, e.g. the model checkpoint dict
+        buffer_pool (PinnedBufferPool or None): pool from which the pinned buffers for the CUDA tensors are taken.
+            Once the snapshot is saved, release it with ``buffer_pool.release(snapshot)`` so that the next
+            snapshot reuses its buffers. When not provided, new pinned buffers are allocated.
+
+    Returns:
+        snapshot of the state
+    """
+    cuda_devices = set()
+    state_snapshot = _snapshot_state(state, cuda_devices, buffer_pool, {})
+    # Copies are queued on the current stream of each source device
+    for device in cuda_devices:
+        torch.cuda.synchronize(device)
+    return state_snapshot
+
+
+def _snapshot_state(state, cuda_devices, buffer_pool, memo):
+    if isinstance(state, torch.Tensor):
+        tensor = state.detach()
+        if tensor.is_cuda:
+            cuda_devices.add(tensor.device)
+            if buffer_pool is not None:
+                tensor_snapshot = buffer_pool.acquire(tensor.shape, tensor.dtype)
+            else:
+                tensor_snapshot = torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+            tensor_snapshot.copy_(tensor, non_blocking=True)
+            return tensor_snapshot
+        return tensor.to('cpu', copy=True)
+    if isinstance(state, dict):
+        state_snapshot = copy.copy(state)
+        for k, v in state.items():
+            state_snapshot[k] = _snapshot_state(v, cuda_devices, buffer_pool, memo)
+        return state_snapshot
+    if isinstance(state, list):
+        return [_snapshot_state(el, cuda_devices, buffer_pool, memo) for el in state]
+    if isinstance(state, tuple):
+        elements = [_snapshot_state(el, cuda_devices, buffer_pool, memo) for el in state]
+        return type(state)(*elements) if hasattr(state, '_fields') else type(state)(elements)
+    return copy.deepcopy(state, memo)
+
+
+def _iter_tensors(state):
+    if isinstance(state, torch.Tensor):
+        yield state
+    elif isinstance(state, dict):
+        for v in state.values():
+            yield from _iter_tensors(v)
+    elif isinstance(state, (list, tuple)):
+        for el in state:
+            yield from _iter_tensors(el)
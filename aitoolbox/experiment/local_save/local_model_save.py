@@ -2,9 +2,12 @@ from abc import ABC, abstractmethod
 import os
 import time
 import datetime
+import json
 
 from aitoolbox.experiment.local_save.folder_create import ExperimentFolder
-from aitoolbox.utils.file_system import zip_folder
+from aitoolbox.utils.file_system import zip_folder, atomic_write_path
+
+LATEST_CHECKPOINT_MARKER_FILE_NAME = 'latest_checkpoint.json'
 
 
 class AbstractLocalModelSaver(ABC):
@@ -66,14 +69,25 @@ class BaseLocalModelSaver:
 
 class PyTorchLocalModelSaver(AbstractLocalModelSaver, BaseLocalModelSaver):
     def __init__(self, local_model_result_folder_path='~/project/model_result',
-                 checkpoint_model=False):
+                 checkpoint_model=False, sectioned_checkpoint=False):
         """PyTorch experiment local model saver
 
         Args:
             local_model_result_folder_path (str): root local path where project folder will be created
             checkpoint_model (bool): if the model is coming from the mid-training checkpoint
+            sectioned_checkpoint (bool or dict): save the model in the sectioned checkpoint format which enables
+                the lazy and memory-mapped loading of only the needed checkpoint sections. To enable either:
+
+                * set this parameter to ``True`` to use the default sectioned checkpoint settings
+                * provide the ``save_sectioned_checkpoint()`` parameters as a dict as this parameter. For example,
+                  ``{'weights_dtype': 'bf16', 'compression': 'zlib', 'separate_optimizer': True}``
+
+                Otherwise, the standard ``torch.save()`` format is used.
+                ``PyTorchLocalModelLoader`` detects and loads all the format variants.
         """
         BaseLocalModelSaver.__init__(self, local_model_result_folder_path, checkpoint_model)
+        self.sectioned_checkpoint = sectioned_checkpoint is True or isinstance(sectioned_checkpoint, dict)
+        self.sectioned_checkpoint_args = sectioned_checkpoint if isinstance(sectioned_checkpoint, dict) else {}
 
     def save_model(self, model, project_name, experiment_name, experiment_timestamp=None,
                    epoch=None, iteration_idx=None,
@@ -99,19 +113,37 @@ class PyTorchLocalModelSaver(AbstractLocalModelSaver, BaseLocalModelSaver):
 
         experiment_model_local_path = self.create_experiment_local_models_folder(project_name, experiment_name,
                                                                                  experiment_timestamp)
-        iteration_suffix = f'_ITER{iteration_idx}' if iteration_idx is not None else ''
+        model_name = self.get_model_name(experiment_name, experiment_timestamp, epoch, iteration_idx)
+        model_local_path = os.path.join(experiment_model_local_path, model_name)
 
-        if epoch is None:
-            model_name = f'model_{experiment_name}_{experiment_timestamp}.pth'
+        if self.sectioned_checkpoint:
+            from aitoolbox.experiment.local_save.sectioned_checkpoint import save_sectioned_checkpoint
+            save_sectioned_checkpoint(model, model_local_path, **self.sectioned_checkpoint_args)
         else:
-            model_name = f'model_{experiment_name}_{experiment_timestamp}_E{epoch}{iteration_suffix}.pth'
+            import torch
+            with atomic_write_path(model_local_path) as tmp_model_local_path:
+                torch.save(model, tmp_model_local_path)
 
-        model_local_path = os.path.join(experiment_model_local_path, model_name)
+        return model_name, model_local_path
 
-        import torch
-        torch.save(model, model_local_path)
+    @staticmethod
+    def get_model_name(experiment_name, experiment_timestamp, epoch=None, iteration_idx=None):
+        """Get the file name of the saved PyTorch model
 
-        return model_name, model_local_path
+        Args:
+            experiment_name (str): name of the particular experiment
+            experiment_timestamp (str): time stamp at the start of training
+            epoch (int or None): in which epoch the model is being saved
+            iteration_idx (int or None): at which training iteration the model is being saved
+
+        Returns:
+            str: model file name
+        """
+        if epoch is None:
+            return f'model_{experiment_name}_{experiment_timestamp}.pth'
+
+        iteration_suffix = f'_ITER{iteration_idx}' if iteration_idx is not None else ''
+        return f'model_{experiment_name}_{experiment_timestamp}_E{epoch}{iteration_suffix}.pth'
 
     @staticmethod
     def check_model_dict_contents(model):
@@ -133,6 +165,33 @@ class PyTorchLocalModelSaver(AbstractLocalModelSaver, BaseLocalModelSaver):
                                  f'dict has the following elements: {model.keys()}')
 
 
+def save_latest_checkpoint_marker(model_local_path, epoch=None, iteration_idx=None):
+    """Mark the fully saved model checkpoint as the latest completed checkpoint of the experiment
+
+    The marker is saved atomically as the ``latest_checkpoint.json`` file into the experiment folder. It should only
+    be updated once all the files of the checkpoint have been completely written. This way the training resumption
+    via ``PyTorchLocalModelLoader.load_latest_checkpoint()`` never picks up a partially written checkpoint.
+
+    Args:
+        model_local_path (str): path to the saved model checkpoint inside the experiment folder
+        epoch (int or None): in which epoch the model was saved
+        iteration_idx (int or None): at which training iteration the model was saved
+
+    Returns:
+        str: path to the latest checkpoint marker file
+    """
+    model_dir_path, model_name = os.path.split(model_local_path)
+    experiment_dir_path, model_save_dir = os.path.split(model_dir_path)
+    marker_file_path = os.path.join(experiment_dir_path, LATEST_CHECKPOINT_MARKER_FILE_NAME)
+
+    with atomic_write_path(marker_file_path) as tmp_marker_file_path:
+        with open(tmp_marker_file_path, 'w') as f:
+            json.dump({'model_name': model_name, 'model_save_dir': model_save_dir,
+                       'epoch': epoch, 'iteration_idx': iteration_idx}, f)
+
+    return marker_file_path
+
+
 class KerasLocalModelSaver(AbstractLocalModelSaver, BaseLocalModelSaver):
     def __init__(self, local_model_result_folder_path='~/project/model_result',
                  checkpoint_model=False):
@@ -199,7 +258,8 @@ class KerasLocalModelSaver(AbstractLocalModelSaver, BaseLocalModelSaver):
 
 
 class LocalSubOptimalModelRemover:
-    def __init__(self, metric_name, num_best_kept=2):
+    def __init__(self, metric_name, num_best_kept=2, before_remove_fn=None, keep_latest=False, after_remove_fn=None,
+                 metric_known_at_save=False):
         """Removes the tracked saved models which become suboptimal when new models are trained in subsequent epochs
 
         Useful when interested in saving the limited local disk space, especially when dealing with large model which
@@ -210,14 +270,30 @@ class LocalSubOptimalModelRemover:
                 in the TrainLoop
             num_best_kept (int): number of best performing models which are kept when removing suboptimal model
                 checkpoints
+            before_remove_fn (callable or None): optional function called with the list of model paths right before
+                they get removed. For example, used to wait for the pending background uploads of these files.
+            keep_latest (bool): never remove the most recently saved model, even when it is suboptimal. Its removal
+                is deferred until the next model is saved. This way the latest checkpoint is always available for
+                the training resumption.
+            after_remove_fn (callable or None): optional function called with the list of model paths right after
+                they have been removed. For example, used to garbage collect the tensor store blobs no longer
+                referenced by any of the kept deduplicated checkpoints.
+            metric_known_at_save (bool): the metric of the newly saved model is already in the training history at
+                the time of saving. By default, this is only assumed for the default loss metrics while the models
+                tracked with the other metrics are paired with the metric value reported at the next model save.
         """
         self.metric_name = metric_name
+        self.before_remove_fn = before_remove_fn
+        self.after_remove_fn = after_remove_fn
+        self.keep_latest = keep_latest
+        self.latest_model_paths_to_rm = None
         self.decrease_metric = 'loss' in metric_name
 
         self.num_best_kept = num_best_kept
 
         self.default_metrics_list = ['loss', 'accumulated_loss', 'val_loss']
         self.is_default_metric = metric_name in self.default_metrics_list
+        self.metric_known_at_save = metric_known_at_save
         self.non_default_metric_buffer = None
 
         self.model_save_history = []
@@ -232,7 +308,11 @@ class LocalSubOptimalModelRemover:
         Returns:
             None
         """
-        if not self.is_default_metric:
+        if self.latest_model_paths_to_rm is not None:
+            self.remove_model(self.latest_model_paths_to_rm)
+            self.latest_model_paths_to_rm = None
+
+        if not self.is_default_metric and not self.metric_known_at_save:
             if self.non_default_metric_buffer is not None:
                 if self.metric_name in history:
                     self.model_save_history.append((self.non_default_metric_buffer, history[self.metric_name][-1]))
@@ -248,8 +328,53 @@ class LocalSubOptimalModelRemover:
 
             model_paths_to_rm, _ = self.model_save_history.pop()
 
-            print(f'Removing suboptimal models. Paths to be removed: {model_paths_to_rm}')
-            self.rm_suboptimal_model(model_paths_to_rm)
+            if self.keep_latest and model_paths_to_rm == new_model_dump_paths:
+                self.latest_model_paths_to_rm = model_paths_to_rm
+            else:
+                self.remove_model(model_paths_to_rm)
+
+    def is_new_model_kept(self, history):
+        """Decide before saving whether the model with the latest metric value would be among the best kept models
+
+        Enables skipping of the model saving altogether if the saved model would anyway be immediately removed as
+        suboptimal.
+
+        Args:
+            history (aitoolbox.experiment.training_history.TrainingHistory): training performance history
+
+        Returns:
+            bool: ``True`` if the new model would be kept. Also returned when the metric can't be found in
+            the history and the decision can't be made.
+        """
+        if self.metric_name not in history or len(history[self.metric_name]) == 0:
+            print(f'Provided metric {self.metric_name} not found on the list of evaluated metrics: {history.keys()}')
+            return True
+
+        if len(self.model_save_history) < self.num_best_kept:
+            return True
+
+        new_metric_value = history[self.metric_name][-1]
+        kept_metric_values = [metric_value for _, metric_value in self.model_save_history]
+        # When the new model ties with the worst kept one, the new model would be removed
+        if self.decrease_metric:
+            return new_metric_value < max(kept_metric_values)
+        return new_metric_value > min(kept_metric_values)
+
+    def remove_model(self, model_paths_to_rm):
+        """Remove the suboptimal model files and execute the optional before_remove_fn and after_remove_fn
+
+        Args:
+            model_paths_to_rm (list): list of string paths
+
+        Returns:
+            None
+        """
+        print(f'Removing suboptimal models. Paths to be removed: {model_paths_to_rm}')
+        if self.before_remove_fn is not None:
+            self.before_remove_fn(model_paths_to_rm)
+        self.rm_suboptimal_model(model_paths_to_rm)
+        if self.after_remove_fn is not None:
+            self.after_remove_fn(model_paths_to_rm)
 
     @staticmethod
     def rm_suboptimal_model(rm_model_paths):
@@ -263,3 +388,60 @@ class LocalSubOptimalModelRemover:
         """
         for rm_path in rm_model_paths:
             os.remove(rm_path)
+
+
+class LocalRollingModelRemover:
+    def __init__(self, num_kept=3, before_remove_fn=None, after_remove_fn=None):
+        """Keeps only the rolling window of the most recently saved models and removes the older ones
+
+        Args:
+            num_kept (int): number of the most recently saved models which are kept
+            before_remove_fn (callable or None): optional function called with the list of model paths right before
+                they get removed. For example, used to wait for the pending background uploads of these files.
+            after_remove_fn (callable or None): optional function called with the list of model paths right after
+                they have been removed. For example, used to garbage collect the tensor store blobs no longer
+                referenced by any of the kept deduplicated checkpoints.
+        """
+        if num_kept < 1:
+            raise ValueError(f'num_kept should be at least 1. Provided: {num_kept}')
+
+        self.num_kept = num_kept
+        self.before_remove_fn = before_remove_fn
+        self.after_remove_fn = after_remove_fn
+
+        self.model_save_history = []
+
+    def add_model(self, new_model_dump_paths):
+        """Start tracking the newly saved model and remove the oldest tracked model if it falls out of the window
+
+        Args:
+            new_model_dump_paths (list): new saved models paths which will begin to be tracked
+
+        Returns:
+            None
+        """
+        # Model saved again under the same name, e.g. at the same iteration, is treated as the newest one
+        if new_model_dump_paths in self.model_save_history:
+            self.model_save_history.remove(new_model_dump_paths)
+        self.model_save_history.append(new_model_dump_paths)
+
+        while len(self.model_save_history) > self.num_kept:
+            self.remove_model(self.model_save_history.pop(0))
+
+    def remove_model(self, model_paths_to_rm):
+        """Remove the model files and execute the optional before_remove_fn and after_remove_fn
+
+        Args:
+            model_paths_to_rm (list): list of string paths
+
+        Returns:
+            None
+        """
+        print(f'Removing old models. Paths to be removed: {model_paths_to_rm}')
+        if self.before_remove_fn is not None:
+            self.before_remove_fn(model_paths_to_rm)
+        for rm_path in model_paths_to_rm:
+            if os.path.exists(rm_path):
+                os.remove(rm_path)
+        if self.after_remove_fn is not None:
+            self.after_remove_fn(model_paths_to_rm)
@@ -4,6 +4,7 @@ import time
 import datetime
 import pickle
 import json
+import numpy as np
 
 from aitoolbox.experiment.local_save.folder_create import ExperimentFolder
 from aitoolbox.experiment.result_reporting.report_generator import TrainingHistoryPlotter
@@ -58,20 +59,31 @@ class AbstractLocalResultsSaver(ABC):
 
 
 class BaseLocalResultsSaver:
-    def __init__(self, local_model_result_folder_path='~/project/model_result', file_format='pickle'):
+    def __init__(self, local_model_result_folder_path='~/project/model_result', file_format='pickle',
+                 labels_array_format=None):
         """Base functionality for all the local results savers
 
         Args:
             local_model_result_folder_path (str): root local path where project folder will be created
             file_format (str): pickle or json
+            labels_array_format (str or None): storage format of the ground truth and predicted labels arrays.
+                If left to ``None`` the labels are embedded as python objects into the results file.
+                With ``'npz'`` the labels are saved into the single compressed ``.npz`` file and with ``'npy'``
+                into the separate uncompressed ``.npy`` files which can be memory-mapped when loaded. In both
+                cases the arrays are described by the small JSON metadata file referenced from the results file.
         """
         self.local_model_result_folder_path = os.path.expanduser(local_model_result_folder_path)
         self.file_format = file_format
+        self.labels_array_format = labels_array_format
 
         if self.file_format not in ['pickle', 'json']:
             print('Warning: file format should be: pickle or json. Setting it to default pickle')
             self.file_format = 'pickle'
 
+        if self.labels_array_format not in [None, 'npz', 'npy']:
+            raise ValueError(f'labels_array_format setting not supported: {self.labels_array_format}. '
+                             f'Can select only None, npz or npy')
+
     def create_experiment_local_folder_structure(self, project_name, experiment_name, experiment_timestamp):
         """Creates experiment local results folder hierarchy
 
@@ -158,16 +170,91 @@ class BaseLocalResultsSaver:
         else:
             raise ValueError('file_format setting not supported: can select only pickle or json')
 
+    def save_true_pred_labels_arrays(self, result_package, file_name_w_type, file_local_path_w_type):
+        """Saves ground truth and predicted labels as arrays next to the JSON metadata file describing them
+
+        Labels of the result packages wrapped in the ``MultipleResultPackageWrapper`` are saved as separate arrays
+        for each of the wrapped result packages.
+
+        Args:
+            result_package (aitoolbox.experiment.result_package.abstract_result_packages.AbstractResultPackage):
+            file_name_w_type (str): filename without the file extension at the end
+            file_local_path_w_type (str): file path without the file extension at the end
+
+        Returns:
+            list: list of list with this format: [[file_name, file_local_path], ... [ , ]].
+                The first file is the JSON metadata file followed by the array files.
+        """
+        labels_arrays = []
+        for label_name in ['y_true', 'y_predicted']:
+            labels = getattr(result_package, label_name)
+            if isinstance(labels, dict):
+                labels_arrays += [(label_name, package_name, self.to_array(package_labels))
+                                  for package_name, package_labels in labels.items()]
+            else:
+                labels_arrays.append((label_name, None, self.to_array(labels)))
+
+        results_dir_path = os.path.dirname(file_local_path_w_type)
+        arrays_metadata = []
+        saved_array_file_paths = []
+
+        if self.labels_array_format == 'npz':
+            array_file_name = file_name_w_type + '.npz'
+            np.savez_compressed(file_local_path_w_type + '.npz',
+                                **{f'array_{i}': array for i, (_, _, array) in enumerate(labels_arrays)})
+            saved_array_file_paths.append([array_file_name, file_local_path_w_type + '.npz'])
+        else:
+            os.makedirs(file_local_path_w_type, exist_ok=True)
+
+        for i, (label_name, package_name, array) in enumerate(labels_arrays):
+            if self.labels_array_format == 'npz':
+                array_file_name, array_key = file_name_w_type + '.npz', f'array_{i}'
+            else:
+                array_file_name, array_key = os.path.join(file_name_w_type, f'array_{i}.npy'), None
+                np.save(os.path.join(results_dir_path, array_file_name), array)
+                saved_array_file_paths.append([array_file_name, os.path.join(results_dir_path, array_file_name)])
+
+            arrays_metadata.append({'label_name': label_name, 'package_name': package_name,
+                                    'file_name': array_file_name, 'array_key': array_key,
+                                    'shape': list(array.shape), 'dtype': str(array.dtype)})
+
+        metadata_file_local_path = file_local_path_w_type + '.json'
+        with open(metadata_file_local_path, 'w') as f:
+            json.dump({'labels_array_format': self.labels_array_format, 'arrays': arrays_metadata}, f, indent=4)
+
+        return [[file_name_w_type + '.json', metadata_file_local_path]] + saved_array_file_paths
+
+    @staticmethod
+    def to_array(labels):
+        """Convert the labels into the numpy array
+
+        Args:
+            labels (numpy.array or list): labels
+
+        Returns:
+            numpy.array: labels array. Ragged nested labels are returned as the object array of per-example labels.
+        """
+        try:
+            return np.asarray(labels)
+        except ValueError:
+            labels_array = np.empty(len(labels), dtype=object)
+            for i, example_labels in enumerate(labels):
+                labels_array[i] = example_labels
+            return labels_array
+
 
 class LocalResultsSaver(AbstractLocalResultsSaver, BaseLocalResultsSaver):
-    def __init__(self, local_model_result_folder_path='~/project/model_result', file_format='pickle'):
+    def __init__(self, local_model_result_folder_path='~/project/model_result', file_format='pickle',
+                 labels_array_format=None):
         """Local model training results saver to local drive
 
         Args:
             local_model_result_folder_path (str): root local path where project folder will be created
             file_format (str): file format of the results file
+            labels_array_format (str or None): storage format of the ground truth and predicted labels arrays:
+                ``None`` (embedded into the results file), ``'npz'`` or ``'npy'``
         """
-        BaseLocalResultsSaver.__init__(self, local_model_result_folder_path, file_format)
+        BaseLocalResultsSaver.__init__(self, local_model_result_folder_path, file_format, labels_array_format)
 
     def save_experiment_results(self, result_package, training_history,
                                 project_name, experiment_name, experiment_timestamp=None,
@@ -208,7 +295,15 @@ class LocalResultsSaver(AbstractLocalResultsSaver, BaseLocalResultsSaver):
                                        'hyperparameters': hyperparameters,
                                        'training_history': training_history.get_train_history()}
 
-        if save_true_pred_labels:
+        labels_file_paths = []
+        if save_true_pred_labels and self.labels_array_format is not None:
+            labels_file_name_w_type = f'true_pred_labels_{experiment_name}_{experiment_timestamp}'
+            labels_file_paths = self.save_true_pred_labels_arrays(
+                result_package,
+                labels_file_name_w_type, os.path.join(experiment_results_local_path, labels_file_name_w_type)
+            )
+            exp_results_hyperparam_dict['true_pred_labels_metadata_file'] = labels_file_paths[0][0]
+        elif save_true_pred_labels:
             exp_results_hyperparam_dict = {'y_true': result_package.y_true, 'y_predicted': result_package.y_predicted,
                                            **exp_results_hyperparam_dict}
 
@@ -219,7 +314,7 @@ class LocalResultsSaver(AbstractLocalResultsSaver, BaseLocalResultsSaver):
                                                                     results_file_name_w_type,
                                                                     results_file_local_path_w_type)
         
-        experiment_results_paths = [[results_file_name, results_file_local_path]]
+        experiment_results_paths = [[results_file_name, results_file_local_path]] + labels_file_paths
         
         if additional_results_dump_paths is not None:
             experiment_results_paths += additional_results_dump_paths
@@ -294,14 +389,19 @@ class LocalResultsSaver(AbstractLocalResultsSaver, BaseLocalResultsSaver):
                                [train_hist_file_name, train_hist_file_local_path]]
 
         if save_true_pred_labels:
-            experiment_true_pred_labels_dict = {'y_true': result_package.y_true, 'y_predicted': result_package.y_predicted}
-
             labels_file_name_w_type = f'true_pred_labels_{experiment_name}_{experiment_timestamp}'
             labels_file_local_path_w_type = os.path.join(experiment_results_local_path, labels_file_name_w_type)
-            labels_file_name, labels_file_local_path = self.save_file(experiment_true_pred_labels_dict,
-                                                                      labels_file_name_w_type,
-                                                                      labels_file_local_path_w_type)
-            saved_results_paths.append([labels_file_name, labels_file_local_path])
+
+            if self.labels_array_format is not None:
+                saved_results_paths += self.save_true_pred_labels_arrays(result_package, labels_file_name_w_type,
+                                                                         labels_file_local_path_w_type)
+            else:
+                experiment_true_pred_labels_dict = {'y_true': result_package.y_true,
+                                                    'y_predicted': result_package.y_predicted}
+                labels_file_name, labels_file_local_path = self.save_file(experiment_true_pred_labels_dict,
+                                                                          labels_file_name_w_type,
+                                                                          labels_file_local_path_w_type)
+                saved_results_paths.append([labels_file_name, labels_file_local_path])
 
         if additional_results_dump_paths is not None:
             saved_results_paths += additional_results_dump_paths
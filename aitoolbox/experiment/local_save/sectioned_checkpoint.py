@@ -0,0 +1,869 @@
+import os
+import io
+import copy
+import json
+import time
+import hashlib
+import mmap
+import zlib
+import lzma
+import struct
+from collections.abc import MutableMapping
+import torch
+
+from aitoolbox.utils.file_system import atomic_write_path
+
+SECTIONED_CHECKPOINT_MAGIC = b'AITBCKPT'
+SECTIONED_CHECKPOINT_FORMAT_VERSION = 2
+# Version 2 adds the tensors deduplicated into the tensor store. Checkpoints not using it are still written as version 1
+BASE_SECTIONED_CHECKPOINT_FORMAT_VERSION = 1
+# Footer: header length as unsigned 64-bit little-endian integer followed by the magic bytes
+FOOTER_SIZE = 8 + len(SECTIONED_CHECKPOINT_MAGIC)
+TENSOR_ALIGNMENT = 64
+TENSOR_REF_KEY = '__aitoolbox_tensor_ref__'
+
+REDUCED_PRECISION_DTYPES = {
+    'fp16': torch.float16, 'float16': torch.float16,
+    'bf16': torch.bfloat16, 'bfloat16': torch.bfloat16
+}
+# Every tensor is compressed independently so that any section can be decompressed without reading the rest
+COMPRESSION_METHODS = {
+    'zlib': (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress)
+}
+OPTIMIZER_SECTIONS = ['optimizer_state_dict', 'schedulers_state_dict', 'amp']
+TENSOR_STORE_DIR_NAME = 'tensor_store'
+
+
+class SectionedCheckpointWriter:
+    def __init__(self, file_obj, compression=None, compression_level=6, tensor_store_path=None):
+        """Writer of the sectioned checkpoint format
+
+        Every top-level entry of the checkpoint dict is stored as a separate section. Section tensors are written
+        as raw aligned bytes while the rest of the section structure (the skeleton) is serialized with
+        ``torch.save()``. The index header describing the location of every section and tensor is written at
+        the end of the file followed by the fixed size footer. This way the file is written in a single sequential
+        pass and the readers can memory-map the tensors or read only the selected sections.
+
+        File layout::
+
+            magic | section data ... | JSON index header | header length (uint64) | magic
+
+        Args:
+            file_obj (file object): binary file object opened for writing. Only sequential writes are used.
+            compression (str or None): optional compression of the tensor data: ``'zlib'`` or ``'lzma'``. Each tensor
+                is compressed independently. Compressed tensors are decompressed into memory when loaded instead
+                of being memory-mapped.
+            compression_level (int): compression level passed to the selected compression method
+            tensor_store_path (str or None): path to the content-addressed tensor store folder located next to
+                the checkpoint file. If provided, the tensor data is not written into the checkpoint file but into
+                the tensor store blob files named by the hash of their content. The blobs are shared between
+                the checkpoints, so the unchanged tensors (e.g. the frozen layers) are written only once.
+        """
+        if compression is not None and compression not in COMPRESSION_METHODS:
+            raise ValueError(f'Unsupported compression {compression}. '
+                             f'Supported options: {list(COMPRESSION_METHODS.keys())}')
+
+        self.file_obj = file_obj
+        self.compression = compression
+        self.compression_level = compression_level
+        self.tensor_store_path = tensor_store_path
+        self.position = 0
+        self.sections = {}
+        self.reduced_precision_sections = []
+
+        self._write(SECTIONED_CHECKPOINT_MAGIC)
+
+    def write_section(self, section_name, section_obj, storage_dtype=None):
+        """Serialize and write the checkpoint section
+
+        Args:
+            section_name (str): name of the section
+            section_obj: section content, e.g. model state dict
+            storage_dtype (torch.dtype or None): optional reduced precision floating point dtype in which
+                the fp32 and fp64 tensors of the section are stored. When loaded, the tensors are cast back to their
+                original dtype, however the precision lost when saving can't be recovered.
+
+        Returns:
+            None
+        """
+        tensors = []
+        skeleton = extract_tensors(section_obj, tensors)
+        skeleton_buffer = io.BytesIO()
+        torch.save(skeleton, skeleton_buffer)
+
+        section_start = self.position
+        skeleton_offset = self.position
+        self._write(skeleton_buffer.getbuffer())
+
+        tensors_info = []
+        for tensor in tensors:
+            tensor_options = {}
+            if storage_dtype is not None and tensor.is_floating_point() and \
+                    tensor.element_size() > torch.tensor([], dtype=storage_dtype).element_size():
+                tensor_options['dtype'] = get_dtype_name(tensor.dtype)
+                tensor = tensor.detach().to(storage_dtype)
+
+            tensor_bytes = tensor_to_bytes(tensor)
+            if tensor_bytes is not None and self.tensor_store_path is not None:
+                tensor_offset = 0
+                tensor_options['blob'] = self._store_blob(tensor_bytes)
+                if self.compression is not None:
+                    tensor_options['compression'] = self.compression
+            else:
+                self._pad_to_alignment()
+                tensor_offset = self.position
+                if tensor_bytes is not None:
+                    if self.compression is not None:
+                        tensor_bytes = self._compress(tensor_bytes)
+                        tensor_options['compression'] = self.compression
+                        tensor_options['nbytes'] = len(tensor_bytes)
+                    self._write(tensor_bytes)
+
+            tensor_info = [tensor_offset, get_dtype_name(tensor.dtype), list(tensor.shape)]
+            if len(tensor_options) > 0:
+                tensor_info.append(tensor_options)
+            tensors_info.append(tensor_info)
+
+        if storage_dtype is not None:
+            self.reduced_precision_sections.append(section_name)
+
+        self.sections[section_name] = {
+            'start': section_start, 'end': self.position,
+            'skeleton_offset': skeleton_offset, 'skeleton_size': skeleton_buffer.getbuffer().nbytes,
+            'tensors': tensors_info
+        }
+
+    def add_external_section(self, section_name, file_name):
+        """Register the section which is stored in the separate sectioned checkpoint file
+
+        Args:
+            section_name (str): name of the section
+            file_name (str): name of the file storing the section, located in the same folder as this checkpoint
+
+        Returns:
+            None
+        """
+        self.sections[section_name] = {'external_file': file_name}
+
+    def close(self):
+        """Write the index header and the footer
+
+        Returns:
+            None
+        """
+        header = {
+            'format_version': BASE_SECTIONED_CHECKPOINT_FORMAT_VERSION,
+            'sections': self.sections,
+            'reduced_precision_sections': self.reduced_precision_sections
+        }
+        if self.tensor_store_path is not None:
+            header['format_version'] = SECTIONED_CHECKPOINT_FORMAT_VERSION
+            header['tensor_store'] = os.path.basename(os.path.normpath(self.tensor_store_path))
+
+        header = json.dumps(header).encode('utf-8')
+        self._write(header)
+        self._write(struct.pack('<Q', len(header)) + SECTIONED_CHECKPOINT_MAGIC)
+
+    def _compress(self, tensor_bytes):
+        compress_fn, _ = COMPRESSION_METHODS[self.compression]
+        return compress_fn(tensor_bytes, self.compression_level)
+
+    def _store_blob(self, tensor_bytes):
+        """Store the tensor bytes into the tensor store unless the blob with the same content already exists
+
+        Args:
+            tensor_bytes (memoryview): raw tensor bytes
+
+        Returns:
+            str: name of the blob file
+        """
+        blob_hash = hashlib.sha256(tensor_bytes)
+        if self.compression is not None:
+            blob_hash.update(self.compression.encode('utf-8'))
+        blob_name = blob_hash.hexdigest()
+        blob_path = os.path.join(self.tensor_store_path, blob_name)
+
+        if os.path.exists(blob_path):
+            # Refresh the modification time so that the concurrent garbage collection keeps the reused blob
+            os.utime(blob_path)
+        else:
+            blob_bytes = self._compress(tensor_bytes) if self.compression is not None else tensor_bytes
+            with atomic_write_path(blob_path) as tmp_blob_path, open(tmp_blob_path, 'wb') as f:
+                f.write(blob_bytes)
+        return blob_name
+
+    def _write(self, data):
+        self.file_obj.write(data)
+        self.position += memoryview(data).nbytes
+
+    def _pad_to_alignment(self):
+        padding_size = -self.position % TENSOR_ALIGNMENT
+        if padding_size > 0:
+            self._write(b'\0' * padding_size)
+
+
+class SectionedCheckpointReader:
+    def __init__(self, file_path, map_location=None, mmap_tensors=True):
+        """Reader of the sectioned checkpoint format which deserializes the sections on demand
+
+        Args:
+            file_path (str): path to the sectioned checkpoint file
+            map_location (str or torch.device or dict or callable or None): device to which the loaded tensors are
+                moved, applied the same way as in ``torch.load()``. If left to ``None`` tensors stay on the CPU.
+            mmap_tensors (bool): if ``True`` the file is memory-mapped and the tensors are backed by the mapped
+                file pages, which are only read from the disk when the tensor data is actually accessed.
+                If ``False`` the section bytes are read into memory when the section is loaded.
+        """
+        self.file_path = file_path
+        self.map_location = map_location
+        self.mmap_tensors = mmap_tensors
+
+        with open(file_path, 'rb') as f:
+            f.seek(0, io.SEEK_END)
+            file_size = f.tell()
+            self.header = read_sectioned_checkpoint_header(
+                lambda start, end: self._read_range(f, start, end), file_size
+            )
+
+            # Copy-on-write mapping gives writable tensors without ever modifying the file
+            self.file_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) \
+                if mmap_tensors and file_size > 0 else None
+
+        self.external_readers = {}
+
+    @property
+    def section_names(self):
+        return list(self.header['sections'].keys())
+
+    @property
+    def reduced_precision_sections(self):
+        return self.header.get('reduced_precision_sections', [])
+
+    def load_section(self, section_name):
+        """Deserialize the selected checkpoint section
+
+        Args:
+            section_name (str): name of the section
+
+        Returns:
+            deserialized section content
+        """
+        section_info = self.header['sections'][section_name]
+
+        if 'external_file' in section_info:
+            external_file_path = os.path.join(os.path.dirname(self.file_path), section_info['external_file'])
+            if external_file_path not in self.external_readers:
+                self.external_readers[external_file_path] = SectionedCheckpointReader(
+                    external_file_path, self.map_location, self.mmap_tensors
+                )
+            return self.external_readers[external_file_path].load_section(section_name)
+
+        if self.file_buffer is not None:
+            return deserialize_section(section_info, self.file_buffer, 0, self.map_location, self.load_blob)
+
+        with open(self.file_path, 'rb') as f:
+            section_buffer = bytearray(self._read_range(f, section_info['start'], section_info['end'] - 1))
+        return deserialize_section(section_info, section_buffer, section_info['start'], self.map_location,
+                                   self.load_blob)
+
+    def load_blob(self, blob_name):
+        """Read the tensor blob from the tensor store
+
+        Every call returns a new buffer, so that the tensors loaded from the same blob in different sections
+        don't share memory.
+
+        Args:
+            blob_name (str): name of the blob file
+
+        Returns:
+            mmap.mmap or bytearray: blob bytes buffer
+        """
+        blob_path = os.path.join(os.path.dirname(self.file_path), self.header['tensor_store'], blob_name)
+        with open(blob_path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) if self.mmap_tensors else bytearray(f.read())
+
+    @staticmethod
+    def _read_range(f, start, end):
+        f.seek(start)
+        return f.read(end - start + 1)
+
+
+class RangedSectionedCheckpointReader:
+    # Size of the file tail read with the first request which usually already contains the whole index header
+    HEADER_PREFETCH_SIZE = 64 * 1024
+
+    def __init__(self, read_range_fn, file_size, map_location=None, open_file_fn=None, read_files_fn=None):
+        """Reader of the sectioned checkpoint stored remotely which reads only the byte ranges of the loaded sections
+
+        The index header is read from the end of the file and afterwards each loaded section is read with
+        a single byte-range request. This way, for example, only the model weights can be read from the cloud
+        checkpoint without transferring the optimizer state.
+
+        Args:
+            read_range_fn (callable): function which accepts the inclusive start and end byte positions and returns
+                the bytes of the checkpoint file in that range
+            file_size (int): size of the checkpoint file in bytes
+            map_location (str or torch.device or dict or callable or None): device to which the loaded tensors are
+                moved, applied the same way as in ``torch.load()``. If left to ``None`` tensors stay on the CPU.
+            open_file_fn (callable or None): function which accepts the path of the file relative to the checkpoint
+                folder and returns the ``(read_range_fn, file_size)`` pair for it. Required to load the sections
+                stored in the separate files or in the tensor store.
+            read_files_fn (callable or None): optional function which accepts the list of file paths relative to
+                the checkpoint folder and returns the list of their whole contents in the same order. When provided,
+                all the tensor store blobs of the loaded section are read with it at once, e.g. in parallel, instead
+                of reading the blobs one by one via ``open_file_fn``.
+        """
+        self.map_location = map_location
+        self.open_file_fn = open_file_fn
+        self.read_files_fn = read_files_fn
+
+        tail_start = max(file_size - self.HEADER_PREFETCH_SIZE, 0)
+        tail_bytes = bytes(read_range_fn(tail_start, file_size - 1)) if file_size > 0 else b''
+
+        def read_range_with_tail(start, end):
+            if start >= tail_start:
+                return tail_bytes[start - tail_start:end - tail_start + 1]
+            return read_range_fn(start, end)
+
+        self.read_range_fn = read_range_fn
+        self.header = read_sectioned_checkpoint_header(read_range_with_tail, file_size)
+
+        self.external_readers = {}
+
+    @property
+    def section_names(self):
+        return list(self.header['sections'].keys())
+
+    @property
+    def reduced_precision_sections(self):
+        return self.header.get('reduced_precision_sections', [])
+
+    def load_section(self, section_name):
+        """Read and deserialize the selected checkpoint section
+
+        Args:
+            section_name (str): name of the section
+
+        Returns:
+            deserialized section content
+        """
+        section_info = self.header['sections'][section_name]
+
+        if 'external_file' in section_info:
+            external_file_name = section_info['external_file']
+            if external_file_name not in self.external_readers:
+                self.external_readers[external_file_name] = RangedSectionedCheckpointReader(
+                    *self._open_file(external_file_name), self.map_location, self.open_file_fn, self.read_files_fn
+                )
+            return self.external_readers[external_file_name].load_section(section_name)
+
+        section_buffer = bytearray(self.read_range_fn(section_info['start'], section_info['end'] - 1)) \
+            if section_info['end'] > section_info['start'] else bytearray()
+
+        load_blob_fn = self.load_blob
+        blob_names = sorted(get_section_blob_names(section_info))
+        if self.read_files_fn is not None and len(blob_names) > 0:
+            blob_paths = [os.path.join(self.header['tensor_store'], blob_name) for blob_name in blob_names]
+            blob_buffers = {blob_name: bytearray(blob_data)
+                            for blob_name, blob_data in zip(blob_names, self.read_files_fn(blob_paths))}
+            load_blob_fn = blob_buffers.__getitem__
+
+        return deserialize_section(section_info, section_buffer, section_info['start'], self.map_location,
+                                   load_blob_fn)
+
+    def load_blob(self, blob_name):
+        """Read the tensor blob from the remote tensor store
+
+        Args:
+            blob_name (str): name of the blob file
+
+        Returns:
+            bytearray: blob bytes buffer
+        """
+        blob_read_range_fn, blob_size = self._open_file(os.path.join(self.header['tensor_store'], blob_name))
+        return bytearray(blob_read_range_fn(0, blob_size - 1)) if blob_size > 0 else bytearray()
+
+    def _open_file(self, file_path):
+        if self.open_file_fn is None:
+            raise ValueError(f'Section is stored in the separate file {file_path}, but open_file_fn is not provided')
+        return self.open_file_fn(file_path)
+
+
+class LazyCheckpoint(MutableMapping):
+    def __init__(self, checkpoint_reader):
+        """Checkpoint dict whose sections are deserialized only when they are first accessed
+
+        For example, when only ``model_state_dict`` is used to initialize the model for inference, the optimizer,
+        scheduler and other sections are never read or deserialized.
+
+        Args:
+            checkpoint_reader (SectionedCheckpointReader or RangedSectionedCheckpointReader): reader of
+                the checkpoint sections
+        """
+        self.checkpoint_reader = checkpoint_reader
+        self.section_names = checkpoint_reader.section_names
+        self.reduced_precision_sections = checkpoint_reader.reduced_precision_sections
+        self.loaded_sections = {}
+
+    def __getitem__(self, key):
+        if key not in self.loaded_sections:
+            if key not in self.section_names:
+                raise KeyError(key)
+            self.loaded_sections[key] = self.checkpoint_reader.load_section(key)
+        return self.loaded_sections[key]
+
+    def __setitem__(self, key, value):
+        if key not in self.section_names:
+            self.section_names.append(key)
+        self.loaded_sections[key] = value
+
+    def __delitem__(self, key):
+        if key not in self.section_names:
+            raise KeyError(key)
+        self.section_names.remove(key)
+        self.loaded_sections.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.section_names
+
+    def __iter__(self):
+        return iter(list(self.section_names))
+
+    def __len__(self):
+        return len(self.section_names)
+
+    def __repr__(self):
+        return f'LazyCheckpoint(sections={self.section_names}, loaded={list(self.loaded_sections.keys())})'
+
+
+def save_sectioned_checkpoint(checkpoint, file_path,
+                              weights_dtype=None, compression=None, compression_level=6, separate_optimizer=False,
+                              dedup_tensors=False):
+    """Save the checkpoint dict in the sectioned checkpoint format
+
+    Each of the files is written atomically, so that the readers never see a partially written checkpoint file.
+
+    Args:
+        checkpoint (dict): checkpoint dict, e.g. the PyTorch model representation dict
+        file_path (str): destination file path
+        weights_dtype (str or torch.dtype or None): reduced precision dtype in which the model weights
+            (``model_state_dict``) are stored: ``'fp16'`` or ``'bf16'``. Storing the weights in the reduced precision
+            is only meant for the final model saves as the training can't be exactly resumed from such a checkpoint.
+        compression (str or None): optional tensor data compression: ``'zlib'`` or ``'lzma'``
+        compression_level (int): compression level passed to the selected compression method
+        separate_optimizer (bool): if ``True`` the optimizer, scheduler and AMP states are saved into the separate
+            ``<checkpoint name>_optimizer`` file next to the model file. This way the model can be used for
+            inference without even downloading the (often larger) optimizer state.
+        dedup_tensors (bool): if ``True`` the tensors are saved into the content-addressed tensor store folder
+            shared by all the checkpoints in the same folder and the checkpoint file only references them. Tensors
+            which haven't changed since the previous checkpoint (e.g. the frozen layers) aren't written again.
+            Tensor store blobs no longer referenced by any checkpoint are removed by
+            ``collect_tensor_store_garbage()``.
+
+    Returns:
+        list: paths of all the saved files, not including the shared tensor store blobs
+    """
+    if isinstance(weights_dtype, str):
+        if weights_dtype not in REDUCED_PRECISION_DTYPES:
+            raise ValueError(f'Unsupported weights_dtype {weights_dtype}. '
+                             f'Supported options: {list(REDUCED_PRECISION_DTYPES.keys())}')
+        weights_dtype = REDUCED_PRECISION_DTYPES[weights_dtype]
+
+    tensor_store_path = None
+    if dedup_tensors:
+        tensor_store_path = os.path.join(os.path.dirname(file_path), TENSOR_STORE_DIR_NAME)
+        os.makedirs(tensor_store_path, exist_ok=True)
+
+    saved_file_paths = [file_path]
+    external_section_names = [name for name in checkpoint if name in OPTIMIZER_SECTIONS] if separate_optimizer else []
+
+    if len(external_section_names) > 0:
+        optimizer_file_path = get_optimizer_file_path(file_path)
+        with atomic_write_path(optimizer_file_path) as tmp_file_path, open(tmp_file_path, 'wb') as f:
+            checkpoint_writer = SectionedCheckpointWriter(f, compression, compression_level, tensor_store_path)
+            for section_name in external_section_names:
+                checkpoint_writer.write_section(section_name, checkpoint[section_name])
+            checkpoint_writer.close()
+        saved_file_paths.append(optimizer_file_path)
+
+    with atomic_write_path(file_path) as tmp_file_path, open(tmp_file_path, 'wb') as f:
+        checkpoint_writer = SectionedCheckpointWriter(f, compression, compression_level, tensor_store_path)
+        for section_name, section_obj in checkpoint.items():
+            if section_name in external_section_names:
+                checkpoint_writer.add_external_section(section_name, os.path.basename(saved_file_paths[1]))
+            else:
+                checkpoint_writer.write_section(
+                    section_name, section_obj,
+                    storage_dtype=weights_dtype if section_name == 'model_state_dict' else None
+                )
+        checkpoint_writer.close()
+
+    return saved_file_paths
+
+
+def get_optimizer_file_path(file_path):
+    """Get the path of the separately saved optimizer state file belonging to the model checkpoint
+
+    Args:
+        file_path (str): model checkpoint file path
+
+    Returns:
+        str: optimizer state file path
+    """
+    file_path_root, file_ext = os.path.splitext(file_path)
+    return f'{file_path_root}_optimizer{file_ext}'
+
+
+def get_checkpoint_file_paths(file_path):
+    """Get the paths of all the files forming the checkpoint
+
+    Args:
+        file_path (str): path to the main checkpoint file which can be either a sectioned or a torch.save() checkpoint
+
+    Returns:
+        list: the main checkpoint file path followed by the paths of the separately stored sections files
+    """
+    if not is_sectioned_checkpoint(file_path):
+        return [file_path]
+
+    header = read_sectioned_checkpoint_file_header(file_path)
+    external_file_paths = []
+    for section_info in header['sections'].values():
+        if 'external_file' not in section_info:
+            continue
+        external_file_path = os.path.join(os.path.dirname(file_path), section_info['external_file'])
+        if external_file_path not in external_file_paths:
+            external_file_paths.append(external_file_path)
+    return [file_path] + external_file_paths
+
+
+def get_tensor_store_blob_paths(file_path):
+    """Get the paths of the tensor store blobs referenced by the checkpoint
+
+    Args:
+        file_path (str): path to the main checkpoint file which can be either a sectioned or a torch.save() checkpoint
+
+    Returns:
+        list: paths of the referenced tensor store blobs. Empty list if the checkpoint doesn't use the tensor store.
+    """
+    blob_paths = []
+    for checkpoint_file_path in get_checkpoint_file_paths(file_path):
+        if not is_sectioned_checkpoint(checkpoint_file_path):
+            continue
+        header = read_sectioned_checkpoint_file_header(checkpoint_file_path)
+        if 'tensor_store' not in header:
+            continue
+
+        tensor_store_path = os.path.join(os.path.dirname(checkpoint_file_path), header['tensor_store'])
+        for blob_name in get_referenced_blob_names(header):
+            blob_path = os.path.join(tensor_store_path, blob_name)
+            if blob_path not in blob_paths:
+                blob_paths.append(blob_path)
+    return blob_paths
+
+
+def get_referenced_blob_names(header):
+    """Get the names of the tensor store blobs referenced in the checkpoint index header
+
+    Args:
+        header (dict): checkpoint index header
+
+    Returns:
+        set: referenced blob names
+    """
+    blob_names = set()
+    for section_info in header['sections'].values():
+        blob_names.update(get_section_blob_names(section_info))
+    return blob_names
+
+
+def get_section_blob_names(section_info):
+    """Get the names of the tensor store blobs referenced by the tensors of the checkpoint section
+
+    Args:
+        section_info (dict): section entry from the checkpoint index header
+
+    Returns:
+        set: referenced blob names
+    """
+    return {tensor_options[0]['blob'] for _, _, _, *tensor_options in section_info.get('tensors', [])
+            if len(tensor_options) > 0 and 'blob' in tensor_options[0]}
+
+
+def collect_tensor_store_garbage(checkpoint_dir_path, grace_period=600., before_remove_fn=None):
+    """Remove the tensor store blobs which are no longer referenced by any of the checkpoints in the folder
+
+    Mark-and-sweep garbage collection: the blobs referenced by all the complete sectioned checkpoints found in
+    the folder are kept and the rest are removed. The blobs modified within the grace period are always kept
+    as they could belong to the checkpoint which is still being written.
+
+    Args:
+        checkpoint_dir_path (str): path to the folder containing the checkpoints and their tensor store folder
+        grace_period (float): number of seconds since the last modification during which the blob is never removed
+        before_remove_fn (callable or None): optional function called with the list of blob paths right before
+            they get removed. For example, used to wait for the pending background uploads of these files.
+
+    Returns:
+        list: paths of the removed blobs
+    """
+    tensor_store_path = os.path.join(checkpoint_dir_path, TENSOR_STORE_DIR_NAME)
+    if not os.path.isdir(tensor_store_path):
+        return []
+
+    referenced_blob_names = set()
+    for file_name in os.listdir(checkpoint_dir_path):
+        file_path = os.path.join(checkpoint_dir_path, file_name)
+        if not os.path.isfile(file_path) or not is_sectioned_checkpoint(file_path):
+            continue
+        try:
+            header = read_sectioned_checkpoint_file_header(file_path)
+        except ValueError:
+            # Checkpoint still being written. Its new blobs are protected by the grace period.
+            continue
+        if header.get('tensor_store') == TENSOR_STORE_DIR_NAME:
+            referenced_blob_names.update(get_referenced_blob_names(header))
+
+    current_time = time.time()
+    unreferenced_blob_paths = []
+    for blob_name in os.listdir(tensor_store_path):
+        blob_path = os.path.join(tensor_store_path, blob_name)
+        if blob_name not in referenced_blob_names and current_time - os.path.getmtime(blob_path) > grace_period:
+            unreferenced_blob_paths.append(blob_path)
+
+    if len(unreferenced_blob_paths) > 0:
+        print(f'Removing {len(unreferenced_blob_paths)} unreferenced tensor store blobs')
+        if before_remove_fn is not None:
+            before_remove_fn(unreferenced_blob_paths)
+        for blob_path in unreferenced_blob_paths:
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+
+    return unreferenced_blob_paths
+
+
+def is_sectioned_checkpoint(file_path):
+    """Check if the file is saved in the sectioned checkpoint format
+
+    Args:
+        file_path (str): path to the checkpoint file
+
+    Returns:
+        bool: if the file is a sectioned checkpoint
+    """
+    with open(file_path, 'rb') as f:
+        return f.read(len(SECTIONED_CHECKPOINT_MAGIC)) == SECTIONED_CHECKPOINT_MAGIC
+
+
+def read_sectioned_checkpoint_file_header(file_path):
+    """Read the index header of the sectioned checkpoint file on the local drive
+
+    Args:
+        file_path (str): path to the sectioned checkpoint file
+
+    Returns:
+        dict: checkpoint index header
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(0, io.SEEK_END)
+        return read_sectioned_checkpoint_header(
+            lambda start, end: SectionedCheckpointReader._read_range(f, start, end), f.tell()
+        )
+
+
+def read_sectioned_checkpoint_header(read_range_fn, file_size):
+    """Read the index header of the sectioned checkpoint
+
+    Args:
+        read_range_fn (callable): function which accepts the inclusive start and end byte positions and returns
+            the bytes of the checkpoint file in that range
+        file_size (int): size of the checkpoint file in bytes
+
+    Returns:
+        dict: checkpoint index header
+    """
+    if file_size < len(SECTIONED_CHECKPOINT_MAGIC) + FOOTER_SIZE:
+        raise ValueError('File is too small to be a sectioned checkpoint')
+
+    footer = read_range_fn(file_size - FOOTER_SIZE, file_size - 1)
+    if footer[8:] != SECTIONED_CHECKPOINT_MAGIC:
+        raise ValueError('File is not a complete sectioned checkpoint. The footer is missing.')
+
+    header_size = struct.unpack('<Q', footer[:8])[0]
+    header_start = file_size - FOOTER_SIZE - header_size
+    header = json.loads(bytes(read_range_fn(header_start, header_start + header_size - 1)).decode('utf-8'))
+
+    if header['format_version'] > SECTIONED_CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f'Unsupported sectioned checkpoint format version: {header["format_version"]}')
+    return header
+
+
+def deserialize_section(section_info, buffer, buffer_offset=0, map_location=None, load_blob_fn=None):
+    """Deserialize the checkpoint section from the buffer containing the section bytes
+
+    Args:
+        section_info (dict): section entry from the checkpoint index header
+        buffer: buffer object containing the section bytes, e.g. memory-mapped file or bytearray
+        buffer_offset (int): position in the checkpoint file at which the buffer starts
+        map_location (str or torch.device or dict or callable or None): device to which the loaded tensors are
+            moved, applied the same way as in ``torch.load()``
+        load_blob_fn (callable or None): function which accepts the tensor store blob name and returns the buffer
+            with the blob bytes. Required when the section tensors are stored in the tensor store.
+
+    Returns:
+        deserialized section content
+    """
+    # Each blob is loaded only once per section. Tensors with the same content, e.g. the optimizer step counters,
+    # reference the same blob but still need their own memory as they are later updated in-place independently.
+    blob_buffers = {}
+    loaded_blob_names = set()
+
+    skeleton_start = section_info['skeleton_offset'] - buffer_offset
+    skeleton_bytes = bytes(buffer[skeleton_start:skeleton_start + section_info['skeleton_size']])
+    skeleton = torch.load(io.BytesIO(skeleton_bytes), map_location=map_location)
+
+    tensors = []
+    for tensor_offset, dtype_name, shape, *tensor_options in section_info['tensors']:
+        tensor_options = tensor_options[0] if len(tensor_options) > 0 else {}
+        dtype = getattr(torch, dtype_name)
+        numel = 1
+        for dim_size in shape:
+            numel *= dim_size
+
+        blob_name = tensor_options.get('blob')
+        if blob_name is not None:
+            if blob_name not in blob_buffers:
+                blob_buffers[blob_name] = load_blob_fn(blob_name)
+            data_buffer = blob_buffers[blob_name]
+            data_start, data_size = 0, len(data_buffer)
+        else:
+            data_buffer = buffer
+            data_start, data_size = tensor_offset - buffer_offset, tensor_options.get('nbytes')
+
+        if numel == 0:
+            tensor = torch.empty(shape, dtype=dtype)
+        elif 'compression' in tensor_options:
+            _, decompress_fn = COMPRESSION_METHODS[tensor_options['compression']]
+            tensor_bytes = bytearray(decompress_fn(data_buffer[data_start:data_start + data_size]))
+            tensor = torch.frombuffer(tensor_bytes, dtype=dtype, count=numel).reshape(shape)
+        else:
+            tensor = torch.frombuffer(data_buffer, dtype=dtype, count=numel, offset=data_start).reshape(shape)
+            if blob_name in loaded_blob_names:
+                tensor = tensor.clone()
+            loaded_blob_names.add(blob_name)
+
+        if 'dtype' in tensor_options:
+            tensor = tensor.to(getattr(torch, tensor_options['dtype']))
+
+        tensors.append(apply_map_location(tensor, map_location))
+
+    return restore_tensors(skeleton, tensors)
+
+
+def apply_map_location(tensor, map_location):
+    """Move the loaded tensor to the device given by the ``map_location`` the same way as ``torch.load()`` does
+
+    All the tensors of the sectioned checkpoint are stored from the CPU, so ``'cpu'`` is used as their saved
+    location when ``map_location`` is a dict or a callable.
+
+    Args:
+        tensor (torch.Tensor): tensor loaded on the CPU
+        map_location (str or torch.device or dict or callable or None): the ``torch.load()`` map location
+
+    Returns:
+        torch.Tensor: tensor on the mapped device
+    """
+    if map_location is None:
+        return tensor
+
+    if isinstance(map_location, (str, torch.device)):
+        device = torch.device(map_location)
+    elif isinstance(map_location, dict):
+        device = torch.device(map_location.get('cpu', 'cpu'))
+    elif callable(map_location):
+        storage = tensor.untyped_storage() if hasattr(tensor, 'untyped_storage') else tensor.storage()
+        mapped_storage = map_location(storage, 'cpu')
+        if mapped_storage is None:
+            return tensor
+        device = mapped_storage.device
+    else:
+        raise TypeError(f'Unsupported map_location type: {type(map_location)}. '
+                        'Provide str, torch.device, dict, callable or None.')
+
+    return tensor.to(device) if device.type != 'cpu' else tensor
+
+
+def extract_tensors(obj, tensors):
+    """Replace the dense tensors in the nested structure with the references and collect them in the list
+
+    Args:
+        obj: nested structure of dicts, lists and tuples containing tensors
+        tensors (list): list into which the extracted tensors are appended
+
+    Returns:
+        the structure skeleton with the tensors replaced by the references
+    """
+    if isinstance(obj, torch.Tensor) and obj.layout == torch.strided and not obj.is_quantized:
+        tensors.append(obj)
+        return {TENSOR_REF_KEY: len(tensors) - 1}
+    if isinstance(obj, dict):
+        skeleton = copy.copy(obj)
+        for k, v in obj.items():
+            skeleton[k] = extract_tensors(v, tensors)
+        return skeleton
+    if isinstance(obj, list):
+        return [extract_tensors(el, tensors) for el in obj]
+    if isinstance(obj, tuple):
+        elements = [extract_tensors(el, tensors) for el in obj]
+        return type(obj)(*elements) if hasattr(obj, '_fields') else type(obj)(elements)
+    return obj
+
+
+def restore_tensors(skeleton, tensors):
+    """Replace the tensor references in the skeleton with the actual tensors
+
+    Args:
+        skeleton: nested structure with the tensor references
+        tensors (list): list of tensors referenced from the skeleton
+
+    Returns:
+        the structure with the restored tensors
+    """
+    if isinstance(skeleton, dict):
+        if len(skeleton) == 1 and TENSOR_REF_KEY in skeleton:
+            return tensors[skeleton[TENSOR_REF_KEY]]
+        for k, v in skeleton.items():
+            skeleton[k] = restore_tensors(v, tensors)
+        return skeleton
+    if isinstance(skeleton, list):
+        return [restore_tensors(el, tensors) for el in skeleton]
+    if isinstance(skeleton, tuple):
+        elements = [restore_tensors(el, tensors) for el in skeleton]
+        return type(skeleton)(*elements) if hasattr(skeleton, '_fields') else type(skeleton)(elements)
+    return skeleton
+
+
+def get_dtype_name(dtype):
+    return str(dtype).replace('torch.', '')
+
+
+def tensor_to_bytes(tensor):
+    """Get the raw bytes of the tensor data without copying when possible
+
+    Args:
+        tensor (torch.Tensor): dense tensor
+
+    Returns:
+        memoryview or None: tensor bytes or None for the empty tensor
+    """
+    if tensor.numel() == 0:
+        return None
+
+    tensor = tensor.detach().cpu()
+    if tensor.is_conj():
+        tensor = tensor.resolve_conj()
+    if tensor.is_neg():
+        tensor = tensor.resolve_neg()
+    tensor = tensor.contiguous()
+
+    return memoryview(tensor.reshape(-1).view(torch.uint8).numpy())
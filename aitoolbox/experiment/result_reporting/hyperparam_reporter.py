@@ -2,7 +2,7 @@ import os
 import shutil
 
 from aitoolbox.experiment.local_save.folder_create import ExperimentFolder as FolderCreator
-from aitoolbox.utils.file_system import zip_folder
+from aitoolbox.experiment.result_reporting.source_snapshot import SourceSnapshot
 from aitoolbox.cloud.AWS.model_save import BaseModelSaver
 from aitoolbox.cloud.AWS.results_save import BaseResultsSaver
 from aitoolbox.cloud.GoogleCloud.model_save import BaseModelGoogleStorageSaver
@@ -69,6 +69,30 @@ class HyperParamSourceReporter:
 
         return cloud_file_path
 
+    def copy_files_to_cloud_storage(self, local_file_paths, cloud_saver, bundler=None):
+        """Copy multiple saved local files, such as the hyperparams file and the source code snapshot, into cloud storage
+
+        Args:
+            local_file_paths (list): paths to the files stored on local disk. Files are uploaded under their file names.
+            cloud_saver (BaseModelSaver or BaseResultsSaver or BaseModelGoogleStorageSaver or BaseResultsGoogleStorageSaver):
+            bundler (aitoolbox.cloud.bundle.ArtifactBundler or None): if provided, the small files are packed into
+                the single ``hyperparams_source_bundle.zip`` archive uploaded with one request
+
+        Returns:
+            list: paths where the files were saved in the cloud storage
+        """
+        cloud_folder_path = cloud_saver \
+            .create_experiment_cloud_storage_folder_structure(self.project_name, self.experiment_name,
+                                                              self.experiment_timestamp).rsplit('/', 1)[0]
+
+        file_paths = [[local_file_path, os.path.join(cloud_folder_path, os.path.basename(local_file_path))]
+                      for local_file_path in local_file_paths]
+        if bundler is not None:
+            return bundler.save_files(file_paths, os.path.join(cloud_folder_path, 'hyperparams_source_bundle.zip'))
+
+        cloud_saver.save_files(file_paths)
+        return [cloud_file_path for _, cloud_file_path in file_paths]
+
     def save_experiment_python_file(self, hyperparams):
         """Saves the python experiment file to the project folder
 
@@ -100,6 +124,13 @@ class HyperParamSourceReporter:
     def save_experiment_source_files(self, hyperparams):
         """Saves all the experiment source files into single source code zip
 
+        The source files are streamed directly into the zip archive without copying the source folders. By default,
+        the files ignored by ``.gitignore``, the version control, cache and virtual environment directories and
+        the large files are skipped. The snapshot can be configured by providing the ``SourceSnapshot``
+        initialization parameters as a dict under the `source_snapshot` key in the hyperparams. For example,
+        ``{'skip_data': True}`` also skips the data and model checkpoint directories and files, while
+        ``{'git_diff_only': True}`` only records the current git commit, the uncommitted diff and the untracked files.
+
         Args:
             hyperparams (dict): hyper-parameters listed in the dict. In order for this function to work, the dict needs
                 to include `source_dirs_paths` key.
@@ -109,15 +140,6 @@ class HyperParamSourceReporter:
         """
         if 'source_dirs_paths' in hyperparams and \
                 type(hyperparams['source_dirs_paths']) in [list, tuple] and len(hyperparams['source_dirs_paths']) > 0:
-            src_dir_in_project_dir = os.path.join(self.experiment_dir_path, 'source_code')
-            os.mkdir(src_dir_in_project_dir)
-
-            for src_dir_path in hyperparams['source_dirs_paths']:
-                src_dir_path = os.path.expanduser(src_dir_path)
-                destination_file_path = os.path.join(src_dir_in_project_dir, os.path.basename(src_dir_path))
-                shutil.copytree(src_dir_path, destination_file_path)
-
-            zip_path = zip_folder(src_dir_in_project_dir, src_dir_in_project_dir)
-            shutil.rmtree(src_dir_in_project_dir)
-
-            return zip_path
+            source_snapshot = SourceSnapshot(**hyperparams.get('source_snapshot', {}))
+            return source_snapshot.save_zip(hyperparams['source_dirs_paths'],
+                                            os.path.join(self.experiment_dir_path, 'source_code.zip'))
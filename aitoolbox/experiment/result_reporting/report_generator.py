@@ -194,7 +194,9 @@ class GradientPlotter:
         """Plot all the gradient distributions for the layers in the model
 
         Args:
-            model_layer_gradients (list): list of model's gradients
+            model_layer_gradients (list): list of model's gradients or of the per-layer gradient stats dicts with
+                precomputed histograms as returned by the
+                :class:`aitoolbox.torchtrain.callbacks.gradient.GradientStatsCalculator`
             grad_plots_folder_name (str): name of the folder where gradient distribution plots will be saved
             file_format (str): output file format. Can be either 'png' for saving separate images or 'pdf' for combining
                 all the plots into a single pdf file.
@@ -257,7 +259,8 @@ class GradientPlotter:
         """Plot and save to file the distribution of the single layer's gradients
 
         Args:
-            gradients (list or np.array): a flattened list  of gradients from a single layer
+            gradients (list or np.array or dict): a flattened list  of gradients from a single layer or the gradient
+                stats dict with the precomputed histogram ('hist' and 'bin_edges') and the 'mean' and 'std' stats
             layer_name (str or int): name or index of the layer
 
         Returns:
@@ -266,15 +269,23 @@ class GradientPlotter:
         fig = plt.figure()
         fig.set_size_inches(10, 8)
 
-        ax = sns.distplot(gradients)
+        if isinstance(gradients, dict):
+            bin_edges = gradients['bin_edges']
+            ax = fig.gca()
+            ax.bar(bin_edges[:-1], gradients['hist'], width=np.diff(bin_edges), align='edge')
+            grad_mean, grad_std = gradients['mean'], gradients['std']
+        else:
+            ax = sns.distplot(gradients)
+            grad_mean, grad_std = np.mean(gradients), np.std(gradients)
+
         ax.set_xlabel("Gradient magnitude", size=10)
 
         # Adding plot title and subtitles
         ax.text(s=f'Gradient distribution for layer {layer_name}',
                 x=0.5, y=1.07, fontsize=16, weight='bold', ha='center', va='bottom', transform=ax.transAxes)
-        ax.text(s=f'Mean: {np.mean(gradients)}',
+        ax.text(s=f'Mean: {grad_mean}',
                 x=0.5, y=1.035, fontsize=8, alpha=0.75, ha='center', va='bottom', transform=ax.transAxes)
-        ax.text(s=f'Std: {np.std(gradients)}',
+        ax.text(s=f'Std: {grad_std}',
                 x=0.5, y=1.01, fontsize=8, alpha=0.75,
                 ha='center', va='bottom', transform=ax.transAxes)
 
@@ -0,0 +1,308 @@
+import os
+import json
+import fnmatch
+import zipfile
+import warnings
+import subprocess
+
+from aitoolbox.utils.file_system import atomic_write_path
+
+DEFAULT_SKIPPED_DIR_NAMES = (
+    '.git', '.hg', '.svn', '__pycache__', '.ipynb_checkpoints', '.pytest_cache', '.mypy_cache', '.tox',
+    '.venv', 'venv', '.idea', '.vscode'
+)
+DEFAULT_EXCLUDED_FILE_PATTERNS = ('*.pyc', '*.pyo', '.DS_Store')
+
+# Only skipped when explicitly enabled as these names can just as well be the source packages of the project
+DATA_SKIPPED_DIR_NAMES = (
+    'data', 'datasets', 'checkpoint_model', 'checkpoints', 'model', 'results', 'wandb', 'runs', 'tensorboard'
+)
+DATA_EXCLUDED_FILE_PATTERNS = (
+    '*.pth', '*.pt', '*.ckpt', '*.h5', '*.npy', '*.npz', '*.pkl', '*.pickle',
+    '*.zip', '*.tar', '*.tar.gz', '*.tgz', '*.gz', '*.log'
+)
+
+
+class SourceSnapshot:
+    def __init__(self, include_patterns=('*',), exclude_patterns=DEFAULT_EXCLUDED_FILE_PATTERNS,
+                 skipped_dir_names=DEFAULT_SKIPPED_DIR_NAMES,
+                 max_file_size=5 * 1024 ** 2, max_total_size=100 * 1024 ** 2,
+                 respect_gitignore=True, git_diff_only=False, skip_data=False):
+        """Snapshot of the experiment source code streamed directly into the zip archive
+
+        Files are added one by one into the zip without making any intermediate copy of the source folders.
+        When the source folder is inside the git working tree, the files ignored by ``.gitignore`` are found with
+        git itself. Otherwise, the ``.gitignore`` files found in the source folder are parsed with the common
+        subset of the gitignore pattern rules.
+
+        Args:
+            include_patterns (list or tuple): glob patterns of the included files, matched against the file path
+                relative to the source folder as well as against the file name
+            exclude_patterns (list or tuple): glob patterns of the excluded files, matched the same way as
+                the ``include_patterns``
+            skipped_dir_names (list or tuple): names of the directories which are skipped completely. By default,
+                only the version control, cache and virtual environment directories are skipped.
+            max_file_size (int or None): files larger than this number of bytes are skipped with a warning
+            max_total_size (int or None): once the total size of the added files would exceed this number of bytes,
+                the remaining files are skipped with a warning
+            respect_gitignore (bool): skip the files ignored by the ``.gitignore`` rules
+            git_diff_only (bool): if the source folder is inside the git working tree, record only the current
+                commit, the diff of the uncommitted changes against it and the untracked files instead of all
+                the source files
+            skip_data (bool): additionally skip the usual data, model checkpoint and experiment results directories
+                (``DATA_SKIPPED_DIR_NAMES``) and the data, model and archive files (``DATA_EXCLUDED_FILE_PATTERNS``)
+        """
+        self.include_patterns = include_patterns
+        self.exclude_patterns = tuple(exclude_patterns) + (DATA_EXCLUDED_FILE_PATTERNS if skip_data else ())
+        self.skipped_dir_names = set(skipped_dir_names) | (set(DATA_SKIPPED_DIR_NAMES) if skip_data else set())
+        self.max_file_size = max_file_size
+        self.max_total_size = max_total_size
+        self.respect_gitignore = respect_gitignore
+        self.git_diff_only = git_diff_only
+
+    def save_zip(self, source_dir_paths, zip_path):
+        """Stream the source files of all the source folders into the zip archive
+
+        Every source folder is stored in the archive under the folder named after its base name.
+
+        Args:
+            source_dir_paths (list or tuple): paths of the source code folders
+            zip_path (str): path of the created zip file
+
+        Returns:
+            str: path to the created zip file
+        """
+        zip_path = os.path.abspath(os.path.expanduser(zip_path))
+        total_size = 0
+        skipped_file_paths = []
+
+        with atomic_write_path(zip_path) as tmp_zip_path:
+            with zipfile.ZipFile(tmp_zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zip_f:
+                for source_dir_path in source_dir_paths:
+                    source_dir_path = os.path.abspath(os.path.expanduser(source_dir_path))
+                    archive_dir_name = os.path.basename(source_dir_path)
+                    git_commit = self.get_git_commit(source_dir_path)
+
+                    if self.git_diff_only and git_commit is not None:
+                        self.write_git_info(zip_f, source_dir_path, archive_dir_name, git_commit)
+                        file_rel_paths = self.list_git_files(source_dir_path, untracked_only=True)
+                    elif self.respect_gitignore and git_commit is not None:
+                        file_rel_paths = self.list_git_files(source_dir_path)
+                    else:
+                        file_rel_paths = self.list_files(source_dir_path)
+
+                    for file_rel_path in file_rel_paths:
+                        file_path = os.path.join(source_dir_path, file_rel_path)
+                        # Don't include the snapshot itself when it is created inside the source folder
+                        if not os.path.isfile(file_path) or \
+                                os.path.abspath(file_path) in (zip_path, os.path.abspath(tmp_zip_path)) or \
+                                not self.is_file_selected(file_rel_path):
+                            continue
+
+                        file_size = os.path.getsize(file_path)
+                        if (self.max_file_size is not None and file_size > self.max_file_size) or \
+                                (self.max_total_size is not None and total_size + file_size > self.max_total_size):
+                            skipped_file_paths.append(file_path)
+                            continue
+
+                        zip_f.write(file_path, arcname=os.path.join(archive_dir_name, file_rel_path))
+                        total_size += file_size
+
+        if len(skipped_file_paths) > 0:
+            warnings.warn(f'Source snapshot size limits exceeded. Skipped {len(skipped_file_paths)} files: '
+                          f'{skipped_file_paths[:10]}{" ..." if len(skipped_file_paths) > 10 else ""}')
+
+        return zip_path
+
+    def is_file_selected(self, file_rel_path):
+        """Check the file against the include and exclude patterns and the skipped directory names
+
+        Args:
+            file_rel_path (str): file path relative to the source folder
+
+        Returns:
+            bool: if the file should be included in the snapshot
+        """
+        path_parts = file_rel_path.replace(os.sep, '/').split('/')
+        if any(dir_name in self.skipped_dir_names for dir_name in path_parts[:-1]):
+            return False
+
+        return self._matches_any(file_rel_path, self.include_patterns) and \
+            not self._matches_any(file_rel_path, self.exclude_patterns)
+
+    @staticmethod
+    def _matches_any(file_rel_path, patterns):
+        file_name = os.path.basename(file_rel_path)
+        return any(fnmatch.fnmatch(file_rel_path, pattern) or fnmatch.fnmatch(file_name, pattern)
+                   for pattern in patterns)
+
+    def list_files(self, source_dir_path):
+        """List the source files by walking the folder without the git
+
+        Args:
+            source_dir_path (str): path of the source folder
+
+        Returns:
+            list: file paths relative to the source folder
+        """
+        file_rel_paths = []
+        gitignore_rules = {}
+
+        for dir_path, dir_names, file_names in os.walk(source_dir_path):
+            dir_rel_path = os.path.relpath(dir_path, source_dir_path)
+            dir_rel_path = '' if dir_rel_path == '.' else dir_rel_path
+
+            if self.respect_gitignore and os.path.isfile(os.path.join(dir_path, '.gitignore')):
+                gitignore_rules[dir_rel_path] = GitignoreRules.from_file(os.path.join(dir_path, '.gitignore'))
+
+            # Pruning dir_names in-place prevents os.walk() from descending into the skipped directories
+            dir_names[:] = sorted(
+                dir_name for dir_name in dir_names
+                if dir_name not in self.skipped_dir_names and
+                not self._is_gitignored(os.path.join(dir_rel_path, dir_name), True, gitignore_rules)
+            )
+            file_rel_paths += [
+                os.path.join(dir_rel_path, file_name) for file_name in sorted(file_names)
+                if not self._is_gitignored(os.path.join(dir_rel_path, file_name), False, gitignore_rules)
+            ]
+
+        return file_rel_paths
+
+    @staticmethod
+    def _is_gitignored(rel_path, is_dir, gitignore_rules):
+        ignored = False
+        # Rules from the deeper .gitignore files take precedence
+        for rules_dir_rel_path in sorted(gitignore_rules, key=len):
+            if rules_dir_rel_path == '' or rel_path.startswith(rules_dir_rel_path + os.sep):
+                path_in_rules_dir = os.path.relpath(rel_path, rules_dir_rel_path or '.')
+                rule_decision = gitignore_rules[rules_dir_rel_path].is_ignored(path_in_rules_dir, is_dir)
+                if rule_decision is not None:
+                    ignored = rule_decision
+        return ignored
+
+    @staticmethod
+    def list_git_files(source_dir_path, untracked_only=False):
+        """List the source files not ignored by the git
+
+        Args:
+            source_dir_path (str): path of the source folder inside the git working tree
+            untracked_only (bool): list only the untracked files which are not ignored
+
+        Returns:
+            list: file paths relative to the source folder
+        """
+        git_cmd = ['ls-files', '--others', '--exclude-standard', '-z']
+        if not untracked_only:
+            git_cmd.append('--cached')
+
+        git_output = run_git(git_cmd, source_dir_path)
+        return sorted(set(el for el in git_output.split('\0') if el != ''))
+
+    @staticmethod
+    def get_git_commit(source_dir_path):
+        """Get the current git commit of the source folder
+
+        Args:
+            source_dir_path (str): path of the source folder
+
+        Returns:
+            str or None: commit hash or ``None`` if the folder is not inside the git working tree with any commit
+        """
+        try:
+            return run_git(['rev-parse', 'HEAD'], source_dir_path).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def write_git_info(zip_f, source_dir_path, archive_dir_name, git_commit):
+        """Write the current commit and the diff of the uncommitted changes into the zip archive
+
+        Args:
+            zip_f (zipfile.ZipFile): opened zip archive
+            source_dir_path (str): path of the source folder inside the git working tree
+            archive_dir_name (str): folder name inside the archive
+            git_commit (str): current commit hash
+
+        Returns:
+            None
+        """
+        git_info = {
+            'commit': git_commit,
+            'branch': run_git(['rev-parse', '--abbrev-ref', 'HEAD'], source_dir_path).strip(),
+            'source_dir_in_repo': run_git(['rev-parse', '--show-prefix'], source_dir_path).strip()
+        }
+        zip_f.writestr(os.path.join(archive_dir_name, 'git_info.json'), json.dumps(git_info, indent=4))
+        # Diff of the staged and unstaged changes of the tracked files restricted to the source folder
+        zip_f.writestr(os.path.join(archive_dir_name, 'git_diff.patch'),
+                       run_git(['diff', '--binary', 'HEAD', '--', '.'], source_dir_path))
+
+
+class GitignoreRules:
+    def __init__(self, patterns):
+        """Common subset of the gitignore pattern rules
+
+        Supported are the comments, negated patterns, directory only patterns with the trailing slash and
+        patterns anchored to the ``.gitignore`` folder with the leading or the middle slash. The wildcards are
+        matched with the ``fnmatch``.
+
+        Args:
+            patterns (list): lines of the ``.gitignore`` file
+        """
+        self.rules = []
+
+        for pattern in patterns:
+            pattern = pattern.rstrip('\n').rstrip()
+            if pattern == '' or pattern.startswith('#'):
+                continue
+
+            negated = pattern.startswith('!')
+            pattern = pattern[1:] if negated else pattern
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            anchored = '/' in pattern
+            pattern = pattern.lstrip('/')
+            if pattern.startswith('**/'):
+                pattern, anchored = pattern[3:], False
+
+            self.rules.append((pattern, negated, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, gitignore_path):
+        with open(gitignore_path) as f:
+            return cls(f.readlines())
+
+    def is_ignored(self, rel_path, is_dir):
+        """Match the path against the rules
+
+        Args:
+            rel_path (str): path relative to the ``.gitignore`` folder
+            is_dir (bool): if the path is a directory
+
+        Returns:
+            bool or None: ignore decision of the last matching rule or ``None`` if no rule matches
+        """
+        rel_path = rel_path.replace(os.sep, '/')
+        decision = None
+
+        for pattern, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            path_to_match = rel_path if anchored else rel_path.rsplit('/', 1)[-1]
+            if fnmatch.fnmatch(path_to_match, pattern):
+                decision = not negated
+
+        return decision
+
+
+def run_git(git_args, cwd):
+    """Run the git command and return its standard output
+
+    Args:
+        git_args (list): git command arguments
+        cwd (str): folder in which the command is executed
+
+    Returns:
+        str: decoded standard output
+    """
+    return subprocess.run(['git'] + git_args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          check=True).stdout.decode('utf-8', errors='replace')
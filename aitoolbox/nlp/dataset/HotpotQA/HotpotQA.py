@@ -11,7 +11,7 @@ from aitoolbox.cloud.AWS.data_access import HotpotQADatasetFetcher
 """
 
 
-def get_dataset_local_copy(local_dataset_folder_path, protect_local_folder=True):
+def get_dataset_local_copy(local_dataset_folder_path, protect_local_folder=True, members=None):
     """Interface method for getting a local copy of HotpotQA dataset
 
     If a local copy is not found, dataset is automatically downloaded from S3.
@@ -19,9 +19,10 @@ def get_dataset_local_copy(local_dataset_folder_path, protect_local_folder=True)
     Args:
         local_dataset_folder_path (str):
         protect_local_folder (bool):
+        members (list or None): optional list of glob patterns selecting which archive members are extracted
 
     Returns:
         None
     """
     dataset_fetcher = HotpotQADatasetFetcher(bucket_name='dataset-store', local_dataset_folder_path=local_dataset_folder_path)
-    dataset_fetcher.fetch_dataset(protect_local_folder=protect_local_folder)
+    dataset_fetcher.fetch_dataset(protect_local_folder=protect_local_folder, members=members)
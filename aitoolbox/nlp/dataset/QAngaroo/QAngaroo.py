@@ -1,7 +1,7 @@
 from aitoolbox.cloud.AWS.data_access import QAngarooDatasetFetcher
 
 
-def get_dataset_local_copy(local_dataset_folder_path, dataset_name=None, protect_local_folder=True):
+def get_dataset_local_copy(local_dataset_folder_path, dataset_name=None, protect_local_folder=True, members=None):
     """Interface method for getting a local copy of QAngaroo dataset
 
     If a local copy is not found, dataset is automatically downloaded from S3.
@@ -10,10 +10,11 @@ def get_dataset_local_copy(local_dataset_folder_path, dataset_name=None, protect
         local_dataset_folder_path (str):
         dataset_name (str or None): possible options: medhop, wikihop or None
         protect_local_folder (bool):
+        members (list or None): optional list of glob patterns selecting which archive members are extracted
 
     Returns:
         None
 
     """
     dataset_fetcher = QAngarooDatasetFetcher(bucket_name='dataset-store', local_dataset_folder_path=local_dataset_folder_path)
-    dataset_fetcher.fetch_dataset(dataset_name=dataset_name, protect_local_folder=protect_local_folder)
+    dataset_fetcher.fetch_dataset(dataset_name=dataset_name, protect_local_folder=protect_local_folder, members=members)
@@ -1,4 +1,5 @@
 import os
+import time
 import numpy as np
 
 from aitoolbox.torchtrain.callbacks.abstract import AbstractCallback, AbstractExperimentCallback
@@ -259,15 +260,30 @@ class EmailNotification(AbstractCallback):
 
 class LogUpload(AbstractExperimentCallback):
     def __init__(self, log_file_path='~/project/training.log', fail_if_cloud_missing=True,
+                 incremental_upload=False, flush_interval=None,
                  project_name=None, experiment_name=None, local_model_result_folder_path=None,
                  cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None):
         """Upload logging file to the cloud storage
 
         Uploading happens after each epoch and at the end of the training process.
 
+        With the incremental upload, instead of repeatedly uploading the whole growing log file, only the newly
+        written complete lines since the last upload are uploaded as the numbered segment files into the
+        ``<log_filename>_segments`` cloud folder. At the end of the training the segments are concatenated into
+        the full log file server-side on Google Cloud Storage and the segment files are deleted. On AWS S3, where
+        the small objects can't be concatenated server-side, the segments are kept and can be concatenated at
+        download time with ``BaseDataLoader.load_file_segments()``. When the log file shrinks because it was
+        truncated or rotated, the already uploaded segments are deleted and the upload starts from the beginning
+        of the new log file.
+
         Args:
             log_file_path (str): path to the local logging file
             fail_if_cloud_missing (bool): should throw the exception if cloud saving is not available
+            incremental_upload (bool): upload only the newly appended log content as the numbered segment files
+            flush_interval (float or None): with the incremental upload, additionally upload the new log content
+                at the end of the training batch once this number of seconds has passed since the last upload.
+                If left to ``None`` the log content is uploaded only after each epoch and at the end of
+                the training.
             project_name (str or None): root name of the project
             experiment_name (str or None): name of the particular experiment
             local_model_result_folder_path (str or None): root local path where project folder will be created
@@ -282,11 +298,20 @@ class LogUpload(AbstractExperimentCallback):
                                             project_name, experiment_name, local_model_result_folder_path,
                                             cloud_save_mode, bucket_name, cloud_dir_prefix,
                                             execution_order=1500, device_idx_execution=0)
+        if flush_interval is not None and not incremental_upload:
+            raise ValueError('flush_interval is supported only together with the incremental_upload.')
+
         self.log_file_path = os.path.expanduser(log_file_path)
         self.log_filename = os.path.basename(self.log_file_path)
         self.fail_if_cloud_missing = fail_if_cloud_missing
+        self.incremental_upload = incremental_upload
+        self.flush_interval = flush_interval
 
         self.cloud_saver = None
+        self.uploaded_offset = 0
+        self.uploaded_segment_paths = []
+        self.log_composed = False
+        self.last_upload_time = time.monotonic()
 
     def on_train_loop_registration(self):
         self.try_infer_experiment_details(infer_cloud_details=True)
@@ -303,21 +328,90 @@ class LogUpload(AbstractExperimentCallback):
                                  "instance termination.")
             print("Cloud saving not supported. Produced logs can potentially get lost.")
 
+    def on_batch_end(self):
+        if self.flush_interval is not None and time.monotonic() - self.last_upload_time >= self.flush_interval:
+            self.upload_log_file()
+
     def on_epoch_end(self):
         self.upload_log_file()
 
     def on_train_end(self):
-        self.upload_log_file()
+        self.upload_log_file(final_upload=True)
+
+    def upload_log_file(self, final_upload=False):
+        """Upload the log file or with the incremental upload only its new content to the cloud storage
+
+        Args:
+            final_upload (bool): upload also the last incomplete line and with the incremental upload on Google
+                Cloud Storage compose the uploaded segments into the full log file
+
+        Returns:
+            None
+        """
+        if self.cloud_saver is None:
+            return
 
-    def upload_log_file(self):
         experiment_results_cloud_path = \
             self.cloud_saver.create_experiment_cloud_storage_folder_structure(self.project_name,
                                                                               self.experiment_name,
                                                                               self.train_loop_obj.experiment_timestamp)
         experiment_cloud_path = os.path.dirname(experiment_results_cloud_path)
+        log_cloud_path = os.path.join(experiment_cloud_path, self.log_filename)
+        self.last_upload_time = time.monotonic()
+
+        if not self.incremental_upload:
+            self.cloud_saver.save_file(local_file_path=self.log_file_path, cloud_file_path=log_cloud_path)
+            return
+
+        self.upload_new_log_segment(f'{log_cloud_path}_segments', include_incomplete_line=final_upload)
+
+        if final_upload and hasattr(self.cloud_saver, 'compose_files') and len(self.uploaded_segment_paths) > 0:
+            # Log composed at the previous final upload is extended with the new segments
+            compose_file_paths = ([log_cloud_path] if self.log_composed else []) + self.uploaded_segment_paths
+            self.cloud_saver.compose_files(compose_file_paths, log_cloud_path)
+            self.cloud_saver.delete_files(self.uploaded_segment_paths)
+            self.uploaded_segment_paths = []
+            self.log_composed = True
+
+    def upload_new_log_segment(self, segments_cloud_dir_path, include_incomplete_line=False):
+        """Upload the log content written since the last upload as the next numbered segment file
 
-        self.cloud_saver.save_file(local_file_path=self.log_file_path,
-                                   cloud_file_path=os.path.join(experiment_cloud_path, self.log_filename))
+        Args:
+            segments_cloud_dir_path (str): cloud folder path where the segment files are uploaded
+            include_incomplete_line (bool): upload also the last line which doesn't yet end with the newline
+
+        Returns:
+            str or None: cloud path of the uploaded segment or ``None`` if there was no new log content
+        """
+        if not os.path.isfile(self.log_file_path):
+            return None
+
+        # Log file was truncated or replaced with the new file since the last upload. Segments of the old log
+        # are deleted so that they don't end up concatenated in front of the new log content.
+        if os.path.getsize(self.log_file_path) < self.uploaded_offset:
+            print('Log file has shrunk since the last upload. Uploading it again from the beginning.')
+            if len(self.uploaded_segment_paths) > 0:
+                self.cloud_saver.delete_files(self.uploaded_segment_paths)
+            self.uploaded_segment_paths = []
+            self.log_composed = False
+            self.uploaded_offset = 0
+
+        with open(self.log_file_path, 'rb') as f:
+            f.seek(self.uploaded_offset)
+            new_content = f.read()
+
+        # Keep the partially written last line for the next upload
+        if not include_incomplete_line:
+            new_content = new_content[:new_content.rfind(b'\n') + 1]
+        if len(new_content) == 0:
+            return None
+
+        segment_cloud_path = os.path.join(segments_cloud_dir_path,
+                                          f'{self.log_filename}.{len(self.uploaded_segment_paths):06d}')
+        self.cloud_saver.save_bytes(new_content, segment_cloud_path)
+        self.uploaded_offset += len(new_content)
+        self.uploaded_segment_paths.append(segment_cloud_path)
+        return segment_cloud_path
 
 
 class DataSubsetTestRun(AbstractCallback):
@@ -1,4 +1,5 @@
 import os
+import inspect
 import numpy as np
 import torch
 
@@ -11,6 +12,9 @@ from aitoolbox.cloud.GoogleCloud.results_save import BaseResultsGoogleStorageSav
 from aitoolbox.cloud import s3_available_options, gcs_available_options
 
 
+CLIP_FOREACH_SUPPORTED = 'foreach' in inspect.signature(torch.nn.utils.clip_grad_norm_).parameters
+
+
 class GradientCallbackBase(AbstractCallback):
     def __init__(self, callback_name, execution_order=0):
         """Base abstract class for gradient related callbacks
@@ -29,11 +33,61 @@ class GradientCallbackBase(AbstractCallback):
     def on_train_loop_registration(self):
         self.train_loop_obj.grad_cb_used = True
 
+    def get_optimizer(self, optimizer_idx):
+        """Get the optimizer which is going to be stepped for the provided optimizer index
+
+        Args:
+            optimizer_idx (int): index of the current optimizer. Relevant when using MultiOptimizer
+
+        Returns:
+            torch.optim.Optimizer: optimizer
+        """
+        optimizer = self.train_loop_obj.optimizer
+        if isinstance(optimizer, MultiOptimizer):
+            optimizer = optimizer[optimizer_idx]
+        return optimizer
+
+    def unscale_optimizer_gradients(self, optimizer):
+        """Unscale the AMP scaled gradients of the optimizer's assigned params in-place
+
+        Following: https://pytorch.org/docs/stable/notes/amp_examples.html#gradient-clipping
+
+        The gradients are unscaled only once per optimizer step even when multiple gradient callbacks request it.
+        The already unscaled optimizers are tracked in the TrainLoop until the AMP scaler is updated at the end
+        of the iteration. When AMP is not used this is a no-op.
+
+        Args:
+            optimizer (torch.optim.Optimizer): optimizer whose gradients are unscaled
+
+        Returns:
+            None
+        """
+        amp_scaler = self.train_loop_obj.amp_scaler
+        if amp_scaler.is_enabled() and id(optimizer) not in self.train_loop_obj.amp_unscaled_optimizer_ids:
+            amp_scaler.unscale_(optimizer)
+            self.train_loop_obj.amp_unscaled_optimizer_ids.add(id(optimizer))
+
+    @staticmethod
+    def get_optimizer_parameters(optimizer):
+        """Get all the parameters with gradients assigned to the optimizer's param groups
+
+        Args:
+            optimizer (torch.optim.Optimizer): optimizer
+
+        Returns:
+            list: list of parameters
+        """
+        return [param for param_group in optimizer.param_groups for param in param_group['params']
+                if param.grad is not None]
+
 
 class GradValueClip(GradientCallbackBase):
     def __init__(self, max_grad_value):
         """Gradient value clipping
 
+        Only the parameters assigned to the currently stepped optimizer are clipped. When available, the fused
+        foreach clipping implementation is used.
+
         Args:
             max_grad_value (int or float): maximum allowed value of the gradients
         """
@@ -42,21 +96,22 @@ class GradValueClip(GradientCallbackBase):
 
     def on_after_gradient_update(self, optimizer_idx):
         if (self.train_loop_obj.iteration + 1) % self.train_loop_obj.grad_accumulation == 0:
-            optimizer = self.train_loop_obj.optimizer
-            if isinstance(optimizer, MultiOptimizer):
-                optimizer = optimizer[optimizer_idx]
-
-            # Unscales the gradients of optimizer's assigned params in-place
-            # Following: https://pytorch.org/docs/stable/notes/amp_examples.html#gradient-clipping
-            self.train_loop_obj.amp_scaler.unscale_(optimizer)
+            optimizer = self.get_optimizer(optimizer_idx)
+            self.unscale_optimizer_gradients(optimizer)
 
-            torch.nn.utils.clip_grad_value_(self.train_loop_obj.model.parameters(), self.max_grad_value)
+            foreach_kwargs = {'foreach': True} if CLIP_FOREACH_SUPPORTED else {}
+            torch.nn.utils.clip_grad_value_(self.get_optimizer_parameters(optimizer), self.max_grad_value,
+                                            **foreach_kwargs)
 
 
 class GradNormClip(GradientCallbackBase):
     def __init__(self, max_grad_norm, **kwargs):
         """Gradient norm clipping
 
+        Only the parameters assigned to the currently stepped optimizer are clipped. When available, the fused
+        foreach clipping implementation is used. The calculated total gradient norm for each of the optimizers is kept
+        as a device tensor in ``self.total_norms`` in order to avoid the host synchronization.
+
         Args:
             max_grad_norm (int or float): max norm of the gradients
             **kwargs: torch.nn.utils.clip_grad_norm_ additional arguemnts
@@ -64,24 +119,148 @@ class GradNormClip(GradientCallbackBase):
         GradientCallbackBase.__init__(self, 'Gradient norm clipping')
         self.max_grad_norm = max_grad_norm
         self.kwargs = kwargs
+        if CLIP_FOREACH_SUPPORTED and 'foreach' not in self.kwargs:
+            self.kwargs['foreach'] = True
+
+        self.total_norms = {}
 
     def on_after_gradient_update(self, optimizer_idx):
         if (self.train_loop_obj.iteration + 1) % self.train_loop_obj.grad_accumulation == 0:
-            optimizer = self.train_loop_obj.optimizer
-            if isinstance(optimizer, MultiOptimizer):
-                optimizer = optimizer[optimizer_idx]
+            optimizer = self.get_optimizer(optimizer_idx)
+            self.unscale_optimizer_gradients(optimizer)
+
+            self.total_norms[optimizer_idx] = torch.nn.utils.clip_grad_norm_(
+                self.get_optimizer_parameters(optimizer), self.max_grad_norm, **self.kwargs
+            )
+
+
+class GradientStatsCalculator:
+    stats_names = ['norm', 'mean', 'std', 'zero_ratio', 'min', 'max', 'sum', 'sum_squares', 'num']
+
+    def __init__(self, num_bins=50, subsample_size=None):
+        """On-device gradient statistics calculator
+
+        All the statistics and histograms are calculated on the device where the gradients reside with only
+        the small summary tensors being moved to the CPU in a single transfer at the end. Consequently, there is no need
+        to copy the full gradient tensors to the host memory, which is prohibitively expensive for large models.
+
+        Args:
+            num_bins (int): number of fixed-width histogram bins spanning the [min, max] range of each layer's gradients
+            subsample_size (int or None): if provided, the histograms are built from a random subsample of at most this
+                many gradient values per layer. The subsample histogram counts are scaled up to the total number of
+                the layer's gradient values so that they stay consistent with the ``num``, ``sum`` and
+                ``sum_squares`` stats. Norm, mean, std, zero ratio, min and max are always calculated from
+                the full gradients.
+        """
+        if num_bins < 1:
+            raise ValueError(f'num_bins should be at least 1. Provided: {num_bins}')
+        if subsample_size is not None and subsample_size < 1:
+            raise ValueError(f'subsample_size should be at least 1. Provided: {subsample_size}')
+
+        self.num_bins = num_bins
+        self.subsample_size = subsample_size
+
+    def calculate(self, gradients):
+        """Calculate gradient statistics and histograms for each of the provided gradient tensors
+
+        Args:
+            gradients (list): list of gradient tensors. Elements can also be ``None`` for layers without gradients.
+
+        Returns:
+            list: list of the same length as the input gradients list. Each element is a dict with gradient stats
+            (norm, mean, std, zero_ratio, min, max, sum, sum_squares, num, hist and bin_edges) or ``None``
+            if the corresponding gradients were ``None``.
+        """
+        grads_idx = [i for i, grad in enumerate(gradients) if grad is not None]
+        layers_stats = [None] * len(gradients)
+        if len(grads_idx) == 0:
+            return layers_stats
+
+        grads = [gradients[i].detach().reshape(-1).float() for i in grads_idx]
+        device = grads[0].device
+
+        if hasattr(torch, '_foreach_norm'):
+            norms = torch._foreach_norm(grads)
+        else:
+            norms = [torch.norm(grad) for grad in grads]
+
+        stats_list = []
+        hist_list = []
+        for grad, norm in zip(grads, norms):
+            num = torch.tensor(float(grad.numel()), device=device)
+            std, mean = torch.std_mean(grad, unbiased=False)
+            zero_ratio = (grad == 0).sum().float() / num
+            grad_min, grad_max = torch.aminmax(grad) if hasattr(torch, 'aminmax') else (grad.min(), grad.max())
+
+            stats_list.append(torch.stack([norm, mean, std, zero_ratio, grad_min, grad_max,
+                                           mean * num, norm * norm, num]))
+            hist_list.append(self.histogram(grad, grad_min, grad_max))
+
+        stats = torch.stack(stats_list)
+        hists = torch.stack(hist_list)
+        # Single device to host transfer of all the calculated summaries
+        summary = torch.cat([stats, hists], dim=1).cpu().numpy()
+
+        for i, layer_summary in zip(grads_idx, summary):
+            layer_stats = {name: float(val) for name, val in zip(self.stats_names, layer_summary)}
+            layer_stats['hist'] = layer_summary[len(self.stats_names):]
+            layer_stats['bin_edges'] = np.linspace(layer_stats['min'], layer_stats['max'], self.num_bins + 1)
+            layers_stats[i] = layer_stats
+
+        return layers_stats
+
+    def histogram(self, grad, grad_min, grad_max):
+        """Fixed-width bins histogram calculated on device without any host synchronization
+
+        Args:
+            grad (torch.Tensor): flattened gradients
+            grad_min (torch.Tensor): minimum gradient value
+            grad_max (torch.Tensor): maximum gradient value
+
+        Returns:
+            torch.Tensor: histogram counts
+        """
+        num_values = grad.numel()
+        if self.subsample_size is not None and num_values > self.subsample_size:
+            sample_idx = torch.randint(num_values, (self.subsample_size,), device=grad.device)
+            grad = grad[sample_idx]
+
+        value_range = grad_max - grad_min
+        value_range = torch.where(value_range > 0, value_range, torch.ones_like(value_range))
+        bin_idx = ((grad - grad_min) / value_range * self.num_bins).long().clamp_(0, self.num_bins - 1)
+
+        hist = torch.bincount(bin_idx, minlength=self.num_bins).float()
+        if grad.numel() < num_values:
+            hist *= num_values / grad.numel()
+        return hist
+
+
+def get_model_layer_gradients(model, model_layers_extract_def=None):
+    """Collect the gradients of the model's layers
 
-            # Unscales the gradients of optimizer's assigned params in-place
-            # Following: https://pytorch.org/docs/stable/notes/amp_examples.html#gradient-clipping
-            self.train_loop_obj.amp_scaler.unscale_(optimizer)
+    Args:
+        model (torch.nn.Module): model from which the gradients are collected
+        model_layers_extract_def (lambda or function or None): lambda/function accepting model as the input and
+            returning a list of all the layers in the model for which the gradients should be collected. If left to
+            ``None``, the gradients of all the named model parameters are collected.
 
-            torch.nn.utils.clip_grad_norm_(self.train_loop_obj.model.parameters(), self.max_grad_norm, **self.kwargs)
+    Returns:
+        (list, list): list of layer names and the list of corresponding gradients
+    """
+    if model_layers_extract_def is None:
+        named_params = [(name, param) for name, param in model.named_parameters() if param.requires_grad]
+        return [name for name, _ in named_params], [param.grad for _, param in named_params]
+
+    model_layers_list = model_layers_extract_def(model)
+    return list(range(len(model_layers_list))), [layer.weight.grad for layer in model_layers_list]
 
 
 class GradientStatsPrint(AbstractCallback):
     def __init__(self, model_layers_extract_def, on_every_grad_update=False):
         """Model gradients statistics reporting
 
+        Gradient statistics are calculated on the device by the GradientStatsCalculator.
+
         Args:
             model_layers_extract_def (lambda or function): lambda/function accepting model as the input and returning
                 a list of all the layers in the model for which the gradient stats should be calculated
@@ -91,6 +270,7 @@ class GradientStatsPrint(AbstractCallback):
         AbstractCallback.__init__(self, 'Print model gradient stats', device_idx_execution=0)
         self.model_layers_extract_def = model_layers_extract_def
         self.on_every_grad_update = on_every_grad_update
+        self.grad_stats_calculator = GradientStatsCalculator(num_bins=1)
 
     def on_train_loop_registration(self):
         if self.on_every_grad_update:
@@ -104,36 +284,82 @@ class GradientStatsPrint(AbstractCallback):
         self.gradients_report()
 
     def gradients_report(self):
-        model_layers_list = self.model_layers_extract_def(self.train_loop_obj.model)
+        _, model_layer_gradients = get_model_layer_gradients(self.train_loop_obj.model, self.model_layers_extract_def)
+        layers_stats = self.grad_stats_calculator.calculate(model_layer_gradients)
 
         print('---> Model layers gradients stats')
-        for i, layer in enumerate(model_layers_list):
-            gradients = layer.weight.grad
+        for i, layer_stats in enumerate(layers_stats):
+            if layer_stats is not None:
+                print(f'Layer {i} grads: Mean: {layer_stats["mean"]}; Std {layer_stats["std"]}')
+                print(f'\tRatio of zero gradients: {layer_stats["zero_ratio"]}')
+            else:
+                print(f'Layer {i} grad are None')
 
-            if gradients is not None:
-                gradients = gradients.cpu().numpy()
 
-                mu = np.mean(gradients)
-                std = np.std(gradients)
+class GradientStatsTracker(GradientCallbackBase):
+    def __init__(self, model_layers_extract_def=None, log_frequency=100, num_bins=50, subsample_size=None):
+        """Lightweight gradient statistics tracking into the training history
 
-                print(f'Layer {i} grads: Mean: {mu}; Std {std}')
-                print(f'\tRatio of zero gradients: {float(np.count_nonzero(gradients == 0)) / gradients.size}')
-            else:
-                print(f'Layer {i} grad are None')
+        Every ``log_frequency`` gradient updates the per-layer gradient norm, mean, std and the ratio of zero gradients
+        are calculated on the device via the GradientStatsCalculator. The latest calculated stats are inserted into
+        the TrainLoop's training history at the end of every epoch under the ``grad_<stat>_<layer_name>`` keys.
+        The latest full stats including the histograms are also available under ``self.last_layers_stats``.
+
+        When training with AMP the calculated gradient stats are based on the scaled gradients unless some previously
+        executed gradient callback, such as gradient clipping, already unscaled the gradients.
+
+        Args:
+            model_layers_extract_def (lambda or function or None): lambda/function accepting model as the input and
+                returning a list of all the layers in the model for which the gradient stats should be calculated.
+                If left to ``None``, the stats are calculated for all the named model parameters.
+            log_frequency (int): number of gradient updates between the consecutive gradient stats calculations
+            num_bins (int): number of gradient histogram bins
+            subsample_size (int or None): optional max number of gradient values per layer used to build histograms
+        """
+        GradientCallbackBase.__init__(self, 'Gradient stats tracker')
+        self.model_layers_extract_def = model_layers_extract_def
+        self.log_frequency = log_frequency
+        self.grad_stats_calculator = GradientStatsCalculator(num_bins, subsample_size)
+
+        self.grad_update_count = 0
+        self.layer_names = None
+        self.last_layers_stats = None
+
+    def on_after_gradient_update(self, optimizer_idx):
+        if optimizer_idx == 0 and (self.train_loop_obj.iteration + 1) % self.train_loop_obj.grad_accumulation == 0:
+            if self.grad_update_count % self.log_frequency == 0:
+                self.layer_names, model_layer_gradients = \
+                    get_model_layer_gradients(self.train_loop_obj.model, self.model_layers_extract_def)
+                self.last_layers_stats = self.grad_stats_calculator.calculate(model_layer_gradients)
+
+            self.grad_update_count += 1
+
+    def on_epoch_end(self):
+        if self.last_layers_stats is not None:
+            for layer_name, layer_stats in zip(self.layer_names, self.last_layers_stats):
+                if layer_stats is not None:
+                    for stat_name in ['norm', 'mean', 'std', 'zero_ratio']:
+                        self.train_loop_obj.insert_metric_result_into_history(f'grad_{stat_name}_{layer_name}',
+                                                                              layer_stats[stat_name])
 
 
 class GradDistributionPlot(AbstractExperimentCallback):
     def __init__(self, model_layers_extract_def, grad_plots_dir_name='grad_distribution', file_format='png',
+                 num_bins=50, subsample_size=None,
                  project_name=None, experiment_name=None, local_model_result_folder_path=None,
                  cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None):
         """Plot layers' gradient distributions after every epoch
 
+        Gradient histograms are calculated on the device and only the resulting bin counts are plotted.
+
         Args:
             model_layers_extract_def (lambda or function): lambda/function accepting model as the input and returning
                 a list of all the layers in the model for which the gradient stats should be calculated
             grad_plots_dir_name (str): name of the folder where gradient distribution plots are saved after every epoch
             file_format (str): output file format. Can be either 'png' for saving separate images or 'pdf' for combining
                 all the plots into a single pdf file.
+            num_bins (int): number of gradient histogram bins
+            subsample_size (int or None): optional max number of gradient values per layer used to build histograms
             project_name (str or None): root name of the project
             experiment_name (str or None): name of the particular experiment
             local_model_result_folder_path (str or None): root local path where project folder will be created
@@ -155,6 +381,7 @@ class GradDistributionPlot(AbstractExperimentCallback):
                              "Select one of the following: 'png' or 'pdf'.")
 
         self.model_layers_extract_def = model_layers_extract_def
+        self.grad_stats_calculator = GradientStatsCalculator(num_bins, subsample_size)
         self.cloud_results_saver = None
 
         self.gradient_plotter = None
@@ -171,11 +398,10 @@ class GradDistributionPlot(AbstractExperimentCallback):
         if self.gradient_plotter is None:
             self.gradient_plotter = GradientPlotter(experiment_grad_results_local_path=grad_plot_dir_path)
 
-        model_layers_list = self.model_layers_extract_def(self.train_loop_obj.model)
-        model_layer_gradients = [layer.weight.grad.reshape(-1).cpu().numpy() if layer.weight.grad is not None else None
-                                 for layer in model_layers_list]
+        _, model_layer_gradients = get_model_layer_gradients(self.train_loop_obj.model, self.model_layers_extract_def)
+        layers_stats = self.grad_stats_calculator.calculate(model_layer_gradients)
 
-        saved_plot_paths = self.gradient_plotter.generate_report(model_layer_gradients, f'epoch_{self.train_loop_obj.epoch}',
+        saved_plot_paths = self.gradient_plotter.generate_report(layers_stats, f'epoch_{self.train_loop_obj.epoch}',
                                                                  file_format=self.file_format)
 
         if self.cloud_results_saver is not None:
@@ -188,10 +414,10 @@ class GradDistributionPlot(AbstractExperimentCallback):
                                                                                       self.train_loop_obj.experiment_timestamp)
         grad_plots_dir_path = os.path.join(experiment_cloud_path, self.grad_plots_dir_name)
 
-        for file_path_in_cloud_grad_results_dir, local_file_path in saved_plot_paths:
-            plot_file_cloud_path = os.path.join(grad_plots_dir_path, file_path_in_cloud_grad_results_dir)
-            self.cloud_results_saver.save_file(local_file_path=local_file_path,
-                                               cloud_file_path=plot_file_cloud_path)
+        self.cloud_results_saver.save_files(
+            [[local_file_path, os.path.join(grad_plots_dir_path, file_path_in_cloud_grad_results_dir)]
+             for file_path_in_cloud_grad_results_dir, local_file_path in saved_plot_paths]
+        )
 
     def create_plot_dirs(self):
         experiment_results_local_path = \
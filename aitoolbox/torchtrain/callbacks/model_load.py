@@ -7,18 +7,26 @@ from aitoolbox.cloud import s3_available_options, gcs_available_options
 
 class ModelLoadContinueTraining(AbstractExperimentCallback):
     def __init__(self,
-                 saved_experiment_timestamp, saved_model_dir='checkpoint_model', epoch_num=None,
+                 saved_experiment_timestamp, saved_model_dir='checkpoint_model', epoch_num=None, iteration_idx=None,
                  ignore_saved_schedulers=False, ignore_missing_saved_schedulers=False,
                  used_data_parallel=False, custom_local_loader_class=None,
                  project_name=None, experiment_name=None, local_model_result_folder_path=None,
                  cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None, **kwargs):
         """(Down)load previously trained and saved model and continue training from this snapshot instead from beginning
 
+        If the checkpoint includes the train loop state (saved by the ``ModelCheckpoint`` and
+        the ``ModelIterationCheckpoint``), the training is continued exactly where it was interrupted. When
+        the checkpoint was saved in the middle of the epoch, the training continues in the same epoch: the train data
+        sampler is fast-forwarded past the already finished iterations without loading their samples and
+        the accumulated epoch losses together with the random number generators state are restored.
+
         Args:
             saved_experiment_timestamp (str): timestamp of the saved model experiment
             saved_model_dir (str): folder where saved model file is inside main experiment folder
             epoch_num (int or None): if loading checkpoint model instead of final model this parameter indicates
                 from which epoch of training the model will be loaded
+            iteration_idx (int or None): when loading the checkpoint saved in the middle of the epoch by
+                the ``ModelIterationCheckpoint`` this parameter indicates at which training iteration it was saved
             ignore_saved_schedulers (bool): if exception should be raised in the case there are found scheduler
                 snapshots in the checkpoint, but not schedulers are provided to this method
             ignore_missing_saved_schedulers (bool): if exception should be raised in the case schedulers are provided
@@ -45,6 +53,7 @@ class ModelLoadContinueTraining(AbstractExperimentCallback):
         self.saved_experiment_timestamp = saved_experiment_timestamp
         self.saved_model_dir = saved_model_dir
         self.epoch_num = epoch_num
+        self.iteration_idx = iteration_idx
         self.ignore_saved_schedulers = ignore_saved_schedulers
         self.ignore_missing_saved_schedulers = ignore_missing_saved_schedulers
         self.used_data_parallel = used_data_parallel
@@ -57,9 +66,13 @@ class ModelLoadContinueTraining(AbstractExperimentCallback):
         self.try_infer_experiment_details(infer_cloud_details=True)
         self.init_model_loader()
 
+        local_loader_kwargs = dict(self.local_loader_kwargs)
+        if self.iteration_idx is not None:
+            local_loader_kwargs['iteration_idx'] = self.iteration_idx
+
         model_representation = self.model_loader.load_model(self.project_name, self.experiment_name,
                                                             self.saved_experiment_timestamp, self.saved_model_dir,
-                                                            self.epoch_num, **self.local_loader_kwargs)
+                                                            self.epoch_num, **local_loader_kwargs)
 
         self.train_loop_obj.model = self.model_loader.init_model(self.train_loop_obj.model,
                                                                  self.used_data_parallel)
@@ -67,7 +80,10 @@ class ModelLoadContinueTraining(AbstractExperimentCallback):
         if self.train_loop_obj.use_amp:
             self.train_loop_obj.amp_scaler = self.model_loader.init_amp(self.train_loop_obj.amp_scaler)
 
-        self.train_loop_obj.epoch = model_representation['epoch'] + 1
+        if 'train_loop_state' in model_representation:
+            self.train_loop_obj.load_train_loop_state(model_representation['train_loop_state'])
+        else:
+            self.train_loop_obj.epoch = model_representation['epoch'] + 1
 
     def on_train_begin(self):
         # Not doing in on_train_loop_registration() in order to ensure
@@ -1,14 +1,28 @@
 import os
+import copy
+import time
+import signal
+import threading
 
 from aitoolbox.cloud.AWS.model_save import PyTorchS3ModelSaver
 from aitoolbox.cloud.GoogleCloud.model_save import PyTorchGoogleStorageModelSaver
+from aitoolbox.cloud.background_upload import BackgroundUploader
+from aitoolbox.cloud.bundle import ArtifactBundler
+from aitoolbox.cloud.retention import CloudSubOptimalModelRemover
 from aitoolbox.experiment.experiment_saver import FullPyTorchExperimentS3Saver, \
     FullPyTorchExperimentGoogleStorageSaver
 from aitoolbox.experiment.local_experiment_saver import FullPyTorchExperimentLocalSaver
-from aitoolbox.experiment.local_save.local_model_save import LocalSubOptimalModelRemover, PyTorchLocalModelSaver
+from aitoolbox.experiment.local_save.async_checkpoint import AsyncCheckpointWriter, PinnedBufferPool, \
+    snapshot_state
+from aitoolbox.experiment.local_save.local_model_save import LocalSubOptimalModelRemover, LocalRollingModelRemover, \
+    PyTorchLocalModelSaver, save_latest_checkpoint_marker
+from aitoolbox.experiment.local_save.sectioned_checkpoint import get_checkpoint_file_paths, \
+    collect_tensor_store_garbage, is_sectioned_checkpoint, read_sectioned_checkpoint_file_header, \
+    get_referenced_blob_names, TENSOR_STORE_DIR_NAME
 from aitoolbox.experiment.result_package.abstract_result_packages import AbstractResultPackage
 from aitoolbox.experiment.result_reporting.hyperparam_reporter import HyperParamSourceReporter
 from aitoolbox.torchtrain.callbacks.abstract import AbstractCallback
+from aitoolbox.torchtrain.train_loop.components import message_passing as msg_passing_settings
 from aitoolbox.utils import util
 
 
@@ -16,7 +30,10 @@ class ModelCheckpoint(AbstractCallback):
     def __init__(self, project_name, experiment_name, local_model_result_folder_path,
                  hyperparams,
                  cloud_save_mode='s3', bucket_name='model-result', cloud_dir_prefix='',
-                 rm_subopt_local_models=False, num_best_checkpoints_kept=2):
+                 rm_subopt_local_models=False, num_best_checkpoints_kept=2, background_upload=False,
+                 sectioned_checkpoint=False, async_save=False,
+                 skip_suboptimal_saves=False, last_checkpoint_frequency=None, rm_subopt_cloud_models=False,
+                 bundle_artifacts=False, keep_latest_checkpoint=False, local_model_copy=True):
         """Check-point save the model during training to disk or also to S3 / GCS cloud storage
 
         Args:
@@ -37,7 +54,63 @@ class ModelCheckpoint(AbstractCallback):
                 to set it as a deciding metric for suboptimal model removal. If metric name consists of substring 'loss'
                 the metric minimization is done otherwise metric maximization is done
             num_best_checkpoints_kept (int): number of best performing models which are kept when removing suboptimal
-                model checkpoints
+                model checkpoints. With ``keep_latest_checkpoint`` enabled, the most recent checkpoint is kept in
+                addition to these even when it is suboptimal.
+            background_upload (bool or dict): upload the checkpoints to the cloud storage in the background without
+                blocking the training. To enable either:
+
+                * set this parameter to ``True`` to use default ``BackgroundUploader`` initialization params
+                * provide custom ``BackgroundUploader`` initialization parameters as a dict as this parameter
+
+                Upload statuses are reported via the message service under the ``ModelCheckpoint_upload_status``
+                key. All the pending uploads are waited for at the end of training.
+            sectioned_checkpoint (bool or dict): save the checkpoints in the sectioned checkpoint format which
+                ``PyTorchLocalModelLoader`` loads lazily and memory-mapped, reading only the needed sections.
+                Provide a dict to specify the ``save_sectioned_checkpoint()`` parameters, for example the compression
+                or the separate optimizer file. Reduced precision ``weights_dtype`` is not allowed for the checkpoints
+                as they have to enable the exact training resumption. With ``{'dedup_tensors': True}`` the tensors
+                are stored in the content-addressed tensor store shared by all the checkpoints, so the unchanged
+                tensors are written and uploaded only once. The blobs of the removed suboptimal checkpoints are
+                garbage collected.
+            async_save (bool or dict): only take the in-memory CPU snapshot of the training state in the training
+                loop and serialize and save the checkpoint in the background thread. To enable either:
+
+                * set this parameter to ``True`` to use default ``AsyncCheckpointWriter`` initialization params
+                * provide custom ``AsyncCheckpointWriter`` initialization parameters as a dict as this parameter
+
+                The checkpoints are saved in the order they were taken. Save statuses are reported via the message
+                service under the ``ModelCheckpoint_save_status`` key. All the pending saves are waited for at
+                the end of training.
+            skip_suboptimal_saves (bool): when removing the suboptimal models, check the tracked metric before
+                the saving and skip the serialization and upload of the checkpoint altogether if the model wouldn't
+                be among the ``num_best_checkpoints_kept`` best models. The metric has to be already evaluated when
+                this callback is executed at the end of the epoch. With ``async_save`` the pending background saves
+                are waited for before the decision is made.
+            last_checkpoint_frequency (int or None): when skipping the suboptimal saves, still save the rolling
+                "last" checkpoint for the training resumption if no checkpoint has been saved in this many epochs.
+                Only the most recent "last" checkpoint is kept and it is removed as soon as a newer checkpoint is
+                saved. If set to ``None`` (default), only the best checkpoints are saved.
+            rm_subopt_cloud_models (bool or str or dict): also remove the suboptimal checkpoints uploaded into
+                the cloud storage bucket, keeping only the ``num_best_checkpoints_kept`` best ones. Enable either:
+
+                * set this parameter to ``True`` to use 'loss' as the deciding metric
+                * give string metric name to set it as a deciding metric, same as for ``rm_subopt_local_models``
+                * provide custom ``CloudSubOptimalModelRemover`` initialization parameters as a dict as this
+                  parameter, for example ``{'metric_name': 'val_loss', 'dry_run': True}``
+
+                The remaining pending deletions are executed at the end of training.
+            bundle_artifacts (bool or dict): upload the hyperparameters file, the experiment python file and
+                the source code snapshot to the cloud storage packed into a single zip bundle with one request.
+                Provide a dict to specify the ``ArtifactBundler`` parameters.
+            keep_latest_checkpoint (bool): when removing suboptimal checkpoints, never remove the most recently saved
+                one even when it is suboptimal, so that the training can always be resumed from the latest state.
+                Its removal is deferred until the next checkpoint is saved. This also applies to the cloud copies
+                unless ``keep_latest`` is given in the ``rm_subopt_cloud_models`` dict.
+            local_model_copy (bool): if set to ``False`` the checkpoints are serialized directly into the cloud
+                storage upload stream without being saved to the local drive. Requires the cloud storage selected via
+                ``cloud_save_mode`` and can't be combined with the local suboptimal model removal, the background
+                upload or the sectioned checkpoint format. Use ``async_save`` to stream the checkpoints to the cloud
+                storage in the background.
         """
         # execution_order=100 to make sure that this callback is the very last one to be executed when all the
         # evaluations are already stored in the train_history and especially also when schedulers have the updated state
@@ -50,40 +123,323 @@ class ModelCheckpoint(AbstractCallback):
 
         self._hyperparams_already_saved = False
 
+        self.skip_suboptimal_saves = skip_suboptimal_saves
+        self.last_checkpoint_frequency = last_checkpoint_frequency
+        self.num_epochs_since_save = 0
+        self.last_checkpoint_paths = None
+
+        if self.skip_suboptimal_saves and self.rm_subopt_local_models is False:
+            raise ValueError('skip_suboptimal_saves requires the suboptimal model removal with rm_subopt_local_models.')
+
+        self.rm_subopt_cloud_models = rm_subopt_cloud_models
+        self.cloud_model_remover_init = {}
+        if self.rm_subopt_cloud_models is not False:
+            if cloud_save_mode not in ['s3', 'aws_s3', 'aws', 'gcs', 'google_storage', 'google storage']:
+                raise ValueError('rm_subopt_cloud_models requires the cloud storage selected via cloud_save_mode. '
+                                 f'Provided cloud_save_mode: {cloud_save_mode}')
+
+            if isinstance(rm_subopt_cloud_models, dict):
+                self.cloud_model_remover_init = dict(rm_subopt_cloud_models)
+            else:
+                self.cloud_model_remover_init['metric_name'] = \
+                    'loss' if rm_subopt_cloud_models is True else rm_subopt_cloud_models
+            self.cloud_model_remover_init.setdefault('metric_name', 'loss')
+            self.cloud_model_remover_init.setdefault('num_best_kept', num_best_checkpoints_kept)
+            self.cloud_model_remover_init.setdefault('keep_latest', keep_latest_checkpoint)
+            self.cloud_model_remover_init.setdefault('metric_known_at_save', self.skip_suboptimal_saves)
+        self.cloud_model_remover = None
+        self.last_checkpoint_cloud_paths = None
+        self.checkpoint_local_file_paths = {}
+
         if self.rm_subopt_local_models is not False:
             metric_name = 'loss' if self.rm_subopt_local_models is True else self.rm_subopt_local_models
             self.subopt_model_remover = LocalSubOptimalModelRemover(metric_name,
-                                                                    num_best_checkpoints_kept)
+                                                                    num_best_checkpoints_kept,
+                                                                    keep_latest=keep_latest_checkpoint,
+                                                                    metric_known_at_save=self.skip_suboptimal_saves)
         self.model_checkpointer = None
         self.cloud_save_mode = cloud_save_mode
         self.bucket_name = bucket_name
         self.cloud_dir_prefix = cloud_dir_prefix
 
+        self.background_upload = background_upload is True or isinstance(background_upload, dict)
+        self.background_uploader_init = background_upload if isinstance(background_upload, dict) else {}
+        self.background_uploader = None
+        self.sectioned_checkpoint = sectioned_checkpoint
+        self.bundle_artifacts = bundle_artifacts
+        self.artifact_bundler = None
+
+        self.async_save = async_save is True or isinstance(async_save, dict)
+        self.async_checkpoint_writer_init = async_save if isinstance(async_save, dict) else {}
+        self.async_checkpoint_writer = None
+        self.pinned_buffer_pool = None
+
+        if isinstance(sectioned_checkpoint, dict) and sectioned_checkpoint.get('weights_dtype') is not None:
+            raise ValueError('Reduced precision weights_dtype is only supported for the final model saved with '
+                             'ModelTrainEndSave. Training checkpoints need the full precision weights to resume training.')
+
+        if self.rm_subopt_local_models is not False and isinstance(sectioned_checkpoint, dict) and \
+                sectioned_checkpoint.get('dedup_tensors', False):
+            self.subopt_model_remover.after_remove_fn = self.rm_unreferenced_tensor_blobs
+
+        self.local_model_copy = local_model_copy
+        if not self.local_model_copy:
+            if cloud_save_mode not in ['s3', 'aws_s3', 'aws', 'gcs', 'google_storage', 'google storage']:
+                raise ValueError('Disabled local_model_copy requires the cloud storage selected via cloud_save_mode. '
+                                 f'Provided cloud_save_mode: {cloud_save_mode}')
+            if self.rm_subopt_local_models is not False or self.background_upload or sectioned_checkpoint is not False:
+                raise ValueError('Disabled local_model_copy can not be combined with rm_subopt_local_models, '
+                                 'background_upload or sectioned_checkpoint as they need the local checkpoint files.')
+
     def on_epoch_end(self):
         self.save_hyperparams()
+        if self.skip_suboptimal_saves:
+            self.save_checkpoint_if_not_suboptimal()
+        else:
+            self.save_checkpoint(remove_suboptimal=self.rm_subopt_local_models is not False or
+                                                   self.rm_subopt_cloud_models is not False)
+
+    def on_train_end(self):
+        if self.async_checkpoint_writer is not None:
+            self.async_checkpoint_writer.shutdown()
+            self.report_save_status()
+        if self.background_uploader is not None:
+            self.background_uploader.shutdown()
+            self.report_upload_status()
+        if self.cloud_model_remover is not None:
+            self.cloud_model_remover.flush_deletes()
+
+    def get_model_checkpoint(self):
+        """Assemble the current training state into the model checkpoint dict
+
+        Returns:
+            dict: model checkpoint
+        """
         model_checkpoint = {
             'model_state_dict': self.train_loop_obj.model.state_dict(),
             'optimizer_state_dict': self.train_loop_obj.optimizer.state_dict(),
             'schedulers_state_dict': [scheduler.state_dict() for scheduler in self.train_loop_obj.get_schedulers()],
             'epoch': self.train_loop_obj.epoch,
             'iteration_idx': self.train_loop_obj.total_iteration_idx,
-            'hyperparams': self.hyperparams
+            'hyperparams': self.hyperparams,
+            'train_loop_state': self.train_loop_obj.get_train_loop_state()
         }
         # If AMP is used
         if self.train_loop_obj.use_amp:
             model_checkpoint['amp'] = self.train_loop_obj.amp_scaler.state_dict()
 
+        return model_checkpoint
+
+    def save_checkpoint_if_not_suboptimal(self):
+        """Save the checkpoint only if the model would be among the best kept models or the "last" checkpoint is due
+
+        Returns:
+            None
+        """
+        self.num_epochs_since_save += 1
+
+        # The pending background saves update the remover's model history which the decision is based on
+        if self.async_checkpoint_writer is not None:
+            self.async_checkpoint_writer.wait_until_done()
+
+        if self.subopt_model_remover.is_new_model_kept(self.train_loop_obj.train_history):
+            self.num_epochs_since_save = 0
+            self.save_checkpoint(remove_suboptimal=True)
+        elif self.last_checkpoint_frequency is not None and \
+                self.num_epochs_since_save >= self.last_checkpoint_frequency:
+            print('--> Model is not among the best models. Saving it only as the last checkpoint.')
+            self.num_epochs_since_save = 0
+            self.save_checkpoint(last_checkpoint=True)
+        else:
+            print('--> Model is not among the best models. Skipping the checkpoint saving.')
+
+    def save_checkpoint(self, iteration_idx=None, remove_suboptimal=False, last_checkpoint=False):
+        """Save the current training state checkpoint
+
+        When the async saving is enabled, only the in-memory snapshot of the checkpoint is taken here and the
+        checkpoint is saved in the background.
+
+        Args:
+            iteration_idx (int or None): training iteration added into the checkpoint file name
+            remove_suboptimal (bool): if the suboptimal checkpoints should be removed after the saving
+            last_checkpoint (bool): save the checkpoint as the rolling "last" checkpoint which is removed once
+                the next checkpoint is saved
+
+        Returns:
+            None
+        """
+        model_checkpoint = self.get_model_checkpoint()
+        train_history = self.train_loop_obj.train_history if remove_suboptimal else None
+
+        if self.async_checkpoint_writer is not None:
+            model_checkpoint = snapshot_state(model_checkpoint, self.pinned_buffer_pool)
+            train_history = copy.deepcopy(train_history)
+
+            def save_fn():
+                try:
+                    return self._save_checkpoint(model_checkpoint, iteration_idx, train_history, last_checkpoint)
+                finally:
+                    # Pinned memory of the written snapshot is reused by the next snapshot
+                    self.pinned_buffer_pool.release(model_checkpoint)
+
+            self.async_checkpoint_writer.submit(
+                save_fn,
+                description=f'Epoch {model_checkpoint["epoch"]}, iteration {model_checkpoint["iteration_idx"]}'
+            )
+            self.report_save_status()
+        else:
+            self._save_checkpoint(model_checkpoint, iteration_idx, train_history, last_checkpoint)
+
+        self.report_upload_status()
+
+    def _save_checkpoint(self, model_checkpoint, iteration_idx, train_history, last_checkpoint=False):
         model_paths = self.model_checkpointer.save_model(model=model_checkpoint,
                                                          project_name=self.project_name,
                                                          experiment_name=self.experiment_name,
                                                          experiment_timestamp=self.train_loop_obj.experiment_timestamp,
-                                                         epoch=self.train_loop_obj.epoch,
+                                                         epoch=model_checkpoint['epoch'],
+                                                         iteration_idx=iteration_idx,
                                                          protect_existing_folder=True)
+        *_, model_local_path = model_paths
+        # Checkpoint streamed directly into the cloud storage doesn't have any local files
+        is_local_model_saved = model_local_path is not None
+
+        # Previous "last" checkpoint is superseded by any newer checkpoint
+        if self.last_checkpoint_paths is not None:
+            self.subopt_model_remover.remove_model(self.last_checkpoint_paths)
+            self.last_checkpoint_paths = None
+
+        if is_local_model_saved and last_checkpoint:
+            self.last_checkpoint_paths = get_checkpoint_file_paths(model_local_path)
+        elif is_local_model_saved and train_history is not None and self.rm_subopt_local_models is not False:
+            self.subopt_model_remover.decide_if_remove_suboptimal_model(train_history,
+                                                                        get_checkpoint_file_paths(model_local_path))
+
+        if self.cloud_model_remover is not None:
+            if is_local_model_saved:
+                model_cloud_paths = self.get_checkpoint_cloud_file_paths(model_local_path)
+            else:
+                model_full_cloud_path, *_ = model_paths
+                model_cloud_paths = [os.path.relpath(model_full_cloud_path, self.bucket_name)]
+
+            if self.last_checkpoint_cloud_paths is not None:
+                self.cloud_model_remover.remove_model(self.last_checkpoint_cloud_paths)
+                self.last_checkpoint_cloud_paths = None
+
+            if last_checkpoint:
+                self.last_checkpoint_cloud_paths = model_cloud_paths
+            elif train_history is not None:
+                self.cloud_model_remover.decide_if_remove_suboptimal_model(train_history, model_cloud_paths)
+
+        # Checkpoint is only marked as the latest once all of its files are completely written and only if it
+        # wasn't right away removed as suboptimal
+        if is_local_model_saved and os.path.isfile(model_local_path):
+            save_latest_checkpoint_marker(model_local_path, model_checkpoint['epoch'], model_checkpoint['iteration_idx'])
+        return model_paths
+
+    def get_checkpoint_cloud_file_paths(self, model_local_path):
+        """Get the paths inside the bucket of all the uploaded files of the saved checkpoint
 
-        if self.rm_subopt_local_models is not False:
-            *_, model_local_path = model_paths
-            self.subopt_model_remover.decide_if_remove_suboptimal_model(self.train_loop_obj.train_history,
-                                                                        [model_local_path])
+        Args:
+            model_local_path (str): path to the main checkpoint file on the local drive
+
+        Returns:
+            list: paths of the checkpoint files inside the bucket
+        """
+        experiment_cloud_path = self.model_checkpointer.create_experiment_cloud_storage_folder_structure(
+            self.project_name, self.experiment_name, self.train_loop_obj.experiment_timestamp
+        )
+        model_cloud_paths = []
+        for local_file_path in get_checkpoint_file_paths(model_local_path):
+            cloud_file_path = os.path.join(experiment_cloud_path, os.path.basename(local_file_path))
+            self.checkpoint_local_file_paths[cloud_file_path] = local_file_path
+            model_cloud_paths.append(cloud_file_path)
+        return model_cloud_paths
+
+    def wait_for_cloud_file_uploads(self, cloud_file_paths):
+        """Block until the background uploads of the checkpoint files scheduled for the deletion are finished
+
+        Args:
+            cloud_file_paths (list): paths of the checkpoint files inside the bucket
+
+        Returns:
+            None
+        """
+        self.background_uploader.wait_for_files([self.checkpoint_local_file_paths.pop(cloud_file_path)
+                                                 for cloud_file_path in cloud_file_paths
+                                                 if cloud_file_path in self.checkpoint_local_file_paths])
+
+    def rm_unreferenced_tensor_blobs(self, removed_model_paths):
+        """Garbage collect the tensor store blobs which were only used by the removed checkpoint
+
+        Args:
+            removed_model_paths (list): paths of the removed checkpoint files
+
+        Returns:
+            None
+        """
+        collect_tensor_store_garbage(
+            os.path.dirname(removed_model_paths[0]),
+            before_remove_fn=self.background_uploader.wait_for_files if self.background_uploader is not None else None
+        )
+
+    def rm_unreferenced_cloud_tensor_blobs(self, removed_cloud_paths):
+        """Garbage collect the tensor store blobs in the bucket which were only used by the removed checkpoint
+
+        The blobs referenced by the checkpoints still waiting for their background upload are protected as these
+        checkpoints aren't in the bucket yet.
+
+        Args:
+            removed_cloud_paths (list): paths of the removed checkpoint files inside the bucket
+
+        Returns:
+            None
+        """
+        protected_blob_names = set()
+        if self.background_uploader is not None:
+            for local_file_path in self.background_uploader.get_pending_files():
+                if os.path.basename(os.path.dirname(local_file_path)) == TENSOR_STORE_DIR_NAME:
+                    protected_blob_names.add(os.path.basename(local_file_path))
+                elif os.path.isfile(local_file_path) and is_sectioned_checkpoint(local_file_path):
+                    protected_blob_names.update(
+                        get_referenced_blob_names(read_sectioned_checkpoint_file_header(local_file_path))
+                    )
+
+        self.cloud_model_remover.collect_tensor_store_garbage(os.path.dirname(removed_cloud_paths[0]),
+                                                              protected_blob_names=protected_blob_names)
+
+    def report_save_status(self):
+        """Report the statuses of the finished background checkpoint saves via the message service
+
+        Returns:
+            None
+        """
+        if self.async_checkpoint_writer is not None:
+            for save_status in self.async_checkpoint_writer.pop_finished_saves():
+                self.message_service.write_message('ModelCheckpoint_save_status', save_status,
+                                                   msg_handling_settings=msg_passing_settings.UNTIL_READ)
+
+    def report_upload_status(self):
+        """Report the statuses of the finished background uploads via the message service
+
+        Tensor store blobs whose upload failed are forgotten by the model saver so that they are uploaded again
+        with the next checkpoint referencing them.
+
+        Returns:
+            None
+        """
+        if self.background_uploader is not None:
+            for upload_status in self.background_uploader.pop_finished_uploads():
+                if not upload_status['success']:
+                    print(f'Background upload of {upload_status["local_file_path"]} failed after '
+                          f'{upload_status["attempts"]} attempts: {upload_status["error"]}')
+
+                    cloud_folder_path, file_name = os.path.split(upload_status['cloud_file_path'])
+                    if os.path.basename(cloud_folder_path) == TENSOR_STORE_DIR_NAME:
+                        self.model_checkpointer.uploaded_tensor_blob_names.discard(file_name)
+
+                self.message_service.write_message('ModelCheckpoint_upload_status', upload_status,
+                                                   msg_handling_settings=msg_passing_settings.UNTIL_READ)
 
     def on_train_loop_registration(self):
         if not util.function_exists(self.train_loop_obj.optimizer, 'state_dict'):
@@ -94,19 +450,46 @@ class ModelCheckpoint(AbstractCallback):
             self.model_checkpointer = PyTorchS3ModelSaver(
                 bucket_name=self.bucket_name, cloud_dir_prefix=self.cloud_dir_prefix,
                 local_model_result_folder_path=self.local_model_result_folder_path,
-                checkpoint_model=True
+                checkpoint_model=True, sectioned_checkpoint=self.sectioned_checkpoint,
+                local_model_copy=self.local_model_copy
             )
         elif self.cloud_save_mode in ['gcs', 'google_storage', 'google storage']:
             self.model_checkpointer = PyTorchGoogleStorageModelSaver(
                 bucket_name=self.bucket_name, cloud_dir_prefix=self.cloud_dir_prefix,
                 local_model_result_folder_path=self.local_model_result_folder_path,
-                checkpoint_model=True
+                checkpoint_model=True, sectioned_checkpoint=self.sectioned_checkpoint,
+                local_model_copy=self.local_model_copy
             )
         else:
             self.model_checkpointer = PyTorchLocalModelSaver(
-                local_model_result_folder_path=self.local_model_result_folder_path, checkpoint_model=True
+                local_model_result_folder_path=self.local_model_result_folder_path, checkpoint_model=True,
+                sectioned_checkpoint=self.sectioned_checkpoint
+            )
+
+        if self.bundle_artifacts is not False and type(self.model_checkpointer) != PyTorchLocalModelSaver:
+            self.artifact_bundler = ArtifactBundler(
+                self.model_checkpointer, **(self.bundle_artifacts if isinstance(self.bundle_artifacts, dict) else {})
             )
 
+        if self.background_upload and type(self.model_checkpointer) != PyTorchLocalModelSaver:
+            self.background_uploader = BackgroundUploader(self.model_checkpointer, **self.background_uploader_init)
+            self.model_checkpointer.background_uploader = self.background_uploader
+
+            if self.rm_subopt_local_models is not False:
+                self.subopt_model_remover.before_remove_fn = self.background_uploader.wait_for_files
+
+        if self.rm_subopt_cloud_models is not False:
+            self.cloud_model_remover = CloudSubOptimalModelRemover(self.model_checkpointer,
+                                                                   **self.cloud_model_remover_init)
+            if self.background_uploader is not None:
+                self.cloud_model_remover.before_remove_fn = self.wait_for_cloud_file_uploads
+            if isinstance(self.sectioned_checkpoint, dict) and self.sectioned_checkpoint.get('dedup_tensors', False):
+                self.cloud_model_remover.after_remove_fn = self.rm_unreferenced_cloud_tensor_blobs
+
+        if self.async_save:
+            self.async_checkpoint_writer = AsyncCheckpointWriter(**self.async_checkpoint_writer_init)
+            self.pinned_buffer_pool = PinnedBufferPool()
+
         if not self.train_loop_obj.lazy_experiment_save:
             self.save_hyperparams()
 
@@ -123,16 +506,11 @@ class ModelCheckpoint(AbstractCallback):
 
                 # Should also save to cloud
                 if type(self.model_checkpointer) != PyTorchLocalModelSaver:
-                    param_reporter.copy_to_cloud_storage(local_hyperparams_file_path, self.model_checkpointer)
-
-                    if local_experiment_python_file_path is not None:
-                        param_reporter.copy_to_cloud_storage(local_experiment_python_file_path,
-                                                             self.model_checkpointer,
-                                                             file_name=os.path.basename(local_experiment_python_file_path))
-                    if local_source_code_zip_path is not None:
-                        param_reporter.copy_to_cloud_storage(local_source_code_zip_path,
-                                                             self.model_checkpointer,
-                                                             file_name=os.path.basename(local_source_code_zip_path))
+                    param_reporter.copy_files_to_cloud_storage(
+                        [file_path for file_path in [local_hyperparams_file_path, local_experiment_python_file_path,
+                                                     local_source_code_zip_path] if file_path is not None],
+                        self.model_checkpointer, bundler=self.artifact_bundler
+                    )
 
                 self._hyperparams_already_saved = True
 
@@ -142,9 +520,13 @@ class ModelIterationCheckpoint(ModelCheckpoint):
                  project_name, experiment_name, local_model_result_folder_path,
                  hyperparams,
                  cloud_save_mode='s3', bucket_name='model-result', cloud_dir_prefix='',
-                 rm_subopt_local_models=False, num_best_checkpoints_kept=2):
+                 rm_subopt_local_models=False, num_best_checkpoints_kept=2, background_upload=False,
+                 sectioned_checkpoint=False, async_save=False, local_model_copy=True):
         """Check-point save the model during training to disk or also to S3 / GCS cloud storage
 
+        The checkpoints include the train loop state, so the ``ModelLoadContinueTraining`` continues the training
+        from the saved iteration in the middle of the epoch.
+
         Args:
             save_frequency (int): frequency of saving the model checkpoint every specified number of training iterations
             project_name (str): root name of the project
@@ -165,12 +547,41 @@ class ModelIterationCheckpoint(ModelCheckpoint):
                 the metric minimization is done otherwise metric maximization is done
             num_best_checkpoints_kept (int): number of best performing models which are kept when removing suboptimal
                 model checkpoints
+            background_upload (bool or dict): upload the checkpoints to the cloud storage in the background without
+                blocking the training. To enable either:
+
+                * set this parameter to ``True`` to use default ``BackgroundUploader`` initialization params
+                * provide custom ``BackgroundUploader`` initialization parameters as a dict as this parameter
+
+                Upload statuses are reported via the message service under the ``ModelCheckpoint_upload_status``
+                key. All the pending uploads are waited for at the end of training.
+            sectioned_checkpoint (bool or dict): save the checkpoints in the sectioned checkpoint format which
+                ``PyTorchLocalModelLoader`` loads lazily and memory-mapped, reading only the needed sections.
+                Provide a dict to specify the ``save_sectioned_checkpoint()`` parameters, for example the compression
+                or the separate optimizer file. Reduced precision ``weights_dtype`` is not allowed for the checkpoints
+                as they have to enable the exact training resumption. With ``{'dedup_tensors': True}`` the tensors
+                are stored in the content-addressed tensor store shared by all the checkpoints, so the unchanged
+                tensors are written and uploaded only once. The blobs of the removed suboptimal checkpoints are
+                garbage collected.
+            async_save (bool or dict): only take the in-memory CPU snapshot of the training state in the training
+                loop and serialize and save the checkpoint in the background thread. To enable either:
+
+                * set this parameter to ``True`` to use default ``AsyncCheckpointWriter`` initialization params
+                * provide custom ``AsyncCheckpointWriter`` initialization parameters as a dict as this parameter
+
+                The checkpoints are saved in the order they were taken. Save statuses are reported via the message
+                service under the ``ModelCheckpoint_save_status`` key. All the pending saves are waited for at
+                the end of training.
+            local_model_copy (bool): if set to ``False`` the checkpoints are serialized directly into the cloud
+                storage upload stream without being saved to the local drive. Refer to the ``ModelCheckpoint`` for
+                the details.
         """
         super().__init__(
             project_name, experiment_name, local_model_result_folder_path,
             hyperparams,
             cloud_save_mode, bucket_name, cloud_dir_prefix,
-            rm_subopt_local_models, num_best_checkpoints_kept
+            rm_subopt_local_models, num_best_checkpoints_kept, background_upload,
+            sectioned_checkpoint, async_save, local_model_copy=local_model_copy
         )
         self.save_frequency = save_frequency
 
@@ -182,35 +593,187 @@ class ModelIterationCheckpoint(ModelCheckpoint):
                 self.train_loop_obj.total_iteration_idx > 0:
             print(f'--> Saving model checkpoint at the training iteration: {self.train_loop_obj.total_iteration_idx}')
             self.save_hyperparams()
+            self.save_checkpoint(iteration_idx=self.train_loop_obj.total_iteration_idx)
 
-            model_checkpoint = {
-                'model_state_dict': self.train_loop_obj.model.state_dict(),
-                'optimizer_state_dict': self.train_loop_obj.optimizer.state_dict(),
-                'schedulers_state_dict': [scheduler.state_dict() for scheduler in
-                                          self.train_loop_obj.get_schedulers()],
-                'epoch': self.train_loop_obj.epoch,
-                'iteration_idx': self.train_loop_obj.total_iteration_idx,
-                'hyperparams': self.hyperparams
-            }
-            # If AMP is used
-            if self.train_loop_obj.use_amp:
-                model_checkpoint['amp'] = self.train_loop_obj.amp_scaler.state_dict()
-
-            model_paths = self.model_checkpointer.save_model(
-                model=model_checkpoint,
-                project_name=self.project_name,
-                experiment_name=self.experiment_name,
-                experiment_timestamp=self.train_loop_obj.experiment_timestamp,
-                epoch=self.train_loop_obj.epoch,
-                iteration_idx=self.train_loop_obj.total_iteration_idx,
-                protect_existing_folder=True
-            )
+
+class ModelTimeCheckpoint(ModelCheckpoint):
+    def __init__(self, save_interval_minutes,
+                 project_name, experiment_name, local_model_result_folder_path,
+                 hyperparams,
+                 cloud_save_mode='s3', bucket_name='model-result', cloud_dir_prefix='',
+                 num_checkpoints_kept=3, save_on_signals=('SIGTERM', 'SIGUSR1'), stop_on_signal=True,
+                 background_upload=False, sectioned_checkpoint=False, async_save=False, local_model_copy=True):
+        """Check-point save the model every specified amount of training time and when the preemption signal arrives
+
+        Unlike the epoch or iteration based checkpointing, the amount of training lost at an interruption is bounded
+        by the wall-clock time regardless of how long the individual training iterations take. Only the rolling
+        window of the most recent time-based checkpoints is kept.
+
+        The checkpoint is also saved when the process receives any of the ``save_on_signals``, e.g. the SIGTERM
+        sent to the preemptible cloud instances. The signal handler only records the signal, while the checkpoint
+        is saved at the end of the currently running training iteration (or epoch) so that the saved state is
+        consistent. The signal triggered save is always waited for to complete, including the background save and
+        the cloud upload, so the duration of one training iteration together with the checkpoint saving should fit
+        into the instance shutdown grace period.
+
+        Args:
+            save_interval_minutes (float): training time in minutes between the consecutive checkpoints
+            project_name (str): root name of the project
+            experiment_name (str): name of the particular experiment
+            local_model_result_folder_path (str): root local path where project folder will be created
+            hyperparams (dict): used hyper-parameters. When running the TrainLoop from jupyter notebook in order to
+                ensure the python experiment file copying to the experiment folder, the user needs to manually
+                specify the python file path as the value for the `experiment_file_path` key. If running the training
+                directly from the terminal the path deduction is done automatically.
+            cloud_save_mode (str or None): Storage destination selector.
+                For AWS S3: 's3' / 'aws_s3' / 'aws'
+                For Google Cloud Storage: 'gcs' / 'google_storage' / 'google storage'
+                Everything else results just in local storage to disk
+            bucket_name (str): name of the bucket in the cloud storage
+            cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            num_checkpoints_kept (int or None): number of the most recent local checkpoints kept. The older ones are
+                removed. If set to ``None``, all the checkpoints are kept.
+            save_on_signals (list or tuple): names of the signals which trigger the checkpoint saving. Provide
+                an empty list to disable the signal handling.
+            stop_on_signal (bool): after the signal triggered checkpoint has been saved, hand over the signal to
+                the previously installed signal handler, which for the SIGTERM by default terminates the process.
+                If ``False``, the training simply continues after the checkpoint is saved.
+            background_upload (bool or dict): upload the checkpoints to the cloud storage in the background without
+                blocking the training. To enable either:
+
+                * set this parameter to ``True`` to use default ``BackgroundUploader`` initialization params
+                * provide custom ``BackgroundUploader`` initialization parameters as a dict as this parameter
+            sectioned_checkpoint (bool or dict): save the checkpoints in the sectioned checkpoint format. Refer to
+                the ``ModelCheckpoint`` for the details.
+            async_save (bool or dict): serialize and save the time-based checkpoints in the background thread.
+                To enable either:
+
+                * set this parameter to ``True`` to use default ``AsyncCheckpointWriter`` initialization params
+                * provide custom ``AsyncCheckpointWriter`` initialization parameters as a dict as this parameter
+            local_model_copy (bool): if set to ``False`` the checkpoints are serialized directly into the cloud
+                storage upload stream without being saved to the local drive. The local rolling window of
+                the ``num_checkpoints_kept`` checkpoints then doesn't apply. Refer to the ``ModelCheckpoint`` for
+                the details.
+        """
+        super().__init__(
+            project_name, experiment_name, local_model_result_folder_path,
+            hyperparams,
+            cloud_save_mode, bucket_name, cloud_dir_prefix,
+            rm_subopt_local_models=False, background_upload=background_upload,
+            sectioned_checkpoint=sectioned_checkpoint, async_save=async_save, local_model_copy=local_model_copy
+        )
+        self.callback_name = 'Model checkpoint every specified amount of training time'
+        if save_interval_minutes <= 0:
+            raise ValueError(f'save_interval_minutes should be positive. Provided: {save_interval_minutes}')
+
+        self.save_interval_minutes = save_interval_minutes
+        self.save_on_signals = [getattr(signal, signal_name) for signal_name in save_on_signals]
+        self.stop_on_signal = stop_on_signal
+
+        self.rolling_model_remover = None
+        if num_checkpoints_kept is not None:
+            self.rolling_model_remover = LocalRollingModelRemover(num_checkpoints_kept)
+            if isinstance(sectioned_checkpoint, dict) and sectioned_checkpoint.get('dedup_tensors', False):
+                self.rolling_model_remover.after_remove_fn = self.rm_unreferenced_tensor_blobs
+
+        self.last_save_time = None
+        self.received_signal = None
+        self.previous_signal_handlers = {}
+
+    def on_train_loop_registration(self):
+        super().on_train_loop_registration()
+        if self.background_uploader is not None and self.rolling_model_remover is not None:
+            self.rolling_model_remover.before_remove_fn = self.background_uploader.wait_for_files
+
+    def on_train_begin(self):
+        self.last_save_time = time.monotonic()
+        self.register_signal_handlers()
+
+    def on_batch_end(self):
+        if self.received_signal is not None:
+            self.save_on_signal()
+        elif time.monotonic() - self.last_save_time >= self.save_interval_minutes * 60.:
+            print(f'--> Saving time-based model checkpoint at the training iteration: '
+                  f'{self.train_loop_obj.total_iteration_idx}')
+            self.save_hyperparams()
+            self.save_checkpoint(iteration_idx=self.train_loop_obj.total_iteration_idx)
+            self.last_save_time = time.monotonic()
+
+    def on_epoch_end(self):
+        # Signal received during the end of epoch evaluation is handled as soon as the state is consistent again
+        if self.received_signal is not None:
+            self.save_on_signal()
+
+    def on_train_end(self):
+        self.restore_signal_handlers()
+        super().on_train_end()
+
+    def save_on_signal(self):
+        """Save the checkpoint triggered by the received signal and wait for it to be completely saved
+
+        Returns:
+            None
+        """
+        signal_num, self.received_signal = self.received_signal, None
+        print(f'--> Received the {signal.Signals(signal_num).name} signal. Saving model checkpoint at the training '
+              f'iteration: {self.train_loop_obj.total_iteration_idx}')
+        self.save_hyperparams()
+        self.save_checkpoint(iteration_idx=self.train_loop_obj.total_iteration_idx)
+        self.last_save_time = time.monotonic()
+
+        if self.async_checkpoint_writer is not None:
+            self.async_checkpoint_writer.wait_until_done()
+            self.report_save_status()
+        if self.background_uploader is not None:
+            self.background_uploader.wait_until_done()
+            self.report_upload_status()
+        print('--> Signal triggered model checkpoint saved')
+
+        if self.stop_on_signal:
+            self.restore_signal_handlers()
+            os.kill(os.getpid(), signal_num)
+
+    def _save_checkpoint(self, model_checkpoint, iteration_idx, train_history, last_checkpoint=False):
+        model_paths = super()._save_checkpoint(model_checkpoint, iteration_idx, train_history, last_checkpoint)
+        *_, model_local_path = model_paths
+        if self.rolling_model_remover is not None and model_local_path is not None:
+            self.rolling_model_remover.add_model(get_checkpoint_file_paths(model_local_path))
+        return model_paths
+
+    def register_signal_handlers(self):
+        """Install the handlers recording the received save triggering signals
+
+        Signal handlers can only be installed from the main thread. Otherwise, only the time-based saving is done.
+
+        Returns:
+            None
+        """
+        if threading.current_thread() is not threading.main_thread():
+            print('ModelTimeCheckpoint is not running in the main thread. Signal triggered saving is disabled.')
+            return
+
+        for signal_num in self.save_on_signals:
+            self.previous_signal_handlers[signal_num] = signal.signal(signal_num, self._record_signal)
+
+    def restore_signal_handlers(self):
+        """Reinstall the signal handlers which were active before the training started
+
+        Returns:
+            None
+        """
+        for signal_num, previous_handler in self.previous_signal_handlers.items():
+            signal.signal(signal_num, previous_handler if previous_handler is not None else signal.SIG_DFL)
+        self.previous_signal_handlers = {}
+
+    def _record_signal(self, signal_num, frame):
+        self.received_signal = signal_num
 
 
 class ModelTrainEndSave(AbstractCallback):
     def __init__(self, project_name, experiment_name, local_model_result_folder_path,
                  hyperparams, val_result_package=None, test_result_package=None,
-                 cloud_save_mode='s3', bucket_name='model-result', cloud_dir_prefix=''):
+                 cloud_save_mode='s3', bucket_name='model-result', cloud_dir_prefix='', sectioned_checkpoint=False,
+                 experiment_index=None, bundle_artifacts=False, local_model_copy=True):
         """At the end of training execute model performance evaluation, build result package report and save it
             together with the final model to local disk and possibly to S3 / GCS cloud storage
 
@@ -230,6 +793,22 @@ class ModelTrainEndSave(AbstractCallback):
                 Everything else results just in local storage to disk
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            sectioned_checkpoint (bool or dict): save the final model in the sectioned checkpoint format which
+                ``PyTorchLocalModelLoader`` loads lazily and memory-mapped, reading only the needed sections.
+                Provide a dict to specify the ``save_sectioned_checkpoint()`` parameters. For example,
+                ``{'weights_dtype': 'bf16', 'compression': 'zlib', 'separate_optimizer': True}`` stores the model
+                weights in bfloat16 and the optimizer state in a separate file. The loader refuses to resume
+                the training from the model saved with the reduced precision weights.
+            experiment_index (aitoolbox.experiment.experiment_index.ExperimentIndex or None): if provided,
+                the final experiment results are also recorded into this experiment index for the fast querying
+                across many experiment runs
+            bundle_artifacts (bool or dict): upload the small results files and separately the hyperparameters
+                file together with the source code snapshot to the cloud storage packed into the zip bundles instead
+                of uploading every file with its own request. Provide a dict to specify the ``ArtifactBundler``
+                parameters.
+            local_model_copy (bool): if set to ``False`` the final model is serialized directly into the cloud
+                storage upload stream without being saved to the local drive. Requires the cloud storage selected
+                via ``cloud_save_mode`` and can't be combined with the sectioned checkpoint format.
         """
         # execution_order=101 to make sure that this callback is the very last one to be executed when all the
         # evaluations are already stored in the train_history
@@ -249,6 +828,16 @@ class ModelTrainEndSave(AbstractCallback):
         self.cloud_save_mode = cloud_save_mode
         self.bucket_name = bucket_name
         self.cloud_dir_prefix = cloud_dir_prefix
+        self.sectioned_checkpoint = sectioned_checkpoint
+        self.experiment_index = experiment_index
+        self.bundle_artifacts = bundle_artifacts
+        self.artifact_bundler = None
+        self.local_model_copy = local_model_copy
+
+        if not self.local_model_copy and \
+                cloud_save_mode not in ['s3', 'aws_s3', 'aws', 'gcs', 'google_storage', 'google storage']:
+            raise ValueError('Disabled local_model_copy requires the cloud storage selected via cloud_save_mode. '
+                             f'Provided cloud_save_mode: {cloud_save_mode}')
 
     def on_train_end(self):
         if not self.train_loop_obj.ddp_training_mode or self.train_loop_obj.device.index == 0:
@@ -259,7 +848,8 @@ class ModelTrainEndSave(AbstractCallback):
             'schedulers_state_dict': [scheduler.state_dict() for scheduler in self.train_loop_obj.get_schedulers()],
             'epoch': self.train_loop_obj.epoch,
             'iteration_idx': self.train_loop_obj.total_iteration_idx,
-            'hyperparams': self.hyperparams
+            'hyperparams': self.hyperparams,
+            'train_loop_state': self.train_loop_obj.get_train_loop_state()
         }
         # If AMP is used
         if self.train_loop_obj.use_amp:
@@ -310,18 +900,32 @@ class ModelTrainEndSave(AbstractCallback):
             self.results_saver = FullPyTorchExperimentS3Saver(
                 self.project_name, self.experiment_name,
                 bucket_name=self.bucket_name, cloud_dir_prefix=self.cloud_dir_prefix,
-                local_model_result_folder_path=self.local_model_result_folder_path
+                local_model_result_folder_path=self.local_model_result_folder_path,
+                sectioned_checkpoint=self.sectioned_checkpoint,
+                experiment_index=self.experiment_index, local_model_copy=self.local_model_copy,
+                bundle_artifacts=self.bundle_artifacts
             )
         elif self.cloud_save_mode in ['gcs', 'google_storage', 'google storage']:
             self.results_saver = FullPyTorchExperimentGoogleStorageSaver(
                 self.project_name, self.experiment_name,
                 bucket_name=self.bucket_name, cloud_dir_prefix=self.cloud_dir_prefix,
-                local_model_result_folder_path=self.local_model_result_folder_path
+                local_model_result_folder_path=self.local_model_result_folder_path,
+                sectioned_checkpoint=self.sectioned_checkpoint,
+                experiment_index=self.experiment_index, local_model_copy=self.local_model_copy,
+                bundle_artifacts=self.bundle_artifacts
             )
         else:
             self.results_saver = FullPyTorchExperimentLocalSaver(
                 self.project_name, self.experiment_name,
-                local_model_result_folder_path=self.local_model_result_folder_path
+                local_model_result_folder_path=self.local_model_result_folder_path,
+                sectioned_checkpoint=self.sectioned_checkpoint,
+                experiment_index=self.experiment_index
+            )
+
+        if self.bundle_artifacts is not False and type(self.results_saver) != FullPyTorchExperimentLocalSaver:
+            self.artifact_bundler = ArtifactBundler(
+                self.results_saver.model_saver,
+                **(self.bundle_artifacts if isinstance(self.bundle_artifacts, dict) else {})
             )
 
         if not self.train_loop_obj.lazy_experiment_save and \
@@ -341,16 +945,11 @@ class ModelTrainEndSave(AbstractCallback):
 
                 # Should also save to cloud
                 if type(self.results_saver) != FullPyTorchExperimentLocalSaver:
-                    param_reporter.copy_to_cloud_storage(local_hyperparams_file_path, self.results_saver.model_saver)
-
-                    if local_experiment_python_file_path is not None:
-                        param_reporter.copy_to_cloud_storage(local_experiment_python_file_path,
-                                                             self.results_saver.model_saver,
-                                                             file_name=os.path.basename(local_experiment_python_file_path))
-                    if local_source_code_zip_path is not None:
-                        param_reporter.copy_to_cloud_storage(local_source_code_zip_path,
-                                                             self.results_saver.model_saver,
-                                                             file_name=os.path.basename(local_source_code_zip_path))
+                    param_reporter.copy_files_to_cloud_storage(
+                        [file_path for file_path in [local_hyperparams_file_path, local_experiment_python_file_path,
+                                                     local_source_code_zip_path] if file_path is not None],
+                        self.results_saver.model_saver, bundler=self.artifact_bundler
+                    )
 
                 self._hyperparams_already_saved = True
 
@@ -5,6 +5,8 @@ from aitoolbox.torchtrain.callbacks.abstract import AbstractCallback, AbstractEx
 from aitoolbox.torchtrain.train_loop.components import message_passing as msg_passing_settings
 from aitoolbox.cloud.AWS.results_save import BaseResultsSaver as BaseResultsS3Saver
 from aitoolbox.cloud.GoogleCloud.results_save import BaseResultsGoogleStorageSaver
+from aitoolbox.cloud.sync import IncrementalCloudSync
+from aitoolbox.cloud.bundle import ArtifactBundler
 from aitoolbox.cloud import s3_available_options, gcs_available_options
 from aitoolbox.experiment.local_save.local_results_save import BaseLocalResultsSaver
 from aitoolbox.experiment.result_reporting.report_generator import TrainingHistoryPlotter, TrainingHistoryWriter
@@ -303,7 +305,7 @@ class ModelTrainHistoryBaseCB(AbstractExperimentCallback):
     def __init__(self, callback_name, execution_order=0,
                  epoch_end=True, train_end=False, file_format='',
                  project_name=None, experiment_name=None, local_model_result_folder_path=None,
-                 cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None):
+                 cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None, bundle_artifacts=False):
         """Base callback class to be inherited from when reporting train performance history
 
         Args:
@@ -322,6 +324,8 @@ class ModelTrainHistoryBaseCB(AbstractExperimentCallback):
                 Everything else results just in local storage to disk
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            bundle_artifacts (bool or dict): upload the small report files produced at the same epoch to the cloud
+                storage packed into a single zip bundle. Provide a dict to specify the ``ArtifactBundler`` parameters.
         """
         AbstractExperimentCallback.__init__(self, callback_name,
                                             project_name, experiment_name, local_model_result_folder_path,
@@ -332,8 +336,10 @@ class ModelTrainHistoryBaseCB(AbstractExperimentCallback):
         self.epoch_end = epoch_end
         self.train_end = train_end
         self.file_format = file_format
+        self.bundle_artifacts = bundle_artifacts
 
         self.cloud_results_saver = None
+        self.cloud_sync = None
 
     def prepare_results_saver(self):
         """Initialize the required results saver
@@ -351,11 +357,21 @@ class ModelTrainHistoryBaseCB(AbstractExperimentCallback):
         else:
             self.cloud_results_saver = None
 
+        self.cloud_sync = None
+        if self.cloud_results_saver is not None:
+            artifact_bundler = None
+            if self.bundle_artifacts is not False:
+                artifact_bundler = ArtifactBundler(
+                    self.cloud_results_saver,
+                    **(self.bundle_artifacts if isinstance(self.bundle_artifacts, dict) else {})
+                )
+            self.cloud_sync = IncrementalCloudSync(self.cloud_results_saver, bundler=artifact_bundler)
+
 
 class ModelTrainHistoryPlot(ModelTrainHistoryBaseCB):
     def __init__(self, epoch_end=True, train_end=False, file_format='png',
                  project_name=None, experiment_name=None, local_model_result_folder_path=None,
-                 cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None):
+                 cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None, bundle_artifacts=False):
         """Plot the evaluated performance metric history
 
         Args:
@@ -372,6 +388,9 @@ class ModelTrainHistoryPlot(ModelTrainHistoryBaseCB):
                 Everything else results just in local storage to disk
             bucket_name (str): name of the bucket in the cloud storage
             cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            bundle_artifacts (bool or dict): upload all the plots of the epoch to the cloud storage packed into
+                a single zip bundle instead of uploading every plot file separately. Provide a dict to specify
+                the ``ArtifactBundler`` parameters.
         """
         # execution_order=97 makes sure that any performance calculation callbacks are executed before and the most
         # recent results can already be found in the train_history
@@ -380,7 +399,7 @@ class ModelTrainHistoryPlot(ModelTrainHistoryBaseCB):
                                          project_name=project_name, experiment_name=experiment_name,
                                          local_model_result_folder_path=local_model_result_folder_path,
                                          cloud_save_mode=cloud_save_mode, bucket_name=bucket_name,
-                                         cloud_dir_prefix=cloud_dir_prefix)
+                                         cloud_dir_prefix=cloud_dir_prefix, bundle_artifacts=bundle_artifacts)
         if self.file_format not in ['png', 'pdf']:
             raise ValueError(f"Output format '{self.file_format}' is not supported. "
                              "Select one of the following: 'png' or 'pdf'.")
@@ -411,10 +430,11 @@ class ModelTrainHistoryPlot(ModelTrainHistoryBaseCB):
                                                                          self.train_loop_obj.experiment_timestamp,
                                                                          self.local_model_result_folder_path)
 
+        plots_folder_name = f'{prefix}plots_epoch_{self.train_loop_obj.epoch}'
         plotter = TrainingHistoryPlotter(experiment_results_local_path=experiment_results_local_path)
         saved_local_results_details = \
             plotter.generate_report(training_history=self.train_loop_obj.train_history,
-                                    plots_folder_name=f'{prefix}plots_epoch_{self.train_loop_obj.epoch}',
+                                    plots_folder_name=plots_folder_name,
                                     file_format=self.file_format)
 
         results_file_local_paths = [result_local_path for _, result_local_path in saved_local_results_details]
@@ -428,10 +448,11 @@ class ModelTrainHistoryPlot(ModelTrainHistoryBaseCB):
                                                                                           self.experiment_name,
                                                                                           self.train_loop_obj.experiment_timestamp)
 
-            for results_file_path_in_cloud_results_dir, results_file_local_path in saved_local_results_details:
-                results_file_s3_path = os.path.join(experiment_cloud_path, results_file_path_in_cloud_results_dir)
-                self.cloud_results_saver.save_file(local_file_path=results_file_local_path,
-                                                   cloud_file_path=results_file_s3_path)
+            self.cloud_sync.sync_files(
+                [[results_file_local_path, os.path.join(experiment_cloud_path, results_file_path_in_cloud_results_dir)]
+                 for results_file_path_in_cloud_results_dir, results_file_local_path in saved_local_results_details],
+                bundle_cloud_path=os.path.join(experiment_cloud_path, f'{plots_folder_name}.zip')
+            )
 
 
 class ModelTrainHistoryFileWriter(ModelTrainHistoryBaseCB):
@@ -513,5 +534,4 @@ class ModelTrainHistoryFileWriter(ModelTrainHistoryBaseCB):
                                                                                           self.train_loop_obj.experiment_timestamp)
 
             results_file_s3_path = os.path.join(experiment_cloud_path, results_file_path_in_cloud_results_dir)
-            self.cloud_results_saver.save_file(local_file_path=results_file_local_path,
-                                               cloud_file_path=results_file_s3_path)
+            self.cloud_sync.sync_files([[results_file_local_path, results_file_s3_path]])
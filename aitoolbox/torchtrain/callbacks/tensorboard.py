@@ -2,10 +2,12 @@ import os
 from torch.utils.tensorboard import SummaryWriter
 
 from aitoolbox.torchtrain.callbacks.abstract import AbstractExperimentCallback
+from aitoolbox.torchtrain.callbacks.gradient import GradientStatsCalculator, get_model_layer_gradients
 from aitoolbox.experiment.local_save.folder_create import ExperimentFolder as FolderCreator
 from aitoolbox.cloud import s3_available_options, gcs_available_options
 from aitoolbox.cloud.AWS.results_save import BaseResultsSaver as BaseResultsS3Saver
 from aitoolbox.cloud.GoogleCloud.results_save import BaseResultsGoogleStorageSaver
+from aitoolbox.cloud.sync import IncrementalCloudSync
 
 
 class TensorboardReporterBaseCB(AbstractExperimentCallback):
@@ -51,31 +53,33 @@ class TensorboardReporterBaseCB(AbstractExperimentCallback):
         self.global_step = 0
 
         self.cloud_results_saver = None
+        self.cloud_sync = None
 
     def log_mid_train_loss(self):
         """Log the training loss at the batch iteration level
 
-        Logs current batch loss and the accumulated average loss.
+        Logs current batch loss, the accumulated average loss, the exponential moving average loss and the windowed
+        mean loss. All the values are read in O(1) from the TrainLoop's running loss tracker.
 
         Returns:
             None
         """
-        last_batch_loss = self.train_loop_obj.parse_loss(self.train_loop_obj.loss_batch_accum[-1:])
-        accum_mean_batch_loss = self.train_loop_obj.parse_loss(self.train_loop_obj.loss_batch_accum)
-
-        if not isinstance(last_batch_loss, dict) and not isinstance(accum_mean_batch_loss, dict):
-            last_batch_loss = {'loss': last_batch_loss}
-            accum_mean_batch_loss = {'loss': accum_mean_batch_loss}
-
-        for loss_name in last_batch_loss.keys():
-            self.tb_writer.add_scalar(
-                f'train_loss/last_batch_{loss_name}', last_batch_loss[loss_name],
-                self.global_step
-            )
-            self.tb_writer.add_scalar(
-                f'train_loss/accumulated_batch_{loss_name}', accum_mean_batch_loss[loss_name],
-                self.global_step
-            )
+        loss_tracker = self.train_loop_obj.loss_tracker
+        loss_stats = {
+            'last_batch': loss_tracker.get_loss('last'),
+            'accumulated_batch': loss_tracker.get_loss('mean'),
+            'ema_batch': loss_tracker.get_loss('ema'),
+            'window_mean_batch': loss_tracker.get_loss('window_mean')
+        }
+
+        for loss_stat_name, loss_stat in loss_stats.items():
+            if loss_stat is None:
+                continue
+            if not isinstance(loss_stat, dict):
+                loss_stat = {'loss': loss_stat}
+
+            for loss_name, loss_val in loss_stat.items():
+                self.tb_writer.add_scalar(f'train_loss/{loss_stat_name}_{loss_name}', loss_val, self.global_step)
 
     def log_train_history_metrics(self, metric_names):
         """Log the train history metrics at the end of the epoch
@@ -140,11 +144,15 @@ class TensorboardReporterBaseCB(AbstractExperimentCallback):
         else:
             self.cloud_results_saver = None
 
+        self.cloud_sync = IncrementalCloudSync(self.cloud_results_saver) \
+            if self.cloud_results_saver is not None else None
+
     def upload_to_cloud(self):
         """Upload sync the local version of tensorboard file to the cloud storage
 
         Will only upload to cloud if this callback is used as part of the experiment tracking TrainLoop and
-        the results are saved in the cloud experiment's folder.
+        the results are saved in the cloud experiment's folder. Only the new or changed tensorboard files
+        are uploaded.
 
         Returns:
             None
@@ -163,12 +171,7 @@ class TensorboardReporterBaseCB(AbstractExperimentCallback):
                 os.path.dirname(experiment_results_cloud_path),
                 tb_dir_sub_path
             )
-            for root, _, files in os.walk(self.log_dir):
-                for file_name in files:
-                    local_file_path = os.path.join(root, file_name)
-                    cloud_file_path = os.path.join(experiment_cloud_path, file_name)
-                    self.cloud_results_saver.save_file(local_file_path=local_file_path,
-                                                       cloud_file_path=cloud_file_path)
+            self.cloud_sync.sync_folder(self.log_dir, experiment_cloud_path)
 
 
 class TensorboardTrainBatchLoss(TensorboardReporterBaseCB):
@@ -306,3 +309,88 @@ class TensorboardFullTracking(TensorboardReporterBaseCB):
 
         self.tb_writer.flush()
         self.upload_to_cloud()
+
+
+class TensorboardGradientStats(TensorboardReporterBaseCB):
+    def __init__(self, model_layers_extract_def=None, grad_log_frequency=100, num_bins=50, subsample_size=None,
+                 log_dir=None, is_project=True,
+                 project_name=None, experiment_name=None, local_model_result_folder_path=None,
+                 cloud_save_mode=None, bucket_name=None, cloud_dir_prefix=None,
+                 **kwargs):
+        """Tensorboard model gradient stats and histograms logger
+
+        Gradient stats and histograms are calculated on the device and only the small summaries are moved to the CPU,
+        which makes the gradient monitoring cheap enough to be executed every N gradient updates.
+
+        When training with AMP the logged gradients are the scaled gradients unless some previously executed
+        gradient callback, such as gradient clipping, already unscaled them.
+
+        Args:
+            model_layers_extract_def (lambda or function or None): lambda/function accepting model as the input and
+                returning a list of all the layers in the model for which the gradient stats should be calculated.
+                If left to ``None``, the stats are calculated for all the named model parameters.
+            grad_log_frequency (int): number of gradient updates between the consecutive gradient stats logging
+            num_bins (int): number of gradient histogram bins
+            subsample_size (int or None): optional max number of gradient values per layer used to build histograms
+            log_dir (str or None): save directory location
+            is_project (bool): set to ``True`` if the results should be saved into the TrainLoop-created project
+                folder structure or to ``False`` if you want to save into a specific full path given in the log_dir
+                parameter.
+            project_name (str or None): root name of the project
+            experiment_name (str or None): name of the particular experiment
+            local_model_result_folder_path (str or None): root local path where project folder will be created
+            cloud_save_mode (str or None): Storage destination selector.
+                For AWS S3: 's3' / 'aws_s3' / 'aws'
+                For Google Cloud Storage: 'gcs' / 'google_storage' / 'google storage'
+                Everything else results just in local storage to disk
+            bucket_name (str): name of the bucket in the cloud storage
+            cloud_dir_prefix (str): path to the folder inside the bucket where the experiments are going to be saved
+            **kwargs: additional arguments for ``torch.utils.tensorboard.SummaryWriter`` wrapped inside this callback
+        """
+        TensorboardReporterBaseCB.__init__(self, 'Tensorboard gradient stats',
+                                           log_dir, is_project,
+                                           project_name, experiment_name, local_model_result_folder_path,
+                                           cloud_save_mode, bucket_name, cloud_dir_prefix,
+                                           **kwargs)
+        self.model_layers_extract_def = model_layers_extract_def
+        self.grad_log_frequency = grad_log_frequency
+        self.grad_stats_calculator = GradientStatsCalculator(num_bins, subsample_size)
+
+    def on_train_loop_registration(self):
+        TensorboardReporterBaseCB.on_train_loop_registration(self)
+        self.train_loop_obj.grad_cb_used = True
+
+    def on_after_gradient_update(self, optimizer_idx):
+        if optimizer_idx == 0 and (self.train_loop_obj.iteration + 1) % self.train_loop_obj.grad_accumulation == 0:
+            if self.global_step % self.grad_log_frequency == 0:
+                self.log_gradient_stats()
+
+            self.global_step += 1
+
+    def log_gradient_stats(self):
+        """Log the gradient stats scalars and histograms for all the tracked model layers
+
+        Returns:
+            None
+        """
+        layer_names, model_layer_gradients = \
+            get_model_layer_gradients(self.train_loop_obj.model, self.model_layers_extract_def)
+        layers_stats = self.grad_stats_calculator.calculate(model_layer_gradients)
+
+        for layer_name, layer_stats in zip(layer_names, layers_stats):
+            if layer_stats is not None:
+                for stat_name in ['norm', 'mean', 'std', 'zero_ratio']:
+                    self.tb_writer.add_scalar(f'gradients_{stat_name}/{layer_name}', layer_stats[stat_name],
+                                              self.global_step)
+
+                self.tb_writer.add_histogram_raw(
+                    f'gradients_hist/{layer_name}',
+                    min=layer_stats['min'], max=layer_stats['max'], num=int(layer_stats['num']),
+                    sum=layer_stats['sum'], sum_squares=layer_stats['sum_squares'],
+                    bucket_limits=layer_stats['bin_edges'][1:].tolist(), bucket_counts=layer_stats['hist'].tolist(),
+                    global_step=self.global_step
+                )
+
+    def on_epoch_end(self):
+        self.tb_writer.flush()
+        self.upload_to_cloud()
@@ -0,0 +1,206 @@
+import collections
+import numpy as np
+import torch
+
+
+class LossTracker:
+    loss_stat_names = ('last', 'mean', 'ema', 'window_mean')
+
+    def __init__(self, ema_decay=0.98, window_size=100, ddp_sync_frequency=None):
+        """Incremental running statistics of the training batch loss
+
+        Every batch loss is processed only once when it is added to the tracker, so reading the current statistics
+        is an O(1) operation regardless of how many batches have already been processed in the epoch.
+
+        Tracked statistics:
+
+        * ``'last'``: last batch loss
+        * ``'mean'``: mean of all the batch losses in the current epoch
+        * ``'ema'``: bias-corrected exponential moving average of the batch losses
+        * ``'window_mean'``: mean of the last ``window_size`` batch losses
+
+        The epoch mean is reset at the end of every epoch while the EMA and the windowed mean carry on over
+        the epoch boundaries.
+
+        Args:
+            ema_decay (float): exponential moving average decay factor
+            window_size (int): number of most recent batch losses included in the windowed mean
+            ddp_sync_frequency (int or None): when training in DDP mode, every ``ddp_sync_frequency`` iterations
+                the statistics are averaged across all the processes. The getters then return the last synced
+                statistics. If left to ``None``, no sync is done and the getters return the process local statistics.
+                As the sync has to be executed in all the processes this setting has to be provided before
+                the TrainLoop training is started and not from the callbacks which are executed only in some processes.
+        """
+        if not 0. <= ema_decay < 1.:
+            raise ValueError(f'ema_decay should be in the [0, 1) range. Provided: {ema_decay}')
+        if window_size < 1:
+            raise ValueError(f'window_size should be at least 1. Provided: {window_size}')
+
+        self.ema_decay = ema_decay
+        self.window_size = window_size
+        self.ddp_sync_frequency = ddp_sync_frequency
+
+        self.loss_names = None
+        self.last_loss = None
+        self.epoch_loss_sum = None
+        self.epoch_num_batches = 0
+        self.ema_loss = None
+        self.ema_num_updates = 0
+        self.window = collections.deque(maxlen=window_size)
+        self.window_loss_sum = None
+
+        self.ddp_synced_stats = None
+
+    def update(self, loss):
+        """Add new batch loss to the tracker
+
+        Args:
+            loss (float or dict): batch loss or the dict of batch losses when using MultiLoss
+
+        Returns:
+            None
+        """
+        if isinstance(loss, dict):
+            if self.loss_names is None:
+                self.loss_names = sorted(loss.keys())
+            loss = np.array([loss[k] for k in self.loss_names], dtype=np.float64)
+        else:
+            loss = np.array([loss], dtype=np.float64)
+
+        self.last_loss = loss
+
+        if self.epoch_num_batches == 0:
+            self.epoch_loss_sum = np.zeros_like(loss)
+        self.epoch_loss_sum += loss
+        self.epoch_num_batches += 1
+
+        self.ema_loss = loss * (1. - self.ema_decay) if self.ema_loss is None \
+            else self.ema_loss * self.ema_decay + loss * (1. - self.ema_decay)
+        self.ema_num_updates += 1
+
+        if self.window_loss_sum is None:
+            self.window_loss_sum = np.zeros_like(loss)
+        if len(self.window) == self.window_size:
+            self.window_loss_sum -= self.window[0]
+        self.window.append(loss)
+        self.window_loss_sum += loss
+
+    def reset_epoch(self):
+        """Reset the epoch level statistics
+
+        Returns:
+            None
+        """
+        self.epoch_loss_sum = None
+        self.epoch_num_batches = 0
+        self.ddp_synced_stats = None
+
+    def get_loss(self, loss_stat='mean'):
+        """Get the current value of the tracked loss statistic
+
+        Args:
+            loss_stat (str): selected loss statistic. Select one of: ``'last'``, ``'mean'``, ``'ema'``
+                or ``'window_mean'``
+
+        Returns:
+            float or dict or None: loss statistic value or the dict of loss statistic values when using MultiLoss.
+            ``None`` is returned if no batch losses have been added to the tracker yet.
+        """
+        if loss_stat not in self.loss_stat_names:
+            raise ValueError(f'Loss stat {loss_stat} not supported. Select one of: {self.loss_stat_names}')
+
+        if self.ddp_synced_stats is not None:
+            return self._format_loss(self.ddp_synced_stats[loss_stat])
+
+        return self._format_loss(self.calculate_local_stats()[loss_stat])
+
+    def calculate_local_stats(self):
+        """Calculate all the tracked loss statistics for the current process
+
+        Returns:
+            dict: loss statistic name to the numpy array of loss values
+        """
+        if self.last_loss is None:
+            return {loss_stat: None for loss_stat in self.loss_stat_names}
+
+        return {
+            'last': self.last_loss,
+            'mean': self.epoch_loss_sum / self.epoch_num_batches if self.epoch_num_batches > 0 else self.last_loss,
+            'ema': self.ema_loss / (1. - self.ema_decay ** self.ema_num_updates),
+            'window_mean': self.window_loss_sum / len(self.window)
+        }
+
+    def sync_ddp(self, ddp_handler):
+        """Average the tracked loss statistics across all the DDP processes
+
+        Needs to be called in all the running processes as it executes collective communication.
+
+        Args:
+            ddp_handler (aitoolbox.torchtrain.train_loop.components.ddp_handler.DDPHandler): TrainLoop DDP handler
+
+        Returns:
+            None
+        """
+        local_stats = self.calculate_local_stats()
+        if local_stats['last'] is None:
+            return
+
+        local_stats_tensor = torch.Tensor(np.stack([local_stats[loss_stat] for loss_stat in self.loss_stat_names]))
+        synced_stats = ddp_handler.mp_sync(local_stats_tensor).reshape(-1, *local_stats_tensor.shape)
+        synced_stats = synced_stats.mean(dim=0).numpy()
+        self.ddp_synced_stats = dict(zip(self.loss_stat_names, synced_stats))
+
+    def state_dict(self):
+        """Get the tracker state which can be saved into the checkpoint and restored when continuing the training
+
+        Numpy arrays are converted into the plain lists so that the state can be loaded with the ``torch.load()``
+        restricted to the weights only.
+
+        Returns:
+            dict: loss tracker state
+        """
+        return {
+            'loss_names': self.loss_names,
+            'last_loss': self._array_to_list(self.last_loss),
+            'epoch_loss_sum': self._array_to_list(self.epoch_loss_sum),
+            'epoch_num_batches': self.epoch_num_batches,
+            'ema_loss': self._array_to_list(self.ema_loss),
+            'ema_num_updates': self.ema_num_updates,
+            'window': [self._array_to_list(loss) for loss in self.window],
+            'window_loss_sum': self._array_to_list(self.window_loss_sum)
+        }
+
+    def load_state_dict(self, state_dict):
+        """Restore the tracker state obtained from ``state_dict()``
+
+        Args:
+            state_dict (dict): loss tracker state
+
+        Returns:
+            None
+        """
+        self.loss_names = state_dict['loss_names']
+        self.last_loss = self._list_to_array(state_dict['last_loss'])
+        self.epoch_loss_sum = self._list_to_array(state_dict['epoch_loss_sum'])
+        self.epoch_num_batches = state_dict['epoch_num_batches']
+        self.ema_loss = self._list_to_array(state_dict['ema_loss'])
+        self.ema_num_updates = state_dict['ema_num_updates']
+        self.window = collections.deque([self._list_to_array(loss) for loss in state_dict['window']],
+                                        maxlen=self.window_size)
+        self.window_loss_sum = self._list_to_array(state_dict['window_loss_sum'])
+        self.ddp_synced_stats = None
+
+    @staticmethod
+    def _array_to_list(loss):
+        return loss.tolist() if loss is not None else None
+
+    @staticmethod
+    def _list_to_array(loss):
+        return np.array(loss, dtype=np.float64) if loss is not None else None
+
+    def _format_loss(self, loss):
+        if loss is None:
+            return None
+        if self.loss_names is None:
+            return float(loss[0])
+        return {loss_name: float(loss_val) for loss_name, loss_val in zip(self.loss_names, loss)}
@@ -0,0 +1,155 @@
+import random
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, IterableDataset
+
+
+def get_rng_state():
+    """Capture the state of all the global random number generators used during the training
+
+    The state is stored only in the basic python types and the torch tensors so that it can be loaded with
+    the ``torch.load()`` restricted to the weights only.
+
+    Returns:
+        dict: python, numpy, torch and (when available) CUDA random number generator states
+    """
+    np_rng_state = np.random.get_state()
+    rng_state = {
+        'python': random.getstate(),
+        'numpy': (np_rng_state[0], np_rng_state[1].tolist()) + tuple(np_rng_state[2:]),
+        'torch': torch.get_rng_state()
+    }
+    if torch.cuda.is_available():
+        rng_state['cuda'] = torch.cuda.get_rng_state_all()
+    return rng_state
+
+
+def set_rng_state(rng_state):
+    """Restore the global random number generators state obtained from ``get_rng_state()``
+
+    Args:
+        rng_state (dict): random number generator states
+
+    Returns:
+        None
+    """
+    version, internal_state, gauss_next = rng_state['python']
+    random.setstate((version, tuple(internal_state), gauss_next))
+
+    np_rng_state = rng_state['numpy']
+    np.random.set_state((np_rng_state[0], np.array(np_rng_state[1], dtype=np.uint32)) + tuple(np_rng_state[2:]))
+
+    torch.set_rng_state(rng_state['torch'].cpu())
+    if 'cuda' in rng_state and torch.cuda.is_available() and len(rng_state['cuda']) == torch.cuda.device_count():
+        torch.cuda.set_rng_state_all([state.cpu() for state in rng_state['cuda']])
+
+
+class SkipBatchSampler:
+    def __init__(self, batch_sampler, num_skipped_batches, rng_state=None):
+        """Batch sampler wrapper skipping the first batches of the wrapped sampler
+
+        Only the sample indices of the skipped batches are drawn from the wrapped sampler. The samples themselves
+        are never loaded from the dataset.
+
+        Args:
+            batch_sampler: wrapped (batch) sampler of the original data loader
+            num_skipped_batches (int): number of batches skipped at the start of the iteration
+            rng_state (dict or None): random number generators state obtained from ``get_rng_state()`` which
+                is restored after the batches have been skipped
+        """
+        self.batch_sampler = batch_sampler
+        self.num_skipped_batches = num_skipped_batches
+        self.rng_state = rng_state
+
+    def __iter__(self):
+        batch_sampler_iter = iter(self.batch_sampler)
+        for _ in range(self.num_skipped_batches):
+            if next(batch_sampler_iter, None) is None:
+                break
+
+        if self.rng_state is not None:
+            set_rng_state(self.rng_state)
+
+        yield from batch_sampler_iter
+
+    def __len__(self):
+        return max(len(self.batch_sampler) - self.num_skipped_batches, 0)
+
+
+class SkipLoadedBatches:
+    def __init__(self, data_loader, num_skipped_batches, rng_state=None):
+        """Data loader wrapper skipping the first batches by loading and discarding them
+
+        Fallback for the data loaders where the sample indices can't be drawn without loading the data,
+        e.g. when the loader is based on the ``IterableDataset``.
+
+        Args:
+            data_loader (torch.utils.data.DataLoader): wrapped data loader
+            num_skipped_batches (int): number of batches skipped at the start of the iteration
+            rng_state (dict or None): random number generators state obtained from ``get_rng_state()`` which
+                is restored after the batches have been skipped
+        """
+        self.data_loader = data_loader
+        self.num_skipped_batches = num_skipped_batches
+        self.rng_state = rng_state
+
+    def __iter__(self):
+        data_loader_iter = iter(self.data_loader)
+        for _ in range(self.num_skipped_batches):
+            if next(data_loader_iter, None) is None:
+                break
+
+        if self.rng_state is not None:
+            set_rng_state(self.rng_state)
+
+        yield from data_loader_iter
+
+    def __len__(self):
+        return max(len(self.data_loader) - self.num_skipped_batches, 0)
+
+
+def build_resumed_data_loader(data_loader, num_skipped_batches, rng_state=None):
+    """Replicate given data loader so that it continues the partially finished epoch
+
+    To reproduce the same data order as in the interrupted epoch, the random number generators should be set to
+    the state they were in at the start of the interrupted epoch before the iteration over the returned loader
+    is started. The wrapped sampler then draws the same permutation as in the original epoch and skips the already
+    consumed batches without loading their samples. This also works for the ``DistributedSampler`` added by
+    the DDPHandler for which the permutation is determined by the sampler epoch set at the start of every epoch.
+
+    Args:
+        data_loader (torch.utils.data.DataLoader): original data loader
+        num_skipped_batches (int): number of batches already consumed in the interrupted epoch
+        rng_state (dict or None): random number generators state at the interruption which is restored once
+            the batches have been skipped
+
+    Returns:
+        torch.utils.data.DataLoader or SkipLoadedBatches: data loader continuing the interrupted epoch
+    """
+    if isinstance(data_loader.dataset, IterableDataset):
+        print('Data loader is based on IterableDataset. The already consumed batches have to be loaded '
+              'in order to skip them.')
+        return SkipLoadedBatches(data_loader, num_skipped_batches, rng_state)
+
+    data_loader_args = {
+        'dataset': data_loader.dataset,
+        'num_workers': data_loader.num_workers,
+        'collate_fn': data_loader.collate_fn,
+        'pin_memory': data_loader.pin_memory,
+        'timeout': data_loader.timeout,
+        'worker_init_fn': data_loader.worker_init_fn,
+        'multiprocessing_context': data_loader.multiprocessing_context,
+        'generator': data_loader.generator
+    }
+    if hasattr(data_loader, 'persistent_workers'):
+        data_loader_args['persistent_workers'] = data_loader.persistent_workers
+    if data_loader.num_workers > 0 and hasattr(data_loader, 'prefetch_factor'):
+        data_loader_args['prefetch_factor'] = data_loader.prefetch_factor
+
+    if data_loader.batch_sampler is not None:
+        data_loader_args['batch_sampler'] = SkipBatchSampler(data_loader.batch_sampler, num_skipped_batches, rng_state)
+    else:
+        data_loader_args['sampler'] = SkipBatchSampler(data_loader.sampler, num_skipped_batches, rng_state)
+        data_loader_args['batch_size'] = None
+
+    return DataLoader(**data_loader_args)
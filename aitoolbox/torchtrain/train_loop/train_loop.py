@@ -24,6 +24,9 @@ from aitoolbox.torchtrain.schedulers.basic import AbstractScheduler
 from aitoolbox.experiment.training_history import TrainingHistory
 from aitoolbox.torchtrain.train_loop.components.model_prediction_store import ModelPredictionStore
 from aitoolbox.torchtrain.train_loop.components.message_passing import MessageService
+from aitoolbox.torchtrain.train_loop.components.loss_tracker import LossTracker
+from aitoolbox.torchtrain.train_loop.components.train_state import \
+    get_rng_state, set_rng_state, build_resumed_data_loader
 from aitoolbox.torchtrain.train_loop.components.pred_collate_fns import append_predictions, torch_cat_transf
 
 
@@ -113,10 +116,17 @@ class TrainLoop:
 
         self.experiment_timestamp = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d_%H-%M-%S')
         self.loss_batch_accum = []
+        # Running batch loss statistics. Can be replaced with differently configured LossTracker before training
+        self.loss_tracker = LossTracker()
         self.epoch = 0
         self.iteration = 0
         # Intentionally set to -1 because we do += 1 at the start of every iteration
         self.total_iteration_idx = -1
+        self.epoch_in_progress = False
+        # Random number generators state captured before the iteration over the train loader is started
+        self.epoch_start_rng_state = None
+        # Set when continuing the training from the checkpoint saved in the middle of the epoch
+        self.mid_epoch_resume_state = None
 
         # Store settings provided in fit()
         self.num_epochs, self.num_iterations = None, None
@@ -134,6 +144,8 @@ class TrainLoop:
         self.early_stop = False
 
         self.grad_cb_used = False
+        # IDs of the optimizers whose gradients were already unscaled by the gradient callbacks in the current step
+        self.amp_unscaled_optimizer_ids = set()
 
         if not isinstance(self.model, TTModel) and not isinstance(self.model, TTDataParallel) and \
                 not isinstance(self.model, Module):
@@ -227,7 +239,14 @@ class TrainLoop:
                 print(f'Epoch: {self.epoch}')
             self.callbacks_handler.execute_epoch_begin()
 
-            for self.iteration, batch_data in enumerate(tqdm(self.train_loader)):
+            train_loader, start_iteration = self.train_loader, 0
+            if self.mid_epoch_resume_state is not None:
+                train_loader, start_iteration = self._build_mid_epoch_resume_loader()
+            else:
+                self.epoch_start_rng_state = get_rng_state()
+            self.epoch_in_progress = True
+
+            for self.iteration, batch_data in enumerate(tqdm(train_loader), start=start_iteration):
                 self.total_iteration_idx += 1
                 self.callbacks_handler.execute_batch_begin()
 
@@ -247,12 +266,14 @@ class TrainLoop:
                     self._optimizer_zero_grad(optimizer_idx)
 
                 self.amp_scaler.update()
+                self.amp_unscaled_optimizer_ids.clear()
 
                 self.callbacks_handler.execute_batch_end()
 
                 if self.total_iteration_idx + 1 == num_iterations:
                     break
 
+            self.epoch_in_progress = False
             # Automatic end of epoch code - reports the train and if available validation loss and executes callbacks
             self.auto_execute_end_of_epoch()
             self.callbacks_handler.execute_epoch_end()
@@ -277,6 +298,77 @@ class TrainLoop:
 
         return self.model
 
+    def get_train_loop_state(self):
+        """Get the training progress state needed to exactly continue the training from the checkpoint
+
+        Apart from the epoch and iteration counters the state includes the losses accumulated in the current epoch,
+        the loss tracker statistics and the random number generators state both at the start of the current epoch
+        and at the moment of the call. When the state is captured in the middle of the epoch, the former is used
+        to reproduce the data sampler order of the interrupted epoch.
+
+        Returns:
+            dict: train loop state
+        """
+        return {
+            'epoch': self.epoch,
+            'iteration': self.iteration,
+            'total_iteration_idx': self.total_iteration_idx,
+            'epoch_completed': not self.epoch_in_progress,
+            'loss_batch_accum': list(self.loss_batch_accum) if self.epoch_in_progress else [],
+            'loss_tracker': self.loss_tracker.state_dict(),
+            'epoch_start_rng_state': self.epoch_start_rng_state,
+            'rng_state': get_rng_state()
+        }
+
+    def load_train_loop_state(self, train_loop_state):
+        """Restore the training progress state obtained from ``get_train_loop_state()``
+
+        If the state was captured at the end of the epoch, the training continues from the start of the next epoch.
+        If it was captured in the middle of the epoch, the training continues in the same epoch right after
+        the last finished iteration. In the latter case the train loader sampler is fast-forwarded without
+        loading the samples of the already finished iterations.
+
+        Args:
+            train_loop_state (dict): train loop state
+
+        Returns:
+            None
+        """
+        self.total_iteration_idx = train_loop_state['total_iteration_idx']
+        self.loss_tracker.load_state_dict(train_loop_state['loss_tracker'])
+
+        if train_loop_state['epoch_completed']:
+            self.epoch = train_loop_state['epoch'] + 1
+            set_rng_state(train_loop_state['rng_state'])
+        else:
+            self.epoch = train_loop_state['epoch']
+            self.loss_batch_accum = list(train_loop_state['loss_batch_accum'])
+            self.mid_epoch_resume_state = {
+                'num_skipped_batches': train_loop_state['iteration'] + 1,
+                'epoch_start_rng_state': train_loop_state['epoch_start_rng_state'],
+                'rng_state': train_loop_state['rng_state']
+            }
+
+    def _build_mid_epoch_resume_loader(self):
+        """Build the train loader continuing the interrupted epoch
+
+        Returns:
+            (torch.utils.data.DataLoader, int): train loader skipping the finished iterations, index of the first
+            iteration to be executed
+        """
+        resume_state, self.mid_epoch_resume_state = self.mid_epoch_resume_state, None
+        num_skipped_batches = resume_state['num_skipped_batches']
+
+        self.epoch_start_rng_state = resume_state['epoch_start_rng_state']
+        if self.epoch_start_rng_state is not None:
+            set_rng_state(self.epoch_start_rng_state)
+
+        if not self.ddp_training_mode or self.device.index == 0:
+            print(f'Continuing the epoch {self.epoch} from the iteration {num_skipped_batches}')
+
+        train_loader = build_resumed_data_loader(self.train_loader, num_skipped_batches, resume_state['rng_state'])
+        return train_loader, num_skipped_batches
+
     def _calculate_batch_loss(self, batch_data):
         """Push batch data through the model and calculate the batch loss
 
@@ -297,7 +389,13 @@ class TrainLoop:
             # Need to divide by the number of accumulation steps if our loss is averaged over the training samples
             loss_batch = loss_batch / self.grad_accumulation
 
-        self.loss_batch_accum.append(loss_batch_log.item())
+        loss_batch_log = loss_batch_log.item()
+        self.loss_batch_accum.append(loss_batch_log)
+        self.loss_tracker.update(loss_batch_log)
+
+        if self.ddp_training_mode and self.loss_tracker.ddp_sync_frequency is not None and \
+                self.total_iteration_idx % self.loss_tracker.ddp_sync_frequency == 0:
+            self.loss_tracker.sync_ddp(self.ddp_handler)
 
         return loss_batch
 
@@ -381,6 +479,7 @@ class TrainLoop:
                               loss_type_name='accumulated_loss',
                               loss_print_description='AVG BATCH ACCUMULATED TRAIN LOSS')
         self.loss_batch_accum = []
+        self.loss_tracker.reset_epoch()
 
         if (type(self.end_auto_eval) is bool and self.end_auto_eval) or \
                 (type(self.end_auto_eval) is int and self.epoch % self.end_auto_eval == 0):
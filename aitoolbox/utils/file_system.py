@@ -1,8 +1,11 @@
 import os
 from os import path
 import shutil
+import fnmatch
 import zipfile
 import tarfile
+import threading
+from contextlib import contextmanager
 
 
 def create_folder_hierarchy(base_folder_path, folder_names):
@@ -31,6 +34,29 @@ def create_folder_hierarchy(base_folder_path, folder_names):
     return folder_path, all_created_folder_paths
 
 
+@contextmanager
+def atomic_write_path(file_path):
+    """Provide the temporary file path which is atomically moved to the final file path once fully written
+
+    Readers of the final file path consequently never see a partially written file. If the writing fails,
+    the temporary file is removed and the potentially already existing file at the final path is left untouched.
+
+    Args:
+        file_path (str): final destination file path
+
+    Yields:
+        str: temporary file path to which the file should be written
+    """
+    # Unique temporary name so that concurrent writers of the same file don't interfere with each other
+    tmp_file_path = f'{file_path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    try:
+        yield tmp_file_path
+        os.replace(tmp_file_path, file_path)
+    finally:
+        if path.exists(tmp_file_path):
+            os.remove(tmp_file_path)
+
+
 def zip_folder(source_dir_path, zip_path):
     """Utility function for zipping a folder into .zip archive
 
@@ -48,16 +74,96 @@ def zip_folder(source_dir_path, zip_path):
     return zip_path + '.zip'
 
 
-def unzip_file(file_path, target_dir_path):
+def unzip_file(file_path, target_dir_path, members=None):
     """Util function for zip file unzipping
 
     Args:
         file_path (str): path to the zip file
         target_dir_path (str): destination where unzipped content is stored
+        members (list or None): optional list of glob patterns. Only the archive members matching at least one
+            of the patterns are extracted. If left to ``None`` the whole archive is extracted.
     """
     if file_path[-4:] == '.zip':
-        with zipfile.ZipFile(file_path, 'r') as zip_ref:
-            zip_ref.extractall(target_dir_path)
+        extract_zip(file_path, target_dir_path, members)
     elif file_path[-7:] == '.tar.gz':
-        with tarfile.open(file_path, 'r') as zip_ref:
-            zip_ref.extractall(target_dir_path)
+        with open(file_path, 'rb') as f:
+            extract_tar_stream(f, target_dir_path, members)
+
+
+def is_archive_member_selected(member_name, members=None):
+    """Check if the archive member matches any of the selection glob patterns
+
+    Args:
+        member_name (str): name of the member inside the archive
+        members (list or None): list of glob patterns. If ``None`` every member is selected.
+
+    Returns:
+        bool: if the member should be extracted
+    """
+    return members is None or any(fnmatch.fnmatch(member_name, pattern) for pattern in members)
+
+
+def get_archive_member_path(target_dir_path, member_name):
+    """Get the path at which the archive member is extracted
+
+    Args:
+        target_dir_path (str): destination where the extracted content is stored
+        member_name (str): name of the member inside the archive
+
+    Returns:
+        str: extracted member path
+    """
+    return path.normpath(path.join(target_dir_path, member_name))
+
+
+def extract_zip(file, target_dir_path, members=None, extracted_paths=None):
+    """Extract the zip archive with the optional member filtering
+
+    Only the bytes of the selected members are read from the archive. When the provided file object reads from
+    the remote storage only the selected members are thus downloaded.
+
+    Args:
+        file (str or file object): path to the zip file or the seekable file object
+        target_dir_path (str): destination where the extracted content is stored
+        members (list or None): optional list of glob patterns selecting the extracted members
+        extracted_paths (list or None): optional list into which the member paths are recorded right before each
+            member is extracted. This way also the members written before the extraction failed are known.
+
+    Returns:
+        list: paths of the extracted members
+    """
+    extracted_paths = extracted_paths if extracted_paths is not None else []
+
+    with zipfile.ZipFile(file, 'r') as zip_ref:
+        for member_name in zip_ref.namelist():
+            if is_archive_member_selected(member_name, members):
+                extracted_paths.append(get_archive_member_path(target_dir_path, member_name))
+                zip_ref.extract(member_name, target_dir_path)
+    return extracted_paths
+
+
+def extract_tar_stream(file_obj, target_dir_path, members=None, extracted_paths=None):
+    """Extract the (compressed) tar archive in a single sequential pass over the stream
+
+    The archive members are extracted as soon as their bytes are read which allows the extraction of the archive
+    directly from the network stream without first saving the archive to disk.
+
+    Args:
+        file_obj (file object): readable file object of the tar archive. Seeking is not required.
+        target_dir_path (str): destination where the extracted content is stored
+        members (list or None): optional list of glob patterns selecting the extracted members
+        extracted_paths (list or None): optional list into which the member paths are recorded right before each
+            member is extracted. This way also the members written before the extraction failed are known.
+
+    Returns:
+        list: paths of the extracted members
+    """
+    extracted_paths = extracted_paths if extracted_paths is not None else []
+    extract_kwargs = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+    with tarfile.open(fileobj=file_obj, mode='r|*') as tar_ref:
+        for member in tar_ref:
+            if is_archive_member_selected(member.name, members):
+                extracted_paths.append(get_archive_member_path(target_dir_path, member.name))
+                tar_ref.extract(member, target_dir_path, **extract_kwargs)
+    return extracted_paths
@@ -1,11 +1,17 @@
 import unittest
 
 import os
+import io
+import gc
+import shutil
+import tarfile
+import zipfile
 import boto3
 from moto import mock_s3
 
 from tests.setup_moto_env import setup_aws_for_test
 from aitoolbox.cloud.AWS.data_access import BaseDataSaver, BaseDataLoader
+from aitoolbox.cloud.transfer import CloudTransferConfig, MB
 
 setup_aws_for_test()
 BUCKET_NAME = 'test-bucket'
@@ -74,6 +80,142 @@ class TestBaseDataSaver(unittest.TestCase):
              'resources/upload_folder/some_file.txt', 'upload_folder/file_2.txt', 'upload_folder/some_file.txt']
         )
 
+    @mock_s3
+    def test_folder_upload_serial(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME, transfer_config=CloudTransferConfig(max_workers=1))
+        data_saver.save_folder(os.path.join(THIS_DIR, 'resources'), 'resources')
+        bucket_content = [el['Key'] for el in s3_client.list_objects(Bucket=BUCKET_NAME)['Contents']]
+        self.assertEqual(
+            bucket_content,
+            ['resources/file.txt', 'resources/upload_folder/file_2.txt', 'resources/upload_folder/some_file.txt']
+        )
+
+    @mock_s3
+    def test_multiple_files_upload(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME, transfer_config=CloudTransferConfig(max_workers=4))
+        data_saver.save_files([[os.path.join(THIS_DIR, 'resources/file.txt'), f'folder/file_{i}.txt']
+                               for i in range(10)])
+        bucket_content = [el['Key'] for el in s3_client.list_objects(Bucket=BUCKET_NAME)['Contents']]
+        self.assertEqual(bucket_content, sorted([f'folder/file_{i}.txt' for i in range(10)]))
+
+    @mock_s3
+    def test_multipart_upload(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        large_file_path = os.path.join(THIS_DIR, 'large_file.bin')
+        with open(large_file_path, 'wb') as f:
+            f.write(os.urandom(11 * MB))
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME,
+                                   transfer_config=CloudTransferConfig(multipart_threshold=5 * MB,
+                                                                       multipart_chunksize=5 * MB, max_concurrency=3))
+        data_saver.save_file(large_file_path, 'large_file.bin')
+
+        s3_object = s3_client.head_object(Bucket=BUCKET_NAME, Key='large_file.bin')
+        # Multipart upload ETags have the number of uploaded parts appended
+        self.assertTrue(s3_object['ETag'].strip('"').endswith('-3'))
+
+        if os.path.exists(large_file_path):
+            os.remove(large_file_path)
+
+    @mock_s3
+    def test_upload_stream_small_file(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME)
+        with data_saver.open_upload_stream('folder/stream_file.txt') as upload_stream:
+            upload_stream.write(b'first line\n')
+            upload_stream.write(b'second line')
+
+        self.assertIsNone(upload_stream.upload_id)
+        self.assertEqual(s3_client.get_object(Bucket=BUCKET_NAME, Key='folder/stream_file.txt')['Body'].read(),
+                         b'first line\nsecond line')
+
+    @mock_s3
+    def test_upload_stream_multipart(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+        data = os.urandom(11 * MB)
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME,
+                                   transfer_config=CloudTransferConfig(multipart_chunksize=5 * MB))
+        with data_saver.open_upload_stream('large_file.bin') as upload_stream:
+            upload_stream.write(data[:1 * MB])
+            upload_stream.write(data[1 * MB:])
+            # Never more than a single part is buffered in memory
+            self.assertLess(len(upload_stream.buffer), 5 * MB)
+
+        self.assertEqual(len(upload_stream.uploaded_parts), 3)
+        self.assertEqual(upload_stream.num_bytes_written, 11 * MB)
+        self.assertEqual(s3_client.get_object(Bucket=BUCKET_NAME, Key='large_file.bin')['Body'].read(), data)
+
+    @mock_s3
+    def test_upload_stream_aborted_on_exception(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME,
+                                   transfer_config=CloudTransferConfig(multipart_chunksize=5 * MB))
+        with self.assertRaises(RuntimeError):
+            with data_saver.open_upload_stream('large_file.bin') as upload_stream:
+                upload_stream.write(os.urandom(6 * MB))
+                raise RuntimeError('Serialization failed')
+
+        self.assertNotIn('Contents', s3_client.list_objects(Bucket=BUCKET_NAME))
+        self.assertNotIn('Uploads', s3_client.list_multipart_uploads(Bucket=BUCKET_NAME))
+
+    @mock_s3
+    def test_upload_stream_aborted_when_dropped_without_close(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME,
+                                   transfer_config=CloudTransferConfig(multipart_chunksize=5 * MB))
+        for data_size in [6 * MB, 100]:
+            upload_stream = data_saver.open_upload_stream('large_file.bin')
+            upload_stream.write(os.urandom(data_size))
+            del upload_stream
+            gc.collect()
+
+            self.assertNotIn('Contents', s3_client.list_objects(Bucket=BUCKET_NAME))
+            self.assertNotIn('Uploads', s3_client.list_multipart_uploads(Bucket=BUCKET_NAME))
+
+
+    @mock_s3
+    def test_delete_files(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        s3_client = boto3.client('s3')
+
+        data_saver = BaseDataSaver(bucket_name=BUCKET_NAME)
+        for i in range(3):
+            data_saver.save_bytes(b'data', f'folder/file_{i}.txt')
+        data_saver.delete_files(['folder/file_0.txt', 'folder/file_1.txt', 'folder/missing_file.txt'])
+        self.assertEqual([el['Key'] for el in s3_client.list_objects(Bucket=BUCKET_NAME)['Contents']],
+                         ['folder/file_2.txt'])
+
+        delete_objects = data_saver.s3_client.delete_objects
+
+        def delete_objects_with_errors(**kwargs):
+            response = delete_objects(**kwargs)
+            response['Errors'] = [{'Key': 'folder/file_2.txt', 'Code': 'AccessDenied', 'Message': 'Access Denied'}]
+            return response
+        data_saver.s3_client.delete_objects = delete_objects_with_errors
+
+        with self.assertRaises(RuntimeError) as context:
+            data_saver.delete_files(['folder/file_2.txt'])
+        self.assertIn('folder/file_2.txt', str(context.exception))
+        self.assertIn('AccessDenied', str(context.exception))
 
 class TestBaseDataLoader(unittest.TestCase):
     @mock_s3
@@ -107,3 +249,177 @@ class TestBaseDataLoader(unittest.TestCase):
             os.remove(dl_file_path)
         if os.path.exists(dl_some_folder_file_path):
             os.remove(dl_some_folder_file_path)
+
+    @mock_s3
+    def test_read_files(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        file_contents = [os.urandom(100 * (i + 1)) for i in range(5)]
+        for i, file_content in enumerate(file_contents):
+            s3.Object(BUCKET_NAME, f'data/file_{i}.bin').put(Body=file_content)
+
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=THIS_DIR,
+                                     transfer_config=CloudTransferConfig(max_workers=3))
+        self.assertEqual(data_loader.read_file('data/file_0.bin'), bytearray(file_contents[0]))
+        self.assertEqual(data_loader.read_files([f'data/file_{i}.bin' for i in [4, 2, 0, 3, 1]]),
+                         [bytearray(file_contents[i]) for i in [4, 2, 0, 3, 1]])
+
+    @mock_s3
+    def test_ranged_download_through_cache(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        file_content = os.urandom(1000)
+        s3.Object(BUCKET_NAME, 'data/file.bin').put(Body=file_content)
+
+        cache_dir_path = os.path.join(THIS_DIR, 'download_cache')
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=THIS_DIR,
+                                     cache_dir_path=cache_dir_path,
+                                     transfer_config=CloudTransferConfig(multipart_threshold=100,
+                                                                         multipart_chunksize=300))
+        dl_file_paths = [os.path.join(THIS_DIR, f'downloaded_file_{i}.bin') for i in range(2)]
+        data_loader.load_files([['data/file.bin', file_path] for file_path in dl_file_paths])
+
+        for file_path in dl_file_paths:
+            with open(file_path, 'rb') as f:
+                self.assertEqual(f.read(), file_content)
+
+        cache_files = [file_name for _, _, files in os.walk(cache_dir_path) for file_name in files
+                       if not file_name.endswith('.lock')]
+        self.assertEqual(len(cache_files), 1)
+
+        # Missing objects are skipped as before
+        data_loader.load_file('data/missing.bin', os.path.join(THIS_DIR, 'missing.bin'))
+        self.assertFalse(os.path.exists(os.path.join(THIS_DIR, 'missing.bin')))
+
+        shutil.rmtree(cache_dir_path, ignore_errors=True)
+        for file_path in dl_file_paths:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    @mock_s3
+    def test_file_md5_only_for_md5_etags(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        s3.Object(BUCKET_NAME, 'file.txt').put(Body=b'content')
+
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=THIS_DIR)
+        file_size, file_etag, file_md5 = data_loader.get_file_info('file.txt')
+        self.assertEqual(file_size, 7)
+        self.assertEqual(file_md5, file_etag)
+
+        head_object = data_loader.s3_client.head_object
+        for encryption_head in [{'ServerSideEncryption': 'aws:kms'}, {'SSECustomerAlgorithm': 'AES256'}]:
+            data_loader.s3_client.head_object = lambda **kwargs: {**head_object(**kwargs), **encryption_head}
+            self.assertIsNone(data_loader.get_file_info('file.txt')[2])
+
+        # Encrypted object's ETag is not compared against the downloaded content
+        dl_file_path = os.path.join(THIS_DIR, 'downloaded_encrypted_file.txt')
+        data_loader.load_file('file.txt', dl_file_path)
+        with open(dl_file_path, 'rb') as f:
+            self.assertEqual(f.read(), b'content')
+        os.remove(dl_file_path)
+
+    @staticmethod
+    def create_archives():
+        tar_buffer = io.BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode='w:gz') as tar_ref:
+            for i in range(3):
+                file_content = f'file content {i}'.encode('utf-8') * 100
+                tar_info = tarfile.TarInfo(f'data/file_{i}.txt')
+                tar_info.size = len(file_content)
+                tar_ref.addfile(tar_info, io.BytesIO(file_content))
+
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zip_ref:
+            for i in range(3):
+                zip_ref.writestr(f'data/file_{i}.txt', f'file content {i}' * 100)
+
+        return tar_buffer.getvalue(), zip_buffer.getvalue()
+
+    @mock_s3
+    def test_load_archive_streaming(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        tar_content, zip_content = self.create_archives()
+        s3.Object(BUCKET_NAME, 'archive.tar.gz').put(Body=tar_content)
+        s3.Object(BUCKET_NAME, 'archive.zip').put(Body=zip_content)
+
+        extract_folder_path = os.path.join(THIS_DIR, 'extracted')
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=THIS_DIR,
+                                     transfer_config=CloudTransferConfig(multipart_chunksize=1024))
+
+        data_loader.load_archive('archive.tar.gz', os.path.join(extract_folder_path, 'tar'))
+        self.assertEqual(sorted(os.listdir(os.path.join(extract_folder_path, 'tar', 'data'))),
+                         ['file_0.txt', 'file_1.txt', 'file_2.txt'])
+        with open(os.path.join(extract_folder_path, 'tar', 'data', 'file_2.txt')) as f:
+            self.assertEqual(f.read(), 'file content 2' * 100)
+
+        data_loader.load_archive('archive.zip', os.path.join(extract_folder_path, 'zip'), members=['*file_1.txt'])
+        self.assertEqual(os.listdir(os.path.join(extract_folder_path, 'zip', 'data')), ['file_1.txt'])
+        with open(os.path.join(extract_folder_path, 'zip', 'data', 'file_1.txt')) as f:
+            self.assertEqual(f.read(), 'file content 1' * 100)
+
+        # Archives are not saved to the disk
+        self.assertEqual(sorted(os.listdir(extract_folder_path)), ['tar', 'zip'])
+
+        shutil.rmtree(extract_folder_path, ignore_errors=True)
+
+    @mock_s3
+    def test_load_archive_streaming_into_cache(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        tar_content, _ = self.create_archives()
+        s3.Object(BUCKET_NAME, 'archive.tar.gz').put(Body=tar_content)
+
+        extract_folder_path = os.path.join(THIS_DIR, 'extracted')
+        cache_dir_path = os.path.join(THIS_DIR, 'download_cache')
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=THIS_DIR,
+                                     cache_dir_path=cache_dir_path)
+
+        data_loader.load_archive('archive.tar.gz', os.path.join(extract_folder_path, 'first'),
+                                 members=['data/file_0.txt'])
+        self.assertEqual(os.listdir(os.path.join(extract_folder_path, 'first', 'data')), ['file_0.txt'])
+
+        file_size, file_etag, _ = data_loader.get_file_info('archive.tar.gz')
+        cache_file_path = data_loader.download_cache.get_cache_file_path(file_etag, file_size)
+        with open(cache_file_path, 'rb') as f:
+            self.assertEqual(f.read(), tar_content)
+
+        # Second extraction is served from the cache
+        data_loader.s3_client.get_object = None
+        data_loader.load_archive('archive.tar.gz', os.path.join(extract_folder_path, 'second'))
+        self.assertEqual(sorted(os.listdir(os.path.join(extract_folder_path, 'second', 'data'))),
+                         ['file_0.txt', 'file_1.txt', 'file_2.txt'])
+
+        shutil.rmtree(extract_folder_path, ignore_errors=True)
+        shutil.rmtree(cache_dir_path, ignore_errors=True)
+
+    @mock_s3
+    def test_load_cached_file_checks_remote_version(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        s3.Object(BUCKET_NAME, 'model.pth').put(Body=b'model version 1')
+
+        cache_dir_path = os.path.join(THIS_DIR, 'checkpoint_cache')
+        dl_file_path = os.path.join(THIS_DIR, 'downloaded_model.pth')
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=THIS_DIR,
+                                     cache_dir_path=cache_dir_path, max_cache_size=1024)
+        download_calls = []
+        download_file = data_loader.download_file
+        data_loader.download_file = lambda *args: download_calls.append(args) or download_file(*args)
+
+        data_loader.load_cached_file('model.pth', dl_file_path)
+        data_loader.load_cached_file('model.pth', dl_file_path)
+        self.assertEqual(len(download_calls), 1)
+        with open(dl_file_path, 'rb') as f:
+            self.assertEqual(f.read(), b'model version 1')
+
+        s3.Object(BUCKET_NAME, 'model.pth').put(Body=b'model version 2')
+        data_loader.load_cached_file('model.pth', dl_file_path)
+        self.assertEqual(len(download_calls), 2)
+        with open(dl_file_path, 'rb') as f:
+            self.assertEqual(f.read(), b'model version 2')
+
+        shutil.rmtree(cache_dir_path, ignore_errors=True)
+        if os.path.exists(dl_file_path):
+            os.remove(dl_file_path)
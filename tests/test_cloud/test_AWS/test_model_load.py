@@ -1,12 +1,185 @@
 import unittest
 
+import os
+import shutil
+import boto3
+import torch
+import torch.nn as nn
+from moto import mock_s3
+
+from tests.setup_moto_env import setup_aws_for_test
 from aitoolbox.cloud.AWS.model_load import PyTorchS3ModelLoader
+from aitoolbox.cloud.AWS.model_save import PyTorchS3ModelSaver
 from aitoolbox.experiment.local_load.local_model_load import AbstractLocalModelLoader, PyTorchLocalModelLoader
 
+setup_aws_for_test()
+BUCKET_NAME = 'test-bucket'
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 class TestPyTorchS3ModelLoader(unittest.TestCase):
+    def setUp(self):
+        self.save_folder_path = os.path.join(THIS_DIR, 'model_save_folder')
+        self.load_folder_path = os.path.join(THIS_DIR, 'model_load_folder')
+
+    def tearDown(self):
+        shutil.rmtree(self.save_folder_path, ignore_errors=True)
+        shutil.rmtree(self.load_folder_path, ignore_errors=True)
+
     def test_init(self):
         s3_model_loader = PyTorchS3ModelLoader('', '', '')
 
         self.assertEqual(type(s3_model_loader.local_model_loader), PyTorchLocalModelLoader)
         self.assertIsInstance(s3_model_loader.local_model_loader, AbstractLocalModelLoader)
+
+        self.assertIsNotNone(s3_model_loader.download_cache)
+        self.assertIsNone(PyTorchS3ModelLoader('', '', '', cache_dir_path=None).download_cache)
+
+    @mock_s3
+    def test_load_model_with_separate_optimizer_file(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        os.makedirs(self.save_folder_path)
+        os.makedirs(self.load_folder_path)
+
+        model = nn.Linear(100, 10)
+        optimizer = torch.optim.Adam(model.parameters())
+        model_checkpoint = {'model_state_dict': model.state_dict(), 'optimizer_state_dict': optimizer.state_dict(),
+                            'epoch': 3, 'hyperparams': {}}
+        model_saver = PyTorchS3ModelSaver(bucket_name=BUCKET_NAME, local_model_result_folder_path=self.save_folder_path,
+                                          checkpoint_model=True,
+                                          sectioned_checkpoint={'compression': 'zlib', 'separate_optimizer': True})
+        model_saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch=3)
+
+        bucket_content = [el['Key'] for el in boto3.client('s3').list_objects(Bucket=BUCKET_NAME)['Contents']]
+        self.assertEqual(sorted(bucket_content),
+                         ['project/exp_12/checkpoint_model/model_exp_12_E3.pth',
+                          'project/exp_12/checkpoint_model/model_exp_12_E3_optimizer.pth'])
+
+        model_loader = PyTorchS3ModelLoader(self.load_folder_path, BUCKET_NAME, cache_dir_path=None)
+        model_representation = model_loader.load_model('project', 'exp', '12', epoch_num=3)
+        model_init = model_loader.init_model(nn.Linear(100, 10))
+        model_loader.init_optimizer(torch.optim.Adam(model_init.parameters()))
+
+        self.assertEqual(model_representation['epoch'], 3)
+        for k, v in model.state_dict().items():
+            self.assertTrue(torch.equal(v, model_init.state_dict()[k]))
+
+    @mock_s3
+    def test_load_dedup_checkpoint(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        os.makedirs(self.save_folder_path)
+        os.makedirs(self.load_folder_path)
+
+        model = nn.Sequential(nn.Linear(100, 10), nn.Linear(10, 2))
+        optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+        model_saver = PyTorchS3ModelSaver(bucket_name=BUCKET_NAME, local_model_result_folder_path=self.save_folder_path,
+                                          checkpoint_model=True, sectioned_checkpoint={'dedup_tensors': True})
+        for epoch in range(3):
+            with torch.no_grad():
+                model[1].weight += 1.
+            model_checkpoint = {'model_state_dict': model.state_dict(), 'optimizer_state_dict': optimizer.state_dict(),
+                                'epoch': epoch, 'hyperparams': {}}
+            model_saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch=epoch)
+
+        bucket_content = [el['Key'] for el in boto3.client('s3').list_objects(Bucket=BUCKET_NAME)['Contents']]
+        # First layer is uploaded only once
+        self.assertEqual(len([el for el in bucket_content if '/tensor_store/' in el]), 3 + 3)
+        self.assertEqual(len([el for el in bucket_content if '/tensor_store/' not in el]), 3)
+
+        # After the restart the saver doesn't upload again the blobs which are already in the bucket
+        resumed_model_saver = PyTorchS3ModelSaver(bucket_name=BUCKET_NAME,
+                                                  local_model_result_folder_path=self.save_folder_path,
+                                                  checkpoint_model=True, sectioned_checkpoint={'dedup_tensors': True})
+        uploaded_file_paths = []
+        resumed_model_saver.upload_model_file = \
+            lambda local_file_path, cloud_file_path: uploaded_file_paths.append(cloud_file_path)
+        resumed_model_saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch=2)
+        self.assertEqual(uploaded_file_paths, ['project/exp_12/model_exp_12_E2.pth'])
+
+        model_loader = PyTorchS3ModelLoader(self.load_folder_path, BUCKET_NAME, cache_dir_path=None)
+        model_representation = model_loader.load_model('project', 'exp', '12', epoch_num=2)
+        model_init = model_loader.init_model(nn.Sequential(nn.Linear(100, 10), nn.Linear(10, 2)))
+
+        self.assertEqual(model_representation['epoch'], 2)
+        for k, v in model.state_dict().items():
+            self.assertTrue(torch.equal(v, model_init.state_dict()[k]))
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.load_folder_path, 'project', 'exp_12', 'checkpoint_model', 'tensor_store'))),
+            4
+        )
+
+    @mock_s3
+    def test_load_streamed_model(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        os.makedirs(self.load_folder_path)
+
+        model = nn.Linear(100, 10)
+        model_checkpoint = {'model_state_dict': model.state_dict(), 'optimizer_state_dict': None,
+                            'epoch': 3, 'hyperparams': {}}
+        model_saver = PyTorchS3ModelSaver(bucket_name=BUCKET_NAME, local_model_result_folder_path=self.save_folder_path,
+                                          checkpoint_model=True, local_model_copy=False)
+        model_s3_path, _, model_local_path = model_saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch=3)
+
+        self.assertEqual(model_s3_path, f'{BUCKET_NAME}/project/exp_12/checkpoint_model/model_exp_12_E3.pth')
+        self.assertIsNone(model_local_path)
+        self.assertFalse(os.path.exists(self.save_folder_path))
+
+        model_loader = PyTorchS3ModelLoader(self.load_folder_path, BUCKET_NAME, cache_dir_path=None)
+        model_representation = model_loader.load_model('project', 'exp', '12', epoch_num=3)
+        model_init = model_loader.init_model(nn.Linear(100, 10))
+
+        self.assertEqual(model_representation['epoch'], 3)
+        for k, v in model.state_dict().items():
+            self.assertTrue(torch.equal(v, model_init.state_dict()[k]))
+
+    def test_streamed_model_sectioned_checkpoint_error(self):
+        with self.assertRaises(ValueError):
+            PyTorchS3ModelSaver(bucket_name=BUCKET_NAME, local_model_result_folder_path=self.save_folder_path,
+                                sectioned_checkpoint=True, local_model_copy=False)
+
+    @mock_s3
+    def test_load_model_remote_reads_only_accessed_sections(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        os.makedirs(self.save_folder_path)
+
+        model = nn.Linear(100, 10)
+        optimizer = torch.optim.Adam(model.parameters())
+        model(torch.rand(4, 100)).sum().backward()
+        optimizer.step()
+        model_checkpoint = {'model_state_dict': model.state_dict(), 'optimizer_state_dict': optimizer.state_dict(),
+                            'epoch': 3, 'hyperparams': {}}
+        model_saver = PyTorchS3ModelSaver(bucket_name=BUCKET_NAME, local_model_result_folder_path=self.save_folder_path,
+                                          checkpoint_model=True, sectioned_checkpoint={'separate_optimizer': True})
+        model_saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch=3)
+
+        model_loader = PyTorchS3ModelLoader(self.load_folder_path, BUCKET_NAME, cache_dir_path=None)
+        model_representation = model_loader.load_model_remote('project', 'exp', '12', epoch_num=3)
+        model_init = model_loader.init_model(nn.Linear(100, 10))
+
+        for k, v in model.state_dict().items():
+            self.assertTrue(torch.equal(v, model_init.state_dict()[k]))
+        self.assertEqual(list(model_representation.loaded_sections.keys()), ['schedulers_state_dict', 'model_state_dict'])
+        self.assertFalse(os.path.exists(self.load_folder_path))
+
+        optimizer_init = model_loader.init_optimizer(torch.optim.Adam(model_init.parameters()), device='cpu')
+        self.assertEqual(optimizer_init.state_dict()['state'][0]['step'], optimizer.state_dict()['state'][0]['step'])
+
+    @mock_s3
+    def test_load_model_remote_torch_format_fallback(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        os.makedirs(self.save_folder_path)
+        os.makedirs(self.load_folder_path)
+
+        model = nn.Linear(100, 10)
+        model_checkpoint = {'model_state_dict': model.state_dict(), 'optimizer_state_dict': None,
+                            'epoch': 3, 'hyperparams': {}}
+        model_saver = PyTorchS3ModelSaver(bucket_name=BUCKET_NAME, local_model_result_folder_path=self.save_folder_path,
+                                          checkpoint_model=True)
+        model_saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch=3)
+
+        model_loader = PyTorchS3ModelLoader(self.load_folder_path, BUCKET_NAME, cache_dir_path=None)
+        model_representation = model_loader.load_model_remote('project', 'exp', '12', epoch_num=3)
+
+        self.assertEqual(model_representation['epoch'], 3)
+        self.assertTrue(os.path.exists(os.path.join(self.load_folder_path, 'project', 'exp_12', 'checkpoint_model',
+                                                    'model_exp_12_E3.pth')))
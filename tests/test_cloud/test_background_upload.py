@@ -0,0 +1,150 @@
+import unittest
+import os
+import shutil
+import threading
+import boto3
+from moto import mock_s3
+
+from tests.setup_moto_env import setup_aws_for_test
+from aitoolbox.cloud.AWS.data_access import BaseDataSaver
+from aitoolbox.cloud.background_upload import BackgroundUploader
+from aitoolbox.experiment.local_save.local_model_save import LocalSubOptimalModelRemover
+
+setup_aws_for_test()
+BUCKET_NAME = 'test-bucket'
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class FailingSaver:
+    def __init__(self, num_failures):
+        self.num_failures = num_failures
+        self.num_calls = 0
+        self.saved_files = []
+
+    def save_file(self, local_file_path, cloud_file_path):
+        self.num_calls += 1
+        if self.num_calls <= self.num_failures:
+            raise ConnectionError('upload failed')
+        self.saved_files.append((local_file_path, cloud_file_path))
+
+
+class BlockingSaver:
+    def __init__(self):
+        self.release_event = threading.Event()
+        self.saved_files = []
+
+    def save_file(self, local_file_path, cloud_file_path):
+        self.release_event.wait()
+        self.saved_files.append((local_file_path, cloud_file_path))
+
+
+class TestBackgroundUploader(unittest.TestCase):
+    def setUp(self):
+        self.upload_folder_path = os.path.join(THIS_DIR, 'upload_folder')
+        os.makedirs(self.upload_folder_path, exist_ok=True)
+        self.file_paths = []
+        for i in range(3):
+            file_path = os.path.join(self.upload_folder_path, f'file_{i}.txt')
+            with open(file_path, 'w') as f:
+                f.write(f'content {i}' * 10)
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.upload_folder_path, ignore_errors=True)
+
+    @mock_s3
+    def test_background_upload(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        uploader = BackgroundUploader(BaseDataSaver(bucket_name=BUCKET_NAME), num_workers=2)
+
+        for i, file_path in enumerate(self.file_paths):
+            uploader.save_file(file_path, f'exp/file_{i}.txt')
+        uploader.shutdown()
+
+        self.assertFalse(uploader.is_alive())
+        self.assertEqual(uploader.inflight_bytes, 0)
+        self.assertEqual(uploader.pending_files, {})
+
+        s3_client = boto3.client('s3')
+        self.assertEqual(sorted([el['Key'] for el in s3_client.list_objects(Bucket=BUCKET_NAME)['Contents']]),
+                         ['exp/file_0.txt', 'exp/file_1.txt', 'exp/file_2.txt'])
+        self.assertEqual(s3_client.get_object(Bucket=BUCKET_NAME, Key='exp/file_1.txt')['Body'].read(),
+                         b'content 1' * 10)
+
+        upload_statuses = uploader.pop_finished_uploads()
+        self.assertEqual(len(upload_statuses), 3)
+        self.assertTrue(all(status['success'] and status['attempts'] == 1 for status in upload_statuses))
+        self.assertEqual(uploader.pop_finished_uploads(), [])
+
+        with self.assertRaises(RuntimeError):
+            uploader.save_file(self.file_paths[0], 'exp/file_0.txt')
+
+    def test_upload_retry(self):
+        saver = FailingSaver(num_failures=2)
+        uploader = BackgroundUploader(saver, max_retries=3, backoff_base=0.)
+        uploader.save_file(self.file_paths[0], 'exp/file_0.txt')
+        uploader.shutdown()
+
+        upload_status, = uploader.pop_finished_uploads()
+        self.assertTrue(upload_status['success'])
+        self.assertEqual(upload_status['attempts'], 3)
+        self.assertIsNone(upload_status['error'])
+        self.assertEqual(saver.saved_files, [(self.file_paths[0], 'exp/file_0.txt')])
+
+    def test_upload_failure_after_retries(self):
+        saver = FailingSaver(num_failures=10)
+        uploader = BackgroundUploader(saver, max_retries=2, backoff_base=0.)
+        uploader.save_file(self.file_paths[0], 'exp/file_0.txt')
+        uploader.shutdown()
+
+        upload_status, = uploader.pop_finished_uploads()
+        self.assertFalse(upload_status['success'])
+        self.assertEqual(upload_status['attempts'], 3)
+        self.assertIn('upload failed', upload_status['error'])
+        self.assertEqual(uploader.inflight_bytes, 0)
+
+    def test_inflight_bytes_budget(self):
+        saver = BlockingSaver()
+        file_size = os.path.getsize(self.file_paths[0])
+        uploader = BackgroundUploader(saver, max_inflight_bytes=file_size)
+
+        uploader.save_file(self.file_paths[0], 'exp/file_0.txt')
+        self.assertEqual(uploader.inflight_bytes, file_size)
+
+        second_enqueue = threading.Thread(target=uploader.save_file, args=(self.file_paths[1], 'exp/file_1.txt'))
+        second_enqueue.start()
+        second_enqueue.join(timeout=0.2)
+        self.assertTrue(second_enqueue.is_alive())
+        self.assertNotIn(self.file_paths[1], uploader.pending_files)
+
+        saver.release_event.set()
+        second_enqueue.join(timeout=5.)
+        self.assertFalse(second_enqueue.is_alive())
+        uploader.shutdown()
+        self.assertEqual(saver.saved_files,
+                         [(self.file_paths[0], 'exp/file_0.txt'), (self.file_paths[1], 'exp/file_1.txt')])
+
+    def test_wait_for_files(self):
+        saver = BlockingSaver()
+        uploader = BackgroundUploader(saver)
+        uploader.save_file(self.file_paths[0], 'exp/file_0.txt')
+        self.assertIn(self.file_paths[0], uploader.pending_files)
+
+        threading.Timer(0.1, saver.release_event.set).start()
+        uploader.wait_for_files([self.file_paths[0]])
+        self.assertNotIn(self.file_paths[0], uploader.pending_files)
+        self.assertEqual(saver.saved_files, [(self.file_paths[0], 'exp/file_0.txt')])
+        uploader.shutdown()
+
+    def test_remover_waits_for_pending_upload(self):
+        saver = BlockingSaver()
+        uploader = BackgroundUploader(saver)
+        uploader.save_file(self.file_paths[0], 'exp/file_0.txt')
+
+        remover = LocalSubOptimalModelRemover('loss', num_best_kept=1, before_remove_fn=uploader.wait_for_files)
+        threading.Timer(0.1, saver.release_event.set).start()
+        remover.rm_suboptimal_model = lambda paths: self.assertEqual(saver.saved_files,
+                                                                     [(self.file_paths[0], 'exp/file_0.txt')])
+        remover.decide_if_remove_suboptimal_model({'loss': [0.5]}, [self.file_paths[1]])
+        remover.decide_if_remove_suboptimal_model({'loss': [0.6]}, [self.file_paths[0]])
+        uploader.shutdown()
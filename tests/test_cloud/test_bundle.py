@@ -0,0 +1,135 @@
+import unittest
+import os
+import io
+import shutil
+import zipfile
+import boto3
+from moto import mock_s3
+
+from tests.setup_moto_env import setup_aws_for_test
+from aitoolbox.cloud.AWS.data_access import BaseDataSaver, BaseDataLoader
+from aitoolbox.cloud.AWS.results_save import S3ResultsSaver
+from aitoolbox.cloud.bundle import ArtifactBundler
+from aitoolbox.cloud.sync import IncrementalCloudSync
+
+setup_aws_for_test()
+BUCKET_NAME = 'test-bucket'
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestArtifactBundler(unittest.TestCase):
+    def setUp(self):
+        self.artifacts_folder_path = os.path.join(THIS_DIR, 'artifacts_folder')
+        self.extract_folder_path = os.path.join(THIS_DIR, 'artifacts_extract_folder')
+        os.makedirs(os.path.join(self.artifacts_folder_path, 'plots'), exist_ok=True)
+        self.write_file('hyperparams_list.txt', 'lr:\t0.001\n')
+        self.write_file('plots/loss.png', 'loss plot')
+        self.write_file('plots/accuracy.png', 'accuracy plot')
+        self.write_file('large_events.log', 'x' * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.artifacts_folder_path, ignore_errors=True)
+        shutil.rmtree(self.extract_folder_path, ignore_errors=True)
+
+    def write_file(self, file_name, content):
+        with open(os.path.join(self.artifacts_folder_path, file_name), 'w') as f:
+            f.write(content)
+
+    def get_file_paths(self, file_names):
+        return [[os.path.join(self.artifacts_folder_path, file_name), os.path.join('exp', file_name)]
+                for file_name in file_names]
+
+    @staticmethod
+    def get_bucket_content():
+        s3_client = boto3.client('s3')
+        return sorted([el['Key'] for el in s3_client.list_objects(Bucket=BUCKET_NAME).get('Contents', [])])
+
+    @staticmethod
+    def get_bundle_members(bundle_cloud_path):
+        bundle_bytes = boto3.client('s3').get_object(Bucket=BUCKET_NAME, Key=bundle_cloud_path)['Body'].read()
+        with zipfile.ZipFile(io.BytesIO(bundle_bytes)) as zip_f:
+            return {zip_info.filename: zip_info.compress_type for zip_info in zip_f.infolist()}
+
+    @mock_s3
+    def test_small_files_bundled_large_standalone(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        bundler = ArtifactBundler(BaseDataSaver(bucket_name=BUCKET_NAME), max_bundled_file_size=100)
+
+        uploaded = bundler.save_files(
+            self.get_file_paths(['hyperparams_list.txt', 'plots/loss.png', 'plots/accuracy.png', 'large_events.log']),
+            'exp/artifacts_epoch_1.zip'
+        )
+
+        self.assertEqual(uploaded, ['exp/artifacts_epoch_1.zip', 'exp/large_events.log'])
+        self.assertEqual(self.get_bucket_content(), ['exp/artifacts_epoch_1.zip', 'exp/large_events.log'])
+        self.assertEqual(self.get_bundle_members('exp/artifacts_epoch_1.zip'),
+                         {'hyperparams_list.txt': zipfile.ZIP_DEFLATED,
+                          'plots/loss.png': zipfile.ZIP_STORED, 'plots/accuracy.png': zipfile.ZIP_STORED})
+
+    @mock_s3
+    def test_files_outside_bundle_folder_standalone(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        bundler = ArtifactBundler(BaseDataSaver(bucket_name=BUCKET_NAME))
+
+        uploaded = bundler.save_files(self.get_file_paths(['hyperparams_list.txt', 'plots/loss.png']),
+                                      'exp/plots/plots_bundle.zip')
+
+        self.assertEqual(uploaded, ['exp/plots/plots_bundle.zip', 'exp/hyperparams_list.txt'])
+        self.assertEqual(list(self.get_bundle_members('exp/plots/plots_bundle.zip').keys()), ['loss.png'])
+
+    @mock_s3
+    def test_no_bundle_for_only_large_files(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        bundler = ArtifactBundler(BaseDataSaver(bucket_name=BUCKET_NAME), max_bundled_file_size=100)
+
+        uploaded = bundler.save_files(self.get_file_paths(['large_events.log']), 'exp/artifacts_epoch_1.zip')
+        self.assertEqual(uploaded, ['exp/large_events.log'])
+        self.assertEqual(self.get_bucket_content(), ['exp/large_events.log'])
+
+    @mock_s3
+    def test_extract_selected_bundle_members(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        bundler = ArtifactBundler(BaseDataSaver(bucket_name=BUCKET_NAME))
+        bundler.save_files(self.get_file_paths(['hyperparams_list.txt', 'plots/loss.png', 'plots/accuracy.png']),
+                           'exp/artifacts_epoch_1.zip')
+
+        data_loader = BaseDataLoader(bucket_name=BUCKET_NAME, local_base_data_folder_path=self.extract_folder_path)
+        data_loader.load_archive('exp/artifacts_epoch_1.zip', self.extract_folder_path, members=['plots/loss*'])
+
+        self.assertEqual(os.listdir(self.extract_folder_path), ['plots'])
+        self.assertEqual(os.listdir(os.path.join(self.extract_folder_path, 'plots')), ['loss.png'])
+        with open(os.path.join(self.extract_folder_path, 'plots', 'loss.png')) as f:
+            self.assertEqual(f.read(), 'loss plot')
+
+    @mock_s3
+    def test_incremental_sync_bundle(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        cloud_saver = BaseDataSaver(bucket_name=BUCKET_NAME)
+        cloud_sync = IncrementalCloudSync(cloud_saver, bundler=ArtifactBundler(cloud_saver))
+
+        uploaded = cloud_sync.sync_files(self.get_file_paths(['plots/loss.png', 'plots/accuracy.png']),
+                                         bundle_cloud_path='exp/plots_epoch_1.zip')
+        self.assertEqual(sorted(uploaded), ['exp/plots/accuracy.png', 'exp/plots/loss.png'])
+
+        self.write_file('plots/loss.png', 'loss plot changed')
+        cloud_sync.sync_files(self.get_file_paths(['plots/loss.png', 'plots/accuracy.png']),
+                              bundle_cloud_path='exp/plots_epoch_2.zip')
+
+        self.assertEqual(self.get_bucket_content(), ['exp/plots_epoch_1.zip', 'exp/plots_epoch_2.zip'])
+        self.assertEqual(list(self.get_bundle_members('exp/plots_epoch_2.zip').keys()), ['plots/loss.png'])
+
+        # Without the bundle path the files are uploaded standalone
+        self.write_file('plots/loss.png', 'loss plot changed again')
+        cloud_sync.sync_files(self.get_file_paths(['plots/loss.png']))
+        self.assertIn('exp/plots/loss.png', self.get_bucket_content())
+
+
+class TestS3ResultsSaverBundle(unittest.TestCase):
+    @mock_s3
+    def test_init(self):
+        self.assertIsNone(S3ResultsSaver(bucket_name=BUCKET_NAME).bundler)
+
+        results_saver = S3ResultsSaver(bucket_name=BUCKET_NAME, bundle_artifacts={'max_bundled_file_size': 10})
+        self.assertIsInstance(results_saver.bundler, ArtifactBundler)
+        self.assertIs(results_saver.bundler.cloud_saver, results_saver)
+        self.assertEqual(results_saver.bundler.max_bundled_file_size, 10)
@@ -0,0 +1,92 @@
+import unittest
+import os
+import threading
+
+from moto import mock_s3
+
+from tests.setup_moto_env import setup_aws_for_test
+from aitoolbox.cloud import clients
+from aitoolbox.cloud.clients import CloudClientConfig
+from aitoolbox.cloud.AWS.data_access import BaseDataSaver, BaseDataLoader
+from aitoolbox.cloud.AWS.simple_email_service import SESSender
+
+setup_aws_for_test()
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+class TestCloudClientConfig(unittest.TestCase):
+    def test_botocore_config(self):
+        botocore_config = CloudClientConfig(max_pool_connections=20, max_retries=3, retry_mode='standard',
+                                            connect_timeout=5, read_timeout=10).get_botocore_config()
+        self.assertEqual(botocore_config.max_pool_connections, 20)
+        self.assertEqual(botocore_config.retries, {'max_attempts': 3, 'mode': 'standard'})
+        self.assertTrue(botocore_config.tcp_keepalive)
+        self.assertEqual(botocore_config.connect_timeout, 5)
+        self.assertEqual(botocore_config.read_timeout, 10)
+
+    def test_http_adapter(self):
+        http_adapter = CloudClientConfig(max_pool_connections=7, max_retries=2).get_http_adapter()
+        self.assertEqual(http_adapter._pool_maxsize, 7)
+        self.assertEqual(http_adapter.max_retries.total, 2)
+
+    def test_wrong_params(self):
+        with self.assertRaises(ValueError):
+            CloudClientConfig(max_pool_connections=0)
+        with self.assertRaises(ValueError):
+            CloudClientConfig(max_retries=-1)
+
+
+@mock_s3
+class TestSharedCloudClients(unittest.TestCase):
+    def setUp(self):
+        clients.clear_cloud_clients()
+
+    def tearDown(self):
+        clients.set_default_client_config(CloudClientConfig())
+
+    def test_s3_client_shared(self):
+        s3_client = clients.get_s3_client()
+        self.assertIs(clients.get_s3_client(), s3_client)
+        self.assertEqual(s3_client.meta.config.max_pool_connections, clients.default_client_config.max_pool_connections)
+
+        self.assertIs(BaseDataSaver(bucket_name='test-bucket').s3_client, s3_client)
+        self.assertIs(BaseDataLoader(bucket_name='test-bucket').s3_client, s3_client)
+
+    def test_s3_resource_uses_shared_client(self):
+        s3_resource = clients.get_s3_resource()
+        self.assertIs(s3_resource.meta.client, clients.get_s3_client())
+        self.assertIsNot(clients.get_s3_resource(), s3_resource)
+
+        data_loader = BaseDataLoader(bucket_name='test-bucket')
+        self.assertIs(data_loader.s3.meta.client, data_loader.s3_client)
+
+    def test_s3_client_shared_between_threads(self):
+        thread_clients = []
+        threads = [threading.Thread(target=lambda: thread_clients.append(clients.get_s3_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(id(s3_client) for s3_client in thread_clients)), 1)
+
+    def test_ses_client_shared_per_region(self):
+        ses_client = SESSender('sender', 'sender@test.com', 'recipient@test.com', aws_region='eu-west-1').client
+
+        self.assertIs(SESSender('sender', 'sender@test.com', 'recipient@test.com', aws_region='eu-west-1').client,
+                      ses_client)
+        self.assertIsNot(clients.get_ses_client('us-east-1'), ses_client)
+        self.assertEqual(ses_client.meta.region_name, 'eu-west-1')
+
+    def test_set_default_client_config(self):
+        s3_client = clients.get_s3_client()
+        clients.set_default_client_config(CloudClientConfig(max_pool_connections=5))
+
+        new_s3_client = clients.get_s3_client()
+        self.assertIsNot(new_s3_client, s3_client)
+        self.assertEqual(new_s3_client.meta.config.max_pool_connections, 5)
+
+    def test_clear_cloud_clients(self):
+        s3_client = clients.get_s3_client()
+        clients.clear_cloud_clients()
+        self.assertIsNot(clients.get_s3_client(), s3_client)
@@ -0,0 +1,266 @@
+import unittest
+import os
+import time
+import shutil
+import hashlib
+import threading
+
+from aitoolbox.cloud.transfer import CloudTransferConfig
+from aitoolbox.cloud.download import FileLock, RangedFileDownloader, DownloadCache, link_or_copy_file, \
+    replace_with_cached_file, verify_file_md5, cleanup_failed_extraction
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class RangeServer:
+    def __init__(self, data, fail_on_start=None):
+        self.data = data
+        self.fail_on_start = fail_on_start
+        self.requested_ranges = []
+        self.lock = threading.Lock()
+
+    def download_range(self, start, end):
+        with self.lock:
+            self.requested_ranges.append((start, end))
+        if self.fail_on_start is not None and start == self.fail_on_start:
+            raise ConnectionError('connection lost')
+        return self.data[start:end + 1]
+
+
+class TestRangedFileDownloader(unittest.TestCase):
+    def setUp(self):
+        self.download_folder_path = os.path.join(THIS_DIR, 'download_folder')
+        os.makedirs(self.download_folder_path, exist_ok=True)
+        self.data = bytes(range(256)) * 4
+        self.transfer_config = CloudTransferConfig(multipart_threshold=100, multipart_chunksize=100, max_concurrency=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.download_folder_path, ignore_errors=True)
+
+    def test_ranged_download(self):
+        server = RangeServer(self.data)
+        file_path = os.path.join(self.download_folder_path, 'file.bin')
+        RangedFileDownloader(self.transfer_config).download(server.download_range, len(self.data), 'v1', file_path)
+
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(len(server.requested_ranges), 11)
+        self.assertEqual(sorted(os.listdir(self.download_folder_path)), ['file.bin'])
+
+    def test_small_file_single_range(self):
+        server = RangeServer(self.data[:50])
+        file_path = os.path.join(self.download_folder_path, 'file.bin')
+        RangedFileDownloader(self.transfer_config).download(server.download_range, 50, 'v1', file_path)
+
+        self.assertEqual(server.requested_ranges, [(0, 49)])
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), self.data[:50])
+
+    def test_resume_interrupted_download(self):
+        file_path = os.path.join(self.download_folder_path, 'file.bin')
+        downloader = RangedFileDownloader(CloudTransferConfig(multipart_threshold=100, multipart_chunksize=100,
+                                                              max_concurrency=1))
+
+        failing_server = RangeServer(self.data, fail_on_start=500)
+        with self.assertRaises(ConnectionError):
+            downloader.download(failing_server.download_range, len(self.data), 'v1', file_path)
+        self.assertFalse(os.path.exists(file_path))
+        self.assertTrue(os.path.exists(f'{file_path}.part'))
+
+        server = RangeServer(self.data)
+        downloader.download(server.download_range, len(self.data), 'v1', file_path)
+        # Only the failed range is downloaded again
+        self.assertEqual(server.requested_ranges, [(500, 599)])
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(sorted(os.listdir(self.download_folder_path)), ['file.bin'])
+
+    def test_restart_when_remote_version_changes(self):
+        file_path = os.path.join(self.download_folder_path, 'file.bin')
+        downloader = RangedFileDownloader(CloudTransferConfig(multipart_threshold=100, multipart_chunksize=100,
+                                                              max_concurrency=1))
+
+        with self.assertRaises(ConnectionError):
+            downloader.download(RangeServer(self.data, fail_on_start=500).download_range, len(self.data), 'v1',
+                                file_path)
+
+        new_data = bytes(reversed(self.data))
+        server = RangeServer(new_data)
+        downloader.download(server.download_range, len(new_data), 'v2', file_path)
+        self.assertEqual(len(server.requested_ranges), 11)
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), new_data)
+
+
+    def test_corrupted_download_not_moved_to_destination(self):
+        file_path = os.path.join(self.download_folder_path, 'file.bin')
+        downloader = RangedFileDownloader(self.transfer_config)
+        verified_file_paths = []
+
+        def verify_fn(part_file_path):
+            verified_file_paths.append(part_file_path)
+            verify_file_md5(part_file_path, hashlib.md5(b'other content').hexdigest())
+
+        with self.assertRaises(ValueError):
+            downloader.download(RangeServer(self.data).download_range, len(self.data), 'v1', file_path,
+                                verify_fn=verify_fn)
+        self.assertEqual(verified_file_paths, [f'{file_path}.part'])
+        self.assertEqual(os.listdir(self.download_folder_path), [])
+
+        downloader.download(RangeServer(self.data).download_range, len(self.data), 'v1', file_path,
+                            verify_fn=lambda part_file_path: verify_file_md5(part_file_path,
+                                                                             hashlib.md5(self.data).hexdigest()))
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(sorted(os.listdir(self.download_folder_path)), ['file.bin'])
+
+
+class TestDownloadCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir_path = os.path.join(THIS_DIR, 'download_cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir_path, ignore_errors=True)
+
+    def test_concurrent_fetch_downloads_once(self):
+        download_cache = DownloadCache(self.cache_dir_path)
+        download_calls = []
+
+        def download_fn(download_path):
+            download_calls.append(download_path)
+            with open(download_path, 'wb') as f:
+                f.write(b'content')
+
+        threads = [threading.Thread(target=download_cache.fetch, args=(download_fn, 'etag', 7)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(download_calls), 1)
+        self.assertEqual(download_cache.fetch(download_fn, 'etag', 7), download_calls[0])
+        self.assertEqual(len(download_calls), 1)
+
+        self.assertNotEqual(download_cache.get_cache_file_path('etag', 7),
+                            download_cache.get_cache_file_path('other_etag', 7))
+
+    def test_lru_eviction(self):
+        download_cache = DownloadCache(self.cache_dir_path, max_cache_size=250)
+
+        def get_download_fn(content):
+            def download_fn(download_path):
+                with open(download_path, 'wb') as f:
+                    f.write(content)
+            return download_fn
+
+        file_path_a = download_cache.fetch(get_download_fn(b'a' * 100), 'a', 100)
+        file_path_b = download_cache.fetch(get_download_fn(b'b' * 100), 'b', 100)
+        # Make sure the access times differ also on the file systems with the coarse timestamps
+        os.utime(file_path_a, (time.time() - 10, time.time() - 10))
+        os.utime(file_path_b, (time.time() - 5, time.time() - 5))
+
+        # Access refreshes the file's position in the LRU order
+        download_cache.fetch(None, 'a', 100)
+        file_path_c = download_cache.fetch(get_download_fn(b'c' * 100), 'c', 100)
+
+        self.assertTrue(os.path.exists(file_path_a))
+        self.assertFalse(os.path.exists(file_path_b))
+        self.assertTrue(os.path.exists(file_path_c))
+        self.assertEqual(sum(file_size for _, file_size, _ in download_cache.get_cached_files()), 200)
+
+    def test_replace_with_cached_file(self):
+        os.makedirs(self.cache_dir_path)
+        cache_file_path = os.path.join(self.cache_dir_path, 'cached.txt')
+        local_file_path = os.path.join(self.cache_dir_path, 'local.txt')
+        with open(cache_file_path, 'w') as f:
+            f.write('new content')
+        with open(local_file_path, 'w') as f:
+            f.write('outdated content')
+
+        replace_with_cached_file(cache_file_path, local_file_path)
+        with open(local_file_path) as f:
+            self.assertEqual(f.read(), 'new content')
+        replace_with_cached_file(cache_file_path, local_file_path)
+        self.assertEqual(sorted(os.listdir(self.cache_dir_path)), ['cached.txt', 'local.txt'])
+
+    def test_link_or_copy_file(self):
+        os.makedirs(self.cache_dir_path)
+        source_file_path = os.path.join(self.cache_dir_path, 'source.txt')
+        destination_file_path = os.path.join(self.cache_dir_path, 'destination.txt')
+        with open(source_file_path, 'w') as f:
+            f.write('content')
+
+        link_or_copy_file(source_file_path, destination_file_path)
+        with open(destination_file_path) as f:
+            self.assertEqual(f.read(), 'content')
+
+    def test_file_lock(self):
+        lock_file_path = os.path.join(self.cache_dir_path, 'file.lock')
+        counter = {'value': 0, 'max_inside': 0, 'inside': 0}
+
+        def locked_increment():
+            with FileLock(lock_file_path):
+                counter['inside'] += 1
+                counter['max_inside'] = max(counter['max_inside'], counter['inside'])
+                counter['value'] += 1
+                counter['inside'] -= 1
+
+        threads = [threading.Thread(target=locked_increment) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counter['value'], 10)
+        self.assertEqual(counter['max_inside'], 1)
+
+    def test_verify_file_md5(self):
+        os.makedirs(self.cache_dir_path)
+        file_path = os.path.join(self.cache_dir_path, 'file.txt')
+        with open(file_path, 'wb') as f:
+            f.write(b'content')
+
+        verify_file_md5(file_path, hashlib.md5(b'content').hexdigest())
+        self.assertTrue(os.path.exists(file_path))
+
+        with self.assertRaises(ValueError):
+            verify_file_md5(file_path, hashlib.md5(b'other content').hexdigest())
+        self.assertFalse(os.path.exists(file_path))
+
+    def test_cleanup_failed_extraction(self):
+        os.makedirs(os.path.join(self.cache_dir_path, 'shared'))
+        with open(os.path.join(self.cache_dir_path, 'existing.txt'), 'w') as f:
+            f.write('content')
+        part_file_path = os.path.join(self.cache_dir_path, 'archive.part')
+        with open(part_file_path, 'wb') as f:
+            f.write(b'partial archive')
+
+        with self.assertRaises(ValueError):
+            with cleanup_failed_extraction(self.cache_dir_path, part_file_path) as extracted_paths:
+                # File of the other archive extracted in parallel into the same folder
+                with open(os.path.join(self.cache_dir_path, 'shared', 'other_archive.txt'), 'w') as f:
+                    f.write('other')
+
+                for member_name in ['extracted/train/data.txt', 'shared/data.txt', 'extracted.txt']:
+                    member_path = os.path.join(self.cache_dir_path, member_name)
+                    extracted_paths.append(member_path)
+                    os.makedirs(os.path.dirname(member_path), exist_ok=True)
+                    with open(member_path, 'w') as f:
+                        f.write('partial')
+                extracted_paths.append(os.path.join(self.cache_dir_path, 'not_yet_written.txt'))
+                raise ValueError('Corrupted archive')
+        self.assertEqual(sorted(os.listdir(self.cache_dir_path)), ['existing.txt', 'shared'])
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir_path, 'shared')), ['other_archive.txt'])
+
+        new_folder_path = os.path.join(self.cache_dir_path, 'new_folder')
+        with self.assertRaises(ValueError):
+            with cleanup_failed_extraction(new_folder_path) as extracted_paths:
+                extracted_paths.append(os.path.join(new_folder_path, 'train'))
+                os.makedirs(os.path.join(new_folder_path, 'train'))
+                raise ValueError('Corrupted archive')
+        self.assertFalse(os.path.exists(new_folder_path))
+
+        with cleanup_failed_extraction(new_folder_path) as extracted_paths:
+            extracted_paths.append(os.path.join(new_folder_path, 'train'))
+            os.makedirs(os.path.join(new_folder_path, 'train'))
+        self.assertTrue(os.path.isdir(os.path.join(new_folder_path, 'train')))
@@ -0,0 +1,153 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import boto3
+import torch
+from moto import mock_s3
+
+from tests.setup_moto_env import setup_aws_for_test
+from aitoolbox.cloud.AWS.data_access import BaseDataSaver
+from aitoolbox.cloud.retention import CloudSubOptimalModelRemover
+from aitoolbox.experiment.local_save.local_model_save import LocalSubOptimalModelRemover
+from aitoolbox.experiment.local_save.sectioned_checkpoint import save_sectioned_checkpoint, \
+    get_tensor_store_blob_paths, get_referenced_blob_names, read_sectioned_checkpoint_file_header
+
+setup_aws_for_test()
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+BUCKET_NAME = 'test-bucket'
+
+
+@mock_s3
+class TestCloudSubOptimalModelRemover(unittest.TestCase):
+    def setUp(self):
+        self.s3_client = boto3.client('s3')
+        self.s3_client.create_bucket(Bucket=BUCKET_NAME)
+        self.cloud_saver = BaseDataSaver(bucket_name=BUCKET_NAME)
+
+    def save_models(self, remover, metric_name, metric_values, history=None):
+        history = {metric_name: []} if history is None else history
+        for metric_value in metric_values:
+            epoch = len(history[metric_name])
+            model_paths = [f'project/exp/checkpoint_model/model_E{epoch}.pth',
+                           f'project/exp/checkpoint_model/model_E{epoch}_optimizer.pth']
+            for model_path in model_paths:
+                self.cloud_saver.save_bytes(b'model', model_path)
+
+            history[metric_name].append(metric_value)
+            remover.decide_if_remove_suboptimal_model(history, model_paths)
+        return history
+
+    def get_bucket_model_names(self):
+        bucket_content = self.s3_client.list_objects(Bucket=BUCKET_NAME).get('Contents', [])
+        return sorted(os.path.basename(el['Key']) for el in bucket_content)
+
+    def test_init(self):
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'loss')
+        self.assertIsInstance(remover, LocalSubOptimalModelRemover)
+        self.assertTrue(remover.decrease_metric)
+
+        with self.assertRaises(ValueError):
+            CloudSubOptimalModelRemover(self.cloud_saver, 'loss', delete_batch_size=0)
+
+    def test_keep_best_loss_models(self):
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'loss', num_best_kept=2)
+        self.save_models(remover, 'loss', [5., 3., 4., 1., 2.])
+
+        self.assertEqual(self.get_bucket_model_names(),
+                         ['model_E3.pth', 'model_E3_optimizer.pth', 'model_E4.pth', 'model_E4_optimizer.pth'])
+
+    def test_keep_best_acc_models(self):
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'acc', num_best_kept=2, metric_known_at_save=True)
+        self.save_models(remover, 'acc', [0.5, 0.9, 0.7, 0.8, 0.6])
+
+        self.assertEqual(self.get_bucket_model_names(),
+                         ['model_E1.pth', 'model_E1_optimizer.pth', 'model_E3.pth', 'model_E3_optimizer.pth'])
+
+    def test_dry_run(self):
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'loss', num_best_kept=2, dry_run=True)
+        self.save_models(remover, 'loss', [5., 3., 4., 1., 2.])
+
+        self.assertEqual(len(self.get_bucket_model_names()), 10)
+        self.assertEqual(sorted(os.path.basename(el) for el in remover.dry_run_deleted_paths),
+                         ['model_E0.pth', 'model_E0_optimizer.pth', 'model_E1.pth', 'model_E1_optimizer.pth',
+                          'model_E2.pth', 'model_E2_optimizer.pth'])
+
+    def test_batched_deletes(self):
+        delete_requests = []
+        delete_files = self.cloud_saver.delete_files
+        self.cloud_saver.delete_files = lambda paths: delete_requests.append(paths) or delete_files(paths)
+
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'loss', num_best_kept=1, delete_batch_size=4)
+        self.save_models(remover, 'loss', [5., 4., 3., 2., 1.])
+
+        self.assertEqual([len(paths) for paths in delete_requests], [4, 4])
+        self.assertEqual(len(self.get_bucket_model_names()), 2)
+
+        remover.decide_if_remove_suboptimal_model({'loss': [5., 4., 3., 2., 1., 0.5]},
+                                                  ['project/exp/checkpoint_model/model_E5.pth'])
+        self.assertEqual(len(remover.pending_delete_paths), 2)
+        self.assertEqual(len(self.get_bucket_model_names()), 2)
+
+        self.assertEqual(len(remover.flush_deletes()), 2)
+        self.assertEqual(self.get_bucket_model_names(), [])
+        self.assertEqual(remover.flush_deletes(), [])
+
+    def test_keep_latest(self):
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'loss', num_best_kept=1, keep_latest=True)
+        history = self.save_models(remover, 'loss', [1., 2.])
+
+        self.assertEqual(self.get_bucket_model_names(),
+                         ['model_E0.pth', 'model_E0_optimizer.pth', 'model_E1.pth', 'model_E1_optimizer.pth'])
+
+        self.save_models(remover, 'loss', [3.], history)
+        self.assertEqual(self.get_bucket_model_names(),
+                         ['model_E0.pth', 'model_E0_optimizer.pth', 'model_E2.pth', 'model_E2_optimizer.pth'])
+
+    def test_collect_tensor_store_garbage(self):
+        local_dir_path = tempfile.mkdtemp()
+        cloud_dir_path = 'project/exp/checkpoint_model'
+        self.cloud_saver.uploaded_tensor_blob_names = set()
+
+        remover = CloudSubOptimalModelRemover(self.cloud_saver, 'loss', num_best_kept=1, tensor_store_grace_period=0.)
+        history = {'loss': []}
+        for epoch, loss in enumerate([5., 3.]):
+            model_local_path = os.path.join(local_dir_path, f'model_E{epoch}.pth')
+            model_state_dict = {'frozen': torch.ones(10), 'weight': torch.full((10,), float(epoch))}
+            save_sectioned_checkpoint({'model_state_dict': model_state_dict, 'epoch': epoch},
+                                      model_local_path, dedup_tensors=True)
+            for blob_path in get_tensor_store_blob_paths(model_local_path):
+                blob_name = os.path.basename(blob_path)
+                self.cloud_saver.save_file(blob_path, os.path.join(cloud_dir_path, 'tensor_store', blob_name))
+                self.cloud_saver.uploaded_tensor_blob_names.add(blob_name)
+            model_cloud_path = os.path.join(cloud_dir_path, f'model_E{epoch}.pth')
+            self.cloud_saver.save_file(model_local_path, model_cloud_path)
+
+            history['loss'].append(loss)
+            remover.decide_if_remove_suboptimal_model(history, [model_cloud_path])
+        self.cloud_saver.save_bytes(b'{}', os.path.join(cloud_dir_path, 'hyperparams.json'))
+        self.assertEqual(len(self.get_bucket_model_names()), 5)
+
+        kept_blob_names = get_referenced_blob_names(
+            read_sectioned_checkpoint_file_header(os.path.join(local_dir_path, 'model_E1.pth'))
+        )
+        removed_blob_name, = set(os.listdir(os.path.join(local_dir_path, 'tensor_store'))) - kept_blob_names
+
+        # Blobs of the checkpoint which isn't in the bucket yet are protected
+        self.assertEqual(remover.collect_tensor_store_garbage(cloud_dir_path, protected_blob_names={removed_blob_name}),
+                         [])
+        self.assertEqual(len(self.get_bucket_model_names()), 5)
+
+        removed_blob_paths = remover.collect_tensor_store_garbage(cloud_dir_path)
+        self.assertEqual(removed_blob_paths, [os.path.join(cloud_dir_path, 'tensor_store', removed_blob_name)])
+        self.assertEqual(self.get_bucket_model_names(),
+                         sorted(['hyperparams.json', 'model_E1.pth'] + list(kept_blob_names)))
+        self.assertEqual(self.cloud_saver.uploaded_tensor_blob_names, kept_blob_names)
+
+        # Recently uploaded blobs are protected by the grace period
+        self.cloud_saver.save_bytes(b'blob', os.path.join(cloud_dir_path, 'tensor_store', 'new_blob'))
+        remover.tensor_store_grace_period = 600.
+        self.assertEqual(remover.collect_tensor_store_garbage(cloud_dir_path), [])
+
+        shutil.rmtree(local_dir_path)
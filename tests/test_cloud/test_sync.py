@@ -0,0 +1,111 @@
+import unittest
+import os
+import shutil
+import time
+import boto3
+from moto import mock_s3
+
+from tests.setup_moto_env import setup_aws_for_test
+from aitoolbox.cloud.AWS.data_access import BaseDataSaver
+from aitoolbox.cloud.sync import IncrementalCloudSync
+
+setup_aws_for_test()
+BUCKET_NAME = 'test-bucket'
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestIncrementalCloudSync(unittest.TestCase):
+    def setUp(self):
+        self.sync_folder_path = os.path.join(THIS_DIR, 'sync_folder')
+        os.makedirs(os.path.join(self.sync_folder_path, 'sub_folder'), exist_ok=True)
+        self.write_file('file_1.txt', 'content 1')
+        self.write_file('sub_folder/file_2.txt', 'content 2')
+
+    def tearDown(self):
+        shutil.rmtree(self.sync_folder_path, ignore_errors=True)
+        manifest_path = os.path.join(THIS_DIR, 'manifest.json')
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+    def write_file(self, file_name, content):
+        with open(os.path.join(self.sync_folder_path, file_name), 'w') as f:
+            f.write(content)
+
+    @staticmethod
+    def get_bucket_content():
+        s3_client = boto3.client('s3')
+        return sorted([el['Key'] for el in s3_client.list_objects(Bucket=BUCKET_NAME).get('Contents', [])])
+
+    @mock_s3
+    def test_sync_folder_only_changed(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        cloud_sync = IncrementalCloudSync(BaseDataSaver(bucket_name=BUCKET_NAME))
+
+        uploaded, deleted = cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+        self.assertEqual(sorted(uploaded), ['exp/file_1.txt', 'exp/sub_folder/file_2.txt'])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.get_bucket_content(), ['exp/file_1.txt', 'exp/sub_folder/file_2.txt'])
+
+        uploaded, _ = cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+        self.assertEqual(uploaded, [])
+
+        self.write_file('file_1.txt', 'content 1 changed')
+        self.write_file('file_3.txt', 'content 3')
+        uploaded, _ = cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+        self.assertEqual(sorted(uploaded), ['exp/file_1.txt', 'exp/file_3.txt'])
+
+        s3_object = boto3.client('s3').get_object(Bucket=BUCKET_NAME, Key='exp/file_1.txt')
+        self.assertEqual(s3_object['Body'].read(), b'content 1 changed')
+
+    @mock_s3
+    def test_rewrite_same_content_not_uploaded(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        cloud_sync = IncrementalCloudSync(BaseDataSaver(bucket_name=BUCKET_NAME))
+        cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+
+        time.sleep(0.01)
+        self.write_file('file_1.txt', 'content 1')
+        uploaded, _ = cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+        self.assertEqual(uploaded, [])
+
+        cloud_sync_no_hash = IncrementalCloudSync(BaseDataSaver(bucket_name=BUCKET_NAME), hash_content=False)
+        cloud_sync_no_hash.sync_folder(self.sync_folder_path, 'exp')
+        time.sleep(0.01)
+        self.write_file('file_1.txt', 'content 1')
+        uploaded, _ = cloud_sync_no_hash.sync_folder(self.sync_folder_path, 'exp')
+        self.assertEqual(uploaded, ['exp/file_1.txt'])
+
+    @mock_s3
+    def test_delete_removed(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        boto3.client('s3').put_object(Bucket=BUCKET_NAME, Key='exp/not_synced.txt', Body=b'bla')
+        cloud_sync = IncrementalCloudSync(BaseDataSaver(bucket_name=BUCKET_NAME))
+        cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+
+        os.remove(os.path.join(self.sync_folder_path, 'sub_folder/file_2.txt'))
+        uploaded, deleted = cloud_sync.sync_folder(self.sync_folder_path, 'exp')
+        self.assertEqual(uploaded, [])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.get_bucket_content(),
+                         ['exp/file_1.txt', 'exp/not_synced.txt', 'exp/sub_folder/file_2.txt'])
+
+        uploaded, deleted = cloud_sync.sync_folder(self.sync_folder_path, 'exp', delete_removed=True)
+        self.assertEqual(deleted, ['exp/sub_folder/file_2.txt'])
+        self.assertEqual(self.get_bucket_content(), ['exp/file_1.txt', 'exp/not_synced.txt'])
+        self.assertNotIn('exp/sub_folder/file_2.txt', cloud_sync.manifest)
+
+    @mock_s3
+    def test_persisted_manifest(self):
+        boto3.resource('s3').create_bucket(Bucket=BUCKET_NAME)
+        manifest_path = os.path.join(THIS_DIR, 'manifest.json')
+
+        cloud_sync = IncrementalCloudSync(BaseDataSaver(bucket_name=BUCKET_NAME), manifest_file_path=manifest_path)
+        cloud_sync.sync_files([[os.path.join(self.sync_folder_path, 'file_1.txt'), 'exp/file_1.txt']])
+        self.assertTrue(os.path.exists(manifest_path))
+
+        cloud_sync_reloaded = IncrementalCloudSync(BaseDataSaver(bucket_name=BUCKET_NAME),
+                                                   manifest_file_path=manifest_path)
+        self.assertEqual(cloud_sync_reloaded.manifest, cloud_sync.manifest)
+        uploaded = cloud_sync_reloaded.sync_files([[os.path.join(self.sync_folder_path, 'file_1.txt'),
+                                                    'exp/file_1.txt']])
+        self.assertEqual(uploaded, [])
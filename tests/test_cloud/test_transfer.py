@@ -0,0 +1,59 @@
+import unittest
+import os
+
+from aitoolbox.cloud import transfer
+from aitoolbox.cloud.transfer import CloudTransferConfig, parallel_file_transfer, MB
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestCloudTransferConfig(unittest.TestCase):
+    def test_s3_transfer_config(self):
+        s3_config = CloudTransferConfig(multipart_threshold=10 * MB, multipart_chunksize=5 * MB,
+                                        max_concurrency=4).get_s3_transfer_config()
+        self.assertEqual(s3_config.multipart_threshold, 10 * MB)
+        self.assertEqual(s3_config.multipart_chunksize, 5 * MB)
+        self.assertEqual(s3_config.max_request_concurrency, 4)
+        self.assertTrue(s3_config.use_threads)
+
+        self.assertFalse(CloudTransferConfig(max_concurrency=1).get_s3_transfer_config().use_threads)
+
+    def test_is_multipart_upload(self):
+        file_path = os.path.join(THIS_DIR, 'test_AWS', 'resources', 'file.txt')
+        self.assertFalse(CloudTransferConfig().is_multipart_upload(file_path))
+        self.assertTrue(CloudTransferConfig(multipart_threshold=1).is_multipart_upload(file_path))
+
+    def test_wrong_params(self):
+        with self.assertRaises(ValueError):
+            CloudTransferConfig(max_workers=0)
+        with self.assertRaises(ValueError):
+            CloudTransferConfig(max_concurrency=0)
+
+    def test_default_transfer_config(self):
+        original_default = transfer.default_transfer_config
+        new_default = CloudTransferConfig(max_workers=2)
+        custom_config = CloudTransferConfig(max_workers=3)
+
+        self.assertIs(transfer.get_transfer_config(), original_default)
+        transfer.set_default_transfer_config(new_default)
+        self.assertIs(transfer.get_transfer_config(), new_default)
+        self.assertIs(transfer.get_transfer_config(custom_config), custom_config)
+
+        transfer.set_default_transfer_config(original_default)
+
+
+class TestParallelFileTransfer(unittest.TestCase):
+    def test_transfer_all_files(self):
+        for max_workers in [1, 4]:
+            transferred = []
+            file_paths = [[f'local_{i}', f'cloud_{i}'] for i in range(20)]
+            parallel_file_transfer(lambda source, dest: transferred.append([source, dest]), file_paths, max_workers)
+            self.assertEqual(sorted(transferred), sorted(file_paths))
+
+    def test_transfer_error_raised(self):
+        def failing_transfer(source, dest):
+            if source == 'local_3':
+                raise ValueError('Transfer failed')
+
+        with self.assertRaises(ValueError):
+            parallel_file_transfer(failing_transfer, [[f'local_{i}', f'cloud_{i}'] for i in range(5)], 4)
@@ -0,0 +1,104 @@
+import unittest
+import os
+import shutil
+
+import numpy as np
+
+from aitoolbox.experiment.experiment_index import ExperimentIndex, EXPERIMENT_INDEX_FILE_NAME
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestExperimentIndex(unittest.TestCase):
+    def setUp(self):
+        self.index_dir_path = os.path.join(THIS_DIR, 'experiment_index_test_dir')
+        self.index = ExperimentIndex(os.path.join(self.index_dir_path, EXPERIMENT_INDEX_FILE_NAME))
+
+    def tearDown(self):
+        if os.path.exists(self.index_dir_path):
+            shutil.rmtree(self.index_dir_path)
+
+    def record_sweep(self):
+        for i, (lr, f1) in enumerate([(0.1, 0.7), (0.01, 0.9), (0.001, 0.8)]):
+            self.index.record_experiment('projectIdx', 'sweepExp', f'2020-01-0{i + 1}_10-00-00',
+                                         hyperparams={'lr': lr, 'batch_size': 32},
+                                         results={'F1': f1, 'loss': 1. - f1, 'note': 'text'},
+                                         artifact_paths=[f'model_{i}.pth', f'results_{i}.p'])
+        self.index.record_experiment('otherProject', 'sweepExp', '2020-01-01_10-00-00',
+                                     hyperparams={'lr': 0.1}, results={'F1': 0.99})
+
+    def test_init(self):
+        self.assertTrue(os.path.exists(os.path.join(self.index_dir_path, EXPERIMENT_INDEX_FILE_NAME)))
+        self.assertEqual(self.index.query(), [])
+
+    def test_record_and_get_experiment(self):
+        self.record_sweep()
+        experiment = self.index.get_experiment('projectIdx', 'sweepExp', '2020-01-02_10-00-00')
+
+        self.assertEqual(experiment['hyperparams'], {'lr': 0.01, 'batch_size': 32})
+        self.assertEqual(experiment['results'], {'F1': 0.9, 'loss': 1. - 0.9, 'note': 'text'})
+        self.assertEqual(experiment['metrics'], {'F1': 0.9, 'loss': 1. - 0.9})
+        self.assertEqual(experiment['artifact_paths'], ['model_1.pth', 'results_1.p'])
+        self.assertIsNone(self.index.get_experiment('projectIdx', 'sweepExp', 'missing'))
+
+    def test_record_replaces_existing_run(self):
+        self.record_sweep()
+        experiment_id = self.index.get_experiment('projectIdx', 'sweepExp', '2020-01-01_10-00-00')['experiment_id']
+        new_experiment_id = self.index.record_experiment('projectIdx', 'sweepExp', '2020-01-01_10-00-00',
+                                                         results={'F1': 0.1})
+
+        self.assertEqual(experiment_id, new_experiment_id)
+        experiment = self.index.get_experiment('projectIdx', 'sweepExp', '2020-01-01_10-00-00')
+        self.assertEqual(experiment['metrics'], {'F1': 0.1})
+        self.assertEqual(len(self.index.query(project_name='projectIdx')), 3)
+
+    def test_get_best_experiment(self):
+        self.record_sweep()
+
+        best_experiment = self.index.get_best_experiment('F1', project_name='projectIdx')
+        self.assertEqual(best_experiment['hyperparams']['lr'], 0.01)
+        self.assertEqual(self.index.get_best_experiment('F1')['project_name'], 'otherProject')
+        self.assertEqual(self.index.get_best_experiment('loss', maximize=False, project_name='projectIdx')
+                         ['experiment_timestamp'], '2020-01-02_10-00-00')
+        self.assertIsNone(self.index.get_best_experiment('missing_metric'))
+
+    def test_query_filters(self):
+        self.record_sweep()
+
+        self.assertEqual(len(self.index.query(experiment_name='sweepExp')), 4)
+        self.assertEqual(len(self.index.query(hyperparams={'lr': 0.1})), 2)
+        self.assertEqual(len(self.index.query(project_name='projectIdx', hyperparams={'lr': 0.1, 'batch_size': 32})), 1)
+
+        high_f1_runs = self.index.query(project_name='projectIdx', metric_filters=[('F1', '>=', 0.8)],
+                                        order_by_metric='F1', maximize=False)
+        self.assertEqual([run['metrics']['F1'] for run in high_f1_runs], [0.8, 0.9])
+        self.assertEqual(len(self.index.query(order_by_metric='F1', limit=2)), 2)
+
+        with self.assertRaises(ValueError):
+            self.index.query(metric_filters=[('F1', 'LIKE', 0.8)])
+
+    def test_delete_experiment(self):
+        self.record_sweep()
+
+        self.assertTrue(self.index.delete_experiment('projectIdx', 'sweepExp', '2020-01-02_10-00-00'))
+        self.assertFalse(self.index.delete_experiment('projectIdx', 'sweepExp', '2020-01-02_10-00-00'))
+        self.assertEqual(self.index.get_best_experiment('F1', project_name='projectIdx')['metrics']['F1'], 0.8)
+
+    def test_flatten_metrics(self):
+        results = {
+            'pkg1': {'acc': 0.5, 'confusion': np.array([[1, 2], [3, 4]])},
+            'pkg2': {'f1': np.float32(0.25), 'is_ok': True},
+            'loss': np.array(2.),
+            'name': 'abc'
+        }
+        self.assertEqual(ExperimentIndex.flatten_metrics(results),
+                         {'pkg1/acc': 0.5, 'pkg2/f1': 0.25, 'loss': 2.})
+
+    def test_non_json_values_stored(self):
+        self.index.record_experiment('projectIdx', 'exp', 'ts',
+                                     hyperparams={'fn': len}, results={'y': np.array([1, 2])})
+        experiment = self.index.get_experiment('projectIdx', 'exp', 'ts')
+
+        self.assertEqual(experiment['hyperparams'], {'fn': str(len)})
+        self.assertEqual(experiment['results'], {'y': [1, 2]})
+        self.assertEqual(experiment['metrics'], {})
@@ -6,6 +6,7 @@ from tests.utils import *
 
 from aitoolbox.experiment.local_experiment_saver import *
 from aitoolbox.experiment.experiment_saver import AbstractExperimentSaver
+from aitoolbox.experiment.experiment_index import ExperimentIndex, EXPERIMENT_INDEX_FILE_NAME
 from aitoolbox.experiment.result_package.abstract_result_packages import AbstractResultPackage
 from aitoolbox.experiment.local_save.local_model_save import PyTorchLocalModelSaver, KerasLocalModelSaver
 from aitoolbox.experiment.local_save.local_results_save import LocalResultsSaver
@@ -94,6 +95,32 @@ class TestFullPyTorchExperimentLocalSaver(unittest.TestCase):
         if os.path.exists(project_path):
             shutil.rmtree(project_path)
 
+    def test_save_experiment_recorded_in_index(self):
+        project_dir_name = 'projectPyTorchLocalModelSaver'
+        exp_dir_name = 'experimentSubDirPT'
+        current_time = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d_%H-%M-%S')
+        project_path = os.path.join(THIS_DIR, project_dir_name)
+
+        experiment_index = ExperimentIndex(os.path.join(project_path, EXPERIMENT_INDEX_FILE_NAME))
+        result_pkg = DummyFullResultPackage({'metric1': 33434, 'acc1': 223.43, 'loss': 4455.6},
+                                            {'epoch': 20, 'lr': 0.334})
+        model_checkpoint = {'model_state_dict': Net().state_dict(), 'optimizer_state_dict': None,
+                            'epoch': 10, 'hyperparams': {}}
+
+        saver = FullPyTorchExperimentLocalSaver(project_name=project_dir_name, experiment_name=exp_dir_name,
+                                                local_model_result_folder_path=THIS_DIR,
+                                                experiment_index=experiment_index)
+        saved_paths = saver.save_experiment(model_checkpoint, result_pkg,
+                                            TrainingHistory().wrap_pre_prepared_history({}), current_time)
+
+        experiment = experiment_index.get_experiment(project_dir_name, exp_dir_name, current_time)
+        self.assertEqual(experiment['hyperparams'], {'epoch': 20, 'lr': 0.334})
+        self.assertEqual(experiment['metrics'], {'metric1': 33434., 'acc1': 223.43, 'loss': 4455.6})
+        self.assertEqual(experiment['artifact_paths'], saved_paths)
+
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
 
 class TestFullKerasExperimentLocalSaver(unittest.TestCase):
     def test_init(self):
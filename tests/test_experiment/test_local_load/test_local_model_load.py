@@ -1,13 +1,14 @@
 import os
 import unittest
 import shutil
+from contextlib import nullcontext
 from collections import OrderedDict
 import torch.nn as nn
 
 from tests.utils import *
 
 from aitoolbox.experiment.local_load.local_model_load import PyTorchLocalModelLoader
-from aitoolbox.experiment.local_save.local_model_save import PyTorchLocalModelSaver
+from aitoolbox.experiment.local_save.local_model_save import PyTorchLocalModelSaver, save_latest_checkpoint_marker
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -69,3 +70,85 @@ class TestPyTorchLocalModelLoader(unittest.TestCase):
             state_dict_fixed[name] = v
 
         return state_dict_fixed
+
+    def test_load_sectioned_checkpoint_lazily(self):
+        model = Net()
+        model_checkpoint = {'model_state_dict': model.state_dict(),
+                            'optimizer_state_dict': {'state': {}, 'param_groups': []},
+                            'epoch': 10, 'hyperparams': {}}
+        saver = PyTorchLocalModelSaver(local_model_result_folder_path=THIS_DIR, sectioned_checkpoint=True)
+        saver.save_model(model_checkpoint, 'project', 'exp', '12', 3)
+
+        for mmap in [True, False]:
+            model_loader = PyTorchLocalModelLoader(THIS_DIR, mmap=mmap)
+            model_representation = model_loader.load_model('project', 'exp', '12', 'model', 3)
+
+            self.assertEqual(model_representation['schedulers_state_dict'], [])
+            self.assertEqual(sorted(model_representation.keys()),
+                             sorted(list(model_checkpoint.keys()) + ['schedulers_state_dict']))
+
+            model_init = model_loader.init_model(Net())
+            self.assertNotIn('optimizer_state_dict', model_representation.loaded_sections)
+            for k, v in model.state_dict().items():
+                self.assertTrue(torch.equal(v, model_init.state_dict()[k]))
+
+        if os.path.exists(os.path.join(THIS_DIR, 'project')):
+            shutil.rmtree(os.path.join(THIS_DIR, 'project'))
+
+    def test_load_model_from_path_without_mmap(self):
+        self.save_dummy_model()
+        model_path = os.path.join(THIS_DIR, 'project', 'exp_12', 'model', 'model_exp_12_E3.pth')
+
+        self.assertFalse(PyTorchLocalModelLoader(THIS_DIR).mmap)
+        for mmap in [False, True]:
+            model_representation = PyTorchLocalModelLoader(THIS_DIR, mmap=mmap).load_model_from_path(model_path)
+            self.assertEqual(model_representation['epoch'], 10)
+
+        if os.path.exists(os.path.join(THIS_DIR, 'project')):
+            shutil.rmtree(os.path.join(THIS_DIR, 'project'))
+
+    def test_training_resume_guard_for_reduced_precision_weights(self):
+        model = Net()
+        optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+        model_checkpoint = {'model_state_dict': model.state_dict(), 'optimizer_state_dict': optimizer.state_dict(),
+                            'epoch': 10, 'hyperparams': {}}
+        saver = PyTorchLocalModelSaver(local_model_result_folder_path=THIS_DIR,
+                                       sectioned_checkpoint={'weights_dtype': 'fp16', 'separate_optimizer': True})
+        saver.save_model(model_checkpoint, 'project', 'exp', '12', 3)
+
+        model_loader = PyTorchLocalModelLoader(THIS_DIR)
+        model_loader.load_model('project', 'exp', '12', 'model', 3)
+        model_init = model_loader.init_model(Net())
+        for k, v in model.state_dict().items():
+            self.assertTrue(torch.allclose(v, model_init.state_dict()[k], atol=1e-3))
+
+        with self.assertRaises(ValueError):
+            model_loader.init_optimizer(torch.optim.SGD(model_init.parameters(), lr=0.1))
+
+        if os.path.exists(os.path.join(THIS_DIR, 'project')):
+            shutil.rmtree(os.path.join(THIS_DIR, 'project'))
+
+    def test_load_latest_checkpoint(self):
+        model_loader = PyTorchLocalModelLoader(THIS_DIR)
+        saver = PyTorchLocalModelSaver(local_model_result_folder_path=THIS_DIR, checkpoint_model=True,
+                                       sectioned_checkpoint=True)
+        for epoch in range(3):
+            model_checkpoint = {'model_state_dict': Net().state_dict(), 'optimizer_state_dict': {},
+                                'epoch': epoch, 'hyperparams': {}}
+            _, model_local_path = saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch)
+
+            with self.assertRaises(FileNotFoundError) if epoch == 0 else nullcontext():
+                model_loader.load_latest_checkpoint('project', 'exp', '12')
+
+            save_latest_checkpoint_marker(model_local_path, epoch)
+
+            # Checkpoint which is still being saved isn't picked up
+            with open(os.path.join(os.path.dirname(model_local_path), 'model_exp_12_E9.pth'), 'wb') as f:
+                f.write(b'partial')
+
+            model_representation = model_loader.load_latest_checkpoint('project', 'exp', '12')
+            self.assertEqual(model_representation['epoch'], epoch)
+            self.assertEqual(model_representation['schedulers_state_dict'], [])
+
+        if os.path.exists(os.path.join(THIS_DIR, 'project')):
+            shutil.rmtree(os.path.join(THIS_DIR, 'project'))
@@ -0,0 +1,67 @@
+import os
+import unittest
+import shutil
+import numpy as np
+
+from aitoolbox.experiment.local_load.local_results_load import TruePredLabelsLoader
+from aitoolbox.experiment.local_save.local_results_save import LocalResultsSaver
+from aitoolbox.experiment.result_package.abstract_result_packages import AbstractResultPackage
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class DummyLabelsResultPackage(AbstractResultPackage):
+    def __init__(self, y_true, y_predicted):
+        AbstractResultPackage.__init__(self, 'dummyLabelsPkg')
+        self.y_true = y_true
+        self.y_predicted = y_predicted
+
+    def prepare_results_dict(self):
+        return {}
+
+
+class TestTruePredLabelsLoader(unittest.TestCase):
+    def setUp(self):
+        self.saver_folder_path = os.path.join(THIS_DIR, 'results_save_folder')
+        self.labels_file_path_w_type = os.path.join(self.saver_folder_path, 'true_pred_labels')
+        os.makedirs(self.saver_folder_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.saver_folder_path)
+
+    def test_load_npy_memory_mapped(self):
+        result_pkg = DummyLabelsResultPackage(np.arange(20).reshape(10, 2), np.random.rand(10))
+        LocalResultsSaver(self.saver_folder_path, labels_array_format='npy')\
+            .save_true_pred_labels_arrays(result_pkg, 'true_pred_labels', self.labels_file_path_w_type)
+
+        labels = TruePredLabelsLoader().load(self.labels_file_path_w_type + '.json')
+        self.assertIsInstance(labels['y_true'], np.memmap)
+        self.assertTrue(np.array_equal(labels['y_true'], result_pkg.y_true))
+        self.assertTrue(np.array_equal(labels['y_predicted'], result_pkg.y_predicted))
+
+        labels = TruePredLabelsLoader(mmap_mode=None).load(self.labels_file_path_w_type + '.json',
+                                                           label_names=['y_predicted'])
+        self.assertEqual(list(labels.keys()), ['y_predicted'])
+        self.assertNotIsInstance(labels['y_predicted'], np.memmap)
+
+    def test_load_npz_multiple_packages(self):
+        result_pkg = DummyLabelsResultPackage({'pkg_1': [1, 0, 1], 'pkg_2': [0.5, 0.2]},
+                                              {'pkg_1': [1, 1, 1], 'pkg_2': [0.4, 0.1]})
+        LocalResultsSaver(self.saver_folder_path, labels_array_format='npz')\
+            .save_true_pred_labels_arrays(result_pkg, 'true_pred_labels', self.labels_file_path_w_type)
+
+        labels = TruePredLabelsLoader().load(self.labels_file_path_w_type + '.json')
+        self.assertEqual(sorted(labels['y_true'].keys()), ['pkg_1', 'pkg_2'])
+        self.assertEqual(labels['y_true']['pkg_1'].tolist(), [1, 0, 1])
+        self.assertEqual(labels['y_predicted']['pkg_2'].tolist(), [0.4, 0.1])
+
+    def test_load_ragged_labels(self):
+        result_pkg = DummyLabelsResultPackage([[1, 2], [3]], [[1], [2, 3, 4]])
+        LocalResultsSaver(self.saver_folder_path, labels_array_format='npy')\
+            .save_true_pred_labels_arrays(result_pkg, 'true_pred_labels', self.labels_file_path_w_type)
+
+        with self.assertRaises(ValueError):
+            TruePredLabelsLoader().load(self.labels_file_path_w_type + '.json')
+
+        labels = TruePredLabelsLoader(allow_pickle=True).load(self.labels_file_path_w_type + '.json')
+        self.assertEqual(labels['y_predicted'].tolist(), [[1], [2, 3, 4]])
@@ -0,0 +1,149 @@
+import unittest
+import time
+import threading
+from collections import namedtuple
+import torch
+import torch.optim as optim
+
+from tests.utils import *
+
+from aitoolbox.experiment.local_save.async_checkpoint import AsyncCheckpointWriter, PinnedBufferPool, \
+    snapshot_state
+
+
+class TestAsyncCheckpointWriter(unittest.TestCase):
+    def test_saves_executed_in_submission_order(self):
+        writer = AsyncCheckpointWriter(max_pending_saves=2)
+        executed_saves = []
+
+        def build_save_fn(save_idx):
+            def save_fn():
+                time.sleep(0.01 * (5 - save_idx))
+                executed_saves.append(save_idx)
+                return save_idx
+            return save_fn
+
+        for i in range(5):
+            writer.submit(build_save_fn(i), description=f'save {i}')
+        writer.wait_until_done()
+
+        self.assertEqual(executed_saves, list(range(5)))
+        finished_saves = writer.pop_finished_saves()
+        self.assertEqual([el['result'] for el in finished_saves], list(range(5)))
+        self.assertEqual([el['description'] for el in finished_saves], [f'save {i}' for i in range(5)])
+        self.assertTrue(all(el['success'] for el in finished_saves))
+        self.assertEqual(writer.pop_finished_saves(), [])
+
+        writer.shutdown()
+        self.assertFalse(writer.is_alive())
+        with self.assertRaises(RuntimeError):
+            writer.submit(lambda: None)
+
+    def test_submit_does_not_block_training(self):
+        writer = AsyncCheckpointWriter()
+        save_started = threading.Event()
+        release_save = threading.Event()
+
+        def slow_save_fn():
+            save_started.set()
+            release_save.wait()
+
+        writer.submit(slow_save_fn)
+        save_started.wait()
+        self.assertEqual(writer.pop_finished_saves(), [])
+
+        release_save.set()
+        writer.shutdown()
+        self.assertEqual(len(writer.pop_finished_saves()), 1)
+
+    def test_failed_save_raised_in_training_thread(self):
+        writer = AsyncCheckpointWriter()
+
+        def failing_save_fn():
+            raise OSError('Disk full')
+
+        writer.submit(failing_save_fn)
+        with self.assertRaises(RuntimeError):
+            writer.wait_until_done()
+
+        finished_saves = writer.pop_finished_saves()
+        self.assertFalse(finished_saves[0]['success'])
+        self.assertIn('Disk full', finished_saves[0]['error'])
+
+        writer.submit(lambda: 'saved')
+        writer.shutdown()
+        self.assertTrue(writer.pop_finished_saves()[0]['success'])
+
+    def test_max_pending_saves_validation(self):
+        with self.assertRaises(ValueError):
+            AsyncCheckpointWriter(max_pending_saves=0)
+
+
+class TestSnapshotState(unittest.TestCase):
+    def test_snapshot_independent_of_training_state(self):
+        model = Net()
+        optimizer = optim.Adam(model.parameters(), lr=0.001)
+        model(torch.rand(2, 1, 28, 28)).sum().backward()
+        optimizer.step()
+        Pair = namedtuple('Pair', ['first', 'second'])
+
+        state = {
+            'model_state_dict': model.state_dict(),
+            'optimizer_state_dict': optimizer.state_dict(),
+            'epoch': 3,
+            'hyperparams': {'lr': 0.001},
+            'misc': [Pair(torch.ones(2, requires_grad=True), 'text'), (torch.zeros(3), 5)]
+        }
+        state_snapshot = snapshot_state(state)
+
+        self.assertEqual(list(state_snapshot.keys()), list(state.keys()))
+        self.assertEqual(type(state_snapshot['model_state_dict']), type(state['model_state_dict']))
+        self.assertIsInstance(state_snapshot['misc'][0], Pair)
+        self.assertFalse(state_snapshot['misc'][0].first.requires_grad)
+
+        model_weights = {k: v.clone() for k, v in model.state_dict().items()}
+        model(torch.rand(2, 1, 28, 28)).sum().backward()
+        optimizer.step()
+        state['hyperparams']['lr'] = 0.1
+
+        for k, v in model_weights.items():
+            self.assertTrue(torch.equal(v, state_snapshot['model_state_dict'][k]))
+            self.assertFalse(torch.equal(model.state_dict()[k], state_snapshot['model_state_dict'][k]))
+        self.assertEqual(state_snapshot['hyperparams']['lr'], 0.001)
+        self.assertEqual(state_snapshot['optimizer_state_dict']['state'][0]['step'].item(), 1)
+
+        optim.Adam(Net().parameters(), lr=0.001).load_state_dict(state_snapshot['optimizer_state_dict'])
+
+    def test_snapshot_without_cuda_tensors_takes_no_pinned_buffers(self):
+        buffer_pool = PinnedBufferPool()
+        state = {'model_state_dict': Net().state_dict(), 'epoch': 3}
+        state_snapshot = snapshot_state(state, buffer_pool)
+
+        self.assertEqual(buffer_pool.used_buffers, {})
+        buffer_pool.release(state_snapshot)
+        self.assertEqual(buffer_pool.free_buffers, {})
+        for k, v in state['model_state_dict'].items():
+            self.assertTrue(torch.equal(v, state_snapshot['model_state_dict'][k]))
+
+    @unittest.skipUnless(torch.cuda.is_available(), 'Pinned memory requires CUDA')
+    def test_pinned_buffers_reused_across_snapshots(self):
+        buffer_pool = PinnedBufferPool()
+        state = {'model_state_dict': Net().cuda().state_dict()}
+
+        state_snapshot = snapshot_state(state, buffer_pool)
+        snapshot_buffer_ptrs = {v.data_ptr() for v in state_snapshot['model_state_dict'].values()}
+        self.assertTrue(all(v.is_pinned() for v in state_snapshot['model_state_dict'].values()))
+        self.assertEqual(len(buffer_pool.used_buffers), len(state['model_state_dict']))
+
+        # Buffers of the snapshot which is still being saved aren't reused
+        second_state_snapshot = snapshot_state(state, buffer_pool)
+        self.assertTrue(snapshot_buffer_ptrs.isdisjoint(
+            v.data_ptr() for v in second_state_snapshot['model_state_dict'].values()
+        ))
+
+        buffer_pool.release(state_snapshot)
+        third_state_snapshot = snapshot_state(state, buffer_pool)
+        self.assertEqual({v.data_ptr() for v in third_state_snapshot['model_state_dict'].values()},
+                         snapshot_buffer_ptrs)
+        for k, v in state['model_state_dict'].items():
+            self.assertTrue(torch.equal(v.cpu(), third_state_snapshot['model_state_dict'][k]))
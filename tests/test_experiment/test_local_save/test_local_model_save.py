@@ -1,5 +1,6 @@
 import unittest
 import random
+import json
 import shutil
 
 from tests.utils import *
@@ -11,8 +12,8 @@ THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 class DummyLocalSubOptimalModelRemover(LocalSubOptimalModelRemover):
-    def __init__(self, metric_name, num_best_kept=2):
-        LocalSubOptimalModelRemover.__init__(self, metric_name, num_best_kept)
+    def __init__(self, metric_name, num_best_kept=2, keep_latest=False):
+        LocalSubOptimalModelRemover.__init__(self, metric_name, num_best_kept, keep_latest=keep_latest)
         self.paths_to_remove = []
 
     def rm_suboptimal_model(self, rm_model_paths):
@@ -144,6 +145,21 @@ class TestLocalSubOptimalModelRemover(unittest.TestCase):
 
         self.assertEqual(remover_loss.paths_to_remove, paths_2)
 
+    def test_keep_latest_model(self):
+        remover_loss = DummyLocalSubOptimalModelRemover('loss', num_best_kept=2, keep_latest=True)
+
+        remover_loss.decide_if_remove_suboptimal_model({'loss': [10.]}, ['path_1'])
+        remover_loss.decide_if_remove_suboptimal_model({'loss': [10., 5.]}, ['path_2'])
+        remover_loss.decide_if_remove_suboptimal_model({'loss': [10., 5., 20.]}, ['path_3'])
+        # Latest model is suboptimal, but is kept until the next model is saved
+        self.assertEqual(remover_loss.paths_to_remove, [])
+        self.assertEqual(remover_loss.latest_model_paths_to_rm, ['path_3'])
+
+        remover_loss.decide_if_remove_suboptimal_model({'loss': [10., 5., 20., 1.]}, ['path_4'])
+        self.assertEqual(remover_loss.paths_to_remove, ['path_3', 'path_1'])
+        self.assertIsNone(remover_loss.latest_model_paths_to_rm)
+        self.assertEqual(remover_loss.model_save_history, [(['path_4'], 1.), (['path_2'], 5.)])
+
     def test_num_best_kept_acc(self):
         for num_kept in range(2, 100):
             history = {'my_acc': [], 'loss': [1.]}
@@ -170,6 +186,49 @@ class TestLocalSubOptimalModelRemover(unittest.TestCase):
                 self.assertEqual(len(remover_loss.model_save_history), min(i, num_kept))
 
 
+class TestLocalSubOptimalModelRemoverSaveDecision(unittest.TestCase):
+    def test_is_new_model_kept(self):
+        remover_loss = DummyLocalSubOptimalModelRemover('loss', num_best_kept=2)
+        remover_acc = LocalSubOptimalModelRemover('acc', num_best_kept=2, metric_known_at_save=True)
+        history = {'loss': [], 'acc': []}
+
+        for i, (loss, acc) in enumerate([(10., 0.5), (5., 0.7)]):
+            history['loss'].append(loss)
+            history['acc'].append(acc)
+            self.assertTrue(remover_loss.is_new_model_kept(history))
+            self.assertTrue(remover_acc.is_new_model_kept(history))
+            remover_loss.decide_if_remove_suboptimal_model(history, [f'path_{i}'])
+            remover_acc.decide_if_remove_suboptimal_model(history, [f'path_{i}'])
+
+        # Non-default metric is paired with the model saved at the same time
+        self.assertEqual(remover_acc.model_save_history, [(['path_0'], 0.5), (['path_1'], 0.7)])
+
+        for loss, acc, expected_kept in [(10., 0.5, False), (20., 0.2, False), (9., 0.6, True)]:
+            history['loss'].append(loss)
+            history['acc'].append(acc)
+            self.assertEqual(remover_loss.is_new_model_kept(history), expected_kept)
+            self.assertEqual(remover_acc.is_new_model_kept(history), expected_kept)
+
+        self.assertTrue(remover_loss.is_new_model_kept({'acc': [0.1]}))
+
+
+class TestLocalRollingModelRemover(unittest.TestCase):
+    def test_keep_rolling_window(self):
+        removed_paths = []
+        remover = LocalRollingModelRemover(num_kept=2, after_remove_fn=removed_paths.append)
+
+        for i in range(5):
+            remover.add_model([f'path_{i}.1', f'path_{i}.2'])
+        # Model saved again under the same name is not tracked twice
+        remover.add_model(['path_3.1', 'path_3.2'])
+
+        self.assertEqual(remover.model_save_history, [['path_4.1', 'path_4.2'], ['path_3.1', 'path_3.2']])
+        self.assertEqual(removed_paths, [[f'path_{i}.1', f'path_{i}.2'] for i in range(3)])
+
+        with self.assertRaises(ValueError):
+            LocalRollingModelRemover(num_kept=0)
+
+
 class TestBaseLocalModelSaver(unittest.TestCase):
     def test_folder_structure_prep(self):
         self.prepare_folder_structure(checkpoint_model=True)
@@ -240,6 +299,31 @@ class TestPyTorchLocalModelSaver(unittest.TestCase):
             shutil.rmtree(project_path)
 
 
+class TestLatestCheckpointMarker(unittest.TestCase):
+    def test_save_latest_checkpoint_marker(self):
+        model_checkpoint = {'model_state_dict': Net().state_dict(), 'optimizer_state_dict': None,
+                            'epoch': 3, 'hyperparams': {}}
+        saver = PyTorchLocalModelSaver(local_model_result_folder_path=THIS_DIR, checkpoint_model=True)
+
+        for epoch in range(3):
+            _, model_local_path = saver.save_model(model_checkpoint, 'project', 'exp', '12', epoch)
+            marker_file_path = save_latest_checkpoint_marker(model_local_path, epoch, epoch * 10)
+
+        experiment_dir_path = os.path.join(THIS_DIR, 'project', 'exp_12')
+        self.assertEqual(marker_file_path, os.path.join(experiment_dir_path, LATEST_CHECKPOINT_MARKER_FILE_NAME))
+        self.assertEqual(sorted(os.listdir(experiment_dir_path)), ['checkpoint_model', 'latest_checkpoint.json'])
+        self.assertEqual(sorted(os.listdir(os.path.join(experiment_dir_path, 'checkpoint_model'))),
+                         [f'model_exp_12_E{epoch}.pth' for epoch in range(3)])
+
+        with open(marker_file_path) as f:
+            self.assertEqual(json.load(f),
+                             {'model_name': 'model_exp_12_E2.pth', 'model_save_dir': 'checkpoint_model',
+                              'epoch': 2, 'iteration_idx': 20})
+
+        if os.path.exists(os.path.join(THIS_DIR, 'project')):
+            shutil.rmtree(os.path.join(THIS_DIR, 'project'))
+
+
 class TestKerasLocalModelSaver(unittest.TestCase):
     def test_init(self):
         saver = KerasLocalModelSaver(local_model_result_folder_path=THIS_DIR, checkpoint_model=True)
@@ -318,3 +318,53 @@ class TestLocalResultsSaverSeparateFiles(unittest.TestCase):
 
         if os.path.exists(project_path):
             shutil.rmtree(project_path)
+
+
+class TestLocalResultsSaverLabelsArrays(unittest.TestCase):
+    def setUp(self):
+        self.project_path = os.path.join(THIS_DIR, 'projectDir')
+        self.results_path = os.path.join(self.project_path, 'experimentSubDir_2020', 'results')
+        self.result_pkg = DummyFullResultPackage({'acc': 0.9}, {'lr': 0.1})
+        self.training_history = DummyTrainingHistory().wrap_pre_prepared_history({})
+
+    def tearDown(self):
+        shutil.rmtree(self.project_path, ignore_errors=True)
+
+    def test_unsupported_labels_array_format(self):
+        with self.assertRaises(ValueError):
+            LocalResultsSaver(THIS_DIR, labels_array_format='csv')
+
+    def test_save_experiment_results_npz(self):
+        saver = LocalResultsSaver(THIS_DIR, file_format='json', labels_array_format='npz')
+        experiment_results_paths = saver.save_experiment_results(self.result_pkg, self.training_history,
+                                                                 'projectDir', 'experimentSubDir', '2020',
+                                                                 save_true_pred_labels=True)
+        self.assertEqual([el[0] for el in experiment_results_paths],
+                         ['results_hyperParams_hist_experimentSubDir_2020.json',
+                          'true_pred_labels_experimentSubDir_2020.json',
+                          'true_pred_labels_experimentSubDir_2020.npz'])
+
+        with open(experiment_results_paths[0][1]) as f:
+            read_result_dict = json.load(f)
+        self.assertNotIn('y_true', read_result_dict)
+        self.assertEqual(read_result_dict['true_pred_labels_metadata_file'],
+                         'true_pred_labels_experimentSubDir_2020.json')
+
+        with open(experiment_results_paths[1][1]) as f:
+            labels_metadata = json.load(f)
+        self.assertEqual(labels_metadata['labels_array_format'], 'npz')
+        self.assertEqual([(el['label_name'], el['array_key'], el['shape']) for el in labels_metadata['arrays']],
+                         [('y_true', 'array_0', [100]), ('y_predicted', 'array_1', [100])])
+
+    def test_save_experiment_results_separate_files_npy(self):
+        saver = LocalResultsSaver(THIS_DIR, labels_array_format='npy')
+        experiment_results_paths = saver.save_experiment_results_separate_files(self.result_pkg, self.training_history,
+                                                                                'projectDir', 'experimentSubDir',
+                                                                                '2020', save_true_pred_labels=True)
+        self.assertEqual([el[0] for el in experiment_results_paths[3:]],
+                         ['true_pred_labels_experimentSubDir_2020.json',
+                          os.path.join('true_pred_labels_experimentSubDir_2020', 'array_0.npy'),
+                          os.path.join('true_pred_labels_experimentSubDir_2020', 'array_1.npy')])
+        for file_name, file_path in experiment_results_paths:
+            self.assertEqual(file_path, os.path.join(self.results_path, file_name))
+            self.assertTrue(os.path.isfile(file_path))
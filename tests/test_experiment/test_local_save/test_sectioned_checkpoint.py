@@ -0,0 +1,412 @@
+import unittest
+import os
+import shutil
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+from tests.utils import *
+
+from aitoolbox.experiment.local_save.sectioned_checkpoint import SectionedCheckpointReader, LazyCheckpoint, \
+    RangedSectionedCheckpointReader, save_sectioned_checkpoint, is_sectioned_checkpoint, get_checkpoint_file_paths, get_tensor_store_blob_paths, \
+    collect_tensor_store_garbage, TENSOR_ALIGNMENT
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_checkpoint():
+    model = Net()
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+    model(torch.rand(2, 1, 28, 28)).sum().backward()
+    optimizer.step()
+
+    return {
+        'model_state_dict': model.state_dict(),
+        'optimizer_state_dict': optimizer.state_dict(),
+        'schedulers_state_dict': [{'last_epoch': 3, 'base_lrs': [0.1]}],
+        'epoch': 3,
+        'iteration_idx': 150,
+        'hyperparams': {'lr': 0.001, 'batch_size': 32},
+        'misc': {
+            'bf16': torch.rand(3, 5).to(torch.bfloat16),
+            'bool': torch.tensor([True, False, True]),
+            'empty': torch.zeros(0, 4),
+            'scalar': torch.tensor(7, dtype=torch.int64),
+            'non_contiguous': torch.arange(12.).reshape(3, 4).t(),
+            'tuple': (torch.ones(2), 'text')
+        }
+    }
+
+
+class TestSectionedCheckpoint(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(os.path.join(THIS_DIR, 'sectioned_ckpt'), exist_ok=True)
+        self.file_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'model.pth')
+
+    def tearDown(self):
+        shutil.rmtree(os.path.join(THIS_DIR, 'sectioned_ckpt'), ignore_errors=True)
+
+    def assert_nested_equal(self, expected, loaded):
+        if isinstance(expected, torch.Tensor):
+            self.assertIsInstance(loaded, torch.Tensor)
+            self.assertEqual(expected.dtype, loaded.dtype)
+            self.assertEqual(expected.shape, loaded.shape)
+            self.assertTrue(torch.equal(expected, loaded))
+        elif isinstance(expected, dict):
+            self.assertEqual(list(expected.keys()), list(loaded.keys()))
+            for k in expected:
+                self.assert_nested_equal(expected[k], loaded[k])
+        elif isinstance(expected, (list, tuple)):
+            self.assertEqual(type(expected), type(loaded))
+            self.assertEqual(len(expected), len(loaded))
+            for el_expected, el_loaded in zip(expected, loaded):
+                self.assert_nested_equal(el_expected, el_loaded)
+        else:
+            self.assertEqual(expected, loaded)
+
+    def test_save_load_round_trip(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path)
+        self.assertTrue(is_sectioned_checkpoint(self.file_path))
+
+        for mmap_tensors in [True, False]:
+            loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path, mmap_tensors=mmap_tensors))
+            self.assertEqual(list(checkpoint.keys()), list(loaded_checkpoint.keys()))
+            self.assert_nested_equal(checkpoint, dict(loaded_checkpoint))
+
+    def test_map_location(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path)
+
+        location_calls = []
+
+        def map_location_fn(storage, location):
+            location_calls.append(location)
+            return storage
+
+        for map_location in ['cpu', torch.device('cpu'), {'cuda:0': 'cpu'}, map_location_fn]:
+            loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path, map_location=map_location))
+            self.assert_nested_equal(checkpoint['model_state_dict'], loaded_checkpoint['model_state_dict'])
+        self.assertEqual(set(location_calls), {'cpu'})
+
+        with self.assertRaises(TypeError):
+            LazyCheckpoint(SectionedCheckpointReader(self.file_path, map_location=5))['model_state_dict']
+
+    def test_tensors_aligned(self):
+        save_sectioned_checkpoint(build_checkpoint(), self.file_path)
+        reader = SectionedCheckpointReader(self.file_path)
+
+        for section_info in reader.header['sections'].values():
+            for tensor_offset, _, _ in section_info['tensors']:
+                self.assertEqual(tensor_offset % TENSOR_ALIGNMENT, 0)
+
+    def test_lazy_section_loading(self):
+        save_sectioned_checkpoint(build_checkpoint(), self.file_path)
+        loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path))
+
+        self.assertIn('optimizer_state_dict', loaded_checkpoint)
+        self.assertNotIn('amp', loaded_checkpoint)
+        self.assertEqual(loaded_checkpoint.loaded_sections, {})
+
+        model = Net()
+        model.load_state_dict(loaded_checkpoint['model_state_dict'])
+        self.assertEqual(list(loaded_checkpoint.loaded_sections.keys()), ['model_state_dict'])
+
+        with self.assertRaises(KeyError):
+            loaded_checkpoint['amp']
+
+        loaded_checkpoint['amp'] = {'scale': 1.}
+        del loaded_checkpoint['misc']
+        self.assertEqual(list(loaded_checkpoint.keys()),
+                         ['model_state_dict', 'optimizer_state_dict', 'schedulers_state_dict', 'epoch',
+                          'iteration_idx', 'hyperparams', 'amp'])
+
+    def test_mmap_tensors_writable_without_modifying_file(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path)
+        with open(self.file_path, 'rb') as f:
+            file_content = f.read()
+
+        loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path))
+        loaded_checkpoint['model_state_dict']['fc1.weight'].zero_()
+
+        with open(self.file_path, 'rb') as f:
+            self.assertEqual(f.read(), file_content)
+
+    def test_not_sectioned_checkpoint(self):
+        torch.save(build_checkpoint(), self.file_path)
+        self.assertFalse(is_sectioned_checkpoint(self.file_path))
+
+    def test_incomplete_checkpoint(self):
+        save_sectioned_checkpoint(build_checkpoint(), self.file_path)
+        with open(self.file_path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.file_path) - 10)
+
+        with self.assertRaises(ValueError):
+            SectionedCheckpointReader(self.file_path)
+
+    def test_optimizer_state_restore(self):
+        model = Net()
+        optimizer = optim.Adam(model.parameters(), lr=0.001)
+        model(torch.rand(2, 1, 28, 28)).sum().backward()
+        optimizer.step()
+        save_sectioned_checkpoint({'optimizer_state_dict': optimizer.state_dict()}, self.file_path)
+
+        new_optimizer = optim.Adam(Net().parameters(), lr=0.1)
+        new_optimizer.load_state_dict(LazyCheckpoint(SectionedCheckpointReader(self.file_path))['optimizer_state_dict'])
+
+        self.assertEqual(new_optimizer.param_groups[0]['lr'], 0.001)
+        for param_idx, state in optimizer.state_dict()['state'].items():
+            self.assertTrue(torch.equal(state['exp_avg'], new_optimizer.state_dict()['state'][param_idx]['exp_avg']))
+
+    def test_reduced_precision_weights(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path, weights_dtype='bf16')
+        full_precision_file_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'model_full.pth')
+        save_sectioned_checkpoint(checkpoint, full_precision_file_path)
+
+        def get_model_section_size(file_path):
+            section_info = SectionedCheckpointReader(file_path).header['sections']['model_state_dict']
+            return section_info['end'] - section_info['start']
+
+        self.assertLess(get_model_section_size(self.file_path), get_model_section_size(full_precision_file_path) * 0.6)
+
+        loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path))
+        self.assertEqual(loaded_checkpoint.reduced_precision_sections, ['model_state_dict'])
+
+        for k, v in checkpoint['model_state_dict'].items():
+            loaded_tensor = loaded_checkpoint['model_state_dict'][k]
+            self.assertEqual(loaded_tensor.dtype, torch.float32)
+            self.assertTrue(torch.equal(v.to(torch.bfloat16).float(), loaded_tensor))
+        # Optimizer state is kept in the full precision
+        self.assert_nested_equal(checkpoint['optimizer_state_dict'], loaded_checkpoint['optimizer_state_dict'])
+
+        with self.assertRaises(ValueError):
+            save_sectioned_checkpoint(checkpoint, self.file_path, weights_dtype='int8')
+
+    def test_compression(self):
+        checkpoint = build_checkpoint()
+        checkpoint['model_state_dict']['zeros'] = torch.zeros(1000, 100)
+        save_sectioned_checkpoint(checkpoint, self.file_path)
+        uncompressed_size = os.path.getsize(self.file_path)
+
+        for compression in ['zlib', 'lzma']:
+            save_sectioned_checkpoint(checkpoint, self.file_path, compression=compression, compression_level=1)
+            self.assertLess(os.path.getsize(self.file_path), uncompressed_size)
+
+            for mmap_tensors in [True, False]:
+                loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path, mmap_tensors=mmap_tensors))
+                self.assert_nested_equal(checkpoint, dict(loaded_checkpoint))
+
+        with self.assertRaises(ValueError):
+            save_sectioned_checkpoint(checkpoint, self.file_path, compression='unknown')
+
+    def test_separate_optimizer_file(self):
+        checkpoint = build_checkpoint()
+        saved_file_paths = save_sectioned_checkpoint(checkpoint, self.file_path, separate_optimizer=True)
+
+        optimizer_file_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'model_optimizer.pth')
+        self.assertEqual(saved_file_paths, [self.file_path, optimizer_file_path])
+        self.assertEqual(get_checkpoint_file_paths(self.file_path), saved_file_paths)
+
+        loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path))
+        self.assertEqual(list(checkpoint.keys()), list(loaded_checkpoint.keys()))
+        self.assert_nested_equal(checkpoint, dict(loaded_checkpoint))
+
+        model_only_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path))
+        os.remove(optimizer_file_path)
+        Net().load_state_dict(model_only_checkpoint['model_state_dict'])
+        with self.assertRaises(FileNotFoundError):
+            model_only_checkpoint['optimizer_state_dict']
+
+    def test_get_checkpoint_file_paths_torch_format(self):
+        torch.save(build_checkpoint(), self.file_path)
+        self.assertEqual(get_checkpoint_file_paths(self.file_path), [self.file_path])
+
+    def test_dedup_tensors(self):
+        checkpoint = build_checkpoint()
+        tensor_store_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'tensor_store')
+        save_sectioned_checkpoint(checkpoint, self.file_path, dedup_tensors=True)
+        num_blobs = len(os.listdir(tensor_store_path))
+
+        # Only the updated tensors are stored again in the next checkpoint
+        checkpoint['model_state_dict']['fc2.weight'] += 1.
+        checkpoint['epoch'] = 4
+        next_file_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'model_E4.pth')
+        saved_file_paths = save_sectioned_checkpoint(checkpoint, next_file_path, dedup_tensors=True,
+                                                     separate_optimizer=True)
+        self.assertEqual(len(os.listdir(tensor_store_path)), num_blobs + 1)
+        self.assertEqual(saved_file_paths, get_checkpoint_file_paths(next_file_path))
+        self.assertLess(os.path.getsize(next_file_path), 20000)
+
+        blob_paths = get_tensor_store_blob_paths(next_file_path)
+        self.assertEqual(len(blob_paths), num_blobs)
+        self.assertTrue(all(os.path.dirname(el) == tensor_store_path and os.path.isfile(el) for el in blob_paths))
+        self.assertEqual(get_tensor_store_blob_paths(get_checkpoint_file_paths(next_file_path)[0]), blob_paths)
+
+        for mmap_tensors in [True, False]:
+            loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(next_file_path, mmap_tensors=mmap_tensors))
+            self.assert_nested_equal(checkpoint, dict(loaded_checkpoint))
+            self.assertEqual(loaded_checkpoint.checkpoint_reader.header['format_version'], 2)
+
+    def test_dedup_tensors_compression(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path, compression='zlib', dedup_tensors=True)
+        loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path))
+        self.assert_nested_equal(checkpoint, dict(loaded_checkpoint))
+
+        # Same tensors stored uncompressed don't reuse the compressed blobs
+        uncompressed_file_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'model_uncompressed.pth')
+        save_sectioned_checkpoint(checkpoint, uncompressed_file_path, dedup_tensors=True)
+        self.assertEqual(
+            set(get_tensor_store_blob_paths(self.file_path)) & set(get_tensor_store_blob_paths(uncompressed_file_path)),
+            set()
+        )
+        self.assert_nested_equal(checkpoint, dict(LazyCheckpoint(SectionedCheckpointReader(uncompressed_file_path))))
+
+    def test_dedup_tensors_optimizer_resume_not_sharing_memory(self):
+        model = Net()
+        optimizer = optim.Adam(model.parameters(), lr=0.001)
+        model(torch.rand(2, 1, 28, 28)).sum().backward()
+        optimizer.step()
+        save_sectioned_checkpoint({'model_state_dict': model.state_dict(),
+                                   'optimizer_state_dict': optimizer.state_dict()},
+                                  self.file_path, dedup_tensors=True)
+
+        for mmap_tensors in [True, False]:
+            loaded_checkpoint = LazyCheckpoint(SectionedCheckpointReader(self.file_path, mmap_tensors=mmap_tensors))
+            new_model = Net()
+            new_model.load_state_dict(loaded_checkpoint['model_state_dict'])
+            new_optimizer = optim.Adam(new_model.parameters(), lr=0.001)
+            new_optimizer.load_state_dict(loaded_checkpoint['optimizer_state_dict'])
+
+            state_tensors = [state_tensor for state in new_optimizer.state.values()
+                             for state_tensor in state.values() if state_tensor.numel() > 0]
+            self.assertEqual(len({state_tensor.data_ptr() for state_tensor in state_tensors}), len(state_tensors))
+
+            # Step counters with the same content are advanced independently of each other
+            new_model(torch.rand(2, 1, 28, 28)).sum().backward()
+            new_optimizer.step()
+            for state in new_optimizer.state.values():
+                self.assertEqual(int(state['step']), 2)
+
+    def test_collect_tensor_store_garbage(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path, dedup_tensors=True)
+        first_blob_paths = set(get_tensor_store_blob_paths(self.file_path))
+
+        checkpoint['model_state_dict']['fc2.weight'] += 1.
+        next_file_path = os.path.join(THIS_DIR, 'sectioned_ckpt', 'model_E4.pth')
+        save_sectioned_checkpoint(checkpoint, next_file_path, dedup_tensors=True, separate_optimizer=True)
+        next_blob_paths = set(get_tensor_store_blob_paths(next_file_path))
+
+        self.assertEqual(collect_tensor_store_garbage(os.path.join(THIS_DIR, 'sectioned_ckpt'), grace_period=0.), [])
+
+        os.remove(self.file_path)
+        # Recently written blobs are kept as they could belong to the checkpoint still being written
+        self.assertEqual(collect_tensor_store_garbage(os.path.join(THIS_DIR, 'sectioned_ckpt')), [])
+
+        blobs_before_remove = []
+        removed_blob_paths = collect_tensor_store_garbage(os.path.join(THIS_DIR, 'sectioned_ckpt'), grace_period=0.,
+                                                          before_remove_fn=blobs_before_remove.extend)
+        self.assertEqual(set(removed_blob_paths), first_blob_paths - next_blob_paths)
+        self.assertEqual(blobs_before_remove, removed_blob_paths)
+        self.assertEqual(len(removed_blob_paths), 1)
+
+        self.assert_nested_equal(checkpoint, dict(LazyCheckpoint(SectionedCheckpointReader(next_file_path))))
+
+
+class TestRangedSectionedCheckpointReader(unittest.TestCase):
+    def setUp(self):
+        self.folder_path = os.path.join(THIS_DIR, 'ranged_sectioned_ckpt')
+        os.makedirs(self.folder_path, exist_ok=True)
+        self.file_path = os.path.join(self.folder_path, 'model.pth')
+        self.read_ranges = []
+
+    def tearDown(self):
+        shutil.rmtree(self.folder_path, ignore_errors=True)
+
+    def open_file(self, file_path):
+        full_file_path = os.path.join(self.folder_path, file_path)
+
+        def read_range(start, end):
+            self.read_ranges.append((file_path, start, end))
+            with open(full_file_path, 'rb') as f:
+                f.seek(start)
+                return f.read(end - start + 1)
+        return read_range, os.path.getsize(full_file_path)
+
+    def test_read_only_loaded_section(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path)
+        reader = RangedSectionedCheckpointReader(*self.open_file('model.pth'))
+        # Index header of the small checkpoint is read with the single tail request
+        self.assertEqual(len(self.read_ranges), 1)
+
+        loaded_checkpoint = LazyCheckpoint(reader)
+        self.assertEqual(list(checkpoint.keys()), list(loaded_checkpoint.keys()))
+        model = Net()
+        model.load_state_dict(loaded_checkpoint['model_state_dict'])
+
+        section_info = reader.header['sections']['model_state_dict']
+        self.assertEqual(self.read_ranges[1:], [('model.pth', section_info['start'], section_info['end'] - 1)])
+        self.assertEqual(list(loaded_checkpoint.loaded_sections.keys()), ['model_state_dict'])
+
+        for k, v in checkpoint['model_state_dict'].items():
+            self.assertTrue(torch.equal(v, model.state_dict()[k]))
+        self.assertTrue(torch.equal(checkpoint['misc']['bf16'], loaded_checkpoint['misc']['bf16']))
+
+    def test_separate_optimizer_file_and_tensor_store(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path, compression='zlib', separate_optimizer=True,
+                                  dedup_tensors=True)
+
+        loaded_checkpoint = LazyCheckpoint(
+            RangedSectionedCheckpointReader(*self.open_file('model.pth'), open_file_fn=self.open_file)
+        )
+        loaded_optimizer_state = loaded_checkpoint['optimizer_state_dict']
+        self.assertIn('model_optimizer.pth', [file_path for file_path, _, _ in self.read_ranges])
+        self.assertTrue(any(file_path.startswith('tensor_store') for file_path, _, _ in self.read_ranges))
+
+        for k, v in checkpoint['optimizer_state_dict']['state'][0].items():
+            self.assertTrue(torch.equal(v, loaded_optimizer_state['state'][0][k]))
+        for k, v in checkpoint['model_state_dict'].items():
+            self.assertTrue(torch.equal(v, loaded_checkpoint['model_state_dict'][k]))
+
+    def test_tensor_store_blobs_read_together(self):
+        checkpoint = build_checkpoint()
+        save_sectioned_checkpoint(checkpoint, self.file_path, dedup_tensors=True)
+        read_files_requests = []
+
+        def read_files(file_paths):
+            read_files_requests.append(file_paths)
+            file_contents = []
+            for file_path in file_paths:
+                with open(os.path.join(self.folder_path, file_path), 'rb') as f:
+                    file_contents.append(f.read())
+            return file_contents
+
+        loaded_checkpoint = LazyCheckpoint(
+            RangedSectionedCheckpointReader(*self.open_file('model.pth'), open_file_fn=self.open_file,
+                                            read_files_fn=read_files)
+        )
+        loaded_model_state = loaded_checkpoint['model_state_dict']
+
+        # All the blobs of the section are read with the single request and never one by one
+        self.assertEqual(len(read_files_requests), 1)
+        self.assertEqual(len(read_files_requests[0]), len(set(read_files_requests[0])))
+        self.assertTrue(all(file_path.startswith('tensor_store') for file_path in read_files_requests[0]))
+        self.assertFalse(any(file_path.startswith('tensor_store') for file_path, _, _ in self.read_ranges))
+        for k, v in checkpoint['model_state_dict'].items():
+            self.assertTrue(torch.equal(v, loaded_model_state[k]))
+
+    def test_missing_open_file_fn(self):
+        save_sectioned_checkpoint(build_checkpoint(), self.file_path, separate_optimizer=True)
+        loaded_checkpoint = LazyCheckpoint(RangedSectionedCheckpointReader(*self.open_file('model.pth')))
+        with self.assertRaises(ValueError):
+            loaded_checkpoint['optimizer_state_dict']
+
+    def test_not_sectioned_checkpoint(self):
+        torch.save(build_checkpoint(), self.file_path)
+        with self.assertRaises(ValueError):
+            RangedSectionedCheckpointReader(*self.open_file('model.pth'))
@@ -1,6 +1,7 @@
 import unittest
 import os
 import shutil
+import zipfile
 
 from aitoolbox.experiment.result_reporting.hyperparam_reporter import HyperParamSourceReporter
 
@@ -36,6 +37,34 @@ class TestHyperParameterReporter(unittest.TestCase):
         if os.path.exists(project_path):
             shutil.rmtree(project_path)
 
+    def test_save_experiment_source_files(self):
+        source_dir_path = os.path.join(THIS_DIR, 'dummy_source')
+        os.makedirs(os.path.join(source_dir_path, 'data'))
+        for file_rel_path in ['train.py', 'data/dataset.csv', 'model.pth']:
+            with open(os.path.join(source_dir_path, file_rel_path), 'w') as f:
+                f.write('content')
+
+        param_saver = HyperParamSourceReporter('my_project', 'fancy_experiment', '2019_01_01_00_11', THIS_DIR)
+        self.assertIsNone(param_saver.save_experiment_source_files({'source_dirs_paths': []}))
+
+        zip_path = param_saver.save_experiment_source_files({'source_dirs_paths': [source_dir_path]})
+        self.assertEqual(zip_path, os.path.join(param_saver.experiment_dir_path, 'source_code.zip'))
+        with zipfile.ZipFile(zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()),
+                             ['dummy_source/data/dataset.csv', 'dummy_source/model.pth', 'dummy_source/train.py'])
+
+        zip_path = param_saver.save_experiment_source_files({
+            'source_dirs_paths': [source_dir_path],
+            'source_snapshot': {'skip_data': True}
+        })
+        with zipfile.ZipFile(zip_path) as zip_f:
+            self.assertEqual(zip_f.namelist(), ['dummy_source/train.py'])
+
+        shutil.rmtree(source_dir_path)
+        project_path = os.path.join(THIS_DIR, 'my_project')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
     def check_saved_file_contents(self, local_args_file_path, args):
         with open(local_args_file_path, 'r') as f:
             f_lines = f.readlines()
@@ -0,0 +1,120 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import zipfile
+import subprocess
+
+from aitoolbox.experiment.result_reporting.source_snapshot import SourceSnapshot, GitignoreRules
+
+
+def create_source_dir(source_dir_path):
+    source_files = {
+        'train.py': 'print("train")',
+        'models/net.py': 'class Net: pass',
+        'models/weights.pth': 'binary',
+        'data/train.csv': '1,2,3',
+        'checkpoint_model/model_E1.pth': 'binary',
+        'build/out.py': 'generated',
+        'notes.tmp': 'tmp',
+        'keep.tmp': 'kept tmp',
+        'big_file.py': 'x' * 2000,
+        '.gitignore': 'build/\n*.tmp\n!keep.tmp\n# comment\n'
+    }
+    for file_rel_path, content in source_files.items():
+        file_path = os.path.join(source_dir_path, file_rel_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as f:
+            f.write(content)
+
+
+def run_git(git_args, cwd):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@test.com'] + git_args,
+                   cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class TestSourceSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_path = tempfile.mkdtemp()
+        self.source_dir_path = os.path.join(self.tmp_dir_path, 'project_src')
+        create_source_dir(self.source_dir_path)
+        self.zip_path = os.path.join(self.tmp_dir_path, 'source_code.zip')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir_path)
+
+    def test_snapshot_without_git(self):
+        with self.assertWarns(UserWarning):
+            zip_path = SourceSnapshot(max_file_size=1000, skip_data=True).save_zip([self.source_dir_path],
+                                                                                   self.zip_path)
+        self.assertEqual(zip_path, self.zip_path)
+
+        with zipfile.ZipFile(zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()),
+                             ['project_src/.gitignore', 'project_src/keep.tmp',
+                              'project_src/models/net.py', 'project_src/train.py'])
+            self.assertEqual(zip_f.read('project_src/train.py').decode(), 'print("train")')
+
+    def test_data_dirs_kept_by_default(self):
+        os.makedirs(os.path.join(self.source_dir_path, '__pycache__'))
+        with open(os.path.join(self.source_dir_path, '__pycache__', 'train.cpython-36.pyc'), 'w') as f:
+            f.write('compiled')
+
+        SourceSnapshot().save_zip([self.source_dir_path], self.zip_path)
+        with zipfile.ZipFile(self.zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()),
+                             ['project_src/.gitignore', 'project_src/big_file.py',
+                              'project_src/checkpoint_model/model_E1.pth', 'project_src/data/train.csv',
+                              'project_src/keep.tmp', 'project_src/models/net.py', 'project_src/models/weights.pth',
+                              'project_src/train.py'])
+
+    def test_include_exclude_patterns_and_total_size_limit(self):
+        SourceSnapshot(include_patterns=['*.py'], exclude_patterns=['models/*'], respect_gitignore=False)\
+            .save_zip([self.source_dir_path], self.zip_path)
+        with zipfile.ZipFile(self.zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()),
+                             ['project_src/big_file.py', 'project_src/build/out.py', 'project_src/train.py'])
+
+        SourceSnapshot(include_patterns=['*.py'], max_total_size=100).save_zip([self.source_dir_path], self.zip_path)
+        with zipfile.ZipFile(self.zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()), ['project_src/models/net.py', 'project_src/train.py'])
+
+    def test_snapshot_in_git_repo(self):
+        run_git(['init'], self.source_dir_path)
+        run_git(['add', '.gitignore', 'train.py', 'models/net.py'], self.source_dir_path)
+        run_git(['commit', '-m', 'init'], self.source_dir_path)
+        with open(os.path.join(self.source_dir_path, 'train.py'), 'w') as f:
+            f.write('print("changed")')
+        with open(os.path.join(self.source_dir_path, 'new_module.py'), 'w') as f:
+            f.write('new')
+
+        SourceSnapshot(max_file_size=1000, skip_data=True).save_zip([self.source_dir_path], self.zip_path)
+        with zipfile.ZipFile(self.zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()),
+                             ['project_src/.gitignore', 'project_src/keep.tmp', 'project_src/models/net.py',
+                              'project_src/new_module.py', 'project_src/train.py'])
+
+        SourceSnapshot(git_diff_only=True, skip_data=True).save_zip([self.source_dir_path], self.zip_path)
+        with zipfile.ZipFile(self.zip_path) as zip_f:
+            self.assertEqual(sorted(zip_f.namelist()),
+                             ['project_src/big_file.py', 'project_src/git_diff.patch', 'project_src/git_info.json',
+                              'project_src/keep.tmp', 'project_src/new_module.py'])
+            git_info = json.loads(zip_f.read('project_src/git_info.json'))
+            self.assertEqual(len(git_info['commit']), 40)
+            self.assertIn('+print("changed")', zip_f.read('project_src/git_diff.patch').decode())
+
+
+class TestGitignoreRules(unittest.TestCase):
+    def test_is_ignored(self):
+        rules = GitignoreRules(['# comment', '*.log', '!important.log', 'build/', '/top_only.txt', 'docs/*.md', ''])
+
+        self.assertTrue(rules.is_ignored('run.log', False))
+        self.assertTrue(rules.is_ignored('sub/run.log', False))
+        self.assertFalse(rules.is_ignored('sub/important.log', False))
+        self.assertTrue(rules.is_ignored('build', True))
+        self.assertIsNone(rules.is_ignored('build', False))
+        self.assertTrue(rules.is_ignored('top_only.txt', False))
+        self.assertIsNone(rules.is_ignored('sub/top_only.txt', False))
+        self.assertTrue(rules.is_ignored('docs/readme.md', False))
+        self.assertIsNone(rules.is_ignored('train.py', False))
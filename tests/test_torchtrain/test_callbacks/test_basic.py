@@ -1,12 +1,23 @@
 import unittest
+import os
+import shutil
+import tempfile
+import boto3
 import torch
+from moto import mock_s3
 from torch.utils.data.dataset import TensorDataset
 from torch.utils.data.dataloader import DataLoader
 
 from tests.utils import *
 
-from aitoolbox.torchtrain.callbacks.basic import EarlyStopping, ThresholdEarlyStopping, DataSubsetTestRun, FunctionOnTrainLoop
+from tests.setup_moto_env import setup_aws_for_test
+from aitoolbox.torchtrain.callbacks.basic import EarlyStopping, ThresholdEarlyStopping, DataSubsetTestRun, \
+    FunctionOnTrainLoop, LogUpload
 from aitoolbox.torchtrain.train_loop import TrainLoop
+from aitoolbox.cloud.AWS.results_save import BaseResultsSaver
+from aitoolbox.cloud.AWS.data_access import BaseDataLoader
+
+setup_aws_for_test()
 
 
 class TestEarlyStoppingCallback(unittest.TestCase):
@@ -331,3 +342,107 @@ class TestLambdaOnTrainLoop(unittest.TestCase):
         self.assertTrue(train_loop.grad_cb_used)
         train_loop.callbacks_handler.execute_gradient_update()
         self.assertEqual(train_loop.epoch, 200)
+
+
+class TestLogUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_path = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.tmp_dir_path, 'training.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir_path)
+
+    def append_log(self, content):
+        with open(self.log_file_path, 'a') as f:
+            f.write(content)
+
+    def test_flush_interval_requires_incremental_upload(self):
+        with self.assertRaises(ValueError):
+            LogUpload(self.log_file_path, flush_interval=10)
+
+    @mock_s3
+    def test_incremental_upload_segments(self):
+        boto3.resource('s3').create_bucket(Bucket='test-bucket')
+        callback = LogUpload(self.log_file_path, incremental_upload=True)
+        callback.cloud_saver = BaseResultsSaver(bucket_name='test-bucket')
+
+        self.assertIsNone(callback.upload_new_log_segment('exp/training.log_segments'))
+        self.append_log('epoch 1\nepoch 2\npartial')
+        self.assertEqual(callback.upload_new_log_segment('exp/training.log_segments'),
+                         'exp/training.log_segments/training.log.000000')
+        self.assertEqual(callback.uploaded_offset, len('epoch 1\nepoch 2\n'))
+        self.assertIsNone(callback.upload_new_log_segment('exp/training.log_segments'))
+
+        self.append_log(' line\nepoch 3')
+        callback.upload_new_log_segment('exp/training.log_segments', include_incomplete_line=True)
+
+        s3_client = boto3.client('s3')
+        bucket_content = sorted(el['Key'] for el in s3_client.list_objects(Bucket='test-bucket')['Contents'])
+        self.assertEqual(bucket_content, ['exp/training.log_segments/training.log.000000',
+                                          'exp/training.log_segments/training.log.000001'])
+        self.assertEqual(
+            s3_client.get_object(Bucket='test-bucket', Key=bucket_content[1])['Body'].read(),
+            b'partial line\nepoch 3'
+        )
+
+        downloaded_log_path = os.path.join(self.tmp_dir_path, 'downloaded.log')
+        BaseDataLoader(bucket_name='test-bucket').load_file_segments('exp/training.log_segments/',
+                                                                     downloaded_log_path)
+        with open(downloaded_log_path) as f:
+            self.assertEqual(f.read(), 'epoch 1\nepoch 2\npartial line\nepoch 3')
+
+    @mock_s3
+    def test_incremental_upload_truncated_log(self):
+        boto3.resource('s3').create_bucket(Bucket='test-bucket')
+        callback = LogUpload(self.log_file_path, incremental_upload=True)
+        callback.cloud_saver = BaseResultsSaver(bucket_name='test-bucket')
+
+        self.append_log('first long log line\n')
+        callback.upload_new_log_segment('exp/segments')
+        os.remove(self.log_file_path)
+        self.append_log('new log\n')
+        callback.upload_new_log_segment('exp/segments')
+
+        self.assertEqual(callback.uploaded_offset, len('new log\n'))
+        # Segments of the old log are replaced by the new log segments
+        s3_client = boto3.client('s3')
+        self.assertEqual([el['Key'] for el in s3_client.list_objects(Bucket='test-bucket')['Contents']],
+                         ['exp/segments/training.log.000000'])
+        self.assertEqual(
+            s3_client.get_object(Bucket='test-bucket', Key='exp/segments/training.log.000000')['Body'].read(),
+            b'new log\n'
+        )
+
+    def test_compose_deletes_segments(self):
+        class ComposingSaver:
+            def __init__(self):
+                self.files = {}
+
+            def create_experiment_cloud_storage_folder_structure(self, project_name, experiment_name, timestamp):
+                return f'{project_name}/{experiment_name}_{timestamp}/results'
+
+            def save_bytes(self, data, cloud_file_path):
+                self.files[cloud_file_path] = data
+
+            def compose_files(self, cloud_file_paths, cloud_file_path):
+                self.files[cloud_file_path] = b''.join(self.files[path] for path in cloud_file_paths)
+
+            def delete_files(self, cloud_file_paths):
+                for path in cloud_file_paths:
+                    del self.files[path]
+
+        callback = LogUpload(self.log_file_path, incremental_upload=True,
+                             project_name='project', experiment_name='exp', local_model_result_folder_path='~')
+        callback.cloud_saver = ComposingSaver()
+        callback.train_loop_obj = TrainLoop(NetUnifiedBatchFeed(), None, None, None, None, None)
+        log_cloud_path = f'project/exp_{callback.train_loop_obj.experiment_timestamp}/training.log'
+
+        self.append_log('epoch 1\n')
+        callback.upload_log_file()
+        self.append_log('epoch 2\n')
+        callback.upload_log_file(final_upload=True)
+        self.assertEqual(callback.cloud_saver.files, {log_cloud_path: b'epoch 1\nepoch 2\n'})
+
+        self.append_log('epoch 3\n')
+        callback.upload_log_file(final_upload=True)
+        self.assertEqual(callback.cloud_saver.files, {log_cloud_path: b'epoch 1\nepoch 2\nepoch 3\n'})
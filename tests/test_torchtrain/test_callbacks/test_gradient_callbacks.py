@@ -9,8 +9,10 @@ from tests.utils import *
 from torch.utils.data import DataLoader
 import torch.optim as optim
 
-from aitoolbox.torchtrain.callbacks.gradient import GradNormClip, GradientStatsPrint
+from aitoolbox.torchtrain.callbacks.gradient import GradValueClip, GradNormClip, GradientStatsPrint, GradientStatsCalculator, \
+    GradientStatsTracker
 from aitoolbox.torchtrain.train_loop import TrainLoop
+from aitoolbox.torchtrain.multi_loss_optim import MultiOptimizer
 from aitoolbox.torchtrain.data.dataset import BasicDataset
 
 
@@ -30,6 +32,89 @@ class TestGradNormClipCallback(unittest.TestCase):
         train_loop.callbacks_handler.register_callbacks([callback])
         self.assertTrue(train_loop.grad_cb_used)
 
+    def test_clip_only_optimizer_params(self):
+        model = SmallFFNet()
+        optimizer = MultiOptimizer([optim.SGD(model.l1.parameters(), lr=0.01),
+                                    optim.SGD(model.l2.parameters(), lr=0.01)])
+        train_loop = TrainLoop(model, None, None, None, optimizer, None)
+        callback = GradNormClip(0.1)
+        train_loop.callbacks_handler.register_callbacks([callback])
+
+        for param in model.parameters():
+            param.grad = torch.ones_like(param) * 10.
+        l2_grads = [param.grad.clone() for param in model.l2.parameters()]
+
+        callback.on_after_gradient_update(0)
+
+        l1_grad_norm = torch.norm(torch.stack([torch.norm(p.grad) for p in model.l1.parameters()]))
+        self.assertAlmostEqual(l1_grad_norm.item(), 0.1, places=5)
+        for param, grad in zip(model.l2.parameters(), l2_grads):
+            self.assertTrue(torch.equal(param.grad, grad))
+
+        self.assertEqual(list(callback.total_norms.keys()), [0])
+        self.assertIsInstance(callback.total_norms[0], torch.Tensor)
+
+        callback.on_after_gradient_update(1)
+        l2_grad_norm = torch.norm(torch.stack([torch.norm(p.grad) for p in model.l2.parameters()]))
+        self.assertAlmostEqual(l2_grad_norm.item(), 0.1, places=5)
+
+
+    def test_amp_gradients_unscaled_once_per_step(self):
+        class CountingScaler:
+            def __init__(self):
+                self.unscaled_optimizers = []
+
+            def is_enabled(self):
+                return True
+
+            def unscale_(self, optimizer):
+                self.unscaled_optimizers.append(optimizer)
+
+        model = SmallFFNet()
+        optimizer = optim.SGD(model.parameters(), lr=0.01)
+        train_loop = TrainLoop(model, None, None, None, optimizer, None)
+        train_loop.amp_scaler = CountingScaler()
+        callbacks = [GradNormClip(0.1), GradValueClip(0.1)]
+        train_loop.callbacks_handler.register_callbacks(callbacks)
+
+        for param in model.parameters():
+            param.grad = torch.ones_like(param) * 10.
+        for callback in callbacks:
+            callback.on_after_gradient_update(0)
+        self.assertEqual(train_loop.amp_scaler.unscaled_optimizers, [optimizer])
+
+        # Next step after the scaler update unscales the gradients again
+        train_loop.amp_unscaled_optimizer_ids.clear()
+        for callback in callbacks:
+            callback.on_after_gradient_update(0)
+        self.assertEqual(train_loop.amp_scaler.unscaled_optimizers, [optimizer, optimizer])
+
+class TestGradValueClipCallback(unittest.TestCase):
+    def test_on_train_loop_registration(self):
+        callback = GradValueClip(0.1)
+        model = NetUnifiedBatchFeed()
+        train_loop = build_train_loop(model)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertTrue(train_loop.grad_cb_used)
+
+    def test_clip_only_optimizer_params(self):
+        model = SmallFFNet()
+        optimizer = MultiOptimizer([optim.SGD(model.l1.parameters(), lr=0.01),
+                                    optim.SGD(model.l2.parameters(), lr=0.01)])
+        train_loop = TrainLoop(model, None, None, None, optimizer, None)
+        callback = GradValueClip(0.1)
+        train_loop.callbacks_handler.register_callbacks([callback])
+
+        for param in model.parameters():
+            param.grad = torch.ones_like(param) * 10.
+
+        callback.on_after_gradient_update(1)
+
+        for param in model.l1.parameters():
+            self.assertEqual(param.grad.max().item(), 10.)
+        for param in model.l2.parameters():
+            self.assertAlmostEqual(param.grad.max().item(), 0.1, places=6)
+
 
 class TestGradientStatsPrintCallback(unittest.TestCase):
     def test_on_train_loop_registration(self):
@@ -62,17 +147,126 @@ class TestGradientStatsPrintCallback(unittest.TestCase):
         TrainLoop(model, train_loader, None, None, optimizer, criterion).fit(num_epochs=1, callbacks=[callback])
         sys.stdout = sys.__stdout__
         expected_print = '\n'.join(captured_output.getvalue().split('\n')[8:]).strip()
+        output_lines = expected_print.split('\n')
 
         gradients_l1 = model.l1.weight.grad.cpu().numpy()
         gradients_l2 = model.l2.weight.grad.cpu().numpy()
 
-        cb_output = \
-            f"""
----> Model layers gradients stats
-Layer 0 grads: Mean: {np.mean(gradients_l1)}; Std {np.std(gradients_l1)}
-\tRatio of zero gradients: {float(np.count_nonzero(gradients_l1 == 0)) / gradients_l1.size}
-Layer 1 grads: Mean: {np.mean(gradients_l2)}; Std {np.std(gradients_l2)}
-\tRatio of zero gradients: {float(np.count_nonzero(gradients_l2 == 0)) / gradients_l2.size}
-        """.strip()
+        self.assertEqual(output_lines[0], '---> Model layers gradients stats')
+        self.assertEqual(len(output_lines), 5)
+        # Stats are calculated on device so they are compared to the numpy results up to the float32 precision
+        for i, gradients in enumerate([gradients_l1, gradients_l2]):
+            mean_str, std_str = output_lines[1 + i * 2].split(': Mean: ')[1].split('; Std ')
+            self.assertTrue(output_lines[1 + i * 2].startswith(f'Layer {i} grads'))
+            self.assertAlmostEqual(float(mean_str), np.mean(gradients), places=6)
+            self.assertAlmostEqual(float(std_str), np.std(gradients), places=6)
+            self.assertEqual(output_lines[2 + i * 2],
+                             f'\tRatio of zero gradients: {float(np.count_nonzero(gradients == 0)) / gradients.size}')
+
+    def test_gradients_report_direct_call(self):
+        callback = GradientStatsPrint(lambda m: [m.l1, m.l2])
+        model = SmallFFNet()
+        train_loop = build_train_loop(model)
+        train_loop.callbacks_handler.register_callbacks([callback])
+
+        x = torch.Tensor(np.random.rand(100, 10))
+        y = torch.Tensor(np.random.rand(100))
+        nn.BCELoss()(model(x).squeeze(), y).backward()
+
+        captured_output = io.StringIO()  # Create StringIO object
+        sys.stdout = captured_output
+        callback.gradients_report()
+        sys.stdout = sys.__stdout__
+        output_lines = captured_output.getvalue().strip().split('\n')
+
+        self.assertEqual(output_lines[0], '---> Model layers gradients stats')
+        self.assertEqual(len(output_lines), 5)
+
+        for i, layer in enumerate([model.l1, model.l2]):
+            gradients = layer.weight.grad.cpu().numpy()
+            mean_str, std_str = output_lines[1 + i * 2].split(': Mean: ')[1].split('; Std ')
+            zero_ratio_str = output_lines[2 + i * 2].split(': ')[1]
+
+            self.assertTrue(output_lines[1 + i * 2].startswith(f'Layer {i} grads'))
+            self.assertAlmostEqual(float(mean_str), np.mean(gradients), places=6)
+            self.assertAlmostEqual(float(std_str), np.std(gradients), places=6)
+            self.assertAlmostEqual(float(zero_ratio_str), float(np.count_nonzero(gradients == 0)) / gradients.size)
+
+
+class TestGradientStatsCalculator(unittest.TestCase):
+    def test_calculate(self):
+        calculator = GradientStatsCalculator(num_bins=10)
+        gradients = [torch.randn(20, 30), None, torch.tensor([0., 0., 1., 2.]), torch.zeros(5)]
+
+        layers_stats = calculator.calculate(gradients)
+        self.assertEqual(len(layers_stats), 4)
+        self.assertIsNone(layers_stats[1])
+
+        for grad, stats in [(gradients[0], layers_stats[0]), (gradients[2], layers_stats[2]),
+                            (gradients[3], layers_stats[3])]:
+            grad_np = grad.numpy().reshape(-1)
+            self.assertAlmostEqual(stats['norm'], np.linalg.norm(grad_np), places=4)
+            self.assertAlmostEqual(stats['mean'], np.mean(grad_np), places=5)
+            self.assertAlmostEqual(stats['std'], np.std(grad_np), places=5)
+            self.assertAlmostEqual(stats['zero_ratio'], np.count_nonzero(grad_np == 0) / grad_np.size)
+            self.assertAlmostEqual(stats['min'], np.min(grad_np), places=6)
+            self.assertAlmostEqual(stats['max'], np.max(grad_np), places=6)
+            self.assertAlmostEqual(stats['sum_squares'], np.sum(grad_np ** 2), places=3)
+            self.assertEqual(stats['num'], grad_np.size)
+            self.assertEqual(stats['hist'].shape, (10,))
+            self.assertEqual(stats['bin_edges'].shape, (11,))
+            self.assertEqual(stats['hist'].sum(), grad_np.size)
+
+        np_hist, _ = np.histogram(gradients[2].numpy(), bins=10)
+        self.assertEqual(layers_stats[2]['hist'].tolist(), np_hist.tolist())
+        self.assertEqual(layers_stats[3]['hist'].tolist(), [5.] + [0.] * 9)
+
+    def test_calculate_subsample(self):
+        calculator = GradientStatsCalculator(num_bins=5, subsample_size=50)
+        gradients = [torch.randn(1000), torch.randn(10)]
+
+        layers_stats = calculator.calculate(gradients)
+        # Subsample histogram counts are scaled up to the total number of gradients
+        self.assertAlmostEqual(layers_stats[0]['hist'].sum(), 1000, places=3)
+        self.assertEqual(set((layers_stats[0]['hist'] / 20).round(4) % 1), {0.})
+        self.assertEqual(layers_stats[0]['num'], 1000)
+        self.assertEqual(layers_stats[1]['hist'].sum(), 10)
+
+    def test_calculate_all_none(self):
+        self.assertEqual(GradientStatsCalculator().calculate([None, None]), [None, None])
+
+    def test_wrong_params(self):
+        with self.assertRaises(ValueError):
+            GradientStatsCalculator(num_bins=0)
+        with self.assertRaises(ValueError):
+            GradientStatsCalculator(subsample_size=0)
+
+
+class TestGradientStatsTracker(unittest.TestCase):
+    def test_on_train_loop_registration(self):
+        callback = GradientStatsTracker()
+        model = NetUnifiedBatchFeed()
+        train_loop = build_train_loop(model)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertTrue(train_loop.grad_cb_used)
+
+    def test_train_history_insert(self):
+        callback = GradientStatsTracker(lambda m: [m.l1, m.l2], log_frequency=3)
+        model = SmallFFNet()
+
+        x = torch.Tensor(np.random.rand(100, 10))
+        y = torch.Tensor(np.random.rand(100))
+
+        train_loader = DataLoader(TensorDataset(x, y), batch_size=10)
+        optimizer = optim.SGD(model.parameters(), lr=0.01)
+        criterion = nn.BCELoss()
+
+        train_loop = TrainLoop(model, train_loader, None, None, optimizer, criterion)
+        train_loop.fit(num_epochs=2, callbacks=[callback])
+
+        self.assertEqual(callback.grad_update_count, 20)
+        for layer_idx in [0, 1]:
+            for stat_name in ['norm', 'mean', 'std', 'zero_ratio']:
+                self.assertEqual(len(train_loop.train_history[f'grad_{stat_name}_{layer_idx}']), 2)
 
-        self.assertEqual(expected_print, cb_output)
+        self.assertEqual(callback.last_layers_stats[0]['hist'].shape, (50, ))
@@ -1,16 +1,32 @@
 import unittest
 import os
+import json
+import time
+import signal
+import io
 import shutil
+import boto3
 import torch
+from moto import mock_s3
 
 from aitoolbox.cloud.AWS.model_save import PyTorchS3ModelSaver
+from aitoolbox.cloud.background_upload import BackgroundUploader
+from aitoolbox.cloud.bundle import ArtifactBundler
+from aitoolbox.cloud.retention import CloudSubOptimalModelRemover
+from aitoolbox.experiment.local_save.async_checkpoint import AsyncCheckpointWriter, PinnedBufferPool
 from aitoolbox.experiment.experiment_saver import FullPyTorchExperimentS3Saver
 from aitoolbox.experiment.local_experiment_saver import FullPyTorchExperimentLocalSaver
 from aitoolbox.experiment.local_save.local_model_save import PyTorchLocalModelSaver
-from aitoolbox.torchtrain.callbacks.model_save import ModelCheckpoint, ModelIterationCheckpoint, ModelTrainEndSave
+from aitoolbox.experiment.local_save.sectioned_checkpoint import get_referenced_blob_names, \
+    read_sectioned_checkpoint_file_header
+from aitoolbox.torchtrain.callbacks.model_save import ModelCheckpoint, ModelIterationCheckpoint, ModelTimeCheckpoint, \
+    ModelTrainEndSave
 from aitoolbox.torchtrain.train_loop import TrainLoop
+from tests.setup_moto_env import setup_aws_for_test
 from tests.utils import NetUnifiedBatchFeed, MiniDummyOptimizer, DummyResultPackage, DummyOptimizer
 
+setup_aws_for_test()
+
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -48,6 +64,91 @@ class TestModelCheckpointCallback(unittest.TestCase):
         train_loop.callbacks_handler.register_callbacks(None, cache_callbacks=False)
         self.assertEqual(type(callback_2.model_checkpointer), PyTorchLocalModelSaver)
 
+    def test_background_uploader_on_train_start(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
+                                   cloud_save_mode='s3', rm_subopt_local_models=True,
+                                   background_upload={'max_retries': 5})
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertEqual(type(callback.background_uploader), BackgroundUploader)
+        self.assertEqual(callback.background_uploader.max_retries, 5)
+        self.assertIs(callback.model_checkpointer.background_uploader, callback.background_uploader)
+        self.assertEqual(callback.subopt_model_remover.before_remove_fn, callback.background_uploader.wait_for_files)
+        callback.on_train_end()
+        self.assertFalse(callback.background_uploader.is_alive())
+
+        callback_local = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path',
+                                         hyperparams={}, cloud_save_mode=None, background_upload=True)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback_local])
+        self.assertIsNone(callback_local.background_uploader)
+
+    def test_failed_tensor_blob_upload_uploaded_again(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
+                                   cloud_save_mode='s3', background_upload=True)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        callback.model_checkpointer.uploaded_tensor_blob_names.update({'blob_ok', 'blob_failed'})
+
+        for blob_name, success in [('blob_ok', True), ('blob_failed', False)]:
+            callback.background_uploader.finished_uploads.append({
+                'local_file_path': f'tensor_store/{blob_name}', 'cloud_file_path': f'exp/tensor_store/{blob_name}',
+                'size': 10, 'success': success, 'attempts': 1, 'error': None if success else 'Error'
+            })
+        callback.report_upload_status()
+        self.assertEqual(callback.model_checkpointer.uploaded_tensor_blob_names, {'blob_ok'})
+        callback.on_train_end()
+
+    def test_cloud_model_remover_on_train_start(self):
+        with self.assertRaises(ValueError):
+            ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
+                            cloud_save_mode=None, rm_subopt_cloud_models=True)
+
+        callback = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
+                                   cloud_save_mode='s3', num_best_checkpoints_kept=3,
+                                   rm_subopt_cloud_models={'metric_name': 'val_acc', 'dry_run': True},
+                                   background_upload=True)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertEqual(type(callback.cloud_model_remover), CloudSubOptimalModelRemover)
+        self.assertIs(callback.cloud_model_remover.cloud_saver, callback.model_checkpointer)
+        self.assertEqual(callback.cloud_model_remover.metric_name, 'val_acc')
+        self.assertEqual(callback.cloud_model_remover.num_best_kept, 3)
+        self.assertTrue(callback.cloud_model_remover.dry_run)
+        self.assertFalse(callback.cloud_model_remover.keep_latest)
+        self.assertEqual(callback.cloud_model_remover.before_remove_fn, callback.wait_for_cloud_file_uploads)
+        callback.on_train_end()
+
+    def test_artifact_bundler_on_train_start(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
+                                   cloud_save_mode='s3', bundle_artifacts={'max_bundled_file_size': 1024})
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback], cache_callbacks=True)
+        self.assertIsNone(callback.artifact_bundler)
+        train_loop.callbacks_handler.register_callbacks(None, cache_callbacks=False)
+        self.assertEqual(type(callback.artifact_bundler), ArtifactBundler)
+        self.assertIs(callback.artifact_bundler.cloud_saver, callback.model_checkpointer)
+        self.assertEqual(callback.artifact_bundler.max_bundled_file_size, 1024)
+
+        callback_local = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path',
+                                         hyperparams={}, cloud_save_mode=None, bundle_artifacts=True)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback_local], cache_callbacks=True)
+        train_loop.callbacks_handler.register_callbacks(None, cache_callbacks=False)
+        self.assertIsNone(callback_local.artifact_bundler)
+
+    def test_reduced_precision_checkpoint_exception(self):
+        with self.assertRaises(ValueError):
+            ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
+                            cloud_save_mode=None, sectioned_checkpoint={'weights_dtype': 'bf16'})
+
+        callback = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path',
+                                   hyperparams={}, cloud_save_mode=None, sectioned_checkpoint={'compression': 'zlib'})
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertTrue(callback.model_checkpointer.sectioned_checkpoint)
+        self.assertEqual(callback.model_checkpointer.sectioned_checkpoint_args, {'compression': 'zlib'})
+
     def test_optimizer_missing_state_dict_exception(self):
         callback = ModelCheckpoint('project_name', 'experiment_name', 'local_model_result_folder_path', hyperparams={},
                                    cloud_save_mode=None)
@@ -89,6 +190,255 @@ class TestModelCheckpointCallback(unittest.TestCase):
         if os.path.exists(project_path):
             shutil.rmtree(project_path)
 
+    def test_async_save_with_suboptimal_model_removal(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode=None, rm_subopt_local_models=True, num_best_checkpoints_kept=2,
+                                   async_save={'max_pending_saves': 2}, keep_latest_checkpoint=True)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertEqual(type(callback.async_checkpoint_writer), AsyncCheckpointWriter)
+        self.assertEqual(callback.async_checkpoint_writer.save_queue.maxsize, 2)
+        self.assertEqual(type(callback.pinned_buffer_pool), PinnedBufferPool)
+        train_loop.callbacks_handler.execute_train_begin()
+
+        for epoch, loss in enumerate([10., 5., 20., 1., 30.]):
+            train_loop.epoch = epoch
+            train_loop.insert_metric_result_into_history('loss', loss)
+            train_loop.callbacks_handler.execute_epoch_end()
+        callback.on_train_end()
+        self.assertFalse(callback.async_checkpoint_writer.is_alive())
+
+        experiment_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}')
+        # Suboptimal latest checkpoint (epoch 4) is kept for the training resumption
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(experiment_dir_path, 'checkpoint_model'))),
+            [f'model_experiment_name_{train_loop.experiment_timestamp}_E{ep}.pth' for ep in [1, 3, 4]]
+        )
+        with open(os.path.join(experiment_dir_path, 'latest_checkpoint.json')) as f:
+            self.assertEqual(json.load(f)['model_name'], f'model_experiment_name_{train_loop.experiment_timestamp}_E4.pth')
+
+        save_statuses = train_loop.message_service.read_messages('ModelCheckpoint_save_status')
+        self.assertEqual(len(save_statuses), 5)
+        self.assertTrue(all(el['success'] for el in save_statuses))
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+    def test_latest_checkpoint_marker_not_pointing_to_removed_checkpoint(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode=None, rm_subopt_local_models=True, num_best_checkpoints_kept=2)
+        self.assertFalse(callback.subopt_model_remover.keep_latest)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        train_loop.callbacks_handler.execute_train_begin()
+
+        for epoch, loss in enumerate([10., 5., 20.]):
+            train_loop.epoch = epoch
+            train_loop.insert_metric_result_into_history('loss', loss)
+            train_loop.callbacks_handler.execute_epoch_end()
+
+        experiment_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}')
+        # Only the best checkpoints are kept and the marker keeps pointing to the last kept one
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(experiment_dir_path, 'checkpoint_model'))),
+            [f'model_experiment_name_{train_loop.experiment_timestamp}_E{ep}.pth' for ep in [0, 1]]
+        )
+        with open(os.path.join(experiment_dir_path, 'latest_checkpoint.json')) as f:
+            self.assertEqual(json.load(f)['epoch'], 1)
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+    @mock_s3
+    def test_checkpoint_streamed_without_local_copy(self):
+        boto3.resource('s3').create_bucket(Bucket='model-result')
+        s3_client = boto3.client('s3')
+
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode='s3', num_best_checkpoints_kept=1, rm_subopt_cloud_models=True,
+                                   local_model_copy=False)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertFalse(callback.model_checkpointer.local_model_copy)
+        train_loop.callbacks_handler.execute_train_begin()
+
+        for epoch, loss in enumerate([10., 5.]):
+            train_loop.epoch = epoch
+            train_loop.insert_metric_result_into_history('loss', loss)
+            train_loop.callbacks_handler.execute_epoch_end()
+        train_loop.callbacks_handler.execute_train_end()
+
+        experiment_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}')
+        checkpoint_dir_path = os.path.join(experiment_dir_path, 'checkpoint_model')
+        self.assertFalse(os.path.exists(checkpoint_dir_path) and len(os.listdir(checkpoint_dir_path)) > 0)
+        self.assertFalse(os.path.exists(os.path.join(experiment_dir_path, 'latest_checkpoint.json')))
+
+        cloud_model_paths = [s3_object['Key'] for s3_object in
+                             s3_client.list_objects(Bucket='model-result', Prefix='project_name')['Contents']
+                             if s3_object['Key'].endswith('.pth')]
+        self.assertEqual(len(cloud_model_paths), 1)
+        self.assertTrue(cloud_model_paths[0].endswith('_E1.pth'))
+        model_checkpoint = torch.load(
+            io.BytesIO(s3_client.get_object(Bucket='model-result', Key=cloud_model_paths[0])['Body'].read())
+        )
+        self.assertEqual(model_checkpoint['epoch'], 1)
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+    def test_local_model_copy_exceptions(self):
+        with self.assertRaises(ValueError):
+            ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                            cloud_save_mode=None, local_model_copy=False)
+        for invalid_kwargs in [{'rm_subopt_local_models': True}, {'background_upload': True},
+                               {'sectioned_checkpoint': True}]:
+            with self.assertRaises(ValueError):
+                ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                cloud_save_mode='s3', local_model_copy=False, **invalid_kwargs)
+
+        callback = ModelTimeCheckpoint(10, 'project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                       cloud_save_mode='gcs', local_model_copy=False)
+        self.assertFalse(callback.local_model_copy)
+        with self.assertRaises(ValueError):
+            ModelTrainEndSave('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                              cloud_save_mode=None, local_model_copy=False)
+
+    def test_skip_suboptimal_saves_with_last_checkpoint(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode=None, rm_subopt_local_models=True, num_best_checkpoints_kept=2,
+                                   skip_suboptimal_saves=True, last_checkpoint_frequency=2)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        train_loop.callbacks_handler.execute_train_begin()
+
+        experiment_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}')
+        saved_epochs = []
+        original_save_model = callback.model_checkpointer.save_model
+
+        def save_model_spy(**kwargs):
+            saved_epochs.append(kwargs['epoch'])
+            return original_save_model(**kwargs)
+        callback.model_checkpointer.save_model = save_model_spy
+
+        for epoch, loss in enumerate([10., 5., 20., 1., 30., 25., 40.]):
+            train_loop.epoch = epoch
+            train_loop.insert_metric_result_into_history('loss', loss)
+            train_loop.callbacks_handler.execute_epoch_end()
+
+        # Epoch 5 is saved only as the last checkpoint as no checkpoint was saved for 2 epochs
+        self.assertEqual(saved_epochs, [0, 1, 3, 5])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(experiment_dir_path, 'checkpoint_model'))),
+            [f'model_experiment_name_{train_loop.experiment_timestamp}_E{ep}.pth' for ep in [1, 3, 5]]
+        )
+        with open(os.path.join(experiment_dir_path, 'latest_checkpoint.json')) as f:
+            self.assertEqual(json.load(f)['epoch'], 5)
+
+        train_loop.epoch = 7
+        train_loop.insert_metric_result_into_history('loss', 2.)
+        train_loop.callbacks_handler.execute_epoch_end()
+
+        # Last checkpoint is superseded by the new best checkpoint
+        self.assertEqual(saved_epochs, [0, 1, 3, 5, 7])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(experiment_dir_path, 'checkpoint_model'))),
+            [f'model_experiment_name_{train_loop.experiment_timestamp}_E{ep}.pth' for ep in [3, 7]]
+        )
+
+        with self.assertRaises(ValueError):
+            ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={}, skip_suboptimal_saves=True)
+
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode=None, rm_subopt_local_models=True, skip_suboptimal_saves=True)
+        self.assertIsNone(callback.last_checkpoint_frequency)
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+    def test_dedup_checkpoint_with_suboptimal_model_removal(self):
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode=None, rm_subopt_local_models=True, num_best_checkpoints_kept=1,
+                                   sectioned_checkpoint={'dedup_tensors': True})
+        self.assertEqual(callback.subopt_model_remover.after_remove_fn, callback.rm_unreferenced_tensor_blobs)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        train_loop.callbacks_handler.execute_train_begin()
+
+        for epoch, loss in enumerate([10., 5., 20.]):
+            train_loop.epoch = epoch
+            train_loop.insert_metric_result_into_history('loss', loss)
+            train_loop.callbacks_handler.execute_epoch_end()
+
+        checkpoint_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}', 'checkpoint_model')
+        self.assertEqual(
+            sorted(os.listdir(checkpoint_dir_path)),
+            [f'model_experiment_name_{train_loop.experiment_timestamp}_E{ep}.pth' for ep in [1, 2]] + ['tensor_store']
+        )
+        # Unchanged model weights and the torch RNG state of the train loop state are stored only once
+        self.assertEqual(len(os.listdir(os.path.join(checkpoint_dir_path, 'tensor_store'))),
+                         len(train_loop.model.state_dict()) + 1)
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+
+    @mock_s3
+    def test_dedup_checkpoint_with_suboptimal_cloud_model_removal(self):
+        boto3.resource('s3').create_bucket(Bucket='model-result')
+        s3_client = boto3.client('s3')
+
+        callback = ModelCheckpoint('project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                   cloud_save_mode='s3', num_best_checkpoints_kept=1,
+                                   rm_subopt_cloud_models={'metric_name': 'loss', 'tensor_store_grace_period': 0.},
+                                   sectioned_checkpoint={'dedup_tensors': True})
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        self.assertEqual(callback.cloud_model_remover.after_remove_fn, callback.rm_unreferenced_cloud_tensor_blobs)
+        train_loop.callbacks_handler.execute_train_begin()
+
+        for epoch, loss in enumerate([10., 5., 20.]):
+            train_loop.epoch = epoch
+            # Changed model weights are stored as new blobs in every checkpoint
+            with torch.no_grad():
+                for param in train_loop.model.parameters():
+                    param.add_(1.)
+            train_loop.insert_metric_result_into_history('loss', loss)
+            train_loop.callbacks_handler.execute_epoch_end()
+        train_loop.callbacks_handler.execute_train_end()
+
+        cloud_file_paths = [s3_object['Key'] for s3_object in
+                            s3_client.list_objects(Bucket='model-result', Prefix='project_name')['Contents']]
+        cloud_model_paths = [path for path in cloud_file_paths if path.endswith('.pth')]
+        self.assertEqual(len(cloud_model_paths), 1)
+        self.assertTrue(cloud_model_paths[0].endswith('_E1.pth'))
+
+        checkpoint_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}', 'checkpoint_model')
+        referenced_blob_names = get_referenced_blob_names(read_sectioned_checkpoint_file_header(
+            os.path.join(checkpoint_dir_path, os.path.basename(cloud_model_paths[0]))
+        ))
+        # Only the blobs of the kept checkpoint remain in the bucket
+        cloud_blob_names = {os.path.basename(path) for path in cloud_file_paths
+                            if os.path.basename(os.path.dirname(path)) == 'tensor_store'}
+        self.assertEqual(cloud_blob_names, referenced_blob_names)
+        self.assertEqual(callback.model_checkpointer.uploaded_tensor_blob_names, referenced_blob_names)
+        # Local checkpoints aren't removed, so neither are their blobs
+        self.assertGreater(len(os.listdir(os.path.join(checkpoint_dir_path, 'tensor_store'))),
+                           len(referenced_blob_names))
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
 
 class TestModelIterationCheckpoint(unittest.TestCase):
     def test_end_of_batch_model_saving_with_iteration_info(self):
@@ -145,6 +495,91 @@ class TestModelIterationCheckpoint(unittest.TestCase):
             shutil.rmtree(project_path)
 
 
+class TestModelTimeCheckpoint(unittest.TestCase):
+    def test_time_based_saving_keeps_rolling_window(self):
+        callback = ModelTimeCheckpoint(0.001, 'project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                       cloud_save_mode=None, num_checkpoints_kept=2, save_on_signals=[])
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        train_loop.callbacks_handler.execute_train_begin()
+
+        for iteration in range(4):
+            train_loop.total_iteration_idx = iteration
+            train_loop.callbacks_handler.execute_batch_end()
+            # Not enough time has passed to save the checkpoint again
+            train_loop.callbacks_handler.execute_batch_end()
+            train_loop.callbacks_handler.execute_epoch_end()
+            time.sleep(0.07)
+        train_loop.callbacks_handler.execute_train_end()
+
+        checkpoint_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}', 'checkpoint_model')
+        self.assertEqual(
+            sorted(os.listdir(checkpoint_dir_path)),
+            [f'model_experiment_name_{train_loop.experiment_timestamp}_E0_ITER{it}.pth' for it in [2, 3]]
+        )
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+    def test_signal_triggered_saving(self):
+        received_signals = []
+        original_handler = signal.signal(signal.SIGUSR1, lambda signal_num, frame: received_signals.append(signal_num))
+
+        callback = ModelTimeCheckpoint(60, 'project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                       cloud_save_mode=None, save_on_signals=['SIGUSR1'], async_save=True)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        train_loop.callbacks_handler.execute_train_begin()
+
+        train_loop.total_iteration_idx = 5
+        train_loop.callbacks_handler.execute_batch_end()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        # Signal is only recorded by the callback
+        self.assertEqual(received_signals, [])
+        self.assertEqual(callback.received_signal, signal.SIGUSR1)
+
+        train_loop.total_iteration_idx = 6
+        train_loop.callbacks_handler.execute_batch_end()
+
+        checkpoint_dir_path = os.path.join(THIS_DIR, 'project_name',
+                                           f'experiment_name_{train_loop.experiment_timestamp}', 'checkpoint_model')
+        self.assertEqual(os.listdir(checkpoint_dir_path),
+                         [f'model_experiment_name_{train_loop.experiment_timestamp}_E0_ITER6.pth'])
+        self.assertEqual(len(train_loop.message_service.read_messages('ModelCheckpoint_save_status')), 1)
+        # After saving the signal is handed over to the previously installed handler
+        self.assertEqual(received_signals, [signal.SIGUSR1])
+        self.assertEqual(callback.previous_signal_handlers, {})
+
+        train_loop.callbacks_handler.execute_train_end()
+        signal.signal(signal.SIGUSR1, original_handler)
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+    def test_signal_handlers_restored_at_train_end(self):
+        original_handler = signal.getsignal(signal.SIGTERM)
+
+        callback = ModelTimeCheckpoint(60, 'project_name', 'experiment_name', THIS_DIR, hyperparams={},
+                                       cloud_save_mode=None, stop_on_signal=False)
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        train_loop.callbacks_handler.execute_train_begin()
+        self.assertEqual(signal.getsignal(signal.SIGTERM), callback._record_signal)
+
+        train_loop.callbacks_handler.execute_train_end()
+        self.assertEqual(signal.getsignal(signal.SIGTERM), original_handler)
+
+        with self.assertRaises(ValueError):
+            ModelTimeCheckpoint(0, 'project_name', 'experiment_name', THIS_DIR, hyperparams={})
+
+        project_path = os.path.join(THIS_DIR, 'project_name')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
+
 class TestModelTrainEndSaveCallback(unittest.TestCase):
     def test_init(self):
         callback_true = ModelTrainEndSave('project_name', 'experiment_name', 'local_model_result_folder_path',
@@ -176,6 +611,16 @@ class TestModelTrainEndSaveCallback(unittest.TestCase):
         train_loop.callbacks_handler.register_callbacks(None, cache_callbacks=False)
         self.assertEqual(type(callback_2.results_saver), FullPyTorchExperimentLocalSaver)
 
+    def test_final_model_sectioned_checkpoint(self):
+        callback = ModelTrainEndSave('project_name', 'experiment_name', 'local_model_result_folder_path',
+                                     {}, DummyResultPackage(), cloud_save_mode=None,
+                                     sectioned_checkpoint={'weights_dtype': 'bf16', 'separate_optimizer': True})
+        train_loop = TrainLoop(NetUnifiedBatchFeed(), None, None, None, DummyOptimizer(), None)
+        train_loop.callbacks_handler.register_callbacks([callback])
+        model_saver = callback.results_saver.model_saver
+        self.assertTrue(model_saver.sectioned_checkpoint)
+        self.assertEqual(model_saver.sectioned_checkpoint_args, {'weights_dtype': 'bf16', 'separate_optimizer': True})
+
     def test_train_loop_reg_set_experiment_dir_path_for_additional_results(self):
         result_pkg = DummyResultPackage()
         self.assertIsNone(result_pkg.experiment_path)
@@ -0,0 +1,121 @@
+import unittest
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+import torch.optim as optim
+
+from tests.utils import *
+from aitoolbox.torchtrain.train_loop import TrainLoop
+from aitoolbox.torchtrain.train_loop.components.loss_tracker import LossTracker
+
+
+class TestLossTracker(unittest.TestCase):
+    def test_empty_tracker(self):
+        loss_tracker = LossTracker()
+        for loss_stat in LossTracker.loss_stat_names:
+            self.assertIsNone(loss_tracker.get_loss(loss_stat))
+
+    def test_single_loss_stats(self):
+        losses = np.random.rand(50).tolist()
+        loss_tracker = LossTracker(ema_decay=0.9, window_size=10)
+        for loss in losses:
+            loss_tracker.update(loss)
+
+        expected_ema = 0.
+        for loss in losses:
+            expected_ema = expected_ema * 0.9 + loss * 0.1
+        expected_ema /= 1. - 0.9 ** len(losses)
+
+        self.assertEqual(loss_tracker.get_loss('last'), losses[-1])
+        self.assertAlmostEqual(loss_tracker.get_loss('mean'), np.mean(losses))
+        self.assertAlmostEqual(loss_tracker.get_loss('ema'), expected_ema)
+        self.assertAlmostEqual(loss_tracker.get_loss('window_mean'), np.mean(losses[-10:]))
+
+    def test_window_shorter_than_window_size(self):
+        loss_tracker = LossTracker(window_size=10)
+        loss_tracker.update(1.)
+        loss_tracker.update(2.)
+        self.assertEqual(loss_tracker.get_loss('window_mean'), 1.5)
+        self.assertAlmostEqual(loss_tracker.get_loss('ema'), (0.98 * 1. + 2.) / (1. + 0.98))
+        self.assertGreater(loss_tracker.get_loss('ema'), 1.)
+        self.assertLess(loss_tracker.get_loss('ema'), 2.)
+
+    def test_reset_epoch(self):
+        loss_tracker = LossTracker(window_size=4)
+        for loss in [1., 2., 3.]:
+            loss_tracker.update(loss)
+        loss_tracker.reset_epoch()
+        loss_tracker.update(5.)
+
+        self.assertEqual(loss_tracker.get_loss('mean'), 5.)
+        self.assertEqual(loss_tracker.get_loss('window_mean'), np.mean([1., 2., 3., 5.]))
+
+    def test_multi_loss_stats(self):
+        loss_tracker = LossTracker(window_size=2)
+        loss_tracker.update({'loss_b': 1., 'loss_a': 10.})
+        loss_tracker.update({'loss_b': 3., 'loss_a': 20.})
+        loss_tracker.update({'loss_b': 5., 'loss_a': 30.})
+
+        self.assertEqual(loss_tracker.get_loss('last'), {'loss_a': 30., 'loss_b': 5.})
+        self.assertEqual(loss_tracker.get_loss('mean'), {'loss_a': 20., 'loss_b': 3.})
+        self.assertEqual(loss_tracker.get_loss('window_mean'), {'loss_a': 25., 'loss_b': 4.})
+
+    def test_state_dict(self):
+        loss_tracker = LossTracker(window_size=2)
+        for loss in [1., 2., 3.]:
+            loss_tracker.update({'loss_b': loss, 'loss_a': loss * 10})
+        state_dict = loss_tracker.state_dict()
+        self.assertIsInstance(state_dict['ema_loss'], list)
+
+        loss_tracker_reload = LossTracker(window_size=2)
+        loss_tracker_reload.load_state_dict(state_dict)
+        for loss_stat in LossTracker.loss_stat_names:
+            self.assertEqual(loss_tracker_reload.get_loss(loss_stat), loss_tracker.get_loss(loss_stat))
+
+        loss_tracker.update({'loss_b': 4., 'loss_a': 40.})
+        loss_tracker_reload.update({'loss_b': 4., 'loss_a': 40.})
+        for loss_stat in LossTracker.loss_stat_names:
+            self.assertEqual(loss_tracker_reload.get_loss(loss_stat), loss_tracker.get_loss(loss_stat))
+
+        loss_tracker_empty = LossTracker()
+        loss_tracker_empty.load_state_dict(LossTracker().state_dict())
+        self.assertIsNone(loss_tracker_empty.get_loss('mean'))
+
+    def test_wrong_params(self):
+        with self.assertRaises(ValueError):
+            LossTracker(ema_decay=1.)
+        with self.assertRaises(ValueError):
+            LossTracker(window_size=0)
+        with self.assertRaises(ValueError):
+            LossTracker().get_loss('median')
+
+    def test_train_loop_tracking(self):
+        model = SmallFFNet()
+        x = torch.Tensor(np.random.rand(100, 10))
+        y = torch.Tensor(np.random.rand(100))
+        train_loader = DataLoader(TensorDataset(x, y), batch_size=10)
+
+        train_loop = TrainLoop(model, train_loader, None, None, optim.SGD(model.parameters(), lr=0.01), nn.BCELoss())
+        train_loop.loss_tracker = LossTracker(window_size=5)
+        train_loop.fit(num_epochs=2)
+
+        self.assertEqual(train_loop.loss_tracker.epoch_num_batches, 0)
+        self.assertEqual(train_loop.loss_tracker.ema_num_updates, 20)
+        self.assertEqual(len(train_loop.loss_tracker.window), 5)
+
+    def test_sync_ddp(self):
+        class DummyDDPHandler:
+            @staticmethod
+            def mp_sync(data):
+                return torch.cat([data, data * 3])
+
+        loss_tracker = LossTracker(ddp_sync_frequency=1)
+        loss_tracker.update({'loss_b': 1., 'loss_a': 10.})
+        loss_tracker.update({'loss_b': 3., 'loss_a': 20.})
+        loss_tracker.sync_ddp(DummyDDPHandler())
+
+        self.assertEqual(loss_tracker.get_loss('last'), {'loss_a': 40., 'loss_b': 6.})
+        self.assertEqual(loss_tracker.get_loss('mean'), {'loss_a': 30., 'loss_b': 4.})
+
+        loss_tracker.reset_epoch()
+        self.assertIsNone(loss_tracker.ddp_synced_stats)
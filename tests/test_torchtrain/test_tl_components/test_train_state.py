@@ -0,0 +1,121 @@
+import unittest
+import os
+import random
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset, IterableDataset, TensorDataset
+from torch.utils.data.distributed import DistributedSampler
+
+from aitoolbox.torchtrain.train_loop.components.train_state import \
+    get_rng_state, set_rng_state, SkipBatchSampler, SkipLoadedBatches, build_resumed_data_loader
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CountingDataset(Dataset):
+    def __init__(self, size):
+        self.size = size
+        self.loaded_indices = []
+
+    def __getitem__(self, idx):
+        self.loaded_indices.append(idx)
+        return idx
+
+    def __len__(self):
+        return self.size
+
+
+class RangeIterableDataset(IterableDataset):
+    def __init__(self, size):
+        self.size = size
+
+    def __iter__(self):
+        return iter(range(self.size))
+
+    def __len__(self):
+        return self.size
+
+
+class TestRNGState(unittest.TestCase):
+    def test_get_set_rng_state(self):
+        rng_state = get_rng_state()
+        expected_values = [random.random(), np.random.rand(), torch.rand(1).item()]
+
+        random.random(), np.random.rand(), torch.rand(1)
+        set_rng_state(rng_state)
+        self.assertEqual([random.random(), np.random.rand(), torch.rand(1).item()], expected_values)
+
+    def test_rng_state_saved_with_weights_only_load(self):
+        rng_state = get_rng_state()
+        expected_values = [random.random(), np.random.rand(), torch.rand(1).item()]
+
+        checkpoint_path = os.path.join(THIS_DIR, 'rng_state_checkpoint.pth')
+        torch.save({'rng_state': rng_state}, checkpoint_path)
+        try:
+            rng_state_reload = torch.load(checkpoint_path, weights_only=True)['rng_state']
+        finally:
+            os.remove(checkpoint_path)
+
+        set_rng_state(rng_state_reload)
+        self.assertEqual([random.random(), np.random.rand(), torch.rand(1).item()], expected_values)
+
+
+class TestSkipBatchSampler(unittest.TestCase):
+    def test_skip_batches(self):
+        batch_sampler = [[0, 1], [2, 3], [4, 5], [6, 7]]
+        self.assertEqual(list(SkipBatchSampler(batch_sampler, 3)), [[6, 7]])
+        self.assertEqual(len(SkipBatchSampler(batch_sampler, 3)), 1)
+        self.assertEqual(list(SkipBatchSampler(batch_sampler, 10)), [])
+        self.assertEqual(len(SkipBatchSampler(batch_sampler, 10)), 0)
+
+    def test_rng_state_restored_after_skip(self):
+        rng_state = get_rng_state()
+        expected_value = torch.rand(1).item()
+
+        skip_sampler_iter = iter(SkipBatchSampler([[0], [1], [2]], 1, rng_state))
+        torch.rand(1)
+        self.assertEqual(next(skip_sampler_iter), [1])
+        self.assertEqual(torch.rand(1).item(), expected_value)
+
+
+class TestBuildResumedDataLoader(unittest.TestCase):
+    def test_shuffled_loader_continues_same_order_without_loading_skipped(self):
+        dataset = CountingDataset(50)
+        data_loader = DataLoader(dataset, batch_size=5, shuffle=True)
+
+        epoch_start_rng_state = get_rng_state()
+        original_batches = [batch.tolist() for batch in data_loader]
+
+        dataset.loaded_indices = []
+        set_rng_state(epoch_start_rng_state)
+        resumed_loader = build_resumed_data_loader(data_loader, num_skipped_batches=4)
+        resumed_batches = [batch.tolist() for batch in resumed_loader]
+
+        self.assertEqual(len(resumed_loader), 6)
+        self.assertEqual(resumed_batches, original_batches[4:])
+        self.assertEqual(sorted(dataset.loaded_indices), sorted(sum(original_batches[4:], [])))
+
+    def test_distributed_sampler_loader(self):
+        dataset = CountingDataset(40)
+        ddp_sampler = DistributedSampler(dataset, num_replicas=2, rank=1, shuffle=True)
+        data_loader = DataLoader(dataset, batch_size=4, sampler=ddp_sampler)
+
+        ddp_sampler.set_epoch(3)
+        original_batches = [batch.tolist() for batch in data_loader]
+
+        resumed_loader = build_resumed_data_loader(data_loader, num_skipped_batches=2)
+        ddp_sampler.set_epoch(3)
+        self.assertEqual([batch.tolist() for batch in resumed_loader], original_batches[2:])
+
+    def test_loader_without_auto_batching(self):
+        data_loader = DataLoader(TensorDataset(torch.arange(10)), batch_size=None)
+        resumed_loader = build_resumed_data_loader(data_loader, num_skipped_batches=7)
+        self.assertEqual([el[0].item() for el in resumed_loader], [7, 8, 9])
+
+    def test_iterable_dataset_loader(self):
+        data_loader = DataLoader(RangeIterableDataset(10), batch_size=2)
+        resumed_loader = build_resumed_data_loader(data_loader, num_skipped_batches=3)
+
+        self.assertIsInstance(resumed_loader, SkipLoadedBatches)
+        self.assertEqual(len(resumed_loader), 2)
+        self.assertEqual([batch.tolist() for batch in resumed_loader], [[6, 7], [8, 9]])
@@ -15,6 +15,7 @@ from aitoolbox import TrainLoopCheckpointEndSave, ClassificationResultPackage, T
 from aitoolbox.torchtrain.model import TTModel
 from aitoolbox.experiment.local_load.local_model_load import PyTorchLocalModelLoader
 from aitoolbox.torchtrain.callbacks.model_load import ModelLoadContinueTraining
+from aitoolbox.torchtrain.callbacks.model_save import ModelIterationCheckpoint
 from aitoolbox.torchtrain.schedulers.basic import StepLRScheduler
 from aitoolbox.torchtrain.schedulers.warmup import LinearWithWarmupScheduler
 
@@ -1074,6 +1075,57 @@ class TestEnd2EndTrainLoopModelOptimizerSaveReloadContinueTraining(unittest.Test
                 scheduler_cb[scheduler_idx].state_dict()
             )
 
+    def test_e2e_ff_net_iteration_checkpoint_continue_training_mid_epoch(self):
+        self.set_seeds()
+        batch_size = 10
+
+        train_dataset = TensorDataset(torch.randn(100, 50), torch.randint(low=0, high=10, size=(100,)))
+
+        model = FFNet()
+        optimizer = optim.Adam(model.parameters(), lr=0.001, betas=(0.9, 0.999))
+        train_loop = TrainLoop(
+            model,
+            DataLoader(train_dataset, batch_size=batch_size, shuffle=True), None, None,
+            optimizer, nn.NLLLoss()
+        )
+        train_loop.fit(num_epochs=3, callbacks=[
+            ModelIterationCheckpoint(13, project_name='e2e_train_loop_example', experiment_name='mid_epoch_example',
+                                     local_model_result_folder_path=THIS_DIR, hyperparams={'batch_size': batch_size},
+                                     cloud_save_mode=None)
+        ])
+
+        # Checkpoint at the total iteration 13 was saved in the epoch 1 after its 4th iteration
+        model_reload = FFNet()
+        optimizer_reload = optim.Adam(model_reload.parameters(), lr=0.001, betas=(0.9, 0.999))
+        train_loop_reload = TrainLoop(
+            model_reload,
+            DataLoader(train_dataset, batch_size=batch_size, shuffle=True), None, None,
+            optimizer_reload, nn.NLLLoss()
+        )
+        train_loop_reload.fit(num_epochs=3, callbacks=[
+            ModelLoadContinueTraining(train_loop.experiment_timestamp, epoch_num=1, iteration_idx=13,
+                                      project_name='e2e_train_loop_example', experiment_name='mid_epoch_example',
+                                      local_model_result_folder_path=THIS_DIR, cloud_save_mode='local')
+        ])
+
+        self.assertEqual(train_loop_reload.total_iteration_idx, train_loop.total_iteration_idx)
+        self.assertEqual(train_loop_reload.train_history['loss'], train_loop.train_history['loss'][1:])
+        self.assertEqual(train_loop_reload.loss_tracker.get_loss('ema'), train_loop.loss_tracker.get_loss('ema'))
+
+        for (orig_k, orig_state), (reload_k, reload_state) in zip(model.state_dict().items(),
+                                                                  model_reload.state_dict().items()):
+            self.assertEqual(orig_k, reload_k)
+            self.assertEqual(orig_state.tolist(), reload_state.tolist())
+
+        for orig_state, reload_state in zip(optimizer.state_dict()['state'].values(),
+                                            optimizer_reload.state_dict()['state'].values()):
+            self.assertEqual(orig_state['step'], reload_state['step'])
+            self.assertEqual(orig_state['exp_avg'].tolist(), reload_state['exp_avg'].tolist())
+
+        project_path = os.path.join(THIS_DIR, 'e2e_train_loop_example')
+        if os.path.exists(project_path):
+            shutil.rmtree(project_path)
+
     @staticmethod
     def set_seeds():
         manual_seed = 0
@@ -2,6 +2,7 @@ import unittest
 import os
 import shutil
 import zipfile
+import tarfile
 
 from aitoolbox.utils import file_system
 
@@ -59,6 +60,69 @@ class TestFileSystem(unittest.TestCase):
         if os.path.exists(dummy_dir_path + '.zip'):
             os.remove(dummy_dir_path + '.zip')
 
+    def test_unzip_file_selected_members(self):
+        dummy_dir_path, dummy_files_content = self.prepare_dummy_folder()
+        file_system.zip_folder(dummy_dir_path, dummy_dir_path)
+        shutil.rmtree(dummy_dir_path)
+
+        file_system.unzip_file(dummy_dir_path + '.zip', dummy_dir_path, members=['file_0*', 'file_2.txt'])
+        self.assertEqual(sorted(os.listdir(dummy_dir_path)), ['file_0.txt', 'file_2.txt'])
+        shutil.rmtree(dummy_dir_path)
+
+        extracted_paths = file_system.extract_zip(dummy_dir_path + '.zip', dummy_dir_path, members=['file_2.txt'])
+        self.assertEqual(extracted_paths, [os.path.join(dummy_dir_path, 'file_2.txt')])
+
+        shutil.rmtree(dummy_dir_path)
+        os.remove(dummy_dir_path + '.zip')
+
+    def test_extract_tar_stream(self):
+        dummy_dir_path, dummy_files_content = self.prepare_dummy_folder()
+        tar_path = dummy_dir_path + '.tar.gz'
+        with tarfile.open(tar_path, 'w:gz') as tar_ref:
+            tar_ref.add(dummy_dir_path, arcname='data')
+        shutil.rmtree(dummy_dir_path)
+
+        with open(tar_path, 'rb') as f:
+            extracted_paths = file_system.extract_tar_stream(f, dummy_dir_path, members=['data/file_1.txt'])
+        self.assertEqual(extracted_paths, [os.path.join(dummy_dir_path, 'data', 'file_1.txt')])
+        self.assertEqual(os.listdir(os.path.join(dummy_dir_path, 'data')), ['file_1.txt'])
+        with open(os.path.join(dummy_dir_path, 'data', 'file_1.txt')) as f:
+            self.assertEqual(f.read(), dummy_files_content[1])
+        shutil.rmtree(dummy_dir_path)
+
+        file_system.unzip_file(tar_path, dummy_dir_path)
+        self.assertEqual(sorted(os.listdir(os.path.join(dummy_dir_path, 'data'))),
+                         [f'file_{i}.txt' for i in range(len(dummy_files_content))])
+
+        shutil.rmtree(dummy_dir_path)
+        os.remove(tar_path)
+
+    def test_atomic_write_path(self):
+        dummy_dir_path, dummy_files_content = self.prepare_dummy_folder()
+        file_path = os.path.join(dummy_dir_path, 'file_0.txt')
+
+        with self.assertRaises(OSError):
+            with file_system.atomic_write_path(file_path) as tmp_file_path:
+                with open(tmp_file_path, 'w') as f:
+                    f.write('partial')
+                raise OSError('Disk full')
+
+        with open(file_path) as f:
+            self.assertEqual(f.read(), dummy_files_content[0])
+
+        with file_system.atomic_write_path(file_path) as tmp_file_path:
+            with open(tmp_file_path, 'w') as f:
+                f.write('new content')
+            with open(file_path) as f:
+                self.assertEqual(f.read(), dummy_files_content[0])
+
+        with open(file_path) as f:
+            self.assertEqual(f.read(), 'new content')
+        self.assertEqual(sorted(os.listdir(dummy_dir_path)),
+                         [f'file_{i}.txt' for i in range(len(dummy_files_content))])
+
+        shutil.rmtree(dummy_dir_path)
+
     @staticmethod
     def prepare_dummy_folder():
         dummy_dir_path = os.path.join(THIS_DIR, 'dummy_dir')